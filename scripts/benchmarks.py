@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+DumpsterMap - Benchmark Suite
+
+Times the cleaning hot paths and page prerendering at 10k/100k/1M records
+and stores the results as JSON, so a change can be compared against a
+saved baseline. Runs offline: inputs are synthetic records learned from
+data/raw (see synth_corpus.py) and copies of the real city pages.
+
+Benchmarks:
+- should_remove, normalize_phone, normalize_address, calculate_quality_score
+  (per-record calls over a pool of up to 100k records, cycled to N calls)
+- deduplicate (N distinct records)
+- clean_all (N records written as raw state files, then the full run)
+- prerender_page (one city page per 100 records, copied from dumpster-rental/)
+
+Each benchmark runs --repeat times (default 3) and the fastest run is
+kept, which is the most stable figure on a shared machine.
+
+Usage:
+  python benchmarks.py run                              # 10k and 100k, print results
+  python benchmarks.py run --sizes 10k,100k,1m          # Include 1M (several GB of RAM)
+  python benchmarks.py run --only deduplicate,clean_all
+  python benchmarks.py save                             # Write data/benchmarks/baseline.json
+  python benchmarks.py compare                          # Run now, fail on >15% regressions
+  python benchmarks.py compare old.json new.json --threshold 0.25
+"""
+
+import contextlib
+import importlib.util
+import io
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from itertools import cycle, islice
+from pathlib import Path
+
+import clean_data
+import jsonio
+from synth_corpus import CorpusGenerator, CorpusProfile, generate
+
+ROOT = Path(__file__).parent.parent
+BENCH_DIR = ROOT / "data" / "benchmarks"
+BASELINE = BENCH_DIR / "baseline.json"
+CITY_DIR = ROOT / "dumpster-rental"
+
+DEFAULT_SIZES = [10_000, 100_000]
+POOL_SIZE = 100_000
+RECORDS_PER_PAGE = 100
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.15
+SEED = 0
+
+# Fields deduplicate() reads; projecting keeps 1M records within memory
+DEDUP_FIELDS = ("phone", "address", "website", "place_id")
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().lower()
+    for suffix, factor in (("k", 1_000), ("m", 1_000_000)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * factor)
+    return int(text)
+
+
+def size_label(n: int) -> str:
+    if n % 1_000_000 == 0:
+        return f"{n // 1_000_000}m"
+    if n % 1_000 == 0:
+        return f"{n // 1_000}k"
+    return str(n)
+
+
+def load_prerender():
+    """prerender-city-seo.py has a hyphenated name, so load it by path."""
+    spec = importlib.util.spec_from_file_location("prerender_city_seo", Path(__file__).parent / "prerender-city-seo.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Inputs:
+    """Synthetic records shared by every benchmark of one run."""
+
+    def __init__(self, profile: CorpusProfile):
+        self.profile = profile
+        self._records = []
+
+    def records(self, n: int) -> list:
+        """The first n records of one deterministic synthetic stream."""
+        if len(self._records) < n:
+            gen = CorpusGenerator(self.profile, seed=SEED, slim=True)
+            self._records = []
+            for state, count in gen.state_sizes(n).items():
+                self._records.extend(gen.full_record(r) for r in gen.state_records(state, count))
+        return self._records[:n]
+
+    def pool(self, n: int) -> list:
+        return self.records(min(n, POOL_SIZE))
+
+
+# =============================================================================
+# Benchmarks
+#
+# Each takes (size, inputs, workdir) and returns a zero-argument callable
+# that does the timed work. Setup cost stays outside the timing.
+# =============================================================================
+
+def per_record(fn, field=None):
+    def setup(size, inputs, workdir):
+        pool = inputs.pool(size)
+        args = [r.get(field, "") for r in pool] if field else pool
+
+        def work():
+            for arg in islice(cycle(args), size):
+                fn(arg)
+        return work
+    return setup
+
+
+def bench_deduplicate(size, inputs, workdir):
+    records = [{k: r.get(k) for k in DEDUP_FIELDS} for r in inputs.records(size)]
+    return lambda: clean_data.deduplicate(records)
+
+
+def bench_clean_all(size, inputs, workdir):
+    corpus = workdir / f"corpus-{size}"
+    if not corpus.exists():
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate(size, corpus, seed=SEED, slim=True, profile=inputs.profile)
+
+    def work():
+        clean_dir = corpus / "cleaned"
+        shutil.rmtree(clean_dir, ignore_errors=True)
+        saved = clean_data.RAW_DIR, clean_data.CLEAN_DIR
+        clean_data.RAW_DIR, clean_data.CLEAN_DIR = corpus / "raw", clean_dir
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                clean_data.clean_all()
+        finally:
+            clean_data.RAW_DIR, clean_data.CLEAN_DIR = saved
+    return work
+
+
+def bench_prerender_page(size, inputs, workdir):
+    prerender = load_prerender()
+    sources = sorted(p for p in CITY_DIR.glob("*.html"))
+    pages = workdir / f"pages-{size}"
+    shutil.rmtree(pages, ignore_errors=True)
+    pages.mkdir(parents=True)
+    originals = []
+    for i, src in enumerate(islice(cycle(sources), max(size // RECORDS_PER_PAGE, 1))):
+        originals.append((pages / f"{i:06d}-{src.name}", src.read_text()))
+
+    def work():
+        # Restore the unrendered pages each run so every run does the same work
+        for path, html in originals:
+            path.write_text(html)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for path, _ in originals:
+                prerender.prerender_page(path)
+    return work
+
+
+BENCHMARKS = {
+    "should_remove": per_record(clean_data.should_remove),
+    "normalize_phone": per_record(clean_data.normalize_phone, "phone"),
+    "normalize_address": per_record(clean_data.normalize_address, "address"),
+    "calculate_quality_score": per_record(clean_data.calculate_quality_score),
+    "deduplicate": bench_deduplicate,
+    "clean_all": bench_clean_all,
+    "prerender_page": bench_prerender_page,
+}
+
+
+# =============================================================================
+# Running and comparing
+# =============================================================================
+
+def run(sizes=None, only=None, repeat: int = DEFAULT_REPEAT, profile: CorpusProfile = None) -> dict:
+    """Run the selected benchmarks at each size. Returns the results document."""
+    sizes = sizes or DEFAULT_SIZES
+    names = only or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        raise SystemExit(f"Unknown benchmark(s): {', '.join(unknown)}")
+
+    inputs = Inputs(profile or CorpusProfile.learn())
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="dumpstermap-bench-") as tmp:
+        for size in sizes:
+            for name in names:
+                work = BENCHMARKS[name](size, inputs, Path(tmp))
+                runs = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    work()
+                    runs.append(time.perf_counter() - start)
+                best = min(runs)
+                key = f"{name}@{size_label(size)}"
+                results[key] = {
+                    "benchmark": name,
+                    "records": size,
+                    "seconds": round(best, 6),
+                    "runs": [round(r, 6) for r in runs],
+                    "records_per_second": round(size / best, 1) if best > 0 else None,
+                }
+                print(f"  {key:32} {best:10.4f}s  {size / best if best else 0:>14,.0f} rec/s")
+
+    return {
+        "created_at": datetime.now().isoformat(),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+        },
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Print a comparison table. Returns the keys that regressed, i.e. took
+    more than (1 + threshold) times the baseline time.
+    """
+    regressions = []
+    print(f"\n{'benchmark':32} {'baseline':>10} {'current':>10} {'change':>8}")
+    for key, base in baseline["results"].items():
+        cur = current["results"].get(key)
+        if not cur:
+            continue
+        ratio = cur["seconds"] / base["seconds"] if base["seconds"] > 0 else 1.0
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(key)
+            flag = "  ❌ regression"
+        elif ratio < 1 - threshold:
+            flag = "  🚀"
+        print(f"{key:32} {base['seconds']:10.4f} {cur['seconds']:10.4f} {ratio - 1:+8.1%}{flag}")
+    if baseline.get("machine") != current.get("machine"):
+        print("\n⚠️  Baseline was recorded on a different machine; timings may not be comparable")
+    return regressions
+
+
+def save_json(path: Path, data: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    jsonio.dump(data, path)
+
+
+def main():
+    args = sys.argv[1:]
+
+    def option(flag, default=None):
+        return args[args.index(flag) + 1] if flag in args else default
+
+    sizes = [parse_size(s) for s in option("--sizes").split(",")] if "--sizes" in args else None
+    only = option("--only").split(",") if "--only" in args else None
+    repeat = int(option("--repeat", DEFAULT_REPEAT))
+    threshold = float(option("--threshold", DEFAULT_THRESHOLD))
+    positional = [a for i, a in enumerate(args)
+                  if not a.startswith("--") and (i == 0 or not args[i - 1].startswith("--"))]
+
+    if not positional:
+        print(__doc__.split("Usage:")[1])
+        sys.exit(1)
+    cmd = positional[0]
+
+    if cmd == "run":
+        results = run(sizes, only, repeat)
+        if "--out" in args:
+            save_json(Path(option("--out")), results)
+    elif cmd == "save":
+        results = run(sizes, only, repeat)
+        save_json(Path(option("--out", BASELINE)), results)
+        print(f"\n💾 Baseline saved to {option('--out', BASELINE)}")
+    elif cmd == "compare":
+        baseline_path = Path(positional[1]) if len(positional) > 1 else BASELINE
+        baseline = jsonio.load(baseline_path)
+        if len(positional) > 2:
+            current = jsonio.load(positional[2])
+        else:
+            # Re-run exactly what the baseline measured
+            base_sizes = sorted({r["records"] for r in baseline["results"].values()})
+            base_names = list(dict.fromkeys(r["benchmark"] for r in baseline["results"].values()))
+            current = run(sizes or base_sizes, only or base_names, repeat)
+        regressions = compare(baseline, current, threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} benchmark(s) regressed more than {threshold:.0%}")
+            sys.exit(1)
+        print(f"\n✅ No regressions over {threshold:.0%}")
+    else:
+        print(f"Unknown command: {cmd}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
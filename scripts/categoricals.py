@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+DumpsterMap - Dictionary-encoded categorical fields
+
+state, city, category, subtypes, business_status, time_zone, country and a
+few more fields take a few hundred distinct values across thousands of
+records, yet every parsed record carries its own copy of each string.
+
+Categoricals keeps one Vocabulary (value <-> integer code) per field.
+intern() swaps a record's values for the vocabulary's single shared
+string object, so records stay plain dicts (output is unchanged) while
+repeated strings are stored once. codes() turns a field into an integer
+column (columnar.py stores categoricals that way).
+
+Counting records by a field is a Counter over the values: encoding each
+record's value first costs the same dict lookup the Counter would do.
+count_codes() is for code columns that already exist, such as those read
+from a .cols snapshot, where no per-record lookup is needed at all.
+
+Usage:
+  python categoricals.py                 # Memory and count-by timing on data/raw
+"""
+
+import sys
+import time
+import tracemalloc
+from array import array
+from collections import Counter
+from pathlib import Path
+
+import jsonio
+
+RAW_DIR = Path(__file__).parent.parent / "data" / "raw"
+
+FIELDS = (
+    "state", "state_code", "city", "county", "category", "subtypes", "type",
+    "business_status", "time_zone", "country", "country_code",
+)
+
+
+class Vocabulary:
+    """Distinct values of one field, in first-seen order. Code 0 is None/missing."""
+
+    __slots__ = ("values", "index")
+
+    def __init__(self, values=()):
+        self.values = [None]
+        self.index = {None: 0}
+        for value in values:
+            self.code(value)
+
+    def code(self, value) -> int:
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def value(self, code: int):
+        return self.values[code]
+
+    def canonical(self, value):
+        """The shared object equal to value (added if new)."""
+        return self.values[self.code(value)]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class Categoricals:
+    """One vocabulary per categorical field of a corpus."""
+
+    def __init__(self, fields=FIELDS):
+        self.fields = tuple(fields)
+        self.vocab = {field: Vocabulary() for field in self.fields}
+
+    def intern(self, record: dict) -> dict:
+        """Replace the record's categorical values with shared objects, in place."""
+        if not isinstance(record, dict):
+            # record_model.Record: intern its slots, leaving the raw bytes alone
+            for field in self.fields:
+                value = getattr(record, field, None)
+                if isinstance(value, str):
+                    setattr(record, field, self.vocab[field].canonical(value))
+            return record
+        for field, vocab in self.vocab.items():
+            value = record.get(field)
+            if isinstance(value, str):
+                record[field] = vocab.canonical(value)
+        return record
+
+    def codes(self, records, field: str) -> array:
+        """Integer code of field for each record (0 where missing)."""
+        code = self.vocab[field].code
+        return array("i", (code(r.get(field)) for r in records))
+
+    @staticmethod
+    def count_by(records, field: str) -> dict:
+        """Records per value of field, in first-seen order."""
+        return dict(Counter(r.get(field) for r in records))
+
+    def summary(self) -> dict:
+        return {field: len(vocab) - 1 for field, vocab in self.vocab.items()}
+
+    # =========================================================================
+    # Persistence (shared vocabularies for columnar snapshots)
+    # =========================================================================
+
+    def to_dict(self) -> dict:
+        return {field: vocab.values[1:] for field, vocab in self.vocab.items()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Categoricals":
+        cats = cls(data)
+        for field, values in data.items():
+            cats.vocab[field] = Vocabulary(values)
+        return cats
+
+
+def count_codes(codes, values: list) -> dict:
+    """Rows per value of an existing code column (e.g. a .cols categorical)."""
+    return {values[c]: n for c, n in sorted(Counter(codes).items())}
+
+
+def measure(raw_dir: Path = RAW_DIR) -> dict:
+    """Traced memory of data/raw held as parsed vs. interned dicts, and count-by timing."""
+    paths = [p for p in sorted(Path(raw_dir).glob("*.json")) if p.name != "pull_summary.json"]
+    result = {}
+    for label in ("parsed", "interned"):
+        tracemalloc.start()
+        cats = Categoricals()
+        held = []
+        for path in paths:
+            records = jsonio.load(path)
+            if label == "interned":
+                for r in records:
+                    cats.intern(r)
+            held.extend(records)
+        result[label] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        result["records"] = len(held)
+
+    # End to end from the parsed records, then from a code column that
+    # already exists (the .cols case, where encoding was paid at write time)
+    start = time.perf_counter()
+    Counter(r.get("city") for r in held)
+    result["count_by_city_strings"] = time.perf_counter() - start
+    start = time.perf_counter()
+    codes = cats.codes(held, "city")
+    count_codes(codes, cats.vocab["city"].values)
+    result["count_by_city_encode_and_count"] = time.perf_counter() - start
+    start = time.perf_counter()
+    count_codes(codes, cats.vocab["city"].values)
+    result["count_by_city_code_column"] = time.perf_counter() - start
+    result["distinct"] = cats.summary()
+    return result
+
+
+def main():
+    if "--help" in sys.argv:
+        print(__doc__.split("Usage:")[1])
+        sys.exit(0)
+    r = measure()
+    saved = r["parsed"] - r["interned"]
+    print(f"📦 {r['records']:,} records")
+    print(f"   parsed:   {r['parsed'] / 1e6:8.1f} MB")
+    print(f"   interned: {r['interned'] / 1e6:8.1f} MB  ({saved / 1e6:.1f} MB saved)")
+    print(f"   count by city: Counter over records {r['count_by_city_strings'] * 1000:.1f}ms, "
+          f"encode + count {r['count_by_city_encode_and_count'] * 1000:.1f}ms, "
+          f"existing code column {r['count_by_city_code_column'] * 1000:.1f}ms")
+    print(f"   distinct values: {r['distinct']}")
+
+
+if __name__ == "__main__":
+    main()
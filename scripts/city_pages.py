@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+"""
+DumpsterMap - Data-driven city and state pages
+
+Builds dumpster-rental/ from the cleaned corpus instead of hand-kept
+CITY_CONFIG values:
+
+1. One grouped pass over the latest cleaned snapshot (the columnar .cols
+   file when there is one, reading only city, state, lat/lng, rating and
+   reviews; else the JSON) gives per-city and per-state aggregates:
+   provider count, average rating, total reviews and centroid.
+2. city.html is compiled once into literal chunks and slots (the same
+   edits generate-seo-pages.js makes), so a page is a single join.
+3. Every city with MIN_PROVIDERS or more providers, or in MAJOR_METROS,
+   gets a page, as does every existing city page the corpus covers, and
+   every state with MIN_STATE_PROVIDERS. Nearby-city links come from a
+   2-degree grid instead of comparing every pair of cities.
+4. Pages go through prerender-city-seo.py's render() before writing, so
+   the prerender stage finds them current, and a file is only written
+   when its bytes change.
+
+Existing pages the corpus has no data for are left alone and listed.
+
+Usage:
+  python city_pages.py                           # Latest data/cleaned snapshot
+  python city_pages.py <all_providers.json|.cols>
+  python city_pages.py --dry-run                 # Report, write nothing
+  python city_pages.py --min-providers 5
+"""
+
+import importlib.util
+import json
+import math
+import re
+import sys
+import time
+from decimal import ROUND_HALF_UP, Decimal
+from pathlib import Path
+
+import columnar
+import jsonio
+from categoricals import Categoricals
+
+ROOT = Path(__file__).parent.parent
+CLEAN_DIR = ROOT / "data" / "cleaned"
+CITY_DIR = ROOT / "dumpster-rental"
+TEMPLATE = ROOT / "city.html"
+BASE_URL = "https://dumpstermap.io"
+
+MIN_PROVIDERS = 3
+MIN_STATE_PROVIDERS = 5
+NEARBY_LINKS = 12
+NEARBY_MILES = 100
+STATE_TOP_CITIES = 20
+DEFAULT_CENTER = (39.8283, -98.5795)
+
+STATE_ABBRS = {
+    "Alabama": "AL", "Alaska": "AK", "Arizona": "AZ", "Arkansas": "AR", "California": "CA",
+    "Colorado": "CO", "Connecticut": "CT", "Delaware": "DE", "Florida": "FL", "Georgia": "GA",
+    "Hawaii": "HI", "Idaho": "ID", "Illinois": "IL", "Indiana": "IN", "Iowa": "IA",
+    "Kansas": "KS", "Kentucky": "KY", "Louisiana": "LA", "Maine": "ME", "Maryland": "MD",
+    "Massachusetts": "MA", "Michigan": "MI", "Minnesota": "MN", "Mississippi": "MS", "Missouri": "MO",
+    "Montana": "MT", "Nebraska": "NE", "Nevada": "NV", "New Hampshire": "NH", "New Jersey": "NJ",
+    "New Mexico": "NM", "New York": "NY", "North Carolina": "NC", "North Dakota": "ND", "Ohio": "OH",
+    "Oklahoma": "OK", "Oregon": "OR", "Pennsylvania": "PA", "Rhode Island": "RI", "South Carolina": "SC",
+    "South Dakota": "SD", "Tennessee": "TN", "Texas": "TX", "Utah": "UT", "Vermont": "VT",
+    "Virginia": "VA", "Washington": "WA", "West Virginia": "WV", "Wisconsin": "WI", "Wyoming": "WY",
+    "District Of Columbia": "DC",
+}
+STATE_NAMES = {abbr: name for name, abbr in STATE_ABBRS.items()}
+_ABBR_BY_LOWER = {name.lower(): abbr for name, abbr in STATE_ABBRS.items()}
+
+# Metros that get a page whatever their provider count (from generate-seo-pages.js)
+MAJOR_METROS = {
+    ("Pittsburgh", "PA"), ("Cleveland", "OH"), ("St. Louis", "MO"), ("Baltimore", "MD"),
+    ("Salt Lake City", "UT"), ("Hartford", "CT"), ("Providence", "RI"), ("Buffalo", "NY"),
+    ("Rochester", "NY"), ("Richmond", "VA"), ("Norfolk", "VA"), ("Louisville", "KY"),
+    ("Memphis", "TN"), ("Nashville", "TN"), ("New Orleans", "LA"), ("Oklahoma City", "OK"),
+    ("Milwaukee", "WI"), ("Kansas City", "MO"), ("Virginia Beach", "VA"), ("Raleigh", "NC"),
+    ("Greensboro", "NC"), ("Toledo", "OH"), ("Garland", "TX"), ("Chesapeake", "VA"),
+    ("Fremont", "CA"), ("Chula Vista", "CA"), ("Paradise", "NV"), ("Sunrise Manor", "NV"),
+    ("Spring Valley", "NV"), ("Enterprise", "NV"), ("Fontana", "CA"), ("Moreno Valley", "CA"),
+    ("Glendale", "CA"), ("Huntington Beach", "CA"), ("Santa Clarita", "CA"), ("Garden Grove", "CA"),
+    ("Oceanside", "CA"),
+}
+
+
+def normalize_state(state) -> str | None:
+    """Two-letter code for "TX" or "Texas" (None if unknown)."""
+    if not state:
+        return None
+    if state.upper() in STATE_NAMES:
+        return state.upper()
+    return _ABBR_BY_LOWER.get(state.lower())
+
+
+def city_slug(city: str, abbr: str) -> str:
+    return f"{re.sub(r'[^a-z0-9]+', '-', city.lower())}-{abbr.lower()}"
+
+
+def state_slug(abbr: str) -> str:
+    return re.sub(r"\s+", "-", STATE_NAMES[abbr].lower())
+
+
+def to_fixed(value: float, digits: int = 1) -> str:
+    """JavaScript's Number.toFixed: half-up on the exact binary value."""
+    return str(Decimal(value).quantize(Decimal(1).scaleb(-digits), rounding=ROUND_HALF_UP))
+
+
+def miles(lat1, lng1, lat2, lng2) -> float:
+    """Great-circle distance (haversine, Earth radius 3959 mi)."""
+    dlat = math.radians(lat2 - lat1)
+    dlng = math.radians(lng2 - lng1)
+    a = (math.sin(dlat / 2) ** 2
+         + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng / 2) ** 2)
+    return 3959 * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+# =============================================================================
+# Aggregates
+# =============================================================================
+
+class Aggregate:
+    """Running provider stats for one city or state."""
+
+    __slots__ = ("count", "rating_sum", "rated", "reviews", "lat_sum", "lng_sum", "located")
+
+    def __init__(self):
+        self.count = self.rated = self.reviews = self.located = 0
+        self.rating_sum = self.lat_sum = self.lng_sum = 0.0
+
+    def add(self, lat, lng, rating, reviews):
+        self.count += 1
+        if reviews > 0:
+            self.reviews += reviews
+            if rating:
+                self.rating_sum += rating
+                self.rated += 1
+        if lat and lng:
+            self.lat_sum += lat
+            self.lng_sum += lng
+            self.located += 1
+
+    @property
+    def avg_rating(self) -> str | None:
+        return to_fixed(self.rating_sum / self.rated) if self.rated else None
+
+    @property
+    def center(self) -> tuple | None:
+        return (self.lat_sum / self.located, self.lng_sum / self.located) if self.located else None
+
+
+def load_columns(path: Path) -> dict:
+    """
+    Columns needed for aggregation: city/state as (codes, vocabulary
+    values) and latitude, longitude, rating, reviews with None/NaN/-1 as 0.
+    """
+    path = Path(path)
+    if path.suffix == ".cols":
+        with columnar.Snapshot(path) as snap:
+            cols = {}
+            for name in ("city", "state"):
+                col = snap.column(name)
+                cols[name] = (list(col.codes), col.values)
+            for name in ("latitude", "longitude", "rating", "reviews"):
+                cols[name] = [0 if (v != v or v == -1) else v for v in snap.column(name)]
+        return cols
+    records = jsonio.load(path)
+    cats = Categoricals(("city", "state"))
+    cols = {name: (list(cats.codes(records, name)), cats.vocab[name].values) for name in ("city", "state")}
+    for name in ("latitude", "longitude", "rating", "reviews"):
+        cols[name] = [r.get(name) or 0 for r in records]
+    return cols
+
+
+def aggregate(cols: dict) -> tuple:
+    """
+    One grouped pass. Returns ({(city, abbr): Aggregate}, {abbr: Aggregate}),
+    cities in first-seen order. Grouping is on integer (city, state) codes.
+    """
+    city_codes, city_values = cols["city"]
+    state_codes, state_values = cols["state"]
+    abbr_of = [normalize_state(v) for v in state_values]
+    by_code, states = {}, {}
+    for i, (c, s) in enumerate(zip(city_codes, state_codes)):
+        abbr = abbr_of[s]
+        if not c or not abbr or not city_values[c]:
+            continue
+        row = (cols["latitude"][i], cols["longitude"][i], cols["rating"][i], cols["reviews"][i])
+        agg = by_code.get((c, s))
+        if agg is None:
+            agg = by_code[(c, s)] = Aggregate()
+        agg.add(*row)
+        state = states.get(abbr)
+        if state is None:
+            state = states[abbr] = Aggregate()
+        state.add(*row)
+    # Several state spellings can map to one code; merge their cities
+    cities = {}
+    for (c, s), agg in by_code.items():
+        key = (city_values[c], abbr_of[s])
+        if key in cities:
+            merged = cities[key]
+            for field in Aggregate.__slots__:
+                setattr(merged, field, getattr(merged, field) + getattr(agg, field))
+        else:
+            cities[key] = agg
+    return cities, states
+
+
+def nearby_cities(cities: dict, pages: list, limit: int = NEARBY_LINKS) -> dict:
+    """
+    {(city, abbr): up to limit (city, abbr) links}: same-state cities
+    first, then by distance, then by provider count, like the JS
+    generator. Out-of-state cities count within NEARBY_MILES, found
+    through a grid of 2-degree cells.
+    """
+    by_state, grid = {}, {}
+    for key, agg in cities.items():
+        by_state.setdefault(key[1], []).append(key)
+        center = agg.center
+        if center:
+            grid.setdefault((math.floor(center[0] / 2), math.floor(center[1] / 2)), []).append(key)
+
+    links = {}
+    for key in pages:
+        center = cities[key].center
+        candidates = dict.fromkeys(by_state[key[1]])
+        if center:
+            cy, cx = math.floor(center[0] / 2), math.floor(center[1] / 2)
+            # +-1 cell of latitude covers 2 degrees (138 mi); +-3 cells of
+            # longitude cover 100 mi up to about 75 degrees north
+            for dy in (-1, 0, 1):
+                for dx in range(-3, 4):
+                    for other in grid.get((cy + dy, cx + dx), ()):
+                        candidates.setdefault(other)
+        ranked = []
+        for other in candidates:
+            if other == key:
+                continue
+            other_center = cities[other].center
+            distance = miles(*center, *other_center) if center and other_center else math.inf
+            same_state = other[1] == key[1]
+            if same_state or distance < NEARBY_MILES:
+                ranked.append((not same_state, distance, -cities[other].count, other))
+        ranked.sort(key=lambda item: item[:3])
+        links[key] = [item[3] for item in ranked[:limit]]
+    return links
+
+
+# =============================================================================
+# Compiled template
+# =============================================================================
+
+class Template:
+    """
+    city.html compiled to literal chunks and slot names. compile() makes
+    the edits generate-seo-pages.js makes per page, once, leaving slots.
+    """
+
+    SLOTS = [
+        ("title", r"<title[^>]*>.*?</title>"),
+        ("description", r'<meta name="description"[^>]*>'),
+        ("canonical", r'<link rel="canonical"[^>]*>'),
+        ("og_url", r'<meta property="og:url"[^>]*>'),
+        ("og_title", r'<meta property="og:title"[^>]*>'),
+        ("og_description", r'<meta property="og:description"[^>]*>'),
+        ("schema", r'<script type="application/ld\+json" id="schema-json">[\s\S]*?</script>'),
+        ("links", r'<div class="city-links" id="nearby-links">\s*<!--\s*Populated by JS\s*-->\s*</div>'),
+        ("links_heading", r"<h3>Find Dumpster Rentals Nearby</h3>"),
+    ]
+    PATHS = [
+        (r'href="index\.html"', 'href="../index.html"'),
+        (r'href="results\.html"', 'href="../results.html"'),
+        (r'src="app\.js"', 'src="../app.js"'),
+        (r"'data/providers\.json'", "'../data/providers.json'"),
+        (r'"data/providers\.json"', '"../data/providers.json"'),
+    ]
+    LEAFLET = '<script src="https://unpkg.com/leaflet'
+
+    def __init__(self, html: str):
+        self.chunks, self.slots, self.defaults = [], [], {}
+        marked = html
+        for name, pattern in self.SLOTS:
+            match = re.search(pattern, marked, re.I)
+            if match:
+                self.defaults[name] = match.group(0)
+                marked = marked[:match.start()] + f"\0{name}\0" + marked[match.end():]
+        marked = marked.replace(self.LEAFLET, f"\0config\0\n    {self.LEAFLET}", 1)
+        for pattern, repl in self.PATHS:
+            marked = re.sub(pattern, repl, marked)
+        parts = marked.split("\0")
+        self.chunks, self.slots = parts[0::2], parts[1::2]
+
+    @classmethod
+    def load(cls, path: Path = TEMPLATE) -> "Template":
+        return cls(Path(path).read_text())
+
+    def render(self, values: dict) -> str:
+        out = [self.chunks[0]]
+        for slot, chunk in zip(self.slots, self.chunks[1:]):
+            out.append(values[slot] if slot in values else self.defaults.get(slot, ""))
+            out.append(chunk)
+        return "".join(out)
+
+
+def _json(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _page_values(title: str, desc: str, url: str, config: dict, schema: dict) -> dict:
+    return {
+        "title": f"<title>{title}</title>",
+        "description": f'<meta name="description" content="{desc}">',
+        "canonical": f'<link rel="canonical" href="{url}">',
+        "og_url": f'<meta property="og:url" content="{url}">',
+        "og_title": f'<meta property="og:title" content="{title}">',
+        "og_description": f'<meta property="og:description" content="{desc}">',
+        "schema": ('<script type="application/ld+json" id="schema-json">\n'
+                   f"{json.dumps(schema, indent=2, ensure_ascii=False)}\n    </script>"),
+        "config": f"<script>window.CITY_CONFIG = {_json(config)};</script>",
+    }
+
+
+def _config(city: str, abbr: str, agg: Aggregate, zoom: int) -> dict:
+    lat, lng = agg.center or DEFAULT_CENTER
+    return {"city": city, "state": abbr, "stateAbbr": abbr, "stateName": STATE_NAMES[abbr],
+            "lat": lat, "lng": lng, "zoom": zoom, "providerCount": agg.count,
+            "avgRating": agg.avg_rating, "totalReviews": agg.reviews}
+
+
+def _faq(question: str, answer: str) -> dict:
+    return {"@type": "Question", "name": question, "acceptedAnswer": {"@type": "Answer", "text": answer}}
+
+
+def city_page(template: Template, city: str, abbr: str, agg: Aggregate, nearby: list) -> str:
+    state_name = STATE_NAMES[abbr]
+    url = f"{BASE_URL}/dumpster-rental/{city_slug(city, abbr)}.html"
+    rating = agg.avg_rating
+    title = f"Dumpster Rental {city}, {abbr} - Compare {agg.count} Local Providers | DumpsterMap"
+    desc = (f"Compare {agg.count} dumpster rental companies in {city}, {abbr}. "
+            f"{f'Avg rating: {rating}★.' if rating else ''} Get instant quotes for roll-off dumpsters. "
+            "No phone calls needed.")
+    schema = {"@context": "https://schema.org", "@graph": [
+        {"@type": "WebPage", "@id": url, "name": title, "description": desc, "url": url,
+         "breadcrumb": {"@id": f"{url}#breadcrumb"}},
+        {"@type": "BreadcrumbList", "@id": f"{url}#breadcrumb", "itemListElement": [
+            {"@type": "ListItem", "position": 1, "name": "Home", "item": BASE_URL},
+            {"@type": "ListItem", "position": 2, "name": state_name,
+             "item": f"{BASE_URL}/dumpster-rental/{state_slug(abbr)}.html"},
+            {"@type": "ListItem", "position": 3, "name": f"{city}, {abbr}", "item": url}]},
+        {"@type": "Service", "name": f"Dumpster Rental in {city}, {abbr}", "serviceType": "Dumpster Rental",
+         "provider": {"@type": "Organization", "name": "DumpsterMap", "url": BASE_URL},
+         "areaServed": {"@type": "City", "name": city, "containedInPlace": {"@type": "State", "name": state_name}}},
+        {"@type": "FAQPage", "mainEntity": [
+            _faq(f"How much does a dumpster rental cost in {city}, {abbr}?",
+                 f"Dumpster rental prices in {city} typically range from $250-$600 depending on size. "
+                 "10-yard dumpsters start around $250-350, 20-yard at $300-450, and 30-40 yard at $400-600. "
+                 "Prices vary by provider and rental duration."),
+            _faq(f"How many dumpster rental companies are in {city}?",
+                 f"DumpsterMap lists {agg.count} dumpster rental providers serving {city}, {abbr}. "
+                 + (f"These providers have an average rating of {rating} stars from {agg.reviews} reviews."
+                    if rating else "")),
+        ]},
+    ]}
+    values = _page_values(title, desc, url, _config(city, abbr, agg, 11), schema)
+    if nearby:
+        links = "\n                ".join(
+            f'<a href="{city_slug(c, s)}.html" class="city-link">{c}, {s}</a>' for c, s in nearby)
+        values["links"] = f'<div class="city-links" id="nearby-links">\n                {links}\n            </div>'
+    return template.render(values)
+
+
+def state_page(template: Template, abbr: str, agg: Aggregate, top_cities: list) -> str:
+    name = STATE_NAMES[abbr]
+    url = f"{BASE_URL}/dumpster-rental/{state_slug(abbr)}.html"
+    rating = agg.avg_rating
+    title = f"Dumpster Rental in {name} - Compare {agg.count} Providers Statewide | DumpsterMap"
+    desc = (f"Find dumpster rental companies across {name}. Compare {agg.count} providers statewide. "
+            f"{f'Avg rating: {rating}★.' if rating else ''} Get instant quotes for any city in {name}.")
+    schema = {"@context": "https://schema.org", "@graph": [
+        {"@type": "WebPage", "@id": url, "name": title, "description": desc, "url": url,
+         "breadcrumb": {"@id": f"{url}#breadcrumb"}},
+        {"@type": "BreadcrumbList", "@id": f"{url}#breadcrumb", "itemListElement": [
+            {"@type": "ListItem", "position": 1, "name": "Home", "item": BASE_URL},
+            {"@type": "ListItem", "position": 2, "name": name, "item": url}]},
+        {"@type": "Service", "name": f"Dumpster Rental in {name}", "serviceType": "Dumpster Rental",
+         "provider": {"@type": "Organization", "name": "DumpsterMap", "url": BASE_URL},
+         "areaServed": {"@type": "State", "name": name}},
+        {"@type": "FAQPage", "mainEntity": [
+            _faq(f"How much does dumpster rental cost in {name}?",
+                 f"Dumpster rental prices in {name} typically range from $250-$600 depending on size and "
+                 "location. 10-yard dumpsters start around $250-350, 20-yard at $300-450, and 30-40 yard at "
+                 "$400-600. Urban areas may have higher prices, while rural areas tend to be more affordable."),
+            _faq(f"How many dumpster rental companies are in {name}?",
+                 f"DumpsterMap lists {agg.count} dumpster rental providers across {name}. "
+                 + (f"These providers have an average rating of {rating} stars from {agg.reviews} reviews."
+                    if rating else "")
+                 + " Use our comparison tool to find the best rates in your city."),
+            _faq(f"What size dumpster do I need for my project in {name}?",
+                 "Dumpster size depends on your project: 10-yard for small cleanouts or single-room "
+                 "renovations, 20-yard for medium home projects or roofing, 30-yard for large renovations or "
+                 "construction, and 40-yard for major construction or commercial jobs. Most residential "
+                 "projects use 10-20 yard dumpsters."),
+        ]},
+    ]}
+    values = _page_values(title, desc, url, _config("", abbr, agg, 6), schema)
+    if top_cities:
+        links = "\n                ".join(
+            f'<a href="{city_slug(c, abbr)}.html">{c} ({n})</a>' for c, n in top_cities)
+        values["links"] = f'<div class="city-links" id="nearby-links">\n                {links}\n            </div>'
+        values["links_heading"] = f"<h3>Popular Cities in {name}</h3>"
+    return template.render(values)
+
+
+# =============================================================================
+# Build
+# =============================================================================
+
+def load_prerender():
+    """prerender-city-seo.py has a hyphenated name, so load it by path."""
+    spec = importlib.util.spec_from_file_location("prerender_city_seo", Path(__file__).parent / "prerender-city-seo.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def latest_snapshot(clean_dir: Path = CLEAN_DIR) -> Path | None:
+    """Newest clean_data snapshot, preferring its .cols file."""
+    source = columnar.latest_clean_json(clean_dir)
+    if source is None:
+        return None
+    cols = source.with_name(source.name.split(".")[0] + ".cols")
+    return cols if cols.exists() else source
+
+
+def select_pages(cities: dict, existing: set, min_providers: int = MIN_PROVIDERS) -> list:
+    """City keys that get a page, by provider count (descending)."""
+    keys = [key for key, agg in cities.items()
+            if agg.count >= min_providers or key in MAJOR_METROS or f"{city_slug(*key)}.html" in existing]
+    return sorted(keys, key=lambda key: -cities[key].count)
+
+
+def build(source: Path, city_dir: Path = CITY_DIR, template: Template = None,
+          min_providers: int = MIN_PROVIDERS, dry_run: bool = False) -> dict:
+    """Generate or update every page. Returns counts and page lists."""
+    template = template or Template.load()
+    prerender = load_prerender()
+    cities, states = aggregate(load_columns(source))
+    existing = {p.name for p in city_dir.glob("*.html")} if city_dir.exists() else set()
+    pages = select_pages(cities, existing, min_providers)
+    links = nearby_cities(cities, pages)
+
+    outputs = {}
+    for key in pages:
+        outputs[f"{city_slug(*key)}.html"] = city_page(template, *key, cities[key], links[key])
+    for abbr, agg in states.items():
+        if agg.count < MIN_STATE_PROVIDERS:
+            continue
+        top = sorted(((c, cities[(c, s)].count) for c, s in cities if s == abbr), key=lambda item: -item[1])
+        outputs[f"{state_slug(abbr)}.html"] = state_page(template, abbr, agg, top[:STATE_TOP_CITIES])
+
+    result = {"written": [], "unchanged": [], "new": [], "stale": sorted(existing - set(outputs))}
+    if not dry_run:
+        city_dir.mkdir(parents=True, exist_ok=True)
+    for name, html in outputs.items():
+        rendered, _, _ = prerender.render(html, name[:-5])
+        data = (rendered or html).encode()
+        path = city_dir / name
+        if name not in existing:
+            result["new"].append(name)
+        if path.exists() and path.read_bytes() == data:
+            result["unchanged"].append(name)
+            continue
+        result["written"].append(name)
+        if not dry_run:
+            path.write_bytes(data)
+    result["cities"] = len(cities)
+    result["pages"] = len(outputs)
+    return result
+
+
+def main():
+    args = sys.argv[1:]
+    min_providers = int(args[args.index("--min-providers") + 1]) if "--min-providers" in args else MIN_PROVIDERS
+    paths = [a for a in args if not a.startswith("--") and not a.isdigit()]
+    source = Path(paths[0]) if paths else latest_snapshot()
+    if not source:
+        print(f"❌ No all_providers_YYYYMMDD.json in {CLEAN_DIR} (run clean_data.py first)")
+        sys.exit(1)
+
+    print(f"🏗️  Building city pages from {source.name}")
+    start = time.perf_counter()
+    r = build(source, min_providers=min_providers, dry_run="--dry-run" in args)
+    print(f"   {r['cities']:,} cities in the corpus, {r['pages']:,} pages")
+    print(f"   ✅ {len(r['written'])} written ({len(r['new'])} new), {len(r['unchanged'])} unchanged")
+    for name in r["new"][:20]:
+        print(f"      + {name}")
+    if r["stale"]:
+        print(f"   ⚠️  {len(r['stale'])} existing pages have no data in this snapshot (left alone)")
+    print(f"   ⏱️  {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
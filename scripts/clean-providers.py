@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 """
 Clean providers.json - Remove businesses not related to dumpster rental
+
+Changes are recorded as a patch under data/patches/ (see provider_patch.py)
+instead of a full backup copy; roll back with `provider_patch.py rollback`.
 """
-import json
 from datetime import datetime
 
+from provider_patch import PROVIDERS_PATH, commit_providers, load_providers
+
 # Categories to KEEP (relevant to dumpster/waste business)
 KEEP_CATEGORIES = {
     "Dumpster rental service",
@@ -36,53 +40,53 @@ KEEP_CATEGORIES = {
     "Centro de reciclaje",
 }
 
-# Load data
-with open('data/providers.json', 'r') as f:
-    data = json.load(f)
-
-original_count = len(data['providers'])
-print(f"Original count: {original_count}")
-
-# Filter providers
-cleaned = []
-removed_categories = {}
-
-for p in data['providers']:
-    cat = p.get('category')
+def main():
+    # Load data
+    data = load_providers(PROVIDERS_PATH)
     
-    # Keep if category is in our list
-    if cat in KEEP_CATEGORIES:
-        cleaned.append(p)
-    # Keep null categories for manual review later
-    elif cat is None:
-        cleaned.append(p)
-    else:
-        # Track what we're removing
-        removed_categories[cat] = removed_categories.get(cat, 0) + 1
-
-# Sort by review count (higher = more established), handle None
-cleaned.sort(key=lambda x: x.get('reviewCount') or 0, reverse=True)
-
-print(f"Cleaned count: {len(cleaned)}")
-print(f"Removed: {original_count - len(cleaned)}")
-print(f"\nTop removed categories:")
-for cat, count in sorted(removed_categories.items(), key=lambda x: -x[1])[:20]:
-    print(f"  {count:4d} - {cat}")
-
-# Backup original
-backup_name = f"data/providers-backup-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
-with open(backup_name, 'w') as f:
-    json.dump(data, f)
-print(f"\nBackup saved: {backup_name}")
-
-# Save cleaned data
-data['providers'] = cleaned
-data['cleaned_at'] = datetime.now().isoformat()
-data['original_count'] = original_count
-data['removed_count'] = original_count - len(cleaned)
+    original_count = len(data['providers'])
+    print(f"Original count: {original_count}")
+    
+    # Filter providers
+    cleaned = []
+    removed_categories = {}
+    
+    for p in data['providers']:
+        cat = p.get('category')
+        
+        # Keep if category is in our list
+        if cat in KEEP_CATEGORIES:
+            cleaned.append(p)
+        # Keep null categories for manual review later
+        elif cat is None:
+            cleaned.append(p)
+        else:
+            # Track what we're removing
+            removed_categories[cat] = removed_categories.get(cat, 0) + 1
+    
+    # Sort by review count (higher = more established), handle None
+    cleaned.sort(key=lambda x: x.get('reviewCount') or 0, reverse=True)
+    
+    print(f"Cleaned count: {len(cleaned)}")
+    print(f"Removed: {original_count - len(cleaned)}")
+    print(f"\nTop removed categories:")
+    for cat, count in sorted(removed_categories.items(), key=lambda x: -x[1])[:20]:
+        print(f"  {count:4d} - {cat}")
+    
+    # Save cleaned data (patch history replaces the old full backup)
+    updated = dict(data)
+    # Leave the metadata alone on a no-op run so no empty patch is written
+    if cleaned != data['providers']:
+        updated['providers'] = cleaned
+        updated['cleaned_at'] = datetime.now().isoformat()
+        updated['original_count'] = original_count
+        updated['removed_count'] = original_count - len(cleaned)
+    
+    commit_providers(data, updated, "clean-providers", PROVIDERS_PATH)
+    
+    print(f"\nCleaned data saved to {PROVIDERS_PATH}")
+    print(f"Ready for outreach: {len(cleaned)} providers")
 
-with open('data/providers.json', 'w') as f:
-    json.dump(data, f, indent=2)
 
-print(f"\nCleaned data saved to data/providers.json")
-print(f"Ready for outreach: {len(cleaned)} providers")
+if __name__ == "__main__":
+    main()
@@ -7,17 +7,31 @@ Phase 2: Data Cleaning
 - Step 2.1: Remove obvious junk
 - Step 2.2: Verify with Crawl4AI (separate script)
 - Step 2.3: Deduplicate
+
+Set PIPELINE_SLIM_RECORDS=1 to hold records as record_model.Record
+(~3.5x less memory, slower load) instead of dicts.
 """
 
-import json
 import re
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 
+import jsonio
+from categoricals import Categoricals
+from exporter import EXPORT_COMPRESS, EXPORT_FORMATS, export
+from pipeline_stats import StageTimer, export_prometheus, load_filter_score, print_stage_table
+from profiling import Profiler
+from ranking import city_state, drain, listing, ranked, top_k_by
+from record_model import SLIM_RECORDS, load_records
+
 RAW_DIR = Path.home() / "dumpstermap" / "data" / "raw"
 CLEAN_DIR = Path.home() / "dumpstermap" / "data" / "cleaned"
 
+# Providers kept per state / per city in top_providers_*.json
+TOP_K_STATE = 25
+TOP_K_CITY = 10
+
 # Removal criteria from the plan
 BIG_BOX_RETAILERS = [
     "home depot", "lowe's", "lowes", "menards", "ace hardware",
@@ -210,8 +224,8 @@ def calculate_quality_score(record: dict) -> float:
     return round(score / max_score, 2)
 
 
-def clean_all():
-    """Run cleaning pipeline on all state files."""
+def clean_all(profiler=None):
+    """Run cleaning pipeline on all state files (profiling stages if given a Profiler)."""
     CLEAN_DIR.mkdir(parents=True, exist_ok=True)
     
     stats = {
@@ -223,95 +237,68 @@ def clean_all():
         "by_state": {}
     }
     
-    all_records = []
+    timer = StageTimer(stats, profiler=profiler)
+    cats = Categoricals()
     
-    # Load and filter each state
-    for state_file in sorted(RAW_DIR.glob("*.json")):
-        if state_file.name == "pull_summary.json":
-            continue
-        
-        state_name = state_file.stem.replace("_", " ").title()
-        
-        with open(state_file) as f:
-            records = json.load(f)
-        
-        stats["total_raw"] += len(records)
-        
-        kept = []
-        state_removed = defaultdict(int)
-        
-        for r in records:
-            should_rm, reason = should_remove(r)
-            if should_rm:
-                stats["removed"][reason] += 1
-                state_removed[reason] += 1
-            else:
-                # Add quality score
-                r["_quality_score"] = calculate_quality_score(r)
-                r["_source_state"] = state_name
-                kept.append(r)
-        
-        all_records.extend(kept)
-        stats["by_state"][state_name] = {
-            "raw": len(records),
-            "kept": len(kept),
-            "removed": dict(state_removed)
-        }
-        
-        print(f"✅ {state_name}: {len(records)} → {len(kept)} ({len(records) - len(kept)} removed)")
-    
-    stats["total_after_filter"] = len(all_records)
+    # Load, filter and score one state file at a time
+    all_records = load_filter_score(RAW_DIR, stats, timer, should_remove, calculate_quality_score,
+                                    load=load_records if SLIM_RECORDS else None, categoricals=cats)
     
     # Deduplicate across all states
     print(f"\n🔄 Deduplicating {len(all_records)} records...")
-    unique_records, dupes = deduplicate(all_records)
+    with timer.stage("dedup", records=len(all_records)):
+        unique_records, dupes = deduplicate(all_records)
+    del all_records  # frees the duplicates
     stats["duplicates_removed"] = dupes
     stats["total_clean"] = len(unique_records)
+    by_state = cats.count_by(unique_records, "state")
+    stats["clean_by_state"] = dict(sorted(by_state.items(), key=lambda kv: kv[0] or ""))
     
     print(f"   Removed {dupes} duplicates")
     print(f"   Final count: {len(unique_records)}")
     
-    # Sort by quality score
-    unique_records.sort(key=lambda x: x.get("_quality_score", 0), reverse=True)
+    # Top providers per state and city for listing pages, then rank by quality
+    # score. The records are drained into the sort, so past ranking.RUN_SIZE
+    # they live only in its spilled runs, not in a list held through the export.
+    total = len(unique_records)
+    with timer.stage("sort", records=total):
+        top = {
+            "state": listing(top_k_by(unique_records, "state", TOP_K_STATE)),
+            "city": listing(top_k_by(unique_records, city_state, TOP_K_CITY)),
+        }
+        ranked_records = ranked(drain(unique_records))
     
-    # Save cleaned data
-    output_file = CLEAN_DIR / f"all_providers_{datetime.now().strftime('%Y%m%d')}.json"
-    with open(output_file, "w") as f:
-        json.dump(unique_records, f, indent=2)
+    stamp = datetime.now().strftime('%Y%m%d')
+    stats_file = CLEAN_DIR / f"cleaning_stats_{stamp}.json"
+    top_file = CLEAN_DIR / f"top_providers_{stamp}.json"
     
-    # Save stats
-    stats_file = CLEAN_DIR / f"cleaning_stats_{datetime.now().strftime('%Y%m%d')}.json"
-    stats["removed"] = dict(stats["removed"])
-    with open(stats_file, "w") as f:
-        json.dump(stats, f, indent=2)
+    # Save cleaned data: JSON, CSV for easy viewing, columnar snapshot
+    with timer.stage("write", records=total):
+        outputs = export(ranked_records, CLEAN_DIR / f"all_providers_{stamp}",
+                         EXPORT_FORMATS or ("json", "csv", "cols"), compress=EXPORT_COMPRESS)
+        jsonio.dump(top, top_file)
+    timer.close()
     
-    # Save CSV for easy viewing
-    csv_file = CLEAN_DIR / f"all_providers_{datetime.now().strftime('%Y%m%d')}.csv"
-    with open(csv_file, "w") as f:
-        # Header
-        f.write("name,phone,website,city,state,rating,reviews,quality_score\n")
-        for r in unique_records:
-            name = (r.get("name") or "").replace(",", " ")
-            phone = r.get("phone", "")
-            website = r.get("website", "")
-            city = r.get("city", "")
-            state = r.get("state", "")
-            rating = r.get("rating", "")
-            reviews = r.get("reviews", "")
-            quality = r.get("_quality_score", "")
-            f.write(f'"{name}","{phone}","{website}","{city}","{state}",{rating},{reviews},{quality}\n')
+    # Save stats (stage metrics sit next to by_state)
+    stats["removed"] = dict(stats["removed"])
+    jsonio.dump(stats, stats_file)
+    export_prometheus(stats, "clean_data")
     
     print(f"\n📊 Cleaning Summary:")
     print(f"   Raw records: {stats['total_raw']}")
     print(f"   After filtering: {stats['total_after_filter']}")
     print(f"   After dedup: {stats['total_clean']}")
     print(f"\n📁 Output files:")
-    print(f"   {output_file}")
-    print(f"   {csv_file}")
+    for path in outputs.values():
+        print(f"   {path}")
+    print(f"   {top_file}")
     print(f"   {stats_file}")
+    print_stage_table(stats)
+    if profiler:
+        profiler.finish()
     
     return stats
 
 
 if __name__ == "__main__":
-    clean_all()
+    clean_all(Profiler.from_argv("clean_data", CLEAN_DIR))
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+DumpsterMap - Columnar snapshot of the cleaned corpus
+
+clean_all writes all_providers_YYYYMMDD.cols next to the JSON, so readers
+that need a few columns do not parse the whole file:
+
+- numeric columns, fixed width and 8-byte aligned: latitude, longitude,
+  rating, _quality_score (float64, NaN when missing) and reviews (int64,
+  -1 when missing)
+- string columns: an offset array (uint64, n + 1 entries) into a UTF-8
+  heap; row i is heap[offsets[i]:offsets[i + 1]], None is stored as an
+  empty string flagged in a null bitmap
+- categorical columns (state, city): int32 codes into a vocabulary held
+  in the header (see categoricals.py)
+
+Layout: MAGIC, a uint32 header length, the JSON header (row count and
+each column's kind, type and byte ranges), padding to 8 bytes, then the
+column data. Everything is little-endian.
+
+Writer encodes records as they arrive and spills each column to its own
+temporary file, so writing a snapshot does not hold the records; the
+header and the spilled columns are stitched together on close().
+
+Snapshot memory-maps the file and returns zero-copy views: NumPy arrays
+when NumPy is installed, typed memoryviews otherwise. Only the pages of
+the columns read are touched.
+
+Usage:
+  python columnar.py <file.cols>         # Header summary
+  python columnar.py bench [rows]        # Write/read timing on a synthetic corpus
+"""
+
+import math
+import mmap
+import re
+import shutil
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from pathlib import Path
+
+import jsonio
+from categoricals import Categoricals
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MAGIC = b"DMCOLS1\n"
+VERSION = 1
+ALIGN = 8
+SPILL_ROWS = 65536  # rows buffered per column before spilling to its temporary file
+
+# column -> (kind, type code)
+COLUMNS = {
+    "latitude": ("float", "d"),
+    "longitude": ("float", "d"),
+    "rating": ("float", "d"),
+    "reviews": ("int", "q"),
+    "_quality_score": ("float", "d"),
+    "state": ("categorical", "i"),
+    "city": ("categorical", "i"),
+    "name": ("string", "Q"),
+    "phone": ("string", "Q"),
+    "website": ("string", "Q"),
+    "address": ("string", "Q"),
+    "postal_code": ("string", "Q"),
+    "place_id": ("string", "Q"),
+}
+
+# clean_all's dated outputs. validate_and_clean writes all_providers_YYYYMMDD_HHMM.json
+# to the same directory (no .cols, and possibly still being written), so match exactly.
+CLEAN_JSON_RE = re.compile(r"all_providers_\d{8}\.json(\.gz|\.zst)?")
+
+NUMPY_TYPES = {"d": "<f8", "q": "<i8", "i": "<i4", "Q": "<u8", "B": "u1"}
+
+
+def _float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _int(value) -> int:
+    return value if isinstance(value, int) and not isinstance(value, bool) else -1
+
+
+def latest_clean_json(clean_dir) -> Path | None:
+    """Newest all_providers_YYYYMMDD.json written by clean_all, or None."""
+    found = [p for p in Path(clean_dir).glob("all_providers_*") if CLEAN_JSON_RE.fullmatch(p.name)]
+    return max(found, default=None)
+
+
+# =============================================================================
+# Writing
+# =============================================================================
+
+class Writer:
+    """
+    Streams records into a snapshot, one spill file per column buffer.
+
+    Each column is encoded as rows arrive and flushed to its own temporary
+    file every SPILL_ROWS rows; close() writes the header and stitches the
+    spill files together. Memory is the null bitmaps and vocabularies plus
+    one batch per column, however many rows are written.
+    """
+
+    def __init__(self, path, columns: dict = COLUMNS):
+        self.path = Path(path)
+        self.columns = columns
+        self.rows = 0
+        self.cats = Categoricals([c for c, (kind, _) in columns.items() if kind == "categorical"])
+        self._spills = {}   # (column, part) -> temporary file
+        self._buffers = {}  # (column, part) -> array or bytearray
+        self._nulls = {}    # string column -> null bitmap
+        self._heap_size = {}
+        for name, (kind, code) in columns.items():
+            if kind == "string":
+                self._open(name, "offsets", array("Q", [0]))
+                self._open(name, "heap", bytearray())
+                self._nulls[name] = bytearray()
+                self._heap_size[name] = 0
+            else:
+                self._open(name, "data", array(code))
+
+    def _open(self, name: str, part: str, buffer):
+        self._spills[name, part] = tempfile.TemporaryFile(dir=self.path.parent, prefix=f".{self.path.name}.")
+        self._buffers[name, part] = buffer
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is None:
+            self.close()
+        else:
+            self._discard()
+
+    def add(self, r):
+        i = self.rows
+        for name, (kind, _) in self.columns.items():
+            value = r.get(name)
+            if kind == "float":
+                self._buffers[name, "data"].append(_float(value))
+            elif kind == "int":
+                self._buffers[name, "data"].append(_int(value))
+            elif kind == "categorical":
+                self._buffers[name, "data"].append(self.cats.vocab[name].code(value))
+            else:
+                nulls = self._nulls[name]
+                if i & 7 == 0:
+                    nulls.append(0)
+                if value is None:
+                    nulls[-1] |= 1 << (i & 7)
+                else:
+                    data = str(value).encode()
+                    self._buffers[name, "heap"] += data
+                    self._heap_size[name] += len(data)
+                self._buffers[name, "offsets"].append(self._heap_size[name])
+        self.rows += 1
+        if self.rows % SPILL_ROWS == 0:
+            self._flush()
+
+    def _flush(self):
+        for key, buffer in self._buffers.items():
+            if isinstance(buffer, array):
+                if sys.byteorder == "big":
+                    buffer.byteswap()
+                self._spills[key].write(buffer.tobytes())
+                del buffer[:]
+            else:
+                self._spills[key].write(buffer)
+                buffer.clear()
+
+    def close(self) -> dict:
+        """Write the snapshot to path. Returns the header."""
+        self._flush()
+        parts = []  # (spill file or bytes, length)
+        size = 0
+        header = {"version": VERSION, "rows": self.rows, "columns": {}}
+
+        def add(source, length: int) -> list:
+            nonlocal size
+            parts.append((source, length))
+            start = size
+            size += length + (-length % ALIGN)
+            return [start, length]
+
+        for name, (kind, code) in self.columns.items():
+            col = {"kind": kind, "type": code}
+            if kind == "string":
+                for part in ("offsets", "heap"):
+                    spill = self._spills[name, part]
+                    col[part] = add(spill, spill.tell())
+                col["nulls"] = add(bytes(self._nulls[name]), len(self._nulls[name]))
+            else:
+                spill = self._spills[name, "data"]
+                col["data"] = add(spill, spill.tell())
+            header["columns"][name] = col
+        header["vocab"] = self.cats.to_dict()
+
+        meta = jsonio.dumps(header)
+        prefix = MAGIC + struct.pack("<I", len(meta)) + meta
+        prefix += b"\0" * (-len(prefix) % ALIGN)
+        header["data_start"] = len(prefix)
+        try:
+            with open(self.path, "wb") as f:
+                f.write(prefix)
+                for source, length in parts:
+                    if isinstance(source, bytes):
+                        f.write(source)
+                    else:
+                        source.seek(0)
+                        shutil.copyfileobj(source, f)
+                    f.write(b"\0" * (-length % ALIGN))
+        finally:
+            self._discard()
+        return header
+
+    def _discard(self):
+        for spill in self._spills.values():
+            spill.close()
+        self._spills = {}
+
+
+def write(path, records, columns: dict = COLUMNS) -> dict:
+    """Write records' columns to path. Returns the header."""
+    writer = Writer(path, columns)
+    for r in records:
+        writer.add(r)
+    return writer.close()
+
+
+# =============================================================================
+# Reading
+# =============================================================================
+
+class StringColumn:
+    """Lazy view of a string column; rows are decoded on access."""
+
+    def __init__(self, offsets, heap: memoryview, nulls: memoryview):
+        self.offsets = offsets
+        self.heap = heap
+        self.nulls = nulls
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        if self.nulls[i >> 3] & (1 << (i & 7)):
+            return None
+        return bytes(self.heap[int(self.offsets[i]):int(self.offsets[i + 1])]).decode()
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class CategoricalColumn:
+    """Integer codes plus vocabulary; codes is a zero-copy view."""
+
+    def __init__(self, codes, values: list):
+        self.codes = codes
+        self.values = [None] + values
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i: int):
+        return self.values[int(self.codes[i])]
+
+    def __iter__(self):
+        values = self.values
+        return (values[int(c)] for c in self.codes)
+
+
+class Snapshot:
+    """Memory-mapped columnar snapshot. Use as a context manager or call close()."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._views = []
+        self._columns = {}
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._map)
+        if self._buf[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a columnar snapshot")
+        (size,) = struct.unpack_from("<I", self._buf, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.header = jsonio.loads(bytes(self._buf[start:start + size]))
+        self.rows = self.header["rows"]
+        self._data = start + size + (-(start + size) % ALIGN)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Release the mapping. NumPy views keep it alive until they are dropped."""
+        self._columns = {}
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._map is not None:
+            try:
+                self._buf.release()
+                self._map.close()
+            except BufferError:
+                pass  # NumPy arrays still reference the map; it is freed with them
+            self._buf = self._map = None
+        self._file.close()
+
+    @property
+    def columns(self) -> list:
+        return list(self.header["columns"])
+
+    def _view(self, span: list, code: str):
+        start = self._data + span[0]
+        raw = self._buf[start:start + span[1]]
+        if numpy is not None:
+            return numpy.frombuffer(raw, dtype=NUMPY_TYPES[code])
+        view = raw.cast(code)
+        self._views.extend((raw, view))
+        return view
+
+    def column(self, name: str):
+        """
+        Zero-copy view of a numeric column, codes of a categorical, or a
+        StringColumn. Built once per name and cached for the Snapshot's life.
+        """
+        cached = self._columns.get(name)
+        if cached is None:
+            cached = self._columns[name] = self._build_column(name)
+        return cached
+
+    def _build_column(self, name: str):
+        if numpy is None and sys.byteorder == "big":
+            raise RuntimeError("reading snapshots on big-endian machines needs NumPy")
+        col = self.header["columns"][name]
+        if col["kind"] in ("float", "int"):
+            return self._view(col["data"], col["type"])
+        if col["kind"] == "categorical":
+            return CategoricalColumn(self._view(col["data"], col["type"]), self.header["vocab"][name])
+        return StringColumn(self._view(col["offsets"], "Q"), self._view(col["heap"], "B"),
+                            self._view(col["nulls"], "B"))
+
+    def record(self, i: int) -> dict:
+        """One row as a dict (missing numbers come back as None)."""
+        row = {}
+        for name, col in self.header["columns"].items():
+            value = self.column(name)[i]
+            if col["kind"] == "float":
+                value = None if math.isnan(value) else float(value)
+            elif col["kind"] == "int":
+                value = None if value == -1 else int(value)
+            row[name] = value
+        return row
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def bench(rows: int = 1_000_000) -> dict:
+    """Write a synthetic snapshot of rows providers and time reading lat/lng."""
+    records = [{"latitude": 25 + (i % 2400) / 100, "longitude": -120 + (i % 5000) / 100,
+                "rating": (i % 50) / 10, "reviews": i % 900, "_quality_score": (i % 100) / 100,
+                "state": f"State {i % 50}", "city": f"City {i % 3000}", "name": f"Provider {i}",
+                "phone": None, "website": f"https://p{i}.example/", "address": None,
+                "postal_code": f"{i % 99999:05d}", "place_id": f"place-{i}"} for i in range(rows)]
+    result = {"rows": rows, "numpy": numpy is not None}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.cols"
+        start = time.perf_counter()
+        write(path, records)
+        result["write"] = time.perf_counter() - start
+        result["bytes"] = path.stat().st_size
+        del records
+        start = time.perf_counter()
+        with Snapshot(path) as snap:
+            lat, lng = snap.column("latitude"), snap.column("longitude")
+            result["open_latlng"] = time.perf_counter() - start
+            start = time.perf_counter()
+            total = sum(lat) + sum(lng) if numpy is None else float(lat.sum() + lng.sum())
+            result["scan_latlng"] = time.perf_counter() - start
+            del lat, lng, total
+    return result
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0] in ("-h", "--help"):
+        print(__doc__.split("Usage:")[1])
+        sys.exit(1)
+    if args[0] == "bench":
+        r = bench(int(args[1]) if len(args) > 1 else 1_000_000)
+        print(f"⏱️  {r['rows']:,} rows, {r['bytes'] / 1e6:.1f} MB, numpy: {r['numpy']}")
+        print(f"   write {r['write']:.2f}s   open lat/lng {r['open_latlng'] * 1000:.2f}ms   "
+              f"scan lat/lng {r['scan_latlng'] * 1000:.1f}ms")
+        return
+    with Snapshot(args[0]) as snap:
+        print(f"📦 {snap.path.name}: {snap.rows:,} rows")
+        for name, col in snap.header["columns"].items():
+            size = sum(col[k][1] for k in ("data", "offsets", "heap", "nulls") if k in col)
+            print(f"   {name:16} {col['kind']:12} {size / 1e3:10.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+DumpsterMap - End-to-end load test against the fake services
+
+Starts fake_services.py on a free local port, points the real scripts at
+it through their environment overrides and runs:
+
+- outscraper: outscraper_pull.pull_state_data for the first N states
+- yelp: YelpScraper.scrape_city for the first N cities, then
+  enrich_details for up to --details providers (under the real limiter)
+- websites: validate_and_clean.validate_websites over N farm sites
+
+For each scenario it reports wall time, throughput, client-side latency
+percentiles per unit of work (state, city, site) and the server-side
+latency and status mix per endpoint. The website scenario also counts
+sites reported unreachable although a GET would have worked (HEAD
+quirks), which is the validator's false-negative rate.
+
+Requires aiohttp; the outscraper and yelp scenarios also need requests.
+
+Usage:
+  python e2e_benchmark.py                              # All scenarios, defaults
+  python e2e_benchmark.py --only websites --sites 5000 --concurrency 100
+  python e2e_benchmark.py --states 5 --cities 3 --details 200
+  python e2e_benchmark.py --latency-ms 120 --yelp-429 0.2 --error-rate 0.1
+  python e2e_benchmark.py --out data/benchmarks/e2e.json
+"""
+
+import asyncio
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+import jsonio
+from fake_services import DEFAULT_CONFIG, FakeServices, latency_summary
+
+SCRIPTS = Path(__file__).parent
+
+DEFAULTS = {"states": 3, "cities": 2, "details": 100, "sites": 1000, "concurrency": 50}
+SCENARIOS = ("outscraper", "yelp", "websites")
+
+
+def load_script(path: Path, name: str):
+    """Load a script fresh, so module-level settings pick up the current env."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@contextlib.contextmanager
+def patched_env(values: dict):
+    saved = {k: os.environ.get(k) for k in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def scenario_result(units: str, durations: list, wall: float, **extra) -> dict:
+    return {
+        "units": units,
+        "wall_seconds": round(wall, 4),
+        "per_second": round(len(durations) / wall, 2) if wall else None,
+        "latency": latency_summary(durations),
+        **extra,
+    }
+
+
+# =============================================================================
+# Scenarios
+# =============================================================================
+
+def run_outscraper(services, workdir: Path, states: int) -> dict:
+    pull = load_script(SCRIPTS / "outscraper_pull.py", "outscraper_pull_e2e")
+    out_dir = workdir / "outscraper"
+    out_dir.mkdir()
+    durations, records = [], 0
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for state in pull.STATES[:states]:
+            count, seconds = timed(pull.pull_state_data, state, out_dir)
+            records += count
+            durations.append(seconds)
+    return scenario_result("states", durations, time.perf_counter() - start, records=records)
+
+
+def run_yelp(services, workdir: Path, cities: int, details: int) -> dict:
+    yelp = load_script(SCRIPTS / "scrapers" / "yelp-scraper.py", "yelp_scraper_e2e")
+    scraper = yelp.YelpScraper("e2e-key")
+    scraper.detail_cache = yelp.DetailCache(workdir / "yelp-details")
+    durations = []
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper.open_log(workdir / "yelp-providers.ndjson")
+        try:
+            for city, state in yelp.MAJOR_CITIES[:cities]:
+                providers, seconds = timed(scraper.scrape_city, city, state)
+                scraper.providers.extend(providers)
+                durations.append(seconds)
+        finally:
+            scraper.close_log()
+        search_wall = time.perf_counter() - start
+        enriched, detail_wall = timed(scraper.enrich_details, scraper.providers[:details])
+    return scenario_result("cities", durations, search_wall,
+                           providers=len(scraper.providers), api_calls=scraper.api_calls,
+                           enriched=enriched, details_seconds=round(detail_wall, 4))
+
+
+def run_websites(services, workdir: Path, sites: int, concurrency: int) -> dict:
+    validate = load_script(SCRIPTS / "validate_and_clean.py", "validate_and_clean_e2e")
+    durations = []
+    check = validate.check_website
+
+    async def timed_check(session, url, timeout=10):
+        start = time.perf_counter()
+        try:
+            return await check(session, url, timeout)
+        finally:
+            durations.append(time.perf_counter() - start)
+
+    # validate_websites looks check_website up at call time
+    validate.check_website = timed_check
+    records = [{"website": services.site_url(n), "_site": str(n)} for n in range(sites)]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        checked = asyncio.run(validate.validate_websites(records, concurrency))
+    wall = time.perf_counter() - start
+
+    by_kind = Counter()
+    false_unreachable = 0
+    for r in checked:
+        kind = services.site_kind(r["_site"])
+        reachable = r["_website_check"]["reachable"]
+        by_kind[f"{kind}:{'up' if reachable else 'down'}"] += 1
+        if not reachable and kind in ("head_405", "head_404"):
+            false_unreachable += 1
+    return scenario_result("sites", durations, wall, concurrency=concurrency,
+                           outcomes=dict(sorted(by_kind.items())), false_unreachable=false_unreachable)
+
+
+# =============================================================================
+# Running
+# =============================================================================
+
+def run(only=None, config: dict = None, records: list = None, **sizes) -> dict:
+    """Run the selected scenarios against one fresh server. Returns the report."""
+    sizes = {**DEFAULTS, **sizes}
+    results = {}
+    with FakeServices(records, config) as services, patched_env(services.env()), \
+            tempfile.TemporaryDirectory(prefix="dumpstermap-e2e-") as tmp:
+        for name in only or SCENARIOS:
+            services.reset_metrics()
+            workdir = Path(tmp) / name
+            workdir.mkdir()
+            try:
+                if name == "outscraper":
+                    result = run_outscraper(services, workdir, sizes["states"])
+                elif name == "yelp":
+                    result = run_yelp(services, workdir, sizes["cities"], sizes["details"])
+                elif name == "websites":
+                    result = run_websites(services, workdir, sizes["sites"], sizes["concurrency"])
+                else:
+                    raise SystemExit(f"Unknown scenario: {name}")
+            except ImportError as e:
+                print(f"⚠️  {name}: skipped ({e})")
+                continue
+            result["server"] = services.summary()
+            results[name] = result
+            print_result(name, result)
+        config = services.config
+
+    return {"created_at": datetime.now().isoformat(), "config": config, "sizes": sizes, "results": results}
+
+
+def print_result(name: str, result: dict):
+    lat = result["latency"]
+    print(f"\n📊 {name}: {lat['count']} {result['units']} in {result['wall_seconds']:.2f}s "
+          f"({result['per_second']}/s)  p50 {lat['p50_ms']}ms  p95 {lat['p95_ms']}ms  p99 {lat['p99_ms']}ms")
+    for key in ("records", "providers", "api_calls", "enriched", "details_seconds", "false_unreachable"):
+        if key in result:
+            print(f"  {key}: {result[key]}")
+    if "outcomes" in result:
+        print(f"  outcomes: {result['outcomes']}")
+    for endpoint, s in result["server"].items():
+        print(f"  {endpoint:20} {s['count']:>7} req  p50 {s['p50_ms']:>8}ms  p99 {s['p99_ms']:>8}ms  {s['statuses']}")
+
+
+def main():
+    args = sys.argv[1:]
+
+    def option(flag, default=None):
+        return args[args.index(flag) + 1] if flag in args else default
+
+    config = {}
+    if "--latency-ms" in args:
+        config["latency_ms"] = float(option("--latency-ms"))
+    if "--yelp-429" in args:
+        config["yelp_429_rate"] = float(option("--yelp-429"))
+    if "--error-rate" in args:
+        config["site_mix"] = {**DEFAULT_CONFIG["site_mix"], "error": float(option("--error-rate"))}
+    sizes = {k: int(option(f"--{k}", v)) for k, v in DEFAULTS.items()}
+    only = option("--only").split(",") if "--only" in args else None
+
+    report = run(only, config, **sizes)
+    if "--out" in args:
+        out = Path(option("--out"))
+        out.parent.mkdir(parents=True, exist_ok=True)
+        jsonio.dump(report, out)
+        print(f"\n💾 Report saved to {out}")
+
+
+if __name__ == "__main__":
+    main()
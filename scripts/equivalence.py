@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+DumpsterMap - Reference vs. optimized equivalence harness
+
+Runs the frozen reference implementations in cleaning_reference.py and a
+candidate implementation side by side, and reports the first record on
+which they disagree. The candidate defaults to the live clean_data
+function, so after any performance rewrite of clean_data this proves the
+output is unchanged:
+
+- over every record of the real raw corpus (data/raw), and
+- over generated records (Hypothesis, when installed), which hit edge
+  cases the corpus lacks: None fields, odd phone formats, abbreviations,
+  keywords in unexpected places, duplicate-heavy batches.
+
+Checked functions: should_remove, normalize_phone, normalize_address,
+calculate_quality_score (per record) and deduplicate (whole batch: same
+records kept, same order, same duplicate count).
+
+Usage:
+  python equivalence.py                                  # live clean_data vs reference
+  python equivalence.py --candidate deduplicate=fast_clean:deduplicate
+  python equivalence.py --examples 5000                  # More generated cases
+  python equivalence.py --raw-dir /tmp/synth/raw         # Another corpus
+"""
+
+import copy
+import importlib
+import json
+import sys
+from pathlib import Path
+
+import clean_data
+import cleaning_reference
+import jsonio
+
+try:
+    import hypothesis
+    from hypothesis import strategies as st
+except ImportError:
+    hypothesis = None
+
+RAW_DIR = Path(__file__).parent.parent / "data" / "raw"
+DEFAULT_EXAMPLES = 500
+
+# Function name -> record field it takes ("record" for the whole dict)
+PER_RECORD = {
+    "should_remove": "record",
+    "normalize_phone": "phone",
+    "normalize_address": "address",
+    "calculate_quality_score": "record",
+}
+FUNCTIONS = list(PER_RECORD) + ["deduplicate"]
+
+
+def load_raw_records(raw_dir: Path = RAW_DIR) -> list:
+    records = []
+    for path in sorted(Path(raw_dir).glob("*.json")):
+        if path.name == "pull_summary.json":
+            continue
+        records.extend(jsonio.load(path))
+    return records
+
+
+def resolve(spec: str):
+    """'module:function' -> the function."""
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def live(name: str):
+    return getattr(clean_data, name)
+
+
+# =============================================================================
+# Comparison
+# =============================================================================
+
+def _argument(record: dict, field: str):
+    return record if field == "record" else record.get(field, "")
+
+
+def _call(fn, arg):
+    """Result or raised exception type, so both sides can be compared."""
+    try:
+        return fn(arg)
+    except Exception as e:
+        return f"<raised {type(e).__name__}: {e}>"
+
+
+def first_divergence(name: str, records: list, candidate=None) -> dict | None:
+    """
+    Run reference and candidate for one function over records.
+
+    Returns None when they agree, else a dict naming the first diverging
+    record (its index, the record, and both results).
+    """
+    reference = getattr(cleaning_reference, name)
+    candidate = candidate or live(name)
+
+    if name == "deduplicate":
+        return _dedup_divergence(reference, candidate, records)
+
+    field = PER_RECORD[name]
+    for i, record in enumerate(records):
+        # Separate copies: a candidate that mutates its input must not hide it
+        expected = _call(reference, copy.deepcopy(_argument(record, field)))
+        actual = _call(candidate, copy.deepcopy(_argument(record, field)))
+        if expected != actual:
+            return {"function": name, "index": i, "record": record,
+                    "reference": expected, "candidate": actual}
+    return None
+
+
+def _dedup_divergence(reference, candidate, records: list) -> dict | None:
+    ref_in, cand_in = copy.deepcopy(records), copy.deepcopy(records)
+    ref_unique, ref_dupes = reference(ref_in)
+    cand_unique, cand_dupes = candidate(cand_in)
+
+    # Map kept records back to input positions by identity
+    ref_pos = {id(r): i for i, r in enumerate(ref_in)}
+    cand_pos = {id(r): i for i, r in enumerate(cand_in)}
+    ref_kept = [ref_pos.get(id(r)) for r in ref_unique]
+    cand_kept = [cand_pos.get(id(r)) for r in cand_unique]
+
+    if ref_kept == cand_kept and ref_dupes == cand_dupes:
+        return None
+
+    ref_set, cand_set = set(ref_kept), set(cand_kept)
+    for i in range(len(records)):
+        if (i in ref_set) != (i in cand_set):
+            return {"function": "deduplicate", "index": i, "record": records[i],
+                    "reference": "kept" if i in ref_set else "dropped",
+                    "candidate": "kept" if i in cand_set else "dropped"}
+    for pos, (a, b) in enumerate(zip(ref_kept, cand_kept)):
+        if a != b:
+            return {"function": "deduplicate", "index": a, "record": records[a] if a is not None else None,
+                    "reference": f"output position {pos}", "candidate": f"record {b} at that position"}
+    return {"function": "deduplicate", "index": None, "record": None,
+            "reference": f"{len(ref_kept)} kept, {ref_dupes} duplicates",
+            "candidate": f"{len(cand_kept)} kept, {cand_dupes} duplicates"}
+
+
+def check_corpus(records: list, candidates: dict = None) -> dict:
+    """First divergence (or None) per function over a record list."""
+    candidates = candidates or {}
+    return {name: first_divergence(name, records, candidates.get(name)) for name in FUNCTIONS}
+
+
+# =============================================================================
+# Generated records
+# =============================================================================
+
+if hypothesis:
+    _keywords = (cleaning_reference.BIG_BOX_RETAILERS + cleaning_reference.NATIONAL_WASTE_COMPANIES
+                 + cleaning_reference.JUNK_REMOVAL_ONLY_KEYWORDS + cleaning_reference.NON_DUMPSTER_KEYWORDS)
+    _words = st.sampled_from(["Dumpster", "Rental", "Roll", "Off", "Waste", "LLC", "Inc", "&", "Junk",
+                              "Removal", "Hauling", "dumpster", "Co."] + _keywords)
+    _text = st.lists(_words, max_size=6).map(" ".join)
+    _phone = st.one_of(
+        st.none(), st.just(""),
+        st.from_regex(r"\+1 [2-9]\d\d-\d{3}-\d{4}", fullmatch=True),
+        st.from_regex(r"\([2-9]\d\d\) \d{3}-\d{4}", fullmatch=True),
+        st.from_regex(r"1?[2-9]\d{9}", fullmatch=True),
+        st.text(alphabet="0123456789-+() ", max_size=16),
+    )
+    _street = st.builds(
+        lambda n, name, kind: f"{n} {name} {kind}",
+        st.integers(1, 99999), st.sampled_from(["Main", "Oak", "Dr Martin Luther King Jr", "St Johns"]),
+        st.sampled_from(["St", "Street", "Rd", "Ave", "Blvd", "Dr", "ST", "rd."]))
+    _address = st.one_of(st.none(), st.just(""), st.builds(
+        lambda street, city: f"{street},  {city}, TX 7870{len(city) % 10}",
+        _street, st.sampled_from(["Austin", "Round Rock", "Dr Pepper"])))
+    _website = st.one_of(
+        st.none(), st.just(""),
+        st.builds(lambda scheme, www, host, path: f"{scheme}{www}{host}{path}",
+                  st.sampled_from(["http://", "https://", "HTTPS://", ""]), st.sampled_from(["", "www."]),
+                  st.sampled_from(["abc.com", "facebook.com", "yelp.com", "google.com", "xyz-dumpsters.net"]),
+                  st.sampled_from(["", "/", "/contact", "?utm=1"])))
+    _number = st.one_of(st.none(), st.integers(-5, 500), st.floats(0, 5, allow_nan=False))
+
+    RECORD = st.fixed_dictionaries({
+        "name": st.one_of(st.none(), _text),
+        "category": st.one_of(st.none(), _text),
+        "subtypes": st.one_of(st.none(), _text),
+        "business_status": st.sampled_from(["OPERATIONAL", "CLOSED_PERMANENTLY", "CLOSED_TEMPORARILY", "", None]),
+        "phone": _phone,
+        "address": _address,
+        "website": _website,
+        "verified": st.one_of(st.none(), st.booleans()),
+        "reviews": _number,
+        "rating": _number,
+        "photos_count": _number,
+        "place_id": st.one_of(st.none(), st.sampled_from([f"p{i}" for i in range(20)])),
+    })
+    # Small pools of shared values so batches contain real duplicates
+    BATCH = st.lists(RECORD, max_size=40)
+
+
+def check_generated(name: str, candidate=None, examples: int = DEFAULT_EXAMPLES, shrink: bool = True) -> dict | None:
+    """
+    Search generated batches for a divergence. None if Hypothesis finds none.
+
+    With shrink (the default) the reported record comes from the smallest
+    failing batch Hypothesis can find, which takes longer but reads better.
+    """
+    if not hypothesis:
+        raise RuntimeError("hypothesis is not installed")
+    found = {}
+    phases = list(hypothesis.Phase) if shrink else [hypothesis.Phase.generate]
+
+    @hypothesis.settings(max_examples=examples, deadline=None, database=None, phases=phases,
+                         suppress_health_check=list(hypothesis.HealthCheck))
+    @hypothesis.given(BATCH)
+    def agree(batch):
+        divergence = first_divergence(name, batch, candidate)
+        if divergence:
+            found["divergence"] = divergence
+        assert divergence is None
+
+    try:
+        agree()
+    except AssertionError:
+        # Hypothesis re-raises with the shrunk example last, so 'found' holds it
+        return found["divergence"]
+    return None
+
+
+def report(divergence: dict) -> str:
+    return (f"❌ {divergence['function']}: first divergence at record {divergence['index']}\n"
+            f"   reference: {divergence['reference']!r}\n"
+            f"   candidate: {divergence['candidate']!r}\n"
+            f"   record: {json.dumps(divergence['record'], default=str)[:500]}")
+
+
+def main():
+    args = sys.argv[1:]
+    candidates = {}
+    for i, arg in enumerate(args):
+        if arg == "--candidate":
+            name, _, spec = args[i + 1].partition("=")
+            if name not in FUNCTIONS:
+                raise SystemExit(f"Unknown function: {name}")
+            candidates[name] = resolve(spec)
+    examples = int(args[args.index("--examples") + 1]) if "--examples" in args else DEFAULT_EXAMPLES
+    raw_dir = Path(args[args.index("--raw-dir") + 1]) if "--raw-dir" in args else RAW_DIR
+
+    records = load_raw_records(raw_dir)
+    print(f"🔍 Checking {len(FUNCTIONS)} functions on {len(records):,} corpus records")
+    failures = 0
+    for name, divergence in check_corpus(records, candidates).items():
+        if divergence:
+            failures += 1
+            print(report(divergence))
+        else:
+            print(f"✅ {name}: identical on corpus")
+
+    if hypothesis:
+        print(f"\n🎲 Generated records ({examples} batches per function)")
+        for name in FUNCTIONS:
+            divergence = check_generated(name, candidates.get(name), examples)
+            if divergence:
+                failures += 1
+                print(report(divergence))
+            else:
+                print(f"✅ {name}: identical on generated batches")
+    else:
+        print("\n⚠️  hypothesis not installed; generated-record checks skipped")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
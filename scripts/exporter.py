@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+DumpsterMap - Streaming multi-format export
+
+export() walks the records once and feeds every requested format:
+
+- json: pretty list, byte-for-byte what jsonio.dump writes
+- ndjson: one compact record per line (record_model.Record raw bytes reused)
+- csv: csv module, RFC 4180 (quoted text fields, doubled quotes, CRLF)
+- cols: columnar.py snapshot, spilled per column as records arrive (never
+  compressed, it is memory-mapped)
+
+Text outputs can be gzip (.gz, reproducible) or zstd (.zst, needs
+zstandard) compressed. With threads=True each compressed output gets its
+own thread, fed in 1 MB chunks, so the outputs compress in parallel
+(zlib and zstd release the GIL) while the main thread keeps encoding.
+
+PIPELINE_EXPORT_COMPRESS=gz|zst and PIPELINE_EXPORT_FORMATS=json,csv,...
+override what clean_data and validate_and_clean write.
+
+Usage:
+  python exporter.py <records.json> <out stem> [formats] [--gz|--zst] [--no-threads]
+"""
+
+import csv
+import io
+import os
+import queue
+import sys
+import threading
+import time
+import zlib
+from pathlib import Path
+
+import columnar
+import jsonio
+from record_model import Record
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+FORMATS = ("json", "ndjson", "csv", "cols")
+EXTENSIONS = {"json": ".json", "ndjson": ".ndjson", "csv": ".csv", "cols": ".cols"}
+CHUNK = 1 << 20
+
+EXPORT_COMPRESS = os.environ.get("PIPELINE_EXPORT_COMPRESS") or None
+EXPORT_FORMATS = tuple(f for f in os.environ.get("PIPELINE_EXPORT_FORMATS", "").split(",") if f)
+
+# (header, record key or function of the record)
+CSV_COLUMNS = [
+    ("name", "name"),
+    ("phone", "phone"),
+    ("website", "website"),
+    ("city", "city"),
+    ("state", "state"),
+    ("rating", "rating"),
+    ("reviews", "reviews"),
+    ("quality_score", "_quality_score"),
+]
+
+
+# =============================================================================
+# Compressed binary outputs
+# =============================================================================
+
+class _Compressor:
+    """Incremental compressor for an extension ('' for none)."""
+
+    def __init__(self, suffix: str, path: Path):
+        if suffix == ".gz":
+            # wbits=31: gzip container with a zero mtime, like jsonio.compress
+            self._obj = zlib.compressobj(6, zlib.DEFLATED, 31)
+            self.compress, self.flush = self._obj.compress, self._obj.flush
+        elif suffix == ".zst":
+            if not zstandard:
+                raise RuntimeError(f"zstandard is required to write {path}")
+            self._obj = zstandard.ZstdCompressor(level=6).compressobj()
+            self.compress, self.flush = self._obj.compress, self._obj.flush
+        else:
+            self.compress, self.flush = bytes, bytes
+
+
+class Output:
+    """Buffered binary file, optionally compressed on a background thread."""
+
+    def __init__(self, path, threaded: bool = False):
+        self.path = Path(path)
+        self._file = open(self.path, "wb")
+        self._codec = _Compressor(self.path.suffix, self.path)
+        self._buffer = bytearray()
+        self._queue = self._thread = self._error = None
+        if threaded and self.path.suffix in (".gz", ".zst"):
+            self._queue = queue.Queue(maxsize=8)
+            self._thread = threading.Thread(target=self._drain, name=f"compress-{self.path.name}", daemon=True)
+            self._thread.start()
+
+    def _drain(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            if self._error is None:
+                try:
+                    self._file.write(self._codec.compress(chunk))
+                except Exception as e:  # surfaced by close()
+                    self._error = e
+
+    def _emit(self, chunk: bytes):
+        if self._queue is not None:
+            self._queue.put(chunk)
+        else:
+            self._file.write(self._codec.compress(chunk))
+
+    def write(self, data: bytes):
+        self._buffer += data
+        if len(self._buffer) >= CHUNK:
+            self._emit(bytes(self._buffer))
+            self._buffer.clear()
+
+    def close(self):
+        if self._buffer:
+            self._emit(bytes(self._buffer))
+            self._buffer.clear()
+        if self._thread:
+            self._queue.put(None)
+            self._thread.join()
+        try:
+            if self._error:
+                raise self._error
+            self._file.write(self._codec.flush())
+        finally:
+            self._file.close()
+
+
+# =============================================================================
+# Format writers
+# =============================================================================
+
+class JsonWriter:
+    """Pretty JSON list, one record at a time."""
+
+    def __init__(self, out: Output):
+        self.out = out
+        self.count = 0
+
+    def write(self, r):
+        self.out.write(b"[\n  " if not self.count else b",\n  ")
+        # Strings never contain raw newlines in JSON, so re-indenting by line is safe
+        self.out.write(jsonio.dumps(r, pretty=True).replace(b"\n", b"\n  "))
+        self.count += 1
+
+    def close(self):
+        self.out.write(b"\n]" if self.count else b"[]")
+        self.out.close()
+
+
+class NdjsonWriter:
+    def __init__(self, out: Output):
+        self.out = out
+
+    def write(self, r):
+        self.out.write(r.dumps() if isinstance(r, Record) else jsonio.dumps(r))
+        self.out.write(b"\n")
+
+    def close(self):
+        self.out.close()
+
+
+class CsvWriter:
+    """RFC 4180 CSV: text quoted, numbers bare, None as an empty quoted field."""
+
+    def __init__(self, out: Output, columns: list):
+        self.out = out
+        self.getters = [key if callable(key) else (lambda r, k=key: r.get(k)) for _, key in columns]
+        self._text = io.StringIO()
+        self._csv = csv.writer(self._text, quoting=csv.QUOTE_NONNUMERIC)
+        self._csv.writerow([header for header, _ in columns])
+
+    def write(self, r):
+        self._csv.writerow([get(r) for get in self.getters])
+        if self._text.tell() >= CHUNK:
+            self._flush()
+
+    def _flush(self):
+        self.out.write(self._text.getvalue().encode())
+        self._text.seek(0)
+        self._text.truncate()
+
+    def close(self):
+        self._flush()
+        self.out.close()
+
+
+class ColumnarWriter:
+    """Streams records into a columnar snapshot (see columnar.Writer)."""
+
+    def __init__(self, path: Path):
+        self._writer = columnar.Writer(path)
+
+    def write(self, r):
+        self._writer.add(r)
+
+    def close(self):
+        self._writer.close()
+
+
+# =============================================================================
+# Export
+# =============================================================================
+
+def export(records, stem, formats=FORMATS, csv_columns: list = CSV_COLUMNS,
+           compress: str = None, threads: bool = True) -> dict:
+    """
+    Write records (any iterable) to stem + extension for each format in
+    one pass. compress is None, "gz" or "zst". Returns {format: path}.
+    """
+    stem = Path(stem)
+    paths, writers = {}, []
+    try:
+        for fmt in formats:
+            if fmt not in EXTENSIONS:
+                raise ValueError(f"Unknown export format: {fmt}")
+            path = stem.with_name(stem.name + EXTENSIONS[fmt])
+            if fmt == "cols":
+                writers.append(ColumnarWriter(path))
+            else:
+                if compress:
+                    path = path.with_name(f"{path.name}.{compress}")
+                out = Output(path, threaded=threads)
+                writers.append(JsonWriter(out) if fmt == "json" else NdjsonWriter(out) if fmt == "ndjson"
+                               else CsvWriter(out, csv_columns))
+            paths[fmt] = path
+        for r in records:
+            for w in writers:
+                w.write(r)
+    finally:
+        for w in writers:
+            w.close()
+    return paths
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if len(args) < 2:
+        print(__doc__.split("Usage:")[1])
+        sys.exit(1)
+    compress = "gz" if "--gz" in sys.argv else "zst" if "--zst" in sys.argv else None
+    formats = args[2].split(",") if len(args) > 2 else FORMATS
+    records = jsonio.load(args[0])
+    start = time.perf_counter()
+    paths = export(records, args[1], formats, compress=compress, threads="--no-threads" not in sys.argv)
+    print(f"📦 {len(records):,} records exported in {time.perf_counter() - start:.2f}s")
+    for fmt, path in paths.items():
+        print(f"   {fmt:7} {path.stat().st_size / 1e6:8.2f} MB  {path}")
+
+
+if __name__ == "__main__":
+    main()
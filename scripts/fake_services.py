@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+DumpsterMap - Local stand-ins for OutScraper, Yelp and provider websites
+
+One aiohttp server that answers like the paid APIs and the open web, so
+the pullers and the website validator can be load-tested offline:
+
+- OutScraper: POST /maps/search-v3 returns a task id, GET /requests/{id}
+  stays "Pending" for a few polls, then returns raw records for the query
+- Yelp Fusion: GET /v3/businesses/search (paged, capped at 240) and
+  GET /v3/businesses/{id}, both answering 429 at a configurable rate
+- Provider websites: /site/{n}, each site with a fixed behaviour drawn
+  from a mix: ok, server errors, redirects, hangs, and HEAD quirks
+  (405 or 404 on HEAD while GET works)
+
+Every response is delayed by a log-normal latency. Results come from a
+record list (the real data/raw by default), converted to Yelp shape for
+the Yelp endpoints. Point the scripts at the server with env():
+
+  OUTSCRAPER_SEARCH_URL, OUTSCRAPER_RESULTS_URL, OUTSCRAPER_POLL_SECONDS,
+  YELP_API_BASE, YELP_PAGE_DELAY, YELP_RATE_LIMIT_WAIT
+
+Requires aiohttp. See e2e_benchmark.py for the load test.
+
+Usage:
+  python fake_services.py                         # Serve on 127.0.0.1:8765
+  python fake_services.py --port 9000 --latency-ms 80 --error-rate 0.1
+"""
+
+import asyncio
+import json
+import math
+import random
+import sys
+import threading
+import time
+import zlib
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import jsonio
+
+try:
+    from aiohttp import web
+except ImportError:
+    web = None
+
+RAW_DIR = Path(__file__).parent.parent / "data" / "raw"
+
+DEFAULT_CONFIG = {
+    "seed": 0,
+    # Log-normal response delay: median and spread (sigma of the log)
+    "latency_ms": 40,
+    "latency_sigma": 0.8,
+    # OutScraper: polls answered "Pending" before a task succeeds
+    "pending_polls": 2,
+    # Yelp: share of calls answered 429
+    "yelp_429_rate": 0.05,
+    "yelp_max_results": 240,
+    # Website farm: share of sites with each behaviour (rest are "ok")
+    "site_mix": {
+        "error": 0.05,
+        "redirect": 0.08,
+        "head_405": 0.06,
+        "head_404": 0.02,
+        "hang": 0.01,
+    },
+    # Longer than the validator's 10s timeout
+    "hang_seconds": 15,
+}
+
+SITE_KINDS = ("ok", "error", "redirect", "head_405", "head_404", "hang")
+
+
+def load_raw_records(raw_dir: Path = RAW_DIR) -> list:
+    records = []
+    for path in sorted(Path(raw_dir).glob("*.json")):
+        if path.name == "pull_summary.json":
+            continue
+        records.extend(r for r in jsonio.load(path) if isinstance(r, dict))
+    return records
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def latency_summary(values: list) -> dict:
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+        "max_ms": round(max(values, default=0) * 1000, 2),
+    }
+
+
+def yelp_id(record: dict) -> str:
+    return "fake-" + (record.get("place_id") or str(zlib.crc32(json.dumps(record, sort_keys=True).encode())))
+
+
+def yelp_business(record: dict) -> dict:
+    """An OutScraper record in the shape of a Yelp search result."""
+    phone = record.get("phone") or ""
+    categories = [c.strip() for c in (record.get("subtypes") or record.get("category") or "").split(",") if c.strip()]
+    return {
+        "id": yelp_id(record),
+        "alias": (record.get("name") or "").lower().replace(" ", "-"),
+        "name": record.get("name"),
+        "image_url": record.get("photo"),
+        "is_closed": record.get("business_status") not in (None, "OPERATIONAL"),
+        "url": f"https://www.yelp.com/biz/{yelp_id(record)}",
+        "review_count": record.get("reviews") or 0,
+        "categories": [{"alias": c.lower().replace(" ", "_"), "title": c} for c in categories],
+        "rating": record.get("rating"),
+        "coordinates": {"latitude": record.get("latitude"), "longitude": record.get("longitude")},
+        "transactions": [],
+        "location": {
+            "address1": record.get("street"),
+            "address2": None,
+            "address3": None,
+            "city": record.get("city"),
+            "zip_code": record.get("postal_code"),
+            "state": record.get("state_code"),
+            "display_address": [record.get("address") or ""],
+        },
+        "phone": "+" + "".join(ch for ch in phone if ch.isdigit()) if phone else "",
+        "display_phone": phone,
+    }
+
+
+class FakeServices:
+    """The fake APIs and website farm, served from a background thread."""
+
+    def __init__(self, records: list = None, config: dict = None, host: str = "127.0.0.1", port: int = 0):
+        self.records = records if records is not None else load_raw_records()
+        self.config = {**DEFAULT_CONFIG, **(config or {})}
+        self.host, self.port = host, port
+        self.rng = random.Random(self.config["seed"])
+
+        self.by_state = defaultdict(list)
+        self.by_code = defaultdict(list)
+        self.by_yelp_id = {}
+        for r in self.records:
+            self.by_state[(r.get("state") or "").lower()].append(r)
+            self.by_code[(r.get("state_code") or "").upper()].append(r)
+            self.by_yelp_id[yelp_id(r)] = r
+
+        self.tasks = {}
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.loop = None
+        self.thread = None
+        self.runner = None
+        self.closing = None
+
+    # =========================================================================
+    # Lifecycle
+    # =========================================================================
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def env(self, poll_seconds: float = 0.05) -> dict:
+        """Environment overrides that point the pull scripts at this server."""
+        return {
+            "OUTSCRAPER_SEARCH_URL": f"{self.url}/maps/search-v3",
+            "OUTSCRAPER_RESULTS_URL": f"{self.url}/requests",
+            "OUTSCRAPER_POLL_SECONDS": str(poll_seconds),
+            "YELP_API_BASE": f"{self.url}/v3",
+            "YELP_PAGE_DELAY": "0",
+            "YELP_RATE_LIMIT_WAIT": "0.1",
+        }
+
+    def site_url(self, n: int) -> str:
+        return f"{self.url}/site/{n}"
+
+    def start(self):
+        if web is None:
+            raise RuntimeError("aiohttp is required for fake_services")
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def serve():
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self._start())
+            ready.set()
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=serve, name="fake-services", daemon=True)
+        self.thread.start()
+        if not ready.wait(10):
+            raise RuntimeError("fake services did not start")
+        return self
+
+    async def _start(self):
+        self.closing = asyncio.Event()
+        self.runner = web.AppRunner(self.app())
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        self.port = self.runner.addresses[0][1]
+
+    def stop(self):
+        if not self.loop:
+            return
+        # Release hanging handlers first so cleanup does not wait on them
+        self.loop.call_soon_threadsafe(self.closing.set)
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result(30)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(10)
+        self.loop.close()
+        self.loop = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def app(self):
+        @web.middleware
+        async def measure(request, handler):
+            start = time.perf_counter()
+            name = request.match_info.route.name or "unknown"
+            status = "error"
+            try:
+                response = await handler(request)
+                status = response.status
+                return response
+            except web.HTTPException as e:
+                status = e.status
+                raise
+            finally:
+                self.latencies[name].append(time.perf_counter() - start)
+                self.statuses[name][status] += 1
+
+        app = web.Application(middlewares=[measure])
+        app.router.add_post("/maps/search-v3", self.outscraper_submit, name="outscraper_submit")
+        app.router.add_get("/requests/{task_id}", self.outscraper_poll, name="outscraper_poll")
+        app.router.add_get("/v3/businesses/search", self.yelp_search, name="yelp_search")
+        app.router.add_get("/v3/businesses/{id}", self.yelp_detail, name="yelp_detail")
+        app.router.add_route("*", "/site/{site}{tail:.*}", self.website, name="website")
+        return app
+
+    # =========================================================================
+    # Metrics
+    # =========================================================================
+
+    def summary(self) -> dict:
+        """Per-endpoint request count, latency percentiles and status counts."""
+        return {name: {**latency_summary(values), "statuses": dict(self.statuses[name])}
+                for name, values in sorted(self.latencies.items())}
+
+    def reset_metrics(self):
+        self.latencies.clear()
+        self.statuses.clear()
+
+    async def _delay(self, scale: float = 1.0):
+        median = self.config["latency_ms"] / 1000 * scale
+        if median > 0:
+            await asyncio.sleep(median * math.exp(self.rng.gauss(0, self.config["latency_sigma"])))
+
+    # =========================================================================
+    # OutScraper
+    # =========================================================================
+
+    def query_results(self, query: str, limit: int) -> list:
+        """Records for one search query: by trailing state name or code."""
+        words = query.split()
+        pool = []
+        for n in range(min(3, len(words)), 0, -1):
+            tail = " ".join(words[-n:])
+            pool = self.by_state.get(tail.lower()) or self.by_code.get(tail.upper()) or []
+            if pool:
+                break
+        pool = pool or self.records
+        if not pool:
+            return []
+        # Different queries overlap but start in different places
+        start = zlib.crc32(query.encode()) % len(pool)
+        return [pool[(start + i) % len(pool)] for i in range(min(limit, len(pool)))]
+
+    async def outscraper_submit(self, request):
+        await self._delay()
+        payload = await request.json()
+        queries = payload.get("query") or []
+        if isinstance(queries, str):
+            queries = [queries]
+        task_id = f"task-{len(self.tasks) + 1}"
+        self.tasks[task_id] = {"queries": queries, "limit": payload.get("limit", 400), "polls": 0}
+        return web.json_response({"id": task_id, "status": "Pending"})
+
+    async def outscraper_poll(self, request):
+        await self._delay()
+        task_id = request.match_info["task_id"]
+        task = self.tasks.get(task_id)
+        if not task:
+            return web.json_response({"id": task_id, "status": "Error", "error": "unknown task"}, status=404)
+        task["polls"] += 1
+        if task["polls"] <= self.config["pending_polls"]:
+            return web.json_response({"id": task_id, "status": "Pending"})
+        data = []
+        for query in task["queries"]:
+            data.extend(self.query_results(query, task["limit"]))
+        return web.json_response({"id": task_id, "status": "Success", "data": data})
+
+    # =========================================================================
+    # Yelp
+    # =========================================================================
+
+    def _rate_limited(self) -> bool:
+        return self.rng.random() < self.config["yelp_429_rate"]
+
+    async def yelp_search(self, request):
+        await self._delay()
+        if self._rate_limited():
+            return web.json_response({"error": {"code": "TOO_MANY_REQUESTS_PER_SECOND"}}, status=429)
+        term = request.query.get("term", "")
+        location = request.query.get("location", "")
+        limit = min(int(request.query.get("limit", 20)), 50)
+        offset = int(request.query.get("offset", 0))
+        if offset + limit > self.config["yelp_max_results"]:
+            return web.json_response({"error": {"code": "VALIDATION_ERROR"}}, status=400)
+
+        city, _, state = location.rpartition(",")
+        pool = self.by_code.get(state.strip().upper(), [])
+        local = [r for r in pool if (r.get("city") or "").lower() == city.strip().lower()]
+        matches = self.query_results(f"{term} {state.strip()}", len(pool)) if len(local) < limit else local
+        matches = matches[:self.config["yelp_max_results"]]
+        page = [yelp_business(r) for r in matches[offset:offset + limit]]
+        return web.json_response({"businesses": page, "total": len(matches)})
+
+    async def yelp_detail(self, request):
+        await self._delay()
+        if self._rate_limited():
+            return web.json_response({"error": {"code": "TOO_MANY_REQUESTS_PER_SECOND"}}, status=429)
+        record = self.by_yelp_id.get(request.match_info["id"])
+        if not record:
+            return web.json_response({"error": {"code": "BUSINESS_NOT_FOUND"}}, status=404)
+        details = yelp_business(record)
+        details["photos"] = [p for p in (record.get("photo"), record.get("street_view")) if p]
+        details["is_claimed"] = bool(record.get("verified"))
+        details["hours"] = [{"open": [{"day": d, "start": "0700", "end": "1800", "is_overnight": False}
+                                      for d in range(6)],
+                             "hours_type": "REGULAR", "is_open_now": True}]
+        return web.json_response(details)
+
+    # =========================================================================
+    # Provider websites
+    # =========================================================================
+
+    def site_kind(self, site: str) -> str:
+        """Fixed behaviour of one site, so repeated checks agree."""
+        roll = random.Random(f"{self.config['seed']}:{site}").random()
+        for kind, share in self.config["site_mix"].items():
+            if roll < share:
+                return kind
+            roll -= share
+        return "ok"
+
+    async def website(self, request):
+        site = request.match_info["site"]
+        tail = request.match_info["tail"]
+        kind = self.site_kind(site)
+        head = request.method == "HEAD"
+        await self._delay(scale=2.0)
+
+        if kind == "hang":
+            try:
+                await asyncio.wait_for(self.closing.wait(), self.config["hang_seconds"])
+            except asyncio.TimeoutError:
+                pass
+            return web.Response(text="late")
+        if kind == "error":
+            return web.Response(status=503 if zlib.crc32(site.encode()) % 2 else 500, text="Service unavailable")
+        if kind == "redirect" and not tail:
+            raise web.HTTPMovedPermanently(f"/site/{site}/home")
+        if head and kind == "head_405":
+            return web.Response(status=405, headers={"Allow": "GET"})
+        if head and kind == "head_404":
+            return web.Response(status=404)
+        return web.Response(text=f"<html><title>Provider {site}</title></html>", content_type="text/html")
+
+
+def main():
+    args = sys.argv[1:]
+
+    def option(flag, default):
+        return args[args.index(flag) + 1] if flag in args else default
+
+    config = {
+        "latency_ms": float(option("--latency-ms", DEFAULT_CONFIG["latency_ms"])),
+        "yelp_429_rate": float(option("--yelp-429", DEFAULT_CONFIG["yelp_429_rate"])),
+    }
+    if "--error-rate" in args:
+        config["site_mix"] = {**DEFAULT_CONFIG["site_mix"], "error": float(option("--error-rate", 0))}
+
+    services = FakeServices(config=config, port=int(option("--port", 8765))).start()
+    print(f"🧪 Fake services on {services.url} ({len(services.records):,} records)")
+    for key, value in services.env().items():
+        print(f"  export {key}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        services.stop()
+
+
+if __name__ == "__main__":
+    main()
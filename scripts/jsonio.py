@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+DumpsterMap - Shared JSON I/O
+
+One place for reading and writing JSON, so every script gets the fastest
+available encoder:
+
+- orjson if installed, else msgspec, else the stdlib json module
+- compact (default for dumps) or pretty, 2-space indented, output
+- .gz and .zst paths compressed/decompressed transparently (zstandard
+  is optional; .gz output is reproducible, with no timestamp)
+
+Output is UTF-8 without \\u escapes on every backend, so files do not
+change when the backend does. Objects with a to_dict() method (e.g.
+record_model.Record) serialize as that dict.
+
+Usage:
+  python jsonio.py bench                 # stdlib vs. fast backend on data/raw
+"""
+
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BACKEND = "orjson" if orjson else "msgspec" if msgspec else "json"
+RAW_DIR = Path(__file__).parent.parent / "data" / "raw"
+
+# Raised for malformed input whatever the backend (orjson's error subclasses it)
+JSONDecodeError = json.JSONDecodeError
+
+
+def _default(obj):
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(obj, pretty: bool, sort_keys: bool) -> bytes:
+    if pretty:
+        text = json.dumps(obj, indent=2, ensure_ascii=False, sort_keys=sort_keys, default=_default)
+    else:
+        text = json.dumps(obj, separators=(",", ":"), ensure_ascii=False, sort_keys=sort_keys, default=_default)
+    return text.encode()
+
+
+def dumps(obj, pretty: bool = False, sort_keys: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes."""
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=_default, option=option)
+        except TypeError:
+            pass  # Integers beyond 64 bits or non-str keys orjson rejects; stdlib handles them
+    elif msgspec and not sort_keys:
+        try:
+            data = msgspec.json.encode(obj, enc_hook=_default)
+            return msgspec.json.format(data, indent=2) if pretty else data
+        except (TypeError, OverflowError):
+            pass
+    return _stdlib_dumps(obj, pretty, sort_keys)
+
+
+def loads(data):
+    """Parse JSON from bytes or str."""
+    if orjson:
+        return orjson.loads(data)
+    if msgspec:
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as e:
+            raise JSONDecodeError(str(e), data if isinstance(data, str) else "", 0) from None
+    return json.loads(data)
+
+
+# =============================================================================
+# Files
+# =============================================================================
+
+def read_bytes(path) -> bytes:
+    """File contents, decompressed according to the extension."""
+    path = Path(path)
+    if path.suffix == ".gz":
+        with gzip.open(path, "rb") as f:
+            return f.read()
+    if path.suffix == ".zst":
+        if not zstandard:
+            raise RuntimeError(f"zstandard is required to read {path}")
+        with open(path, "rb") as f, zstandard.ZstdDecompressor().stream_reader(f) as reader:
+            return reader.read()
+    return path.read_bytes()
+
+
+def compress(data: bytes, path) -> bytes:
+    """Compress data for path's extension (unchanged for plain .json)."""
+    suffix = Path(path).suffix
+    if suffix == ".gz":
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if suffix == ".zst":
+        if not zstandard:
+            raise RuntimeError(f"zstandard is required to write {path}")
+        return zstandard.ZstdCompressor(level=6).compress(data)
+    return data
+
+
+def load(path):
+    return loads(read_bytes(path))
+
+
+def dump(obj, path, pretty: bool = True, sort_keys: bool = False):
+    """Write obj to path (pretty by default, like the json.dump(indent=2) it replaces)."""
+    Path(path).write_bytes(compress(dumps(obj, pretty, sort_keys), path))
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def bench(raw_dir: Path = RAW_DIR) -> dict:
+    """Load and pretty-dump every raw file with stdlib json and with this module."""
+    paths = [p for p in sorted(Path(raw_dir).glob("*.json")) if p.name != "pull_summary.json"]
+    size = sum(p.stat().st_size for p in paths)
+    blobs = [p.read_bytes() for p in paths]
+    results = {"backend": BACKEND, "files": len(paths), "bytes": size}
+
+    start = time.perf_counter()
+    docs = [json.loads(b) for b in blobs]
+    results["stdlib_load"] = time.perf_counter() - start
+    start = time.perf_counter()
+    for doc in docs:
+        json.dumps(doc, indent=2)
+    results["stdlib_dump"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    docs = [loads(b) for b in blobs]
+    results["load"] = time.perf_counter() - start
+    start = time.perf_counter()
+    for doc in docs:
+        dumps(doc, pretty=True)
+    results["dump"] = time.perf_counter() - start
+    return results
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] != "bench":
+        print(__doc__.split("Usage:")[1])
+        sys.exit(1)
+    r = bench()
+    print(f"⏱️  {r['files']} files, {r['bytes'] / 1e6:.1f} MB, backend: {r['backend']}")
+    for op in ("load", "dump"):
+        stdlib, fast = r[f"stdlib_{op}"], r[op]
+        print(f"   {op:5} stdlib {stdlib:7.3f}s   {r['backend']} {fast:7.3f}s   {stdlib / fast:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
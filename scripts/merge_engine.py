@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+DumpsterMap - Provider Merge Engine
+
+One set of matching rules for every source we merge into the corpus
+(Google/OutScraper, Yelp scrapes, Yelp sweeps, national discoveries).
+
+Each provider already in the engine is indexed by:
+- normalized phone (10 digits)
+- legal-suffix-aware name + ZIP (falling back to name + city + state)
+- website domain (ignoring directory/social domains)
+- name + geo cell (~200m grid, neighbouring cells included)
+
+A phone match is taken as is. Any other match is rejected when the two
+records carry different phones, and (except for the geo match) when they
+carry different ZIPs: same-name businesses in one metro, and chain
+locations sharing a website, stay separate.
+
+An incoming record costs a fixed number of dict lookups, so a merge is
+linear in corpus size plus incoming records.
+"""
+
+import re
+
+# Trailing words that don't distinguish one business from another
+LEGAL_SUFFIXES = {
+    "llc", "inc", "incorporated", "co", "corp", "corporation",
+    "company", "ltd", "limited", "lp", "llp", "pllc", "pc",
+}
+
+# Domains shared by unrelated businesses, useless for matching
+SHARED_DOMAINS = {
+    "facebook.com", "yelp.com", "google.com", "business.site",
+    "instagram.com", "linkedin.com", "nextdoor.com", "sites.google.com",
+}
+
+# Geo cell size in degrees (~200m of latitude)
+GEO_CELL_DEGREES = 0.002
+
+# Order matters: the first index that hits wins
+MATCH_KEYS = ("phone", "name_zip", "name_city", "domain", "name_geo")
+
+
+def normalize_phone(phone) -> str:
+    """Reduce a phone number to its 10 US digits, or '' if it isn't one."""
+    if not phone:
+        return ""
+    digits = re.sub(r"\D", "", str(phone))
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    return digits if len(digits) == 10 else ""
+
+
+def normalize_name(name) -> str:
+    """
+    Normalize a business name for matching.
+
+    Works on whole words, so "Incredible Hauling Inc." becomes
+    "incredible hauling" rather than losing the "inc" inside "Incredible".
+    """
+    if not name:
+        return ""
+    name = name.lower().replace("&", " and ")
+    # Drop dots first so "L.L.C." collapses to "llc"
+    words = re.sub(r"[^\w\s]", " ", name.replace(".", "")).split()
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def website_domain(url) -> str:
+    """Extract a comparable domain from a website URL."""
+    if not url:
+        return ""
+    domain = re.sub(r"^https?://", "", str(url).lower().strip())
+    domain = domain.split("/")[0].split("?")[0].split(":")[0]
+    if domain.startswith("www."):
+        domain = domain[4:]
+    if domain in SHARED_DOMAINS or any(domain.endswith("." + d) for d in SHARED_DOMAINS):
+        return ""
+    return domain
+
+
+def geo_cell(lat, lng) -> tuple | None:
+    """Grid cell for a coordinate pair, or None if coordinates are missing."""
+    try:
+        return (int(float(lat) // GEO_CELL_DEGREES), int(float(lng) // GEO_CELL_DEGREES))
+    except (TypeError, ValueError):
+        return None
+
+
+def _first(record: dict, *fields):
+    for field in fields:
+        value = record.get(field)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def match_keys(record: dict) -> dict:
+    """
+    Build the index keys for a record.
+
+    Understands both the providers.json schema (zip/lat/lng) and raw
+    OutScraper/Yelp shapes (postal_code/latitude/longitude).
+    """
+    keys = {}
+    phone = normalize_phone(record.get("phone"))
+    if phone:
+        keys["phone"] = phone
+
+    name = normalize_name(record.get("name"))
+    if name:
+        zip_code = _first(record, "zip", "postal_code")
+        if zip_code:
+            keys["name_zip"] = f"{name}|{str(zip_code)[:5]}"
+        city = _first(record, "city")
+        state = _first(record, "state")
+        if city and state:
+            keys["name_city"] = f"{name}|{city.lower().strip()}|{state.lower().strip()}"
+        cell = geo_cell(_first(record, "lat", "latitude"), _first(record, "lng", "longitude"))
+        if cell:
+            keys["name_geo"] = (name, cell)
+
+    domain = website_domain(record.get("website"))
+    if domain:
+        keys["domain"] = domain
+    return keys
+
+
+class MergeEngine:
+    """Indexed provider corpus that incoming records are merged into."""
+
+    def __init__(self, track_sources: bool = False):
+        self.providers = []
+        self.indexes = {key: {} for key in MATCH_KEYS}
+        self.track_sources = track_sources
+        self.stats = {}
+
+    def _index(self, idx: int, keys: dict):
+        for key, value in keys.items():
+            self.indexes[key].setdefault(value, idx)
+
+    def _lookup(self, record: dict, keys: dict):
+        """Return (provider index, matching key) or (None, None)."""
+        for key in MATCH_KEYS:
+            value = keys.get(key)
+            if value is None:
+                continue
+            if key == "name_geo":
+                name, (y, x) = value
+                for dy in (-1, 0, 1):
+                    for dx in (-1, 0, 1):
+                        idx = self.indexes[key].get((name, (y + dy, x + dx)))
+                        if idx is not None and not conflicts(record, self.providers[idx], key):
+                            return idx, key
+            else:
+                idx = self.indexes[key].get(value)
+                if idx is not None and not conflicts(record, self.providers[idx], key):
+                    return idx, key
+        return None, None
+
+    def _source_stats(self, source: str) -> dict:
+        if source not in self.stats:
+            self.stats[source] = {
+                "incoming": 0,
+                "added": 0,
+                "enriched": 0,
+                "matched_by": {key: 0 for key in MATCH_KEYS},
+            }
+        return self.stats[source]
+
+    def load(self, records: list, source: str = "existing"):
+        """Index records as the base corpus without matching them against each other."""
+        stats = self._source_stats(source)
+        for record in records:
+            stats["incoming"] += 1
+            stats["added"] += 1
+            self._append(record, source)
+
+    def _append(self, record: dict, source: str) -> int:
+        if self.track_sources:
+            record.setdefault("sources", [source])
+        self.providers.append(record)
+        idx = len(self.providers) - 1
+        self._index(idx, match_keys(record))
+        return idx
+
+    def find(self, record: dict):
+        """Return the existing provider matching record, or None."""
+        idx, _ = self._lookup(record, match_keys(record))
+        return None if idx is None else self.providers[idx]
+
+    def merge(self, records, source: str, convert=None, overwrite=(), fill=None):
+        """
+        Merge incoming records from one source.
+
+        convert turns a source record into the providers schema. Matched
+        providers only have empty fields filled in (limited to the fields
+        in fill, if given), except for fields named in overwrite, which
+        always take the incoming value.
+        """
+        stats = self._source_stats(source)
+        for record in records:
+            stats["incoming"] += 1
+            if convert:
+                record = convert(record)
+            keys = match_keys(record)
+            idx, matched_by = self._lookup(record, keys)
+
+            if idx is None:
+                self._append(record, source)
+                stats["added"] += 1
+                continue
+
+            stats["matched_by"][matched_by] += 1
+            existing = self.providers[idx]
+            if enrich(existing, record, overwrite, fill):
+                stats["enriched"] += 1
+            if self.track_sources and source not in existing.setdefault("sources", []):
+                existing["sources"].append(source)
+            # Make the existing provider findable by the incoming record's keys too
+            self._index(idx, keys)
+        return stats
+
+    def report(self) -> dict:
+        """Summary of what each source contributed."""
+        return {
+            "sources": self.stats,
+            "total": len(self.providers),
+            "index_sizes": {key: len(index) for key, index in self.indexes.items()},
+        }
+
+
+def conflicts(incoming: dict, existing: dict, key: str) -> bool:
+    """True if the records disagree on phone or ZIP, ruling out a non-phone match."""
+    if key == "phone":
+        return False
+    phones = normalize_phone(incoming.get("phone")), normalize_phone(existing.get("phone"))
+    if all(phones) and phones[0] != phones[1]:
+        return True
+    if key == "name_geo":
+        return False
+    zips = [str(_first(r, "zip", "postal_code") or "")[:5] for r in (incoming, existing)]
+    return all(zips) and zips[0] != zips[1]
+
+
+def enrich(existing: dict, incoming: dict, overwrite=(), fill=None) -> bool:
+    """
+    Fill empty fields of existing from incoming (only fields in fill, if
+    given) and replace fields in overwrite. Returns True if anything changed.
+    """
+    changed = False
+    for key, value in incoming.items():
+        if value in (None, "", [], {}):
+            continue
+        if key not in overwrite and fill is not None and key not in fill:
+            continue
+        if key in overwrite or existing.get(key) in (None, "", [], {}):
+            if existing.get(key) != value:
+                existing[key] = value
+                changed = True
+    return changed
+
+
+def print_report(report: dict):
+    print("\n📊 Merge report:")
+    for source, stats in report["sources"].items():
+        matched = sum(stats["matched_by"].values())
+        print(f"  {source}: {stats['incoming']} in, {stats['added']} added, "
+              f"{matched} matched, {stats['enriched']} enriched")
+        for key, count in stats["matched_by"].items():
+            if count:
+                print(f"      by {key}: {count}")
+    print(f"  Total providers: {report['total']}")
@@ -1,18 +1,24 @@
 #!/usr/bin/env python3
 """Merge enriched Yelp providers into main providers.json"""
 
-import json
+import copy
 from pathlib import Path
 
+import jsonio
+from merge_engine import MergeEngine, print_report
+from provider_patch import commit_providers
+
 DATA_DIR = Path(__file__).parent.parent / "data"
 
+# Fields a Yelp match may fill in on an existing provider; provenance
+# fields (source, notes, region, discovery_date) stay as they were
+FILL_FIELDS = ("phone", "website", "address", "zip", "lat", "lng", "photo", "yelp_url")
+
 def load_json(path):
-    with open(path) as f:
-        return json.load(f)
+    return jsonio.load(path)
 
 def save_json(path, data):
-    with open(path, 'w') as f:
-        json.dump(data, f, indent=2)
+    jsonio.dump(data, path)
 
 def convert_yelp_to_provider(yelp):
     """Convert enriched Yelp provider to main provider schema"""
@@ -38,76 +44,64 @@ def convert_yelp_to_provider(yelp):
         "notes": yelp.get("notes")
     }
 
+def convert_national_to_provider(natl):
+    """Convert a national Yelp discovery to main provider schema"""
+    return {
+        "id": natl.get("name", "").lower().replace(" ", "-"),
+        "name": natl["name"],
+        "slug": natl["name"].lower().replace(" ", "-").replace("'", ""),
+        "city": natl.get("city", ""),
+        "state": natl.get("state", ""),
+        "zip": None,
+        "address": None,
+        "phone": None,
+        "website": None,
+        "lat": None,
+        "lng": None,
+        "rating": natl.get("yelp_rating"),
+        "reviewCount": natl.get("yelp_reviews", 0),
+        "photo": None,
+        "category": "Dumpster rental service",
+        "yelp_url": natl.get("yelp_url"),
+        "source": "yelp_national_sweep",
+        "discovery_date": natl.get("discovery_date"),
+        "notes": natl.get("notes"),
+        "region": natl.get("region")
+    }
+
 def main():
     # Load existing providers
     providers_path = DATA_DIR / "providers.json"
     providers_data = load_json(providers_path)
-    existing_providers = providers_data.get("providers", [])
+    original = copy.deepcopy(providers_data)
     
-    # Create set of existing provider names (normalized)
-    existing_names = {p["name"].lower().strip() for p in existing_providers}
-    
-    print(f"Existing providers: {len(existing_providers)}")
+    engine = MergeEngine()
+    engine.load(providers_data.get("providers", []), source="providers.json")
+    print(f"Existing providers: {len(engine.providers)}")
     
     # Load enriched Yelp providers
     enriched_path = DATA_DIR / "yelp_enriched_providers.json"
     if enriched_path.exists():
-        enriched_providers = load_json(enriched_path)
-        
-        added = 0
-        for yelp in enriched_providers:
-            name_key = yelp["name"].lower().strip()
-            if name_key not in existing_names:
-                provider = convert_yelp_to_provider(yelp)
-                existing_providers.append(provider)
-                existing_names.add(name_key)
-                added += 1
-        
-        print(f"Added {added} Florida Yelp providers")
+        stats = engine.merge(load_json(enriched_path), "yelp_sweep", convert=convert_yelp_to_provider,
+                             fill=FILL_FIELDS)
+        print(f"Added {stats['added']} Florida Yelp providers")
     
     # Load national discoveries and add them
     national_path = DATA_DIR / "yelp_national_discoveries.json"
     if national_path.exists():
-        national_providers = load_json(national_path)
-        
-        added = 0
-        for natl in national_providers:
-            name_key = natl["name"].lower().strip()
-            if name_key not in existing_names:
-                # Convert national format to provider schema
-                provider = {
-                    "id": natl.get("name", "").lower().replace(" ", "-"),
-                    "name": natl["name"],
-                    "slug": natl["name"].lower().replace(" ", "-").replace("'", ""),
-                    "city": natl.get("city", ""),
-                    "state": natl.get("state", ""),
-                    "zip": None,
-                    "address": None,
-                    "phone": None,
-                    "website": None,
-                    "lat": None,
-                    "lng": None,
-                    "rating": natl.get("yelp_rating"),
-                    "reviewCount": natl.get("yelp_reviews", 0),
-                    "photo": None,
-                    "category": "Dumpster rental service",
-                    "yelp_url": natl.get("yelp_url"),
-                    "source": "yelp_national_sweep",
-                    "discovery_date": natl.get("discovery_date"),
-                    "notes": natl.get("notes"),
-                    "region": natl.get("region")
-                }
-                existing_providers.append(provider)
-                existing_names.add(name_key)
-                added += 1
-        
-        print(f"Added {added} national Yelp providers")
+        stats = engine.merge(load_json(national_path), "yelp_national_sweep", convert=convert_national_to_provider,
+                             fill=FILL_FIELDS)
+        print(f"Added {stats['added']} national Yelp providers")
+    
+    # Save updated providers as a patch + atomic rewrite
+    providers_data["providers"] = engine.providers
+    commit_providers(original, providers_data, "merge_providers", providers_path)
     
-    # Save updated providers
-    providers_data["providers"] = existing_providers
-    save_json(providers_path, providers_data)
+    report = engine.report()
+    print_report(report)
+    save_json(DATA_DIR / "merge_report.json", report)
     
-    print(f"\nTotal providers now: {len(existing_providers)}")
+    print(f"\nTotal providers now: {len(engine.providers)}")
 
 if __name__ == "__main__":
     main()
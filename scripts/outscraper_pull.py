@@ -5,15 +5,18 @@ Pulls dumpster rental provider data from Google Maps via OutScraper API
 """
 
 import requests
-import json
 import time
 import os
 from datetime import datetime
 from pathlib import Path
 
+import jsonio
+
 API_KEY = "YjdlY2Y4MzU0ZDE4NDRiMzhhMGYyMGZhMjk0NzBlODJ8ZTJiODRkODQxZQ"
-BASE_URL = "https://api.outscraper.com/maps/search-v3"
-RESULTS_URL = "https://api.outscraper.cloud/requests"
+# Overridable so the pull can run against fake_services.py
+BASE_URL = os.environ.get("OUTSCRAPER_SEARCH_URL", "https://api.outscraper.com/maps/search-v3")
+RESULTS_URL = os.environ.get("OUTSCRAPER_RESULTS_URL", "https://api.outscraper.cloud/requests")
+POLL_SECONDS = float(os.environ.get("OUTSCRAPER_POLL_SECONDS", 15))
 
 # All 50 US states
 STATES = [
@@ -82,7 +85,7 @@ def wait_for_results(task_id: str, max_wait: int = 600) -> dict:
         if check_count % 3 == 0:
             print(f"  Status: {status}... ({int(time.time()-start)}s elapsed)")
         
-        time.sleep(15)  # Longer wait between checks
+        time.sleep(POLL_SECONDS)  # Longer wait between checks
     
     print(f"  ⚠️ Timeout after {max_wait}s")
     return {"status": "Timeout", "id": task_id}
@@ -131,8 +134,7 @@ def pull_state_data(state: str, output_dir: Path) -> int:
     # Save to file
     state_slug = state.lower().replace(" ", "_")
     output_file = output_dir / f"{state_slug}.json"
-    with open(output_file, "w") as f:
-        json.dump(unique_results, f, indent=2)
+    jsonio.dump(unique_results, output_file)
     
     print(f"✅ Saved {len(unique_results)} unique results to {output_file}")
     return len(unique_results)
@@ -173,8 +175,7 @@ def pull_nationwide(start_state: str = None):
             total += count
             
             # Save summary after each state
-            with open(summary_file, "w") as f:
-                json.dump(summary, f, indent=2)
+            jsonio.dump(summary, summary_file)
             
             # Rate limiting - be nice to the API
             if i < len(states_to_process) - 1:
@@ -192,8 +193,7 @@ def pull_nationwide(start_state: str = None):
     summary["completed"] = datetime.now().isoformat()
     summary["total_records"] = total
     
-    with open(summary_file, "w") as f:
-        json.dump(summary, f, indent=2)
+    jsonio.dump(summary, summary_file)
     
     print(f"\n{'='*50}")
     print(f"COMPLETE: {total} total records across {len(summary['states'])} states")
@@ -209,21 +209,27 @@ def quick_test():
 
 if __name__ == "__main__":
     import sys
+    from profiling import Profiler
+    
+    profiler = Profiler.from_argv("outscraper_pull", Path.home() / "dumpstermap" / "data" / "raw")
     
     if len(sys.argv) > 1:
-        if sys.argv[1] == "test":
-            quick_test()
-        elif sys.argv[1] == "all":
-            start_from = sys.argv[2] if len(sys.argv) > 2 else None
-            pull_nationwide(start_from)
-        else:
-            # Pull specific state
-            output_dir = Path.home() / "dumpstermap" / "data" / "raw"
-            output_dir.mkdir(parents=True, exist_ok=True)
-            pull_state_data(sys.argv[1], output_dir)
+        with profiler.stage(sys.argv[1].lower().replace(" ", "_")):
+            if sys.argv[1] == "test":
+                quick_test()
+            elif sys.argv[1] == "all":
+                start_from = sys.argv[2] if len(sys.argv) > 2 else None
+                pull_nationwide(start_from)
+            else:
+                # Pull specific state
+                output_dir = Path.home() / "dumpstermap" / "data" / "raw"
+                output_dir.mkdir(parents=True, exist_ok=True)
+                pull_state_data(sys.argv[1], output_dir)
+        profiler.finish()
     else:
         print("Usage:")
         print("  python outscraper_pull.py test          # Test with Florida")
         print("  python outscraper_pull.py all           # Pull all 50 states")
         print("  python outscraper_pull.py all Texas     # Resume from Texas")
         print("  python outscraper_pull.py California    # Pull single state")
+        print("  Add --profile to write cProfile/flamegraph output to data/raw/profile-*/")
@@ -5,15 +5,18 @@ Enhanced with metro-level queries for better coverage
 """
 
 import requests
-import json
 import time
 import os
 from datetime import datetime
 from pathlib import Path
 
+import jsonio
+
 API_KEY = "YjdlY2Y4MzU0ZDE4NDRiMzhhMGYyMGZhMjk0NzBlODJ8ZTJiODRkODQxZQ"
-BASE_URL = "https://api.outscraper.com/maps/search-v3"
-RESULTS_URL = "https://api.outscraper.cloud/requests"
+# Overridable so the pull can run against fake_services.py
+BASE_URL = os.environ.get("OUTSCRAPER_SEARCH_URL", "https://api.outscraper.com/maps/search-v3")
+RESULTS_URL = os.environ.get("OUTSCRAPER_RESULTS_URL", "https://api.outscraper.cloud/requests")
+POLL_SECONDS = float(os.environ.get("OUTSCRAPER_POLL_SECONDS", 15))
 
 # All 50 US states
 STATES = [
@@ -211,7 +214,7 @@ def wait_for_results(task_id: str, max_wait: int = 600) -> dict:
         if check_count % 3 == 0:
             print(f"  ⏳ Status: {status}... ({int(time.time()-start)}s)")
         
-        time.sleep(15)
+        time.sleep(POLL_SECONDS)
     
     print(f"  ⚠️ Timeout after {max_wait}s")
     return {"status": "Timeout", "id": task_id}
@@ -274,8 +277,7 @@ def pull_state_enhanced(state: str, output_dir: Path) -> int:
     # Save results
     state_slug = state.lower().replace(" ", "_")
     output_file = output_dir / f"{state_slug}.json"
-    with open(output_file, "w") as f:
-        json.dump(all_results, f, indent=2)
+    jsonio.dump(all_results, output_file)
     
     print(f"\n✅ {state}: {len(all_results)} total unique providers")
     return len(all_results)
@@ -289,8 +291,7 @@ def pull_nationwide_enhanced(start_state: str = None):
     
     # Load existing summary
     if summary_file.exists():
-        with open(summary_file) as f:
-            summary = json.load(f)
+        summary = jsonio.load(summary_file)
     else:
         summary = {"started": datetime.now().isoformat(), "states": {}}
     
@@ -323,8 +324,7 @@ def pull_nationwide_enhanced(start_state: str = None):
             # Save summary
             summary["total_records"] = total
             summary["last_updated"] = datetime.now().isoformat()
-            with open(summary_file, "w") as f:
-                json.dump(summary, f, indent=2)
+            jsonio.dump(summary, summary_file)
             
             # Rate limit between states
             if i < len(states_to_process) - 1:
@@ -338,12 +338,10 @@ def pull_nationwide_enhanced(start_state: str = None):
                 "timestamp": datetime.now().isoformat(),
                 "status": f"error: {str(e)}"
             }
-            with open(summary_file, "w") as f:
-                json.dump(summary, f, indent=2)
+            jsonio.dump(summary, summary_file)
     
     summary["completed"] = datetime.now().isoformat()
-    with open(summary_file, "w") as f:
-        json.dump(summary, f, indent=2)
+    jsonio.dump(summary, summary_file)
     
     print(f"\n{'='*60}")
     print(f"🎉 COMPLETE: {total} total providers across {len(summary['states'])} states")
@@ -358,21 +356,27 @@ def repull_state(state: str):
 
 if __name__ == "__main__":
     import sys
+    from profiling import Profiler
+    
+    profiler = Profiler.from_argv("outscraper_pull_v2", Path.home() / "dumpstermap" / "data" / "raw")
     
     if len(sys.argv) < 2:
         print("Usage:")
         print("  python outscraper_pull_v2.py all                  # All 50 states")
         print("  python outscraper_pull_v2.py resume Delaware      # Resume from state")
         print("  python outscraper_pull_v2.py repull California    # Re-pull single state")
+        print("  Add --profile to write cProfile/flamegraph output to data/raw/profile-*/")
         sys.exit(1)
     
     cmd = sys.argv[1]
     
-    if cmd == "all":
-        pull_nationwide_enhanced()
-    elif cmd == "resume" and len(sys.argv) > 2:
-        pull_nationwide_enhanced(sys.argv[2])
-    elif cmd == "repull" and len(sys.argv) > 2:
-        repull_state(sys.argv[2])
-    else:
-        print(f"Unknown command: {cmd}")
+    with profiler.stage(cmd):
+        if cmd == "all":
+            pull_nationwide_enhanced()
+        elif cmd == "resume" and len(sys.argv) > 2:
+            pull_nationwide_enhanced(sys.argv[2])
+        elif cmd == "repull" and len(sys.argv) > 2:
+            repull_state(sys.argv[2])
+        else:
+            print(f"Unknown command: {cmd}")
+    profiler.finish()
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+DumpsterMap - Pipeline Runner
+
+Single entry point for the data pipeline. Each script is a stage with
+declared inputs, outputs and dependencies. Before running a stage its
+inputs are fingerprinted; if the fingerprint matches the one recorded
+after its last successful run (and its outputs exist), the stage is
+skipped. Stages whose dependencies are satisfied run in parallel.
+
+File hashes are cached by (size, mtime), so a no-op rerun only stats
+files and finishes well under a second.
+
+The OutScraper pull costs API credits, so it only runs when named.
+
+Usage:
+  python pipeline.py                       # Run every stale stage
+  python pipeline.py clean prerender       # Run these stages (and stale deps)
+  python pipeline.py pull clean            # Include the paid pull
+  python pipeline.py --force clean         # Ignore fingerprints
+  python pipeline.py status                # Show which stages are stale
+"""
+
+import hashlib
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import jsonio
+
+ROOT = Path(__file__).parent.parent
+SCRIPTS = ROOT / "scripts"
+STATE_FILE = ROOT / "data" / ".pipeline-state.json"
+MAX_PARALLEL = 4
+
+
+class Stage:
+    """One pipeline step: a command plus the files it reads and writes."""
+
+    def __init__(self, name, command, inputs, outputs, deps=(), manual=False):
+        self.name = name
+        self.command = command
+        self.inputs = inputs
+        self.outputs = outputs
+        self.deps = tuple(deps)
+        self.manual = manual
+
+    def __repr__(self):
+        return f"Stage({self.name})"
+
+
+def python(script, *args):
+    return [sys.executable, str(SCRIPTS / script), *args]
+
+
+# clean_data's dated snapshot; validate_and_clean's all_providers_YYYYMMDD_HHMM.json
+# lands in the same directory and must not trigger (or feed) the stages below
+CLEAN_SNAPSHOT = "data/cleaned/all_providers_" + "[0-9]" * 8
+
+STAGES = [
+    Stage("pull", python("outscraper_pull_v2.py", "all"),
+          inputs=["scripts/outscraper_pull_v2.py"],
+          outputs=["data/raw/*.json"],
+          manual=True),
+    Stage("clean", python("clean_data.py"),
+          inputs=["data/raw/*.json", "scripts/clean_data.py", "scripts/pipeline_stats.py", "scripts/exporter.py"],
+          outputs=["data/cleaned/all_providers_*.json*"],
+          deps=["pull"]),
+    Stage("validate", python("validate_and_clean.py"),
+          inputs=["data/raw/*.json", "scripts/validate_and_clean.py", "scripts/pipeline_stats.py",
+                  "scripts/exporter.py"],
+          outputs=["data/validated/validated_providers_*.json*"],
+          deps=["pull"]),
+    Stage("merge", python("merge_providers.py"),
+          inputs=["data/providers.json", "data/yelp_enriched_providers.json",
+                  "data/yelp_national_discoveries.json",
+                  "scripts/merge_providers.py", "scripts/merge_engine.py"],
+          outputs=["data/providers.json"]),
+    Stage("clean-providers", python("clean-providers.py"),
+          inputs=["data/providers.json", "scripts/clean-providers.py"],
+          outputs=["data/providers.json"],
+          deps=["merge"]),
+    Stage("city-pages", python("city_pages.py"),
+          inputs=[f"{CLEAN_SNAPSHOT}.json", f"{CLEAN_SNAPSHOT}.cols", "city.html",
+                  "scripts/city_pages.py", "scripts/prerender-city-seo.py"],
+          outputs=["dumpster-rental/*.html"],
+          deps=["clean"]),
+    Stage("zip-index", python("zip_index.py"),
+          inputs=[f"{CLEAN_SNAPSHOT}.json", "data/zip_centroids.csv", "scripts/zip_index.py"],
+          outputs=["data/zip_nearest.bin"],
+          deps=["clean"]),
+    Stage("prerender", python("prerender-city-seo.py"),
+          inputs=["dumpster-rental/*.html", "*.html", "scripts/prerender-city-seo.py", "scripts/sitemap.py"],
+          outputs=["dumpster-rental/*.html", "sitemap.xml"],
+          deps=["city-pages"]),
+    Stage("precompress", python("precompress.py"),
+          inputs=["*.html", "dumpster-rental/*.html", "app.js", "sitemap*.xml", "robots.txt",
+                  "data/providers.json", "scripts/precompress.py"],
+          outputs=["dumpster-rental/*.html.gz"],
+          deps=["prerender", "clean-providers"]),
+]
+
+
+# =============================================================================
+# Fingerprints
+# =============================================================================
+
+class Fingerprinter:
+    """Content hashes of files, cached against (size, mtime_ns)."""
+
+    def __init__(self, cache: dict):
+        self.cache = cache
+
+    def file_hash(self, path: Path) -> str:
+        st = path.stat()
+        rel = str(path.relative_to(ROOT))
+        cached = self.cache.get(rel)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        self.cache[rel] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def stage(self, stage: Stage) -> str:
+        h = hashlib.sha256(json.dumps(stage.command[1:]).encode())
+        for pattern in stage.inputs:
+            for path in sorted(ROOT.glob(pattern)):
+                if path.is_file():
+                    h.update(f"{path.relative_to(ROOT)}:{self.file_hash(path)}\n".encode())
+        return h.hexdigest()
+
+
+def outputs_exist(stage: Stage) -> bool:
+    return all(any(ROOT.glob(pattern)) for pattern in stage.outputs)
+
+
+def load_state() -> dict:
+    if STATE_FILE.exists():
+        return jsonio.load(STATE_FILE)
+    return {"stages": {}, "files": {}}
+
+
+def save_state(state: dict):
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_FILE.with_suffix(".tmp")
+    jsonio.dump(state, tmp, pretty=False)
+    tmp.replace(STATE_FILE)
+
+
+# =============================================================================
+# Scheduling
+# =============================================================================
+
+def select_stages(targets: list) -> list:
+    """Stages to consider: the named ones plus their dependencies (minus unnamed manual ones)."""
+    by_name = {s.name: s for s in STAGES}
+    unknown = [t for t in targets if t not in by_name]
+    if unknown:
+        raise SystemExit(f"Unknown stage(s): {', '.join(unknown)}")
+
+    if not targets:
+        return [s for s in STAGES if not s.manual]
+
+    wanted = set()
+
+    def visit(name):
+        if name in wanted:
+            return
+        stage = by_name[name]
+        if stage.manual and name not in targets:
+            return
+        wanted.add(name)
+        for dep in stage.deps:
+            visit(dep)
+
+    for t in targets:
+        visit(t)
+    return [s for s in STAGES if s.name in wanted]
+
+
+def is_fresh(stage: Stage, fp: Fingerprinter, state: dict) -> bool:
+    recorded = state["stages"].get(stage.name, {}).get("fingerprint")
+    return recorded == fp.stage(stage) and outputs_exist(stage)
+
+
+def run_stage(stage: Stage) -> tuple[int, float]:
+    start = time.time()
+    result = subprocess.run(stage.command, cwd=ROOT)
+    return result.returncode, time.time() - start
+
+
+def ancestors(stage: Stage) -> list:
+    by_name = {s.name: s for s in STAGES}
+    found = []
+    todo = list(stage.deps)
+    while todo:
+        name = todo.pop()
+        if name in by_name and by_name[name] not in found:
+            found.append(by_name[name])
+            todo.extend(by_name[name].deps)
+    return found
+
+
+def refresh_upstream(stage: Stage, fp: Fingerprinter, state: dict):
+    """
+    Re-fingerprint upstream stages that read a file this stage just wrote.
+
+    merge and clean-providers both rewrite data/providers.json. Without
+    this, clean-providers' write makes merge look stale on the next run,
+    merge reruns, clean-providers reruns after it, and it never settles.
+    The shared file's state after the last writer is what counts.
+    """
+    for upstream in ancestors(stage):
+        recorded = state["stages"].get(upstream.name)
+        if recorded and set(upstream.inputs) & set(stage.outputs):
+            recorded["fingerprint"] = fp.stage(upstream)
+
+
+def run(targets: list, force: bool = False) -> bool:
+    state = load_state()
+    fp = Fingerprinter(state["files"])
+    stages = select_stages(targets)
+    names = {s.name for s in stages}
+
+    pending = {s.name: s for s in stages}
+    done, failed, ran = set(), set(), set()
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL) as pool:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                deps = [d for d in stage.deps if d in names]
+                if any(d in failed for d in deps):
+                    print(f"⏭️  {name}: skipped (dependency failed)")
+                    failed.add(name)
+                    del pending[name]
+                elif all(d in done for d in deps):
+                    del pending[name]
+                    # A rerun upstream invalidates us even if our own inputs look unchanged
+                    upstream_ran = any(d in ran for d in deps)
+                    if not force and not upstream_ran and is_fresh(stage, fp, state):
+                        print(f"✅ {name}: up to date")
+                        done.add(name)
+                    else:
+                        print(f"▶️  {name}: running")
+                        running[pool.submit(run_stage, stage)] = stage
+
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                code, elapsed = future.result()
+                if code == 0:
+                    # Fingerprint after the run so stages that rewrite their inputs stay fresh
+                    state["stages"][stage.name] = {"fingerprint": fp.stage(stage), "seconds": round(elapsed, 2),
+                                                   "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+                    refresh_upstream(stage, fp, state)
+                    save_state(state)
+                    done.add(stage.name)
+                    ran.add(stage.name)
+                    print(f"✅ {stage.name}: finished in {elapsed:.1f}s")
+                else:
+                    failed.add(stage.name)
+                    print(f"❌ {stage.name}: exit code {code}")
+
+    save_state(state)
+    return not failed
+
+
+def status():
+    state = load_state()
+    fp = Fingerprinter(state["files"])
+    for stage in STAGES:
+        info = state["stages"].get(stage.name, {})
+        fresh = is_fresh(stage, fp, state)
+        label = "up to date" if fresh else "stale"
+        if stage.manual:
+            label += " (manual)"
+        last = f", last run {info['finished_at']}" if info.get("finished_at") else ""
+        print(f"  {stage.name:16} {label}{last}")
+    save_state(state)
+
+
+def main():
+    args = sys.argv[1:]
+    if args and args[0] == "status":
+        status()
+        return
+    force = "--force" in args
+    targets = [a for a in args if not a.startswith("--")]
+    start = time.time()
+    ok = run(targets, force)
+    print(f"\n{'🎉 Pipeline complete' if ok else '⚠️  Pipeline finished with failures'} in {time.time() - start:.2f}s")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
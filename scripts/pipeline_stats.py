@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+DumpsterMap - Per-stage pipeline instrumentation
+
+Records wall time, CPU time and throughput for each stage of a pipeline
+script, alongside the existing counts in cleaning_stats_*.json:
+
+    timer = StageTimer(stats)
+    with timer.stage("dedup", records=len(all_records)):
+        unique_records, dupes = deduplicate(all_records)
+
+Results land in stats["stages"][name]. Entering the same stage again
+(e.g. once per state file) adds to its totals.
+
+tracemalloc peaks are opt-in (PIPELINE_TRACK_MEMORY=1): tracing slows the
+JSON-heavy stages several times over, which would swamp the timings.
+It stays off while --profile is active.
+
+Set PROMETHEUS_TEXTFILE to a path (e.g. inside node_exporter's textfile
+collector directory) to also export the metrics for Prometheus.
+"""
+
+import os
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+import jsonio
+
+PROMETHEUS_TEXTFILE = os.environ.get("PROMETHEUS_TEXTFILE")
+TRACK_MEMORY = os.environ.get("PIPELINE_TRACK_MEMORY") == "1"
+
+
+class StageTimer:
+    """Collects per-stage metrics into stats["stages"]."""
+
+    def __init__(self, stats: dict, track_memory: bool = None, profiler=None):
+        self.stages = stats.setdefault("stages", {})
+        self.profiler = profiler
+        profiling = getattr(profiler, "enabled", False)
+        self.track_memory = (TRACK_MEMORY if track_memory is None else track_memory) and not profiling
+        self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name: str, records: int = None, mode: str = "sync"):
+        """
+        Time the body as one stage (and profile it, if a profiler is set).
+
+        records is the number of records the stage processes; it can also
+        be set afterwards through the yielded dict (m["records"] = n).
+        mode is passed to the profiler ("async" for event-loop stages).
+        """
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+
+        metrics = {"records": records}
+        profile = self.profiler.stage(name, mode) if self.profiler else nullcontext()
+        # The clock runs inside the profiler so its start/stop cost isn't counted
+        with profile:
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            try:
+                yield metrics
+            finally:
+                wall = time.perf_counter() - wall_start
+                cpu = time.process_time() - cpu_start
+                self._record(name, wall, cpu, metrics["records"])
+
+    def _record(self, name, wall, cpu, records):
+        previous = self.stages.get(name, {})
+        wall += previous.get("_wall", 0.0)
+        cpu += previous.get("_cpu", 0.0)
+        result = {
+            "wall_seconds": round(wall, 4),
+            "cpu_seconds": round(cpu, 4),
+        }
+        if records is not None:
+            records += previous.get("records", 0)
+            result["records"] = records
+            result["records_per_second"] = round(records / wall, 1) if wall > 0 else None
+        if self.track_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            result["peak_memory_bytes"] = max(peak, previous.get("peak_memory_bytes", 0))
+        self.stages[name] = {**result, "_wall": wall, "_cpu": cpu}
+
+    def close(self):
+        """Drop unrounded totals and stop tracemalloc if this timer started it."""
+        for metrics in self.stages.values():
+            metrics.pop("_wall", None)
+            metrics.pop("_cpu", None)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+
+def load_filter_score(raw_dir: Path, stats: dict, timer: StageTimer, should_remove, quality_score,
+                      line: str = "✅ {state}: {raw} → {kept} ({removed} removed)", load=None,
+                      categoricals=None) -> list:
+    """
+    Load, filter and score raw state files one file at a time.
+
+    Shared by clean_data and validate_and_clean. Only one raw file is held
+    in memory at once; per-file times add up under the load, filter and
+    score stages. load(path) replaces jsonio.load, e.g. with
+    record_model.load_records. Kept records are interned through
+    categoricals (a categoricals.Categoricals) if given. Returns the kept
+    records, in file order.
+    """
+    all_records = []
+    for state_file in sorted(Path(raw_dir).glob("*.json")):
+        if state_file.name == "pull_summary.json":
+            continue
+        state_name = state_file.stem.replace("_", " ").title()
+
+        with timer.stage("load") as m:
+            records = (load or jsonio.load)(state_file)
+            m["records"] = len(records)
+
+        with timer.stage("filter", records=len(records)):
+            kept = []
+            state_removed = defaultdict(int)
+            for r in records:
+                should_rm, reason = should_remove(r)
+                if should_rm:
+                    stats["removed"][reason] += 1
+                    state_removed[reason] += 1
+                else:
+                    kept.append(r)
+            if categoricals:
+                for r in kept:
+                    categoricals.intern(r)
+        stats["total_raw"] += len(records)
+        stats["by_state"][state_name] = {
+            "raw": len(records),
+            "kept": len(kept),
+            "removed": dict(state_removed)
+        }
+        print(line.format(state=state_name, raw=len(records), kept=len(kept),
+                          removed=len(records) - len(kept)))
+        del records
+
+        with timer.stage("score", records=len(kept)):
+            for r in kept:
+                r["_quality_score"] = quality_score(r)
+                r["_source_state"] = state_name
+        all_records.extend(kept)
+
+    stats["total_after_filter"] = len(all_records)
+    return all_records
+
+
+def prometheus_text(stats: dict, script: str) -> str:
+    """Render stats["stages"] in the Prometheus text exposition format."""
+    metrics = [
+        ("wall_seconds", "dumpstermap_stage_wall_seconds", "Wall-clock time per pipeline stage"),
+        ("cpu_seconds", "dumpstermap_stage_cpu_seconds", "CPU time per pipeline stage"),
+        ("records", "dumpstermap_stage_records", "Records processed per pipeline stage"),
+        ("records_per_second", "dumpstermap_stage_records_per_second", "Stage throughput"),
+        ("peak_memory_bytes", "dumpstermap_stage_peak_memory_bytes", "tracemalloc peak per stage"),
+    ]
+    lines = []
+    for key, metric, help_text in metrics:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} gauge")
+        for stage, values in stats.get("stages", {}).items():
+            if values.get(key) is not None:
+                lines.append(f'{metric}{{script="{script}",stage="{stage}"}} {values[key]}')
+    for key in ("total_raw", "total_after_filter", "duplicates_removed", "total_clean"):
+        if key in stats:
+            lines.append(f'dumpstermap_{key}{{script="{script}"}} {stats[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def export_prometheus(stats: dict, script: str, path: str = None):
+    """Write the textfile atomically (node_exporter may read it at any time)."""
+    path = path or PROMETHEUS_TEXTFILE
+    if not path:
+        return None
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(prometheus_text(stats, script))
+    tmp.replace(path)
+    return path
+
+
+def print_stage_table(stats: dict):
+    print("\n⏱️  Stage timings:")
+    for name, s in stats.get("stages", {}).items():
+        rate = f"{s['records_per_second']:>10,.0f} rec/s" if s.get("records_per_second") else " " * 16
+        peak = f"{s['peak_memory_bytes'] / 1e6:8.1f} MB peak" if "peak_memory_bytes" in s else ""
+        print(f"   {name:10} {s['wall_seconds']:8.3f}s wall {s['cpu_seconds']:8.3f}s cpu {rate} {peak}")
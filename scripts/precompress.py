@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+DumpsterMap - Pre-compressed static assets
+
+Writes .gz (gzip -9) and, when the brotli package is installed, .br
+(quality 11) siblings for the generated pages and data files, so nginx
+serves them with gzip_static / brotli_static instead of compressing the
+same bytes on every request (see nginx.conf).
+
+- Files are compressed on a thread pool; zlib and brotli release the
+  GIL, so the work spreads across cores.
+- data/.precompress-state.json records each source's size, mtime and
+  sha256. A file whose stat or content is unchanged, and whose siblings
+  exist, is skipped.
+- gzip output has a zero mtime, so it is reproducible.
+- A sibling is only kept when it is smaller than the source. Siblings
+  whose source is gone are removed.
+
+Usage:
+  python precompress.py                  # Compress changed TARGETS
+  python precompress.py --force          # Recompress everything
+  python precompress.py --jobs 4         # Threads (default: CPU count)
+  python precompress.py "docs/*.html"    # Other patterns, relative to the repo root
+"""
+
+import gzip
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import jsonio
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT = Path(__file__).parent.parent
+STATE_FILE = ROOT / "data" / ".precompress-state.json"
+
+# Served files worth compressing, relative to the repo root
+TARGETS = [
+    "*.html",
+    "dumpster-rental/*.html",
+    "app.js",
+    "sitemap*.xml",
+    "robots.txt",
+    "data/providers.json",
+]
+MIN_SIZE = 256  # below this the headers outweigh the saving
+
+
+def encodings() -> list:
+    return [".gz", ".br"] if brotli else [".gz"]
+
+
+def compress(data: bytes, suffix: str) -> bytes:
+    if suffix == ".gz":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return brotli.compress(data, mode=brotli.MODE_TEXT, quality=11)
+
+
+def sources(root: Path = ROOT, patterns=TARGETS) -> list:
+    found = set()
+    for pattern in patterns:
+        found.update(p for p in root.glob(pattern) if p.is_file() and p.suffix not in (".gz", ".br"))
+    return sorted(found)
+
+
+def load_state(path: Path = STATE_FILE) -> dict:
+    if path.exists():
+        return jsonio.load(path)
+    return {"files": {}}
+
+
+def save_state(state: dict, path: Path = STATE_FILE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    jsonio.dump(state, tmp, pretty=False)
+    tmp.replace(path)
+
+
+def compress_file(path: Path, suffixes: list) -> dict:
+    """Write path's siblings. Returns its state entry plus sizes."""
+    data = path.read_bytes()
+    st = path.stat()
+    result = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": hashlib.sha256(data).hexdigest(),
+              "compressed": {}}
+    for suffix in suffixes:
+        sibling = path.with_name(path.name + suffix)
+        out = compress(data, suffix) if len(data) >= MIN_SIZE else None
+        if out is None or len(out) >= len(data):
+            sibling.unlink(missing_ok=True)
+            continue
+        if not (sibling.exists() and sibling.read_bytes() == out):
+            sibling.write_bytes(out)
+        result["compressed"][suffix] = len(out)
+    return result
+
+
+def _current(path: Path, entry: dict | None, suffixes: list) -> bool:
+    if entry is None or set(entry.get("encodings", ())) != set(suffixes):
+        return False
+    if any(not path.with_name(path.name + s).exists() for s in entry["compressed"]):
+        return False
+    st = path.stat()
+    if (st.st_size, st.st_mtime_ns) == (entry["size"], entry["mtime_ns"]):
+        return True
+    if st.st_size != entry["size"] or hashlib.sha256(path.read_bytes()).hexdigest() != entry["sha256"]:
+        return False
+    entry["mtime_ns"] = st.st_mtime_ns  # touched, not changed
+    return True
+
+
+def precompress_all(files: list, state: dict, root: Path = ROOT, jobs: int = None, force: bool = False) -> list:
+    """Compress the files that changed since the last run. Returns one result per file compressed."""
+    known = state["files"]
+    suffixes = encodings()
+    rel = {p: p.relative_to(root).as_posix() for p in files}
+    todo = [p for p in files if force or not _current(p, known.get(rel[p]), suffixes)]
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        results = list(pool.map(lambda p: compress_file(p, suffixes), todo))
+    for path, result in zip(todo, results):
+        result["name"] = rel[path]
+        known[rel[path]] = {k: result[k] for k in ("size", "mtime_ns", "sha256", "compressed")}
+        known[rel[path]]["encodings"] = suffixes
+    live = set(rel.values())
+    for name in [n for n in known if n not in live]:
+        del known[name]
+    return results
+
+
+def remove_orphans(root: Path = ROOT, patterns=TARGETS) -> list:
+    """Delete .gz/.br siblings whose source no longer exists."""
+    removed = []
+    for pattern in patterns:
+        for suffix in (".gz", ".br"):
+            for sibling in root.glob(pattern + suffix):
+                if not sibling.with_suffix("").exists():
+                    sibling.unlink()
+                    removed.append(sibling)
+    return removed
+
+
+def main():
+    args = sys.argv[1:]
+    jobs = int(args[args.index("--jobs") + 1]) if "--jobs" in args else None
+    patterns = [a for a in args if not a.startswith("--") and not a.isdigit()] or TARGETS
+    if not brotli:
+        print("⚠️  brotli not installed (pip install brotli): writing .gz only")
+
+    start = time.perf_counter()
+    files = sources(ROOT, patterns)
+    state = load_state()
+    results = precompress_all(files, state, jobs=jobs, force="--force" in args)
+    save_state(state)
+    removed = remove_orphans(ROOT, patterns)
+
+    before = sum(r["size"] for r in results)
+    print(f"🗜️  {len(files)} files, {len(results)} compressed, {len(files) - len(results)} unchanged")
+    for suffix in encodings():
+        after = sum(r["compressed"].get(suffix, r["size"]) for r in results)
+        if before:
+            print(f"   {suffix}: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB")
+    if removed:
+        print(f"   🧹 {len(removed)} orphaned siblings removed")
+    print(f"   ⏱️  {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
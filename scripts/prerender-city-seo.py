@@ -5,18 +5,48 @@ Pre-render city pages with SEO content.
 This script reads each city HTML file, extracts the CITY_CONFIG,
 and pre-populates the title, meta description, H1, Open Graph tags,
 and schema markup so Google can index them without JavaScript.
+
+Runs are change-aware: data/.prerender-state.json records, per page, a
+hash of its CITY_CONFIG plus the template version (a hash of this
+script) and the hash, size and mtime of the page we left behind. Pages
+that have not changed since are skipped without rendering; the rest
+are rendered across a process pool, and a file is only rewritten when
+its bytes change, so mtimes and CDN caches stay valid.
+
+Afterwards sitemap.xml is brought up to date from the same page hashes
+(see sitemap.py): only pages whose content changed get a new lastmod.
+
+Usage:
+  python prerender-city-seo.py                 # Render changed pages
+  python prerender-city-seo.py --force         # Render every page
+  python prerender-city-seo.py --jobs 4        # Worker processes (default: CPU count)
+  python prerender-city-seo.py --no-sitemap    # Leave sitemap.xml alone
 """
 
+import hashlib
 import os
 import re
 import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import jsonio
+import sitemap
+from profiling import NullProfiler, Profiler
+
 CITY_DIR = Path(__file__).parent.parent / "dumpster-rental"
+PROFILE_DIR = Path(__file__).parent.parent / "data" / "profiles"
+STATE_FILE = Path(__file__).parent.parent / "data" / ".prerender-state.json"
+
+# Any edit to this script may change the rendered output
+TEMPLATE_VERSION = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
+CONFIG_RE = re.compile(r'window\.CITY_CONFIG\s*=\s*(\{[^}]+\})')
 
 def extract_city_config(html: str) -> dict | None:
     """Extract CITY_CONFIG from the HTML."""
-    match = re.search(r'window\.CITY_CONFIG\s*=\s*(\{[^}]+\})', html)
+    match = CONFIG_RE.search(html)
     if match:
         try:
             return json.loads(match.group(1))
@@ -24,14 +54,53 @@ def extract_city_config(html: str) -> dict | None:
             return None
     return None
 
-def prerender_page(filepath: Path) -> bool:
-    """Pre-render SEO elements in a city page."""
-    html = filepath.read_text()
+def config_key(html: str) -> str:
+    """Hash of the page's CITY_CONFIG source plus the template version."""
+    match = CONFIG_RE.search(html)
+    config = match.group(1) if match else ""
+    return hashlib.sha256(f"{TEMPLATE_VERSION}\n{config}".encode()).hexdigest()
+
+# SEO slots, matched by a single alternation so a page is scanned once.
+# Patterns follow the opening "<": the scan stops only at a "<" followed by
+# a letter some slot starts with, then tries the slots. Each slot's markup
+# is replaced wherever it occurs.
+SLOT_PATTERNS = {
+    "title": r'title[^>]*>.*?</title>',
+    "description": r'meta\s+name="description"[^>]*>',
+    "canonical": r'link\s+rel="canonical"[^>]*>',
+    "og_url": r'meta\s+property="og:url"[^>]*>',
+    "og_title": r'meta\s+property="og:title"[^>]*>',
+    "og_description": r'meta\s+property="og:description"[^>]*>',
+    "h1": r'h1[^>]*id="city-title"[^>]*>.*?</h1>',
+    "schema": r'script\s+type="application/ld\+json"\s+id="schema-json">[\s\S]*?</script>',
+}
+SLOTS_RE = re.compile(
+    "<(?=[" + "".join(sorted({p[0] for p in SLOT_PATTERNS.values()})) + "])(?:"
+    + "|".join(f"(?P<{name}>{pattern})" for name, pattern in SLOT_PATTERNS.items()) + ")"
+)
+
+def rewrite_slots(html: str, values: dict) -> tuple:
+    """
+    Replace each slot's markup with values[slot] in one pass. Returns
+    (html, slots that were not found). Values are inserted literally.
+    """
+    found = set()
+    
+    def replace(match):
+        found.add(match.lastgroup)
+        return values[match.lastgroup]
     
+    html = SLOTS_RE.sub(replace, html)
+    return html, [slot for slot in SLOT_PATTERNS if slot not in found]
+
+def render(html: str, slug: str) -> tuple:
+    """
+    Pre-render SEO elements into a page's HTML. Returns (html, None,
+    missing slots), or (None, reason, []) if the page cannot be rendered.
+    """
     config = extract_city_config(html)
     if not config:
-        print(f"  ⚠️  No CITY_CONFIG found: {filepath.name}")
-        return False
+        return None, "No CITY_CONFIG found", []
     
     city = config.get("city", "")
     state = config.get("stateName", config.get("state", ""))
@@ -40,11 +109,10 @@ def prerender_page(filepath: Path) -> bool:
     total_reviews = config.get("totalReviews", 0)
     
     if not city or not state:
-        print(f"  ⚠️  Missing city/state: {filepath.name}")
-        return False
+        return None, "Missing city/state", []
     
     full_location = f"{city}, {state}"
-    slug = filepath.stem  # e.g., "naples-florida"
+    # slug, e.g. "naples-florida"
     canonical_url = f"https://dumpstermap.io/dumpster-rental/{slug}.html"
     
     # Build SEO content
@@ -73,64 +141,103 @@ def prerender_page(filepath: Path) -> bool:
         }
     }
     
-    # Replace title
-    html = re.sub(
-        r'<title[^>]*>.*?</title>',
-        f'<title id="page-title">{title}</title>',
-        html
-    )
-    
-    # Replace meta description
-    html = re.sub(
-        r'<meta\s+name="description"[^>]*>',
-        f'<meta name="description" id="meta-desc" content="{meta_desc}">',
-        html
-    )
-    
-    # Replace canonical URL
-    html = re.sub(
-        r'<link\s+rel="canonical"[^>]*>',
-        f'<link rel="canonical" id="canonical-url" href="{canonical_url}">',
-        html
-    )
-    
-    # Replace Open Graph tags
-    html = re.sub(
-        r'<meta\s+property="og:url"[^>]*>',
-        f'<meta property="og:url" id="og-url" content="{canonical_url}">',
-        html
-    )
-    html = re.sub(
-        r'<meta\s+property="og:title"[^>]*>',
-        f'<meta property="og:title" id="og-title" content="{title}">',
-        html
-    )
-    html = re.sub(
-        r'<meta\s+property="og:description"[^>]*>',
-        f'<meta property="og:description" id="og-desc" content="{meta_desc}">',
-        html
-    )
-    
-    # Replace H1
-    html = re.sub(
-        r'<h1[^>]*id="city-title"[^>]*>.*?</h1>',
-        f'<h1 id="city-title">{h1_text}</h1>',
-        html
-    )
-    
-    # Replace schema JSON
+    # Replace every SEO slot in one scan
     schema_json = json.dumps(schema, indent=6)
-    html = re.sub(
-        r'<script\s+type="application/ld\+json"\s+id="schema-json">[\s\S]*?</script>',
-        f'<script type="application/ld+json" id="schema-json">\n    {schema_json}\n    </script>',
-        html
-    )
+    html, missing = rewrite_slots(html, {
+        "title": f'<title id="page-title">{title}</title>',
+        "description": f'<meta name="description" id="meta-desc" content="{meta_desc}">',
+        "canonical": f'<link rel="canonical" id="canonical-url" href="{canonical_url}">',
+        "og_url": f'<meta property="og:url" id="og-url" content="{canonical_url}">',
+        "og_title": f'<meta property="og:title" id="og-title" content="{title}">',
+        "og_description": f'<meta property="og:description" id="og-desc" content="{meta_desc}">',
+        "h1": f'<h1 id="city-title">{h1_text}</h1>',
+        "schema": f'<script type="application/ld+json" id="schema-json">\n    {schema_json}\n    </script>',
+    })
     
-    # Write back
-    filepath.write_text(html)
+    return html, None, missing
+
+def render_file(filepath: Path) -> dict:
+    """
+    Render one page, writing it only if its bytes change. Returns the
+    page's state entry plus "status" (written, unchanged or failed),
+    "reason" for failures and the "missing" SEO slots. Runs in the
+    worker processes.
+    """
+    data = filepath.read_bytes()
+    html = data.decode()
+    rendered, reason, missing = render(html, filepath.stem)
+    result = {"name": filepath.name, "status": "unchanged", "reason": reason, "missing": missing}
+    if rendered is None:
+        result["status"] = "failed"
+        out = data
+    else:
+        out = rendered.encode()
+        if out != data:
+            filepath.write_bytes(out)
+            result["status"] = "written"
+    st = filepath.stat()
+    result.update(key=config_key(out.decode()), sha256=hashlib.sha256(out).hexdigest(),
+                  size=st.st_size, mtime_ns=st.st_mtime_ns)
+    return result
+
+def prerender_page(filepath: Path) -> bool:
+    """Pre-render SEO elements in a city page."""
+    result = render_file(filepath)
+    if result["status"] == "failed":
+        print(f"  ⚠️  {result['reason']}: {filepath.name}")
+        return False
+    return True
+
+def is_current(filepath: Path, entry: dict | None) -> bool:
+    """True if the page is exactly what the last run rendered from the same config and template."""
+    if not entry:
+        return False
+    st = filepath.stat()
+    if st.st_size != entry["size"]:
+        return False
+    if st.st_mtime_ns == entry["mtime_ns"] and entry.get("template") == TEMPLATE_VERSION:
+        return True
+    # Touched or template changed: compare content and config hashes
+    data = filepath.read_bytes()
+    if hashlib.sha256(data).hexdigest() != entry["sha256"] or config_key(data.decode()) != entry["key"]:
+        return False
+    entry["mtime_ns"] = st.st_mtime_ns
     return True
 
-def main():
+def load_state() -> dict:
+    if STATE_FILE.exists():
+        return jsonio.load(STATE_FILE)
+    return {"pages": {}}
+
+def save_state(state: dict):
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_FILE.with_suffix(".tmp")
+    jsonio.dump(state, tmp, pretty=False)
+    tmp.replace(STATE_FILE)
+
+def prerender_all(files: list, state: dict, jobs: int = None, force: bool = False) -> list:
+    """Render the pages that changed since the last run. Returns one result per page rendered."""
+    pages = state["pages"]
+    todo = [p for p in sorted(files) if force or not is_current(p, pages.get(p.name))]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(render_file, todo, chunksize=max(1, len(todo) // (jobs * 4))))
+    else:
+        results = [render_file(p) for p in todo]
+    # Failed pages are recorded too, so they are not re-read until they change
+    for result in results:
+        pages[result["name"]] = {k: result[k] for k in ("key", "sha256", "size", "mtime_ns", "reason")}
+        pages[result["name"]]["template"] = TEMPLATE_VERSION
+    names = {p.name for p in files}
+    for name in [n for n in pages if n not in names]:
+        del pages[name]
+    return results
+
+def main(profiler=None):
+    profiler = profiler or NullProfiler()
+    args = sys.argv[1:]
+    jobs = int(args[args.index("--jobs") + 1]) if "--jobs" in args else None
     print("🔧 Pre-rendering city pages for SEO...\n")
     
     if not CITY_DIR.exists():
@@ -140,22 +247,42 @@ def main():
     html_files = list(CITY_DIR.glob("*.html"))
     print(f"📁 Found {len(html_files)} city pages\n")
     
-    success = 0
-    failed = 0
+    state = load_state()
+    with profiler.stage("prerender"):
+        results = prerender_all(html_files, state, jobs, force="--force" in args)
+    save_state(state)
+    
+    if "--no-sitemap" not in args:
+        with profiler.stage("sitemap"):
+            sitemap_state = sitemap.load_state()
+            changes = sitemap.update(sitemap_state, {name: e["sha256"] for name, e in state["pages"].items()},
+                                     {r["name"] for r in results if r["status"] == "written"})
+            sitemap.save_state(sitemap_state)
     
-    for filepath in sorted(html_files):
-        if prerender_page(filepath):
-            success += 1
-            print(f"  ✅ {filepath.name}")
-        else:
-            failed += 1
+    counts = {"written": 0, "unchanged": 0, "failed": 0}
+    missing = {}
+    for result in results:
+        counts[result["status"]] += 1
+        for slot in result["missing"]:
+            missing[slot] = missing.get(slot, 0) + 1
+        if result["status"] == "written":
+            print(f"  ✅ {result['name']}")
+        elif result["status"] == "failed":
+            print(f"  ⚠️  {result['reason']}: {result['name']}")
     
     print(f"\n{'='*50}")
-    print(f"✅ Pre-rendered: {success} pages")
-    if failed:
-        print(f"⚠️  Skipped: {failed} pages")
+    print(f"✅ Pre-rendered: {counts['written']} pages written, {counts['unchanged']} already up to date")
+    print(f"⏭️  Skipped (unchanged since last run): {len(html_files) - len(results)} pages")
+    if counts["failed"]:
+        print(f"⚠️  Skipped: {counts['failed']} pages")
+    for slot, n in missing.items():
+        print(f"⚠️  No {slot} slot in {n} pages")
+    if "--no-sitemap" not in args:
+        print(f"🗺️  sitemap: {len(changes['changed'])} of {changes['urls']} URLs changed, "
+              f"{len(changes['removed'])} removed")
     print(f"\n🎉 Done! City pages now have pre-populated SEO content.")
     print("   Google will see proper titles, descriptions, and H1s.")
+    profiler.finish()
 
 if __name__ == "__main__":
-    main()
+    main(Profiler.from_argv("prerender-city-seo", PROFILE_DIR))
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+DumpsterMap - Opt-in profiling for pipeline scripts
+
+Every pipeline script accepts --profile. When it is given, each stage is
+profiled separately and the results are written to a profile-<stamp>/
+directory inside the run's output directory:
+
+- <stage>.pstats           cProfile data (sync stages)
+- <stage>.collapsed        collapsed stacks, for flamegraph.pl / inferno
+- <stage>.speedscope.json  open at https://www.speedscope.app
+- hotspots.txt             top-N functions per stage
+
+Sync stages run under cProfile plus a light stack sampler (the sampler
+gives real call stacks for the flamegraph; cProfile gives exact counts).
+Async stages (mode="async", e.g. website validation) use only the
+sampler, which also records where every suspended asyncio task is
+awaiting, so time spent waiting on the network shows up per call site.
+
+    profiler = Profiler.from_argv("clean_data", CLEAN_DIR)
+    with profiler.stage("dedup"):
+        ...
+    profiler.finish()
+
+Without --profile, from_argv returns a no-op profiler.
+"""
+
+import asyncio
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+
+import jsonio
+
+SAMPLE_INTERVAL = 0.005
+TOP_N = 25
+MAX_STACK_DEPTH = 128
+
+
+# =============================================================================
+# Stack sampler
+# =============================================================================
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+def _walk(frame) -> list:
+    """Labels from outermost to innermost frame."""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def _coroutine_stack(task) -> list:
+    """Await chain of a suspended task, outermost first."""
+    labels = []
+    coro = task.get_coro()
+    while coro is not None and len(labels) < MAX_STACK_DEPTH:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        labels.append(_frame_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return labels
+
+
+class StackSampler:
+    """
+    Samples the target thread's stack every interval seconds from a
+    background thread. With an event loop attached, it also samples the
+    await chains of suspended tasks under an "await" root.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, thread_id: int = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks = Counter()
+        self.loop = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.duration = 0.0
+
+    def attach_loop(self, loop):
+        self.loop = loop
+
+    def start(self):
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.duration = time.perf_counter() - self._start
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                root = "main"
+                running = self._running_task()
+                if running is not None:
+                    root = f"task:{running.get_name()}"
+                self.stacks[tuple([root] + _walk(frame))] += 1
+            if self.loop is not None:
+                self._sample_tasks()
+
+    def _running_task(self):
+        if self.loop is None:
+            return None
+        current = getattr(asyncio.tasks, "_current_tasks", None)
+        try:
+            return current.get(self.loop) if current is not None else None
+        except Exception:
+            return None
+
+    def _sample_tasks(self):
+        try:
+            tasks = list(asyncio.all_tasks(self.loop))
+        except RuntimeError:
+            # Task set changed while we were copying it; skip this tick
+            return
+        for task in tasks:
+            if task.done():
+                continue
+            stack = _coroutine_stack(task)
+            if stack:
+                self.stacks[tuple(["await"] + stack)] += 1
+
+
+def self_counts(stacks: Counter) -> Counter:
+    """Samples per innermost frame."""
+    counts = Counter()
+    for stack, n in stacks.items():
+        counts[stack[-1]] += n
+    return counts
+
+
+def write_collapsed(stacks: Counter, path: Path):
+    with open(path, "w") as f:
+        for stack, count in sorted(stacks.items()):
+            f.write(";".join(s.replace(";", ":") for s in stack) + f" {count}\n")
+
+
+def write_speedscope(stacks: Counter, path: Path, name: str, duration: float):
+    """Sampled speedscope profile, with sample weights scaled to the stage's wall time."""
+    per_sample = duration / (sum(stacks.values()) or 1)
+    frames = []
+    frame_index = {}
+    samples = []
+    weights = []
+    for stack, count in stacks.items():
+        indexes = []
+        for label in stack:
+            if label not in frame_index:
+                frame_index[label] = len(frames)
+                frames.append({"name": label})
+            indexes.append(frame_index[label])
+        samples.append(indexes)
+        weights.append(count * per_sample)
+    doc = {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+        "name": name,
+        "exporter": "dumpstermap profiling.py",
+    }
+    jsonio.dump(doc, path, pretty=False)
+
+
+# =============================================================================
+# Profiler
+# =============================================================================
+
+class Profiler:
+    """Per-stage profiles for one script run."""
+
+    enabled = True
+
+    def __init__(self, script: str, output_dir: Path, top_n: int = TOP_N):
+        self.script = script
+        self.output_dir = Path(output_dir) / f"profile-{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.top_n = top_n
+        self.stages = {}           # name -> [cProfile or None, stacks, seconds]
+        self.active = None
+
+    @classmethod
+    def from_argv(cls, script: str, output_dir: Path, argv: list = None):
+        """Profiler if --profile was passed (and removed from argv), else a no-op."""
+        argv = sys.argv if argv is None else argv
+        if "--profile" not in argv:
+            return NullProfiler()
+        argv.remove("--profile")
+        return cls(script, output_dir)
+
+    @contextmanager
+    def stage(self, name: str, mode: str = "sync"):
+        """
+        Profile the body. mode="async" uses only the sampler.
+
+        Entering the same stage again (e.g. once per input file) adds to
+        its profile. Nothing is written until finish(), so file output
+        never lands inside a timed stage.
+        """
+        if self.active:
+            # Nested stages are folded into the outer profile
+            yield self
+            return
+        entry = self.stages.setdefault(
+            name, [cProfile.Profile() if mode == "sync" else None, Counter(), 0.0])
+        profile = entry[0]
+        sampler = StackSampler()
+        self.active = sampler
+        sampler.start()
+        if profile:
+            profile.enable()
+        try:
+            yield self
+        finally:
+            if profile:
+                profile.disable()
+            sampler.stop()
+            self.active = None
+            entry[1].update(sampler.stacks)
+            entry[2] += sampler.duration
+
+    def attach_loop(self, loop=None):
+        """Call from inside an async stage so suspended tasks are sampled too."""
+        if self.active:
+            self.active.attach_loop(loop or asyncio.get_running_loop())
+
+    def _write_stage(self, name, profile, stacks, duration) -> str:
+        base = self.output_dir / name
+        write_collapsed(stacks, base.with_suffix(".collapsed"))
+        write_speedscope(stacks, base.with_suffix(".speedscope.json"),
+                         f"{self.script}:{name}", duration)
+
+        lines = [f"== {name} ({duration:.3f}s wall) =="]
+        if profile:
+            profile.dump_stats(base.with_suffix(".pstats"))
+            out = io.StringIO()
+            ps = pstats.Stats(profile, stream=out)
+            ps.sort_stats("tottime").print_stats(self.top_n)
+            lines.append(_trim_pstats(out.getvalue()))
+        else:
+            total = sum(stacks.values()) or 1
+            lines.append(f"{'samples':>8} {'%':>6}  function")
+            for label, count in self_counts(stacks).most_common(self.top_n):
+                lines.append(f"{count:8d} {100 * count / total:5.1f}%  {label}")
+        return "\n".join(lines)
+
+    def finish(self):
+        """Write every stage's files and hotspots.txt."""
+        if not self.stages:
+            return None
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        summaries = [self._write_stage(name, *entry) for name, entry in self.stages.items()]
+        path = self.output_dir / "hotspots.txt"
+        with open(path, "w") as f:
+            f.write(f"{self.script} hotspots (top {self.top_n} per stage)\n\n")
+            f.write("\n\n".join(summaries) + "\n")
+        print(f"\n🔥 Profiles written to {self.output_dir}")
+        return path
+
+
+def _trim_pstats(text: str) -> str:
+    """Drop pstats' preamble, keeping the table."""
+    lines = text.strip().splitlines()
+    for i, line in enumerate(lines):
+        if line.strip().startswith("ncalls"):
+            return "\n".join(lines[i:])
+    return text.strip()
+
+
+class NullProfiler:
+    """Stand-in used when --profile is not given."""
+
+    enabled = False
+
+    def stage(self, name: str, mode: str = "sync"):
+        return nullcontext(self)
+
+    def attach_loop(self, loop=None):
+        pass
+
+    def finish(self):
+        return None
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+DumpsterMap - Patch-based providers.json updates
+
+Tools that change data/providers.json (merge_providers.py,
+clean-providers.py) hand the before/after documents to commit_providers(),
+which:
+- computes a record-level patch (add / update / remove by provider id)
+- stores only that patch under data/patches/ as history
+- writes the new file via temp file + rename, so server.js never sees a
+  half-written providers.json
+
+Patches carry enough of the old values to be reverted, so rollback replays
+them in reverse. Each patch also records a hash of the documents on both
+sides; rollback refuses to run when providers.json no longer matches the
+patch's "after" state (e.g. it was edited or replaced by hand).
+
+Usage:
+  python provider_patch.py list              # Show patch history
+  python provider_patch.py rollback          # Revert the latest patch
+  python provider_patch.py rollback 3        # Revert the latest 3 patches
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import jsonio
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+PROVIDERS_PATH = DATA_DIR / "providers.json"
+PATCH_DIR = DATA_DIR / "patches"
+ROLLED_BACK_DIR = PATCH_DIR / "rolled_back"
+
+_MISSING = object()
+
+
+def load_providers(path: Path = PROVIDERS_PATH) -> dict:
+    return jsonio.load(path)
+
+
+def atomic_write_json(path: Path, data, indent=2):
+    """Write JSON to a temp file in the same directory, then rename over path."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(jsonio.dumps(data, pretty=bool(indent)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def document_hash(data: dict) -> str:
+    """sha256 of the document's content, independent of formatting and key order."""
+    return hashlib.sha256(jsonio.dumps(data, sort_keys=True)).hexdigest()
+
+
+def record_keys(records: list) -> list:
+    """
+    Stable key per record: its id, with #2, #3... on repeated ids.
+
+    Falls back to slug/name for records without an id.
+    """
+    keys = []
+    seen = {}
+    for r in records:
+        base = str(r.get("id") or r.get("slug") or r.get("name") or "")
+        seen[base] = seen.get(base, 0) + 1
+        keys.append(base if seen[base] == 1 else f"{base}#{seen[base]}")
+    return keys
+
+
+def _diff_fields(before: dict, after: dict) -> dict | None:
+    changes = {"set": {}, "unset": [], "before": {}}
+    for field, value in after.items():
+        old = before.get(field, _MISSING)
+        if old is _MISSING or old != value:
+            changes["set"][field] = value
+            if old is not _MISSING:
+                changes["before"][field] = old
+    for field, old in before.items():
+        if field not in after:
+            changes["unset"].append(field)
+            changes["before"][field] = old
+    if not changes["set"] and not changes["unset"]:
+        return None
+    return changes
+
+
+def compute_patch(before: dict, after: dict, list_key="providers") -> dict:
+    """Record-level patch turning the before document into the after document."""
+    old_records = before.get(list_key, [])
+    new_records = after.get(list_key, [])
+    old_keys = record_keys(old_records)
+    new_keys = record_keys(new_records)
+    old_by_key = dict(zip(old_keys, old_records))
+    new_by_key = dict(zip(new_keys, new_records))
+
+    patch = {"add": [], "update": [], "remove": []}
+    for key, record in zip(new_keys, new_records):
+        if key not in old_by_key:
+            patch["add"].append({"key": key, "record": record})
+        else:
+            changes = _diff_fields(old_by_key[key], record)
+            if changes:
+                patch["update"].append({"key": key, **changes})
+    for key, record in zip(old_keys, old_records):
+        if key not in new_by_key:
+            patch["remove"].append({"key": key, "record": record})
+
+    # The new order only needs recording when it isn't "old order, minus
+    # removed, plus added". The old order is needed to undo any removal,
+    # so removed records go back to where they were.
+    implied = [k for k in old_keys if k in new_by_key] + [a["key"] for a in patch["add"]]
+    if implied != new_keys:
+        patch["order"] = new_keys
+    if implied != new_keys or patch["remove"]:
+        patch["order_before"] = old_keys
+
+    meta_before = {k: v for k, v in before.items() if k != list_key}
+    meta_after = {k: v for k, v in after.items() if k != list_key}
+    meta = _diff_fields(meta_before, meta_after)
+    if meta:
+        patch["meta"] = meta
+    return patch
+
+
+def is_empty(patch: dict) -> bool:
+    return not any(patch.get(k) for k in ("add", "update", "remove", "order", "meta"))
+
+
+def _apply_fields(record: dict, set_fields: dict, unset: list) -> dict:
+    record = dict(record)
+    for field in unset:
+        record.pop(field, None)
+    record.update(set_fields)
+    return record
+
+
+def apply_patch(data: dict, patch: dict, list_key="providers") -> dict:
+    """Return a new document with patch applied to data."""
+    records = data.get(list_key, [])
+    keys = record_keys(records)
+    by_key = dict(zip(keys, records))
+
+    removed = {r["key"] for r in patch.get("remove", [])}
+    for upd in patch.get("update", []):
+        by_key[upd["key"]] = _apply_fields(by_key[upd["key"]], upd["set"], upd["unset"])
+    for add in patch.get("add", []):
+        by_key[add["key"]] = add["record"]
+
+    if "order" in patch:
+        order = patch["order"]
+    else:
+        order = [k for k in keys if k not in removed] + [a["key"] for a in patch.get("add", [])]
+
+    result = {k: v for k, v in data.items() if k != list_key}
+    if "meta" in patch:
+        result = _apply_fields(result, patch["meta"]["set"], patch["meta"]["unset"])
+    result[list_key] = [by_key[k] for k in order]
+    return result
+
+
+def invert_patch(patch: dict) -> dict:
+    """Patch that undoes patch."""
+    def invert_fields(changes):
+        return {
+            "set": changes["before"],
+            "unset": [f for f in changes["set"] if f not in changes["before"]],
+            "before": {f: v for f, v in changes["set"].items() if f in changes["before"]},
+        }
+
+    inverse = {
+        "add": patch.get("remove", []),
+        "remove": patch.get("add", []),
+        "update": [{"key": u["key"], **invert_fields(u)} for u in patch.get("update", [])],
+    }
+    if "order_before" in patch:
+        inverse["order"] = patch["order_before"]
+        removed = {r["key"] for r in patch.get("remove", [])}
+        inverse["order_before"] = patch.get("order") or (
+            [k for k in patch["order_before"] if k not in removed] + [a["key"] for a in patch.get("add", [])])
+    if "meta" in patch:
+        inverse["meta"] = invert_fields(patch["meta"])
+    return inverse
+
+
+def summarize(patch: dict) -> str:
+    return (f"+{len(patch.get('add', []))} added, ~{len(patch.get('update', []))} updated, "
+            f"-{len(patch.get('remove', []))} removed")
+
+
+def commit_providers(before: dict, after: dict, tool: str, path: Path = PROVIDERS_PATH) -> dict | None:
+    """
+    Record the before→after patch and atomically write after to path.
+
+    Returns the patch, or None if nothing changed (nothing is written).
+    """
+    patch = compute_patch(before, after)
+    if is_empty(patch):
+        print("No changes to providers.json")
+        return None
+
+    PATCH_DIR.mkdir(parents=True, exist_ok=True)
+    patch["tool"] = tool
+    patch["created_at"] = datetime.now().isoformat()
+    patch["before_sha256"] = document_hash(before)
+    patch["after_sha256"] = document_hash(after)
+    patch_file = PATCH_DIR / f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{tool}.json"
+    atomic_write_json(patch_file, patch, indent=None)
+
+    atomic_write_json(path, after)
+    print(f"Patch saved: {patch_file.name} ({summarize(patch)})")
+    return patch
+
+
+def patch_history() -> list:
+    """Patch files, oldest first."""
+    if not PATCH_DIR.exists():
+        return []
+    return sorted(PATCH_DIR.glob("*.json"))
+
+
+def rollback(count: int = 1, path: Path = PROVIDERS_PATH):
+    """
+    Revert the latest count patches, newest first.
+
+    Returns False, without writing anything, if the file (or the document
+    after an earlier revert) is not the state a patch produced.
+    """
+    history = patch_history()
+    if not history:
+        print("No patches to roll back")
+        return False
+
+    data = load_providers(path)
+
+    ROLLED_BACK_DIR.mkdir(parents=True, exist_ok=True)
+    reverted = []
+    for patch_file in reversed(history[-count:]):
+        patch = jsonio.load(patch_file)
+        expected = patch.get("after_sha256")
+        if expected is None:
+            print(f"  ⚠️  {patch_file.name} predates document hashes; not verified")
+        elif document_hash(data) != expected:
+            print(f"❌ {path.name} does not match the state {patch_file.name} left it in "
+                  f"(changed since?); refusing to roll back")
+            return False
+        data = apply_patch(data, invert_patch(patch))
+        reverted.append(patch_file)
+        print(f"  ↩️  {patch_file.name} ({summarize(patch)})")
+
+    atomic_write_json(path, data)
+    for patch_file in reverted:
+        os.replace(patch_file, ROLLED_BACK_DIR / patch_file.name)
+    print(f"Rolled back {len(reverted)} patch(es); {len(data.get('providers', []))} providers now")
+    return True
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__.split("Usage:")[1])
+        sys.exit(1)
+
+    cmd = sys.argv[1]
+    if cmd == "list":
+        for patch_file in patch_history():
+            patch = jsonio.load(patch_file)
+            print(f"  {patch_file.name}: {summarize(patch)}")
+    elif cmd == "rollback":
+        if not rollback(int(sys.argv[2]) if len(sys.argv) > 2 else 1):
+            sys.exit(1)
+    else:
+        print(f"Unknown command: {cmd}")
+
+
+if __name__ == "__main__":
+    main()
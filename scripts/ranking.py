@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+DumpsterMap - Ranking: top-K per group and external sort
+
+- top_k_by(): best k records per group (state, city) with one bounded
+  heap per group, so a listing needs O(groups * k) memory, not a full sort
+- ranked(): every record by descending score, in the same order as
+  list.sort(key=score, reverse=True). Up to run_size records are sorted
+  in memory; past that, sorted runs are spilled to NDJSON files in a temp
+  directory and heap-merged, so memory stays at one run plus one record
+  per run whatever the input size
+- drain(): hands a list to ranked() and empties it as the runs are
+  built, so records the caller no longer needs are freed once spilled
+
+Ties keep input order in both, like the stable sort they replace.
+
+PIPELINE_SORT_RUN_SIZE sets the run size clean_all uses (default 200000).
+
+Usage:
+  python ranking.py bench [rows] [run_size]   # External sort time and peak memory
+"""
+
+import heapq
+import itertools
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import jsonio
+
+RUN_SIZE = int(os.environ.get("PIPELINE_SORT_RUN_SIZE", 200_000))
+
+# Fields kept for each entry of a top-K listing
+LISTING_FIELDS = ("name", "phone", "website", "city", "state", "rating", "reviews", "place_id", "_quality_score")
+
+
+def quality(record) -> float:
+    return record.get("_quality_score", 0)
+
+
+def city_state(record):
+    city, state = record.get("city"), record.get("state")
+    return f"{city}, {state}" if city and state else None
+
+
+def top_k_by(records, group, k: int, score=quality) -> dict:
+    """
+    {group value: best k records, best first}. group is a field name or a
+    function of the record; records whose group is None are skipped.
+    """
+    get = group if callable(group) else (lambda r: r.get(group))
+    heaps = {}
+    for seq, r in enumerate(records):
+        g = get(r)
+        if g is None:
+            continue
+        # Min-heap on (score, -seq): the root is the worst kept entry, and
+        # among equal scores the later record loses, as in a stable sort
+        item = (score(r), -seq, r)
+        heap = heaps.get(g)
+        if heap is None:
+            heaps[g] = [item]
+        elif len(heap) < k:
+            heapq.heappush(heap, item)
+        elif item[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, item)
+    return {g: [item[2] for item in sorted(heap, key=lambda i: i[:2], reverse=True)]
+            for g, heap in sorted(heaps.items())}
+
+
+def listing(top: dict, fields=LISTING_FIELDS) -> dict:
+    """Trim top_k_by output to the fields a listing page needs."""
+    return {g: [{f: r.get(f) for f in fields} for r in rs] for g, rs in top.items()}
+
+
+# =============================================================================
+# External sort
+# =============================================================================
+
+def _spill(run: list, directory: Path, n: int) -> Path:
+    path = directory / f"run-{n:05d}.ndjson"
+    with open(path, "wb") as f:
+        for key, r in run:
+            f.write(jsonio.dumps([key, r]))
+            f.write(b"\n")
+    return path
+
+
+def _read_run(path: Path):
+    with open(path, "rb") as f:
+        for line in f:
+            key, r = jsonio.loads(line)
+            yield tuple(key), r
+
+
+def _merge(tmp, runs: list):
+    try:
+        for _, r in heapq.merge(*(_read_run(p) for p in runs), key=lambda item: item[0]):
+            yield r
+    finally:
+        tmp.cleanup()
+
+
+def drain(records: list):
+    """Yield the items of records in order, removing each from the list as it goes."""
+    records.reverse()
+    while records:
+        yield records.pop()
+
+
+def ranked(records, score=quality, run_size: int = None, tmp_dir=None):
+    """
+    Iterator over records by descending score. Sorting (and spilling runs
+    of run_size records to disk, once the input is larger than one run)
+    happens up front; the merge is lazy. Spilled records come back as dicts.
+    """
+    run_size = run_size or RUN_SIZE
+    it = iter(records)
+    counter = itertools.count()
+
+    def next_run():
+        run = [((-score(r), next(counter)), r) for r in itertools.islice(it, run_size)]
+        run.sort(key=lambda item: item[0])
+        return run
+
+    run = next_run()
+    nxt = next(it, None)
+    if nxt is None:
+        return (r for _, r in run)
+
+    # Removed when the merge finishes, or with the iterator if it is dropped early
+    tmp = tempfile.TemporaryDirectory(prefix="dumpstermap-sort-", dir=tmp_dir)
+    it = itertools.chain([nxt], it)
+    runs = []
+    while run:
+        runs.append(_spill(run, Path(tmp.name), len(runs)))
+        run = next_run()
+    return _merge(tmp, runs)
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def _synthetic(rows: int):
+    for i in range(rows):
+        yield {"name": f"Provider {i}", "state": f"State {i % 50}", "city": f"City {i % 3000}",
+               "website": f"https://p{i}.example/", "reviews": i % 900,
+               "_quality_score": ((i * 7919) % 1000) / 1000}
+
+
+def _drain_sorted(rows: int, run_size: int):
+    last, count = None, 0
+    for r in ranked(_synthetic(rows), run_size=run_size):
+        assert last is None or r["_quality_score"] <= last
+        last = r["_quality_score"]
+        count += 1
+    assert count == rows
+
+
+def bench(rows: int = 1_000_000, run_size: int = 100_000) -> dict:
+    """
+    Stream rows synthetic records through ranked() and top_k_by(). Each is
+    run twice: once for time, once under tracemalloc for peak memory.
+    """
+    result = {"rows": rows, "run_size": run_size}
+    jobs = {"sort": lambda: _drain_sorted(rows, run_size),
+            "topk": lambda: top_k_by(_synthetic(rows), "city", 10)}
+    for name, job in jobs.items():
+        start = time.perf_counter()
+        job()
+        result[f"{name}_seconds"] = time.perf_counter() - start
+        tracemalloc.start()
+        job()
+        result[f"{name}_peak"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0] != "bench":
+        print(__doc__.split("Usage:")[1])
+        sys.exit(1)
+    r = bench(*(int(a) for a in args[1:3]))
+    print(f"⏱️  {r['rows']:,} records, runs of {r['run_size']:,}")
+    print(f"   external sort: {r['sort_seconds']:.1f}s, peak {r['sort_peak'] / 1e6:.0f} MB")
+    print(f"   top 10 per city: {r['topk_seconds']:.1f}s, "
+          f"peak {r['topk_peak'] / 1e6:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+DumpsterMap - Slim provider record
+
+A raw OutScraper record is a dict of ~60 keys, most of them heavy nested
+data the cleaning pipeline never reads (popular_times, reviews_per_score,
+posts, about, working_hours, ...). Holding thousands of those dicts for
+dedup and sorting costs far more memory than the data itself.
+
+Record keeps only the fields the pipeline reads as __slots__ attributes
+and the whole original record as one compact JSON bytes value, deflated
+against a shared dictionary of OutScraper keys and URL prefixes (about
+1KB instead of 7KB as a dict). Anything else is decoded on demand from
+those bytes, and output re-emits them untouched with the pipeline's
+additions (_quality_score, _source_state, ...) appended. Record supports
+the dict methods the pipeline uses (get, [], in), so should_remove,
+deduplicate and friends work unchanged.
+
+Packing costs ~70us per record, so clean_data only uses Records when
+PIPELINE_SLIM_RECORDS=1 (for corpora too large to hold as dicts).
+
+Usage:
+  python record_model.py                 # Compare memory per record on data/raw
+"""
+
+import os
+import sys
+import tracemalloc
+import zlib
+from pathlib import Path
+
+import jsonio
+
+RAW_DIR = Path(__file__).parent.parent / "data" / "raw"
+SLIM_RECORDS = os.environ.get("PIPELINE_SLIM_RECORDS") == "1"
+
+# Fields read by should_remove, calculate_quality_score, deduplicate and the CSV export
+FIELDS = (
+    "name", "category", "subtypes", "business_status", "verified",
+    "phone", "address", "website", "place_id",
+    "city", "state", "rating", "reviews", "photos_count",
+)
+_FIELD_SET = frozenset(FIELDS)
+
+# Marks a field the raw record does not have (as opposed to a null value)
+MISSING = object()
+
+# OutScraper record keys, in the order the API returns them
+RAW_KEYS = (
+    "about", "address", "area_service", "booking_appointment_link", "business_status", "category",
+    "cid", "city", "country", "country_code", "county", "description", "google_id", "h3", "kgmid",
+    "latitude", "located_google_id", "located_in", "location_link", "location_reviews_link", "logo",
+    "longitude", "menu_link", "name", "name_for_emails", "order_links", "other_hours", "owner_id",
+    "owner_link", "owner_title", "phone", "photo", "photos_count", "place_id", "plus_code",
+    "popular_times", "postal_code", "posts", "prices", "query", "range", "rating", "reservation_links",
+    "reviews", "reviews_id", "reviews_link", "reviews_per_score", "reviews_tags", "state", "state_code",
+    "street", "street_view", "subtypes", "time_zone", "type", "typical_time_spent", "verified",
+    "website", "working_hours", "working_hours_csv_compatible",
+)
+
+# Preset deflate dictionary: strings nearly every record repeats
+ZDICT = (
+    b'"https://www.google.com/maps/place/"https://lh3.googleusercontent.com/p/'
+    b'"https://search.google.com/local/reviews?placeid="https://www.google.com/maps/contrib/'
+    b'"Dumpster rental service"OPERATIONAL"United States of America"'
+    + jsonio.dumps(dict.fromkeys(RAW_KEYS))
+)
+
+
+def pack(raw: bytes) -> bytes:
+    deflate = zlib.compressobj(1, zdict=ZDICT)
+    return deflate.compress(raw) + deflate.flush()
+
+
+def unpack(packed: bytes) -> bytes:
+    inflate = zlib.decompressobj(zdict=ZDICT)
+    return inflate.decompress(packed) + inflate.flush()
+
+
+class Record:
+    """One provider: pipeline fields decoded, everything else kept as raw bytes."""
+
+    __slots__ = FIELDS + ("_packed", "_updates")
+
+    def __init__(self, raw: bytes, fields: dict):
+        self._packed = pack(raw)
+        self._updates = None
+        for name in FIELDS:
+            setattr(self, name, fields.get(name, MISSING))
+
+    @classmethod
+    def from_dict(cls, record: dict) -> "Record":
+        return cls(jsonio.dumps(record), record)
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "Record":
+        return cls(raw, jsonio.loads(raw))
+
+    # =========================================================================
+    # Dict interface
+    # =========================================================================
+
+    def get(self, key, default=None):
+        updates = self._updates
+        if updates and key in updates:
+            return updates[key]
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            return default if value is MISSING else value
+        return self.extra().get(key, default)
+
+    def __getitem__(self, key):
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if self._updates is None:
+            self._updates = {}
+        self._updates[key] = value
+
+    def __contains__(self, key):
+        return self.get(key, MISSING) is not MISSING
+
+    def __repr__(self):
+        return f"Record({self.get('place_id')!r}, {self.get('name')!r})"
+
+    # =========================================================================
+    # Raw bytes
+    # =========================================================================
+
+    def raw(self) -> bytes:
+        """The original record as compact JSON."""
+        return unpack(self._packed)
+
+    def extra(self) -> dict:
+        """The original record, decoded from the raw bytes (not cached)."""
+        return jsonio.loads(self.raw())
+
+    def to_dict(self) -> dict:
+        """The original record with this run's assignments applied, in key order."""
+        record = self.extra()
+        if self._updates:
+            record.update(self._updates)
+        return record
+
+    def dumps(self) -> bytes:
+        """
+        Compact JSON for the record. The original bytes are copied as-is
+        unless an assignment replaced one of the original keys.
+        """
+        raw = self.raw()
+        updates = self._updates
+        if not updates:
+            return raw
+        if any(key in self.extra() for key in updates):
+            return jsonio.dumps(self.to_dict())
+        added = jsonio.dumps(updates)
+        if raw == b"{}":
+            return added
+        return raw[:-1] + b"," + added[1:]
+
+
+def load_records(path: Path) -> list:
+    """Read a raw state file (a JSON list) into Records. Non-dict entries are dropped."""
+    return [Record.from_dict(r) for r in jsonio.load(path) if isinstance(r, dict)]
+
+
+def measure(raw_dir: Path = RAW_DIR) -> dict:
+    """Traced memory of every raw record held as dicts vs. as Records."""
+    paths = [p for p in sorted(Path(raw_dir).glob("*.json")) if p.name != "pull_summary.json"]
+    sizes = {}
+    for label in ("dict", "Record"):
+        tracemalloc.start()
+        held = []
+        for path in paths:
+            if label == "dict":
+                held.extend(r for r in jsonio.load(path) if isinstance(r, dict))
+            else:
+                held.extend(load_records(path))
+        sizes[label] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        sizes["records"] = len(held)
+        del held
+    return sizes
+
+
+def main():
+    if "--help" in sys.argv:
+        print(__doc__.split("Usage:")[1])
+        sys.exit(0)
+    sizes = measure()
+    n = max(sizes["records"], 1)
+    print(f"📦 {sizes['records']:,} records")
+    print(f"   dicts:   {sizes['dict'] / 1e6:8.1f} MB  ({sizes['dict'] / n:,.0f} bytes/record)")
+    print(f"   Records: {sizes['Record'] / 1e6:8.1f} MB  ({sizes['Record'] / n:,.0f} bytes/record)")
+    print(f"   {sizes['dict'] / max(sizes['Record'], 1):.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,9 @@ STATES=(
     "Colorado"
 )
 
+# Snapshot raw data first (only changed records are stored)
+python scripts/snapshot_store.py create data/raw --name "raw-pre-repull-$(date +%Y%m%d-%H%M%S)"
+
 for state in "${STATES[@]}"; do
     echo ""
     echo "========================================"
@@ -2,21 +2,17 @@
 """
 Merge Google and Yelp provider data, dedupe, and enrich
 """
-import json
+import sys
 from pathlib import Path
 from datetime import datetime
 
-def normalize_phone(phone):
-    """Normalize phone for matching"""
-    if not phone:
-        return None
-    return ''.join(c for c in phone if c.isdigit())[-10:]
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-def normalize_name(name):
-    """Normalize company name for matching"""
-    if not name:
-        return None
-    return name.lower().strip().replace('llc', '').replace('inc', '').replace(',', '').strip()
+import jsonio
+from merge_engine import MergeEngine, print_report
+
+# Yelp fields that always replace whatever an earlier merge left behind
+YELP_FIELDS = ('yelp_id', 'yelp_url', 'yelp_rating', 'yelp_review_count', 'price', 'transactions')
 
 def merge_providers():
     google_file = Path('data/providers.json')
@@ -26,98 +22,39 @@ def merge_providers():
     # Load Google data
     google_providers = []
     if google_file.exists():
-        with open(google_file) as f:
-            data = json.load(f)
-            google_providers = data.get('providers', [])
+        data = jsonio.load(google_file)
+        google_providers = data.get('providers', [])
         print(f"Loaded {len(google_providers)} Google providers")
     
     # Load Yelp data
     yelp_providers = []
     if yelp_file.exists():
-        with open(yelp_file) as f:
-            data = json.load(f)
-            yelp_providers = data.get('providers', [])
+        data = jsonio.load(yelp_file)
+        yelp_providers = data.get('providers', [])
         print(f"Loaded {len(yelp_providers)} Yelp providers")
     
-    # Build index for deduplication
-    phone_index = {}
-    name_zip_index = {}
-    merged = []
-    
-    # Add Google providers first (they have better data typically)
-    for p in google_providers:
-        phone = normalize_phone(p.get('phone'))
-        name_zip = f"{normalize_name(p.get('name'))}|{p.get('zip')}"
-        
-        if phone:
-            phone_index[phone] = len(merged)
-        if name_zip:
-            name_zip_index[name_zip] = len(merged)
-        
-        # Add source tracking
-        p['sources'] = ['google']
-        merged.append(p)
-    
-    # Merge Yelp providers
-    new_from_yelp = 0
-    enriched = 0
-    
-    for p in yelp_providers:
-        phone = normalize_phone(p.get('phone'))
-        name_zip = f"{normalize_name(p.get('name'))}|{p.get('zip')}"
-        
-        # Check for existing match
-        existing_idx = None
-        if phone and phone in phone_index:
-            existing_idx = phone_index[phone]
-        elif name_zip in name_zip_index:
-            existing_idx = name_zip_index[name_zip]
-        
-        if existing_idx is not None:
-            # Enrich existing provider with Yelp data
-            existing = merged[existing_idx]
-            existing['yelp_id'] = p.get('yelp_id')
-            existing['yelp_url'] = p.get('yelp_url')
-            existing['yelp_rating'] = p.get('yelp_rating')
-            existing['yelp_review_count'] = p.get('yelp_review_count')
-            existing['price'] = p.get('price')
-            existing['transactions'] = p.get('transactions')
-            if 'yelp' not in existing.get('sources', []):
-                existing['sources'].append('yelp')
-            enriched += 1
-        else:
-            # New provider from Yelp
-            p['sources'] = ['yelp']
-            merged.append(p)
-            
-            # Update indexes
-            if phone:
-                phone_index[phone] = len(merged) - 1
-            if name_zip:
-                name_zip_index[name_zip] = len(merged) - 1
-            
-            new_from_yelp += 1
+    # Google providers first (they have better data typically)
+    engine = MergeEngine(track_sources=True)
+    engine.load(google_providers, source='google')
+    stats = engine.merge(yelp_providers, 'yelp', overwrite=YELP_FIELDS)
+    enriched = sum(stats['matched_by'].values())
+    report = engine.report()
     
     # Save merged data
     output = {
         'merged_at': datetime.now().isoformat(),
         'google_count': len(google_providers),
         'yelp_count': len(yelp_providers),
-        'new_from_yelp': new_from_yelp,
+        'new_from_yelp': stats['added'],
         'enriched': enriched,
-        'total': len(merged),
-        'providers': merged
+        'total': len(engine.providers),
+        'report': report,
+        'providers': engine.providers
     }
     
-    with open(output_file, 'w') as f:
-        json.dump(output, f, indent=2)
+    jsonio.dump(output, output_file)
     
-    print(f"\nMerge complete:")
-    print(f"  Google providers: {len(google_providers)}")
-    print(f"  Yelp providers: {len(yelp_providers)}")
-    print(f"  New from Yelp: {new_from_yelp}")
-    print(f"  Enriched with Yelp: {enriched}")
-    print(f"  Total merged: {len(merged)}")
+    print_report(report)
     print(f"\nSaved to {output_file}")
 
 
@@ -2,18 +2,47 @@
 """
 Yelp Scraper for DumpsterMap
 Scrapes dumpster rental and related businesses from Yelp Fusion API
+
+Providers are appended to data/yelp-providers.ndjson as they are found and
+compacted into data/yelp-providers.json at the end. Run with --resume to
+pick up after a crash without re-scraping finished cities.
+
+Before compaction, new or stale businesses are enriched with hours and
+photos from the detail endpoint (cached in data/yelp-cache/details/).
+Pass --skip-details to leave records as returned by search.
 """
 import os
-import json
+import sys
 import time
 import requests
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import jsonio
+
 # Yelp Fusion API
 YELP_API_KEY = os.environ.get('YELP_API_KEY', '')
-YELP_API_URL = 'https://api.yelp.com/v3/businesses/search'
-YELP_DETAIL_URL = 'https://api.yelp.com/v3/businesses/{}'
+# Overridable so the scraper can run against fake_services.py
+YELP_API_BASE = os.environ.get('YELP_API_BASE', 'https://api.yelp.com/v3')
+YELP_API_URL = f'{YELP_API_BASE}/businesses/search'
+YELP_DETAIL_URL = YELP_API_BASE + '/businesses/{}'
+YELP_PAGE_DELAY = float(os.environ.get('YELP_PAGE_DELAY', 0.5))
+YELP_RATE_LIMIT_WAIT = float(os.environ.get('YELP_RATE_LIMIT_WAIT', 60))
+YELP_PAGE_RETRIES = int(os.environ.get('YELP_PAGE_RETRIES', 3))
+
+# Yelp caps search paging at offset + limit <= 240
+YELP_PAGE_SIZE = 50
+YELP_MAX_RESULTS = 240
+
+# Business-detail enrichment: cached per yelp_id, refetched after the TTL
+DETAIL_CACHE_DIR = 'data/yelp-cache/details'
+DETAIL_TTL_DAYS = 30
+DETAIL_WORKERS = 4
+DETAIL_REQUESTS_PER_SEC = 5
 
 # Search terms for dumpster-related businesses
 SEARCH_TERMS = [
@@ -59,40 +88,104 @@ MAJOR_CITIES = [
     ('Des Moines', 'IA'), ('San Bernardino', 'CA'),
 ]
 
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across threads"""
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.lock = threading.Lock()
+        self.next_at = 0.0
+    
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class DetailCache:
+    """On-disk cache of business details, one JSON file per yelp_id"""
+    def __init__(self, cache_dir=DETAIL_CACHE_DIR, ttl_days=DETAIL_TTL_DAYS):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = timedelta(days=ttl_days)
+    
+    def path(self, yelp_id):
+        return self.cache_dir / f"{yelp_id}.json"
+    
+    def get(self, yelp_id):
+        """Return cached details, or None if missing or older than the TTL"""
+        path = self.path(yelp_id)
+        if not path.exists():
+            return None
+        try:
+            entry = jsonio.load(path)
+            if datetime.now() - datetime.fromisoformat(entry['fetched_at']) > self.ttl:
+                return None
+            return entry
+        except (jsonio.JSONDecodeError, KeyError, ValueError):
+            return None
+    
+    def put(self, yelp_id, details):
+        """Store details atomically so an interrupted run never leaves a partial file"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = {'fetched_at': datetime.now().isoformat(), 'details': details}
+        tmp = self.path(yelp_id).with_suffix('.tmp')
+        jsonio.dump(entry, tmp, pretty=False)
+        os.replace(tmp, self.path(yelp_id))
+        return entry
+
+
 class YelpScraper:
     def __init__(self, api_key):
         self.api_key = api_key
         self.headers = {'Authorization': f'Bearer {api_key}'}
         self.providers = []
         self.seen_ids = set()
+        self.api_calls = 0
+        self.found_this_run = 0
+        self.failed_pages = 0
+        self.completed_cities = set()
+        self.log = None
+        self.fetch_details = True
+        self.detail_cache = DetailCache()
+        self.limiter = RateLimiter(DETAIL_REQUESTS_PER_SEC)
         
-    def search_businesses(self, term, location, limit=50):
-        """Search Yelp for businesses"""
+    def count_call(self):
+        # Detail fetches run on worker threads; share the limiter's lock
+        with self.limiter.lock:
+            self.api_calls += 1
+    
+    def search_businesses(self, term, location, limit=YELP_PAGE_SIZE, offset=0):
+        """Search Yelp for businesses (one page). Returns None if the request failed."""
         params = {
             'term': term,
             'location': location,
             'limit': limit,
+            'offset': offset,
             'sort_by': 'rating',
         }
         
         try:
+            self.count_call()
             resp = requests.get(YELP_API_URL, headers=self.headers, params=params, timeout=10)
             if resp.status_code == 200:
                 return resp.json().get('businesses', [])
             elif resp.status_code == 429:
-                print(f"  Rate limited, waiting 60s...")
-                time.sleep(60)
-                return []
+                print(f"  Rate limited, waiting {YELP_RATE_LIMIT_WAIT:g}s...")
+                time.sleep(YELP_RATE_LIMIT_WAIT)
+                return None
             else:
                 print(f"  Error {resp.status_code}: {resp.text[:100]}")
-                return []
+                return None
         except Exception as e:
             print(f"  Request error: {e}")
-            return []
+            return None
     
     def get_business_details(self, business_id):
         """Get detailed info for a business"""
         try:
+            self.count_call()
             resp = requests.get(
                 YELP_DETAIL_URL.format(business_id), 
                 headers=self.headers, 
@@ -101,9 +194,58 @@ class YelpScraper:
             if resp.status_code == 200:
                 return resp.json()
             return None
-        except:
+        except Exception:
             return None
     
+    def enrich_details(self, providers, workers=DETAIL_WORKERS):
+        """
+        Add hours and extra photos from the detail endpoint.
+
+        Only yelp_ids missing from the cache (or past the TTL) are fetched,
+        concurrently but under the shared rate limit. Each response is
+        cached as it lands, so an interrupted run resumes where it stopped.
+        """
+        cached = {}
+        to_fetch = []
+        for p in providers:
+            yelp_id = p.get('yelp_id')
+            if not yelp_id or yelp_id in cached:
+                continue
+            entry = self.detail_cache.get(yelp_id)
+            if entry:
+                cached[yelp_id] = entry
+            else:
+                to_fetch.append(yelp_id)
+        to_fetch = list(dict.fromkeys(to_fetch))
+        
+        print(f"  Details: {len(cached)} cached, {len(to_fetch)} to fetch")
+        
+        def fetch(yelp_id):
+            self.limiter.wait()
+            return yelp_id, self.get_business_details(yelp_id)
+        
+        failed = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(fetch, yelp_id) for yelp_id in to_fetch]
+            for i, future in enumerate(as_completed(futures)):
+                yelp_id, details = future.result()
+                if details:
+                    cached[yelp_id] = self.detail_cache.put(yelp_id, details)
+                else:
+                    failed += 1
+                if (i + 1) % 100 == 0:
+                    print(f"  Fetched details {i + 1}/{len(to_fetch)}...")
+        
+        enriched = 0
+        for p in providers:
+            entry = cached.get(p.get('yelp_id'))
+            if entry:
+                apply_details(p, entry)
+                enriched += 1
+        
+        print(f"  Enriched {enriched} providers with details ({failed} fetches failed)")
+        return enriched
+    
     def process_business(self, biz, source_term, source_city):
         """Convert Yelp business to our format"""
         if biz['id'] in self.seen_ids:
@@ -158,61 +300,203 @@ class YelpScraper:
         
         return provider
     
-    def scrape_city(self, city, state):
-        """Scrape all dumpster businesses in a city"""
-        location = f"{city}, {state}"
-        city_providers = []
+    def search_term(self, term, location):
+        """
+        Page through results for one term until a page adds nothing new.
+
+        Dense metros keep paging up to YELP_MAX_RESULTS; small towns stop
+        after the first page that only repeats businesses we already have.
+        A failed page (rate limit or request error) is retried at the same
+        offset; after YELP_PAGE_RETRIES failures the term is abandoned and
+        counted in failed_pages rather than treated as exhausted.
+        """
+        found = []
+        offset = 0
+        pages = 0
+        failures = 0
         
-        for term in SEARCH_TERMS:
-            print(f"  Searching '{term}' in {location}...")
-            businesses = self.search_businesses(term, location)
+        while offset < YELP_MAX_RESULTS:
+            limit = min(YELP_PAGE_SIZE, YELP_MAX_RESULTS - offset)
+            businesses = self.search_businesses(term, location, limit=limit, offset=offset)
+            if businesses is None:
+                failures += 1
+                if failures > YELP_PAGE_RETRIES:
+                    self.failed_pages += 1
+                    print(f"  ⚠️  Giving up on '{term}' in {location} at offset {offset}")
+                    break
+                continue
+            failures = 0
+            pages += 1
             
+            new = []
             for biz in businesses:
                 provider = self.process_business(biz, term, location)
                 if provider:
-                    city_providers.append(provider)
+                    self.append(provider)
+                    new.append(provider)
+            found.extend(new)
             
-            time.sleep(0.5)  # Rate limiting
+            time.sleep(YELP_PAGE_DELAY)  # Rate limiting
+            
+            # No unseen ids on this page, or the result set is exhausted
+            if not new or len(businesses) < limit:
+                break
+            offset += limit
+        
+        print(f"  Searched '{term}' in {location}: {pages} page(s), {len(found)} new")
+        return found
+    
+    def scrape_city(self, city, state):
+        """Scrape all dumpster businesses in a city"""
+        location = f"{city}, {state}"
+        city_providers = []
+        
+        for term in SEARCH_TERMS:
+            city_providers.extend(self.search_term(term, location))
         
         return city_providers
     
-    def scrape_all(self, output_file='data/yelp-providers.json'):
-        """Scrape all cities"""
+    def scrape_all(self, output_file='data/yelp-providers.json', resume=False):
+        """Scrape all cities, appending to the NDJSON log as we go"""
+        log_file = Path(output_file).with_suffix('.ndjson')
+        if resume:
+            self.load_log(log_file)
+        
         print(f"Starting Yelp scrape of {len(MAJOR_CITIES)} cities...")
         print(f"Search terms: {len(SEARCH_TERMS)}")
         
-        for i, (city, state) in enumerate(MAJOR_CITIES):
-            print(f"\n[{i+1}/{len(MAJOR_CITIES)}] {city}, {state}")
-            
-            city_providers = self.scrape_city(city, state)
-            self.providers.extend(city_providers)
-            
-            print(f"  Found {len(city_providers)} new providers (total: {len(self.providers)})")
-            
-            # Save progress every 10 cities
-            if (i + 1) % 10 == 0:
-                self.save(output_file)
+        self.open_log(log_file, resume)
+        try:
+            for i, (city, state) in enumerate(MAJOR_CITIES):
+                location = f"{city}, {state}"
+                if location in self.completed_cities:
+                    continue
+                print(f"\n[{i+1}/{len(MAJOR_CITIES)}] {location}")
+                
+                calls_before = self.api_calls
+                failed_before = self.failed_pages
+                city_providers = self.scrape_city(city, state)
+                self.providers.extend(city_providers)
+                self.found_this_run += len(city_providers)
+                # Leave a city with failed pages open so --resume searches it again
+                if self.failed_pages == failed_before:
+                    self.mark_city_done(location)
+                
+                print(f"  Found {len(city_providers)} new providers with {self.api_calls - calls_before} API calls "
+                      f"(total: {len(self.providers)})")
+        finally:
+            self.close_log()
         
-        self.save(output_file)
+        self.compact(log_file, output_file)
         print(f"\nDone! Total providers: {len(self.providers)}")
+        if self.failed_pages:
+            print(f"⚠️  {self.failed_pages} search pages failed after {YELP_PAGE_RETRIES} retries; "
+                  f"rerun with --resume to retry their cities")
+        self.print_call_efficiency()
         return self.providers
     
-    def save(self, output_file):
-        """Save providers to JSON"""
-        Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+    def print_call_efficiency(self):
+        """Report API calls spent against new providers found"""
+        found = self.found_this_run
+        per_provider = self.api_calls / found if found else float(self.api_calls)
+        print(f"API calls: {self.api_calls} for {found} new providers ({per_provider:.2f} calls/provider)")
+    
+    def open_log(self, log_file, resume=False):
+        """Open the append-only NDJSON log (truncated unless resuming)"""
+        Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+        if resume:
+            # Drop a torn final line, or the next append would be glued onto it
+            trim_torn_tail(log_file)
+        self.log = open(log_file, 'a' if resume else 'w')
+    
+    def close_log(self):
+        if self.log:
+            self.log.close()
+            self.log = None
+    
+    def append(self, record):
+        """Write one line to the log and flush so a crash loses at most one line"""
+        if self.log:
+            self.log.write(jsonio.dumps(record).decode() + '\n')
+            self.log.flush()
+    
+    def mark_city_done(self, location):
+        self.completed_cities.add(location)
+        self.append({'_city_done': location})
+    
+    def load_log(self, log_file):
+        """Rebuild providers, seen_ids and completed cities from an earlier run's log"""
+        for entry in read_log(log_file):
+            if '_city_done' in entry:
+                self.completed_cities.add(entry['_city_done'])
+            elif entry.get('yelp_id') not in self.seen_ids:
+                self.seen_ids.add(entry['yelp_id'])
+                self.providers.append(entry)
+        print(f"Resuming: {len(self.providers)} providers, {len(self.completed_cities)} cities already done")
+    
+    def compact(self, log_file, output_file):
+        """Write the log out in the data/yelp-providers.json shape"""
+        providers = []
+        seen = set()
+        for entry in read_log(log_file):
+            if '_city_done' in entry or entry.get('yelp_id') in seen:
+                continue
+            seen.add(entry.get('yelp_id'))
+            providers.append(entry)
+        
+        if self.fetch_details:
+            self.enrich_details(providers)
         
         data = {
             'source': 'yelp',
             'scraped_at': datetime.now().isoformat(),
-            'total': len(self.providers),
-            'providers': self.providers
+            'total': len(providers),
+            'providers': providers
         }
         
-        with open(output_file, 'w') as f:
-            json.dump(data, f, indent=2)
-        print(f"  Saved to {output_file}")
+        jsonio.dump(data, output_file)
+        print(f"  Compacted {log_file} into {output_file}")
 
 
+def apply_details(provider, entry):
+    """Copy the detail fields we use onto a provider record"""
+    details = entry['details']
+    hours = details.get('hours') or []
+    provider['hours'] = hours[0].get('open', []) if hours else []
+    provider['is_open_now'] = hours[0].get('is_open_now') if hours else None
+    provider['photos'] = details.get('photos') or provider.get('photos', [])
+    provider['is_claimed'] = details.get('is_claimed')
+    provider['details_fetched_at'] = entry['fetched_at']
+
+
+def trim_torn_tail(log_file):
+    """Truncate the log after its last newline (no-op if it ends cleanly)"""
+    log_file = Path(log_file)
+    if not log_file.exists():
+        return
+    with open(log_file, 'rb+') as f:
+        data = f.read()
+        if not data or data.endswith(b'\n'):
+            return
+        f.truncate(data.rfind(b'\n') + 1)
+        print(f"  Dropped torn final line from {log_file}")
+
+
+def read_log(log_file):
+    """Yield entries from an NDJSON log, skipping a torn final line"""
+    log_file = Path(log_file)
+    if not log_file.exists():
+        return
+    with open(log_file) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield jsonio.loads(line)
+            except jsonio.JSONDecodeError:
+                print(f"  Skipping unreadable log line in {log_file}")
+
 def main():
     if not YELP_API_KEY:
         print("ERROR: YELP_API_KEY environment variable not set")
@@ -224,7 +508,8 @@ def main():
         return
     
     scraper = YelpScraper(YELP_API_KEY)
-    scraper.scrape_all()
+    scraper.fetch_details = '--skip-details' not in sys.argv
+    scraper.scrape_all(resume='--resume' in sys.argv)
 
 
 if __name__ == '__main__':
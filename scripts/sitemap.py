@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+DumpsterMap - Incremental sitemap.xml
+
+Builds sitemap.xml from the static pages and dumpster-rental/ (same
+pages, order and priorities as generate-sitemap.js), but a URL's
+<lastmod> only moves when the page's content hash changes, so crawlers
+spend their budget on pages that actually changed.
+
+data/.sitemap-state.json keeps each URL's sha256 and lastmod. On the
+first run, URLs already in the committed sitemap keep the lastmod it
+lists. prerender-city-seo.py calls update() after rendering and passes
+the page hashes it already has, so only the static pages are re-read.
+
+Past MAX_URLS (the protocol's 50,000) URLs are split into sitemap-N.xml
+shards and sitemap.xml becomes a sitemap index, so robots.txt does not
+change. Every file gets a pre-gzipped .gz sibling, and files are only
+rewritten when their bytes change.
+
+Usage:
+  python sitemap.py                      # Update sitemap.xml
+  python sitemap.py --max-urls 500       # Shard at a smaller size
+"""
+
+import gzip
+import hashlib
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+import jsonio
+
+ROOT = Path(__file__).parent.parent
+STATE_FILE = ROOT / "data" / ".sitemap-state.json"
+BASE_URL = "https://dumpstermap.io"
+MAX_URLS = 50_000
+
+# (path, changefreq, priority) from generate-sitemap.js
+STATIC_PAGES = [
+    ("", "daily", "1.0"),
+    ("results.html", "daily", "0.9"),
+    ("calculator.html", "weekly", "0.9"),
+    ("sizes.html", "weekly", "0.9"),
+    ("faq.html", "weekly", "0.8"),
+    ("map.html", "daily", "0.8"),
+    ("how-to-rent-a-dumpster.html", "monthly", "0.8"),
+    ("what-can-you-put-in-a-dumpster.html", "monthly", "0.8"),
+    ("dumpster-rental-cost.html", "monthly", "0.8"),
+    ("for-providers.html", "weekly", "0.8"),
+    ("contact.html", "monthly", "0.5"),
+    ("privacy.html", "yearly", "0.3"),
+    ("terms.html", "yearly", "0.3"),
+]
+
+STATE_PAGES = {
+    "alabama", "alaska", "arizona", "arkansas", "california", "colorado", "connecticut",
+    "delaware", "florida", "georgia", "hawaii", "idaho", "illinois", "indiana", "iowa",
+    "kansas", "kentucky", "louisiana", "maine", "maryland", "massachusetts", "michigan",
+    "minnesota", "mississippi", "missouri", "montana", "nebraska", "nevada",
+    "new-hampshire", "new-jersey", "new-mexico", "new-york", "north-carolina",
+    "north-dakota", "ohio", "oklahoma", "oregon", "pennsylvania", "rhode-island",
+    "south-carolina", "south-dakota", "tennessee", "texas", "utah", "vermont",
+    "virginia", "washington", "west-virginia", "wisconsin", "wyoming", "district-of-columbia",
+}
+
+# Abbreviation pages canonicalize to the full state name page and are left out
+STATE_ABBR_PAGES = {
+    "ak", "al", "ar", "az", "ca", "co", "ct", "dc", "de", "fl", "ga", "hi", "ia", "id", "il",
+    "in", "ks", "ky", "la", "ma", "md", "me", "mi", "mn", "mo", "ms", "mt", "nc", "nd", "ne",
+    "nh", "nj", "nm", "nv", "ny", "oh", "ok", "or", "pa", "ri", "sc", "sd", "tn", "tx", "ut",
+    "va", "vt", "wa", "wi", "wv", "wy",
+}
+
+TOP_METROS = {
+    "houston-tx", "dallas-tx", "orlando-fl", "austin-tx", "tampa-fl",
+    "brooklyn-ny", "jacksonville-fl", "phoenix-az", "miami-fl", "san-jose-ca",
+    "new-york-ny", "los-angeles-ca", "chicago-il", "san-antonio-tx", "san-diego-ca",
+    "charlotte-nc", "fort-lauderdale-fl", "el-paso-tx",
+    "las-vegas-nv", "fort-worth-tx", "detroit-mi", "portland-or", "colorado-springs-co",
+    "louisville-ky", "denver-co", "bakersfield-ca", "salt-lake-city-ut", "new-orleans-la",
+    "indianapolis-in", "grand-rapids-mi",
+    "st-petersburg-fl", "raleigh-nc", "greensboro-nc", "sacramento-ca", "reno-nv",
+    "oklahoma-city-ok", "nashville-tn", "midland-tx", "lubbock-tx", "knoxville-tn",
+    "seattle-wa", "boston-ma", "atlanta-ga", "philadelphia-pa", "minneapolis-mn",
+    "columbus-oh", "san-francisco-ca", "washington-dc",
+}
+
+URL_RE = re.compile(r"<loc>([^<]+)</loc>\s*<lastmod>([^<]+)</lastmod>")
+
+
+def pages(root: Path = ROOT) -> list:
+    """(loc, file, changefreq, priority) for every URL, in sitemap order."""
+    urls = []
+    for path, changefreq, priority in STATIC_PAGES:
+        urls.append((f"{BASE_URL}/{path}" if path else BASE_URL, root / (path or "index.html"),
+                     changefreq, priority))
+    city_dir = root / "dumpster-rental"
+    names = sorted(p.stem for p in city_dir.glob("*.html")) if city_dir.exists() else []
+    states = [n for n in names if n in STATE_PAGES]
+    cities = [n for n in names if n not in STATE_PAGES and n not in STATE_ABBR_PAGES]
+    for name in states:
+        urls.append((f"{BASE_URL}/dumpster-rental/{name}.html", city_dir / f"{name}.html", "weekly", "0.85"))
+    for name in cities:
+        urls.append((f"{BASE_URL}/dumpster-rental/{name}.html", city_dir / f"{name}.html", "weekly",
+                     "0.9" if name in TOP_METROS else "0.8"))
+    return urls
+
+
+def load_state(path: Path = STATE_FILE) -> dict:
+    if path.exists():
+        return jsonio.load(path)
+    return {"urls": {}}
+
+
+def save_state(state: dict, path: Path = STATE_FILE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    jsonio.dump(state, tmp, pretty=False)
+    tmp.replace(path)
+
+
+def published_lastmods(root: Path = ROOT) -> dict:
+    """{loc: lastmod} from the sitemap files already on disk."""
+    found = {}
+    for path in sorted(root.glob("sitemap*.xml")):
+        found.update(URL_RE.findall(path.read_text()))
+    return found
+
+
+# =============================================================================
+# Rendering
+# =============================================================================
+
+def urlset(urls: list) -> bytes:
+    """urls: (loc, lastmod, changefreq, priority)."""
+    out = ['<?xml version="1.0" encoding="UTF-8"?>\n',
+           '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    for loc, lastmod, changefreq, priority in urls:
+        out.append(f"  <url>\n    <loc>{escape(loc)}</loc>\n    <lastmod>{lastmod}</lastmod>\n"
+                   f"    <changefreq>{changefreq}</changefreq>\n    <priority>{priority}</priority>\n  </url>\n")
+    out.append("</urlset>")
+    return "".join(out).encode()
+
+
+def sitemapindex(shards: list) -> bytes:
+    """shards: (loc, lastmod)."""
+    out = ['<?xml version="1.0" encoding="UTF-8"?>\n',
+           '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    for loc, lastmod in shards:
+        out.append(f"  <sitemap>\n    <loc>{escape(loc)}</loc>\n    <lastmod>{lastmod}</lastmod>\n  </sitemap>\n")
+    out.append("</sitemapindex>")
+    return "".join(out).encode()
+
+
+def render(urls: list, max_urls: int = MAX_URLS) -> dict:
+    """{file name: bytes}: one urlset, or an index plus sitemap-N.xml shards."""
+    if len(urls) <= max_urls:
+        return {"sitemap.xml": urlset(urls)}
+    files, shards = {}, []
+    for n, start in enumerate(range(0, len(urls), max_urls), 1):
+        chunk = urls[start:start + max_urls]
+        files[f"sitemap-{n}.xml"] = urlset(chunk)
+        shards.append((f"{BASE_URL}/sitemap-{n}.xml", max(u[1] for u in chunk)))
+    files["sitemap.xml"] = sitemapindex(shards)
+    return files
+
+
+def _write_if_changed(path: Path, data: bytes) -> bool:
+    if path.exists() and path.read_bytes() == data:
+        return False
+    path.write_bytes(data)
+    return True
+
+
+# =============================================================================
+# Update
+# =============================================================================
+
+def update(state: dict, hashes: dict = None, written: set = (), root: Path = ROOT,
+           today: str = None, max_urls: int = MAX_URLS) -> dict:
+    """
+    Refresh state and the sitemap files under root. hashes maps
+    dumpster-rental file names to known sha256s (the prerender state);
+    other files are hashed here. written names pages the caller just
+    rewrote, which never keep a published lastmod. Returns the changed
+    URLs and the files written.
+    """
+    hashes = hashes or {}
+    today = today or datetime.now(timezone.utc).date().isoformat()
+    known = state["urls"]
+    seeded = published_lastmods(root) if not known else {}
+    changed, urls = [], []
+    for loc, path, changefreq, priority in pages(root):
+        if not path.exists():
+            continue
+        city_page = path.parent.name == "dumpster-rental"
+        sha = (hashes.get(path.name) if city_page else None) or hashlib.sha256(path.read_bytes()).hexdigest()
+        entry = known.get(loc)
+        if entry is None and loc in seeded and not (city_page and path.name in written):
+            entry = known[loc] = {"sha256": sha, "lastmod": seeded[loc]}
+        elif entry is None or entry["sha256"] != sha:
+            entry = known[loc] = {"sha256": sha, "lastmod": today}
+            changed.append(loc)
+        urls.append((loc, entry["lastmod"], changefreq, priority))
+    live = {u[0] for u in urls}
+    removed = [loc for loc in known if loc not in live]
+    for loc in removed:
+        del known[loc]
+
+    files = render(urls, max_urls)
+    out = []
+    for name, data in files.items():
+        xml = _write_if_changed(root / name, data)
+        gz = root / f"{name}.gz"
+        if xml or not gz.exists():
+            gz.write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+        if xml:
+            out.append(name)
+    # Shards left over from a larger sitemap, with their .gz/.br (precompress.py) siblings
+    for path in root.glob("sitemap-*.xml*"):
+        if path.name.removesuffix(".gz").removesuffix(".br") not in files:
+            path.unlink()
+    return {"urls": len(urls), "changed": changed, "removed": removed, "written": out}
+
+
+def main():
+    args = sys.argv[1:]
+    max_urls = int(args[args.index("--max-urls") + 1]) if "--max-urls" in args else MAX_URLS
+    start = time.perf_counter()
+    state = load_state()
+    r = update(state, max_urls=max_urls)
+    save_state(state)
+    print(f"🗺️  sitemap: {r['urls']} URLs, {len(r['changed'])} changed, {len(r['removed'])} removed")
+    for name in r["written"]:
+        print(f"   ✅ {name} (+ .gz)")
+    print(f"   ⏱️  {(time.perf_counter() - start) * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
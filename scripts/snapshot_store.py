@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+DumpsterMap - Content-Addressed Snapshot Store
+
+Replaces full-copy backups (data/raw_backup_*/, providers-backup-*.json).
+Every record is hashed (sha256 of its canonical JSON) and stored once,
+compressed, in pack files under data/snapshots/packs/. A snapshot is a
+small manifest listing the record hashes of each file, so a new snapshot
+only costs the records that changed since the last one.
+
+Compression is zstd when the `zstandard` package is installed, gzip
+otherwise. Both can be read back regardless of which wrote them, as long
+as zstandard is available for .zst objects.
+
+Usage:
+  python snapshot_store.py create data/raw                 # Snapshot a directory
+  python snapshot_store.py create data/providers.json --name pre-clean
+  python snapshot_store.py list                            # Show snapshots
+  python snapshot_store.py diff raw-20260220 raw-20260301  # Compare two snapshots
+  python snapshot_store.py restore raw-20260220 /tmp/raw   # Write files back out
+"""
+
+import gzip
+import hashlib
+import json
+import sys
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+import jsonio
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+STORE_DIR = DATA_DIR / "snapshots"
+ZSTD_LEVEL = 19
+
+
+class SnapshotStore:
+    """Object store plus manifests rooted at one directory."""
+
+    def __init__(self, root: Path = STORE_DIR):
+        self.root = Path(root)
+        self.packs = self.root / "packs"
+        self.manifests = self.root / "manifests"
+        self.index_path = self.root / "index.txt"
+        self._index = None
+        self._pending = []
+        self._pack = None
+
+    # -------------------------------------------------------------------------
+    # Objects
+    #
+    # Objects written by one snapshot are appended to a single pack file;
+    # index.txt maps "hash pack offset length codec", one line per object.
+    # Packing keeps thousands of ~1KB records from costing a disk block each.
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def canonical(obj) -> bytes:
+        return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+
+    @property
+    def index(self) -> dict:
+        if self._index is None:
+            self._index = {}
+            if self.index_path.exists():
+                with open(self.index_path) as f:
+                    for line in f:
+                        parts = line.split()
+                        if len(parts) == 5:
+                            digest, pack, offset, length, codec = parts
+                            self._index[digest] = (pack, int(offset), int(length), codec)
+        return self._index
+
+    def has(self, digest: str) -> bool:
+        return digest in self.index
+
+    def _open_pack(self):
+        self.packs.mkdir(parents=True, exist_ok=True)
+        name = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.pack"
+        self._pack = (name, open(self.packs / name, "ab"))
+
+    def _close_pack(self):
+        """Flush the pack, then publish its objects in the index."""
+        if not self._pack:
+            return
+        name, f = self._pack
+        f.flush()
+        f.close()
+        self._pack = None
+        if not self._pending:
+            (self.packs / name).unlink()
+            return
+        with open(self.index_path, "a") as idx:
+            for line in self._pending:
+                idx.write(line + "\n")
+        self._pending = []
+
+    def put(self, obj) -> tuple[str, bool]:
+        """Store obj if new. Returns (hash, was_new)."""
+        data = self.canonical(obj)
+        digest = hashlib.sha256(data).hexdigest()
+        if self.has(digest):
+            return digest, False
+
+        if zstandard:
+            codec, blob = "zst", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+        else:
+            codec, blob = "gz", gzip.compress(data, compresslevel=9, mtime=0)
+
+        if not self._pack:
+            self._open_pack()
+        name, f = self._pack
+        offset = f.tell()
+        f.write(blob)
+        self.index[digest] = (name, offset, len(blob), codec)
+        self._pending.append(f"{digest} {name} {offset} {len(blob)} {codec}")
+        return digest, True
+
+    def get(self, digest: str):
+        name, offset, length, codec = self.index[digest]
+        if self._pack and self._pack[0] == name:
+            self._pack[1].flush()
+        with open(self.packs / name, "rb") as f:
+            f.seek(offset)
+            blob = f.read(length)
+        if codec == "zst":
+            if not zstandard:
+                raise RuntimeError("zstandard is required to read .zst snapshot objects")
+            return jsonio.loads(zstandard.ZstdDecompressor().decompress(blob))
+        return jsonio.loads(gzip.decompress(blob))
+
+    # -------------------------------------------------------------------------
+    # Snapshots
+    # -------------------------------------------------------------------------
+
+    def _snapshot_file(self, data) -> tuple[dict, int]:
+        """Manifest entry for one JSON document, plus count of new objects."""
+        new = 0
+        if isinstance(data, list):
+            hashes = []
+            for record in data:
+                digest, was_new = self.put(record)
+                hashes.append(digest)
+                new += was_new
+            return {"kind": "records", "records": hashes}, new
+
+        if isinstance(data, dict) and isinstance(data.get("providers"), list):
+            entry, new = self._snapshot_file(data["providers"])
+            meta, was_new = self.put({k: v for k, v in data.items() if k != "providers"})
+            entry["list_key"] = "providers"
+            entry["meta"] = meta
+            return entry, new + was_new
+
+        digest, was_new = self.put(data)
+        return {"kind": "document", "hash": digest}, int(was_new)
+
+    def create(self, source: Path, name: str = None) -> dict:
+        """
+        Snapshot a JSON file or every *.json file under a directory.
+
+        The default name is <stem>-<YYYYmmdd-HHMMSS>-<content hash>. An
+        explicit name that is already taken raises FileExistsError.
+        """
+        source = Path(source)
+        files = sorted(source.rglob("*.json")) if source.is_dir() else [source]
+        base = source if source.is_dir() else source.parent
+        if name and (self.manifests / f"{name}.json").exists():
+            raise FileExistsError(f"Snapshot '{name}' already exists")
+        stamp = datetime.now()
+
+        manifest = {
+            "name": name,
+            "created_at": stamp.isoformat(),
+            "source": str(source),
+            "files": {},
+        }
+        total = new = 0
+        try:
+            for path in files:
+                data = jsonio.load(path)
+                entry, file_new = self._snapshot_file(data)
+                manifest["files"][str(path.relative_to(base))] = entry
+                total += len(entry.get("records", [])) or 1
+                new += file_new
+        finally:
+            self._close_pack()
+
+        if not name:
+            # Content hash suffix: two snapshots taken in the same second only
+            # share a name when they are identical
+            digest = hashlib.sha256(self.canonical(manifest["files"])).hexdigest()[:8]
+            name = manifest["name"] = f"{source.stem}-{stamp.strftime('%Y%m%d-%H%M%S')}-{digest}"
+            if (self.manifests / f"{name}.json").exists():
+                print(f"📸 Snapshot '{name}' already exists with the same content")
+                return self.load_manifest(name)
+
+        self.manifests.mkdir(parents=True, exist_ok=True)
+        jsonio.dump(manifest, self.manifests / f"{name}.json", pretty=False)
+        print(f"📸 Snapshot '{name}': {len(files)} files, {total} records, {new} new objects stored")
+        return manifest
+
+    def load_manifest(self, name: str) -> dict:
+        return jsonio.load(self.manifests / f"{name}.json")
+
+    def list(self) -> list:
+        if not self.manifests.exists():
+            return []
+        return sorted((self.load_manifest(p.stem) for p in self.manifests.glob("*.json")),
+                      key=lambda m: m["created_at"])
+
+    def materialize(self, entry: dict):
+        """Rebuild one file's JSON document from its manifest entry."""
+        if entry["kind"] == "document":
+            return self.get(entry["hash"])
+        records = [self.get(h) for h in entry["records"]]
+        if "list_key" in entry:
+            return {**self.get(entry["meta"]), entry["list_key"]: records}
+        return records
+
+    def restore(self, name: str, dest: Path) -> int:
+        """Write every file of a snapshot under dest. Returns file count."""
+        manifest = self.load_manifest(name)
+        dest = Path(dest)
+        for rel, entry in manifest["files"].items():
+            path = dest / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            jsonio.dump(self.materialize(entry), path)
+        print(f"♻️  Restored '{name}' ({len(manifest['files'])} files) to {dest}")
+        return len(manifest["files"])
+
+    def diff(self, old_name: str, new_name: str) -> dict:
+        """
+        Per-file record changes between two snapshots.
+
+        Works on hashes alone; only records that differ are decompressed,
+        to pair edits by place_id/id and report them as changed.
+        """
+        old = self.load_manifest(old_name)["files"]
+        new = self.load_manifest(new_name)["files"]
+        result = {}
+        for rel in sorted(set(old) | set(new)):
+            old_hashes = Counter(_entry_hashes(old.get(rel)))
+            new_hashes = Counter(_entry_hashes(new.get(rel)))
+            removed = list((old_hashes - new_hashes).elements())
+            added = list((new_hashes - old_hashes).elements())
+            if not removed and not added:
+                continue
+
+            removed_by_id = {_record_id(self.get(h)): h for h in removed}
+            changed = 0
+            for h in added:
+                if _record_id(self.get(h)) in removed_by_id:
+                    changed += 1
+            result[rel] = {
+                "added": len(added) - changed,
+                "removed": len(removed) - changed,
+                "changed": changed,
+                "file": "added" if rel not in old else "removed" if rel not in new else "modified",
+            }
+        return result
+
+
+def _entry_hashes(entry) -> list:
+    if not entry:
+        return []
+    if entry["kind"] == "document":
+        return [entry["hash"]]
+    return entry["records"] + ([entry["meta"]] if "meta" in entry else [])
+
+
+def _record_id(record):
+    if isinstance(record, dict):
+        return record.get("place_id") or record.get("id") or record.get("name")
+    return None
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__.split("Usage:")[1])
+        sys.exit(1)
+
+    store = SnapshotStore()
+    cmd = sys.argv[1]
+
+    if cmd == "create" and len(sys.argv) > 2:
+        name = sys.argv[sys.argv.index("--name") + 1] if "--name" in sys.argv else None
+        try:
+            store.create(Path(sys.argv[2]), name)
+        except FileExistsError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+    elif cmd == "list":
+        for m in store.list():
+            records = sum(len(e.get("records", [])) for e in m["files"].values())
+            print(f"  {m['name']}: {len(m['files'])} files, {records} records ({m['created_at'][:16]})")
+    elif cmd == "diff" and len(sys.argv) > 3:
+        changes = store.diff(sys.argv[2], sys.argv[3])
+        if not changes:
+            print("No differences")
+        for rel, c in changes.items():
+            print(f"  {rel} [{c['file']}]: +{c['added']} -{c['removed']} ~{c['changed']}")
+    elif cmd == "restore" and len(sys.argv) > 3:
+        store.restore(sys.argv[2], Path(sys.argv[3]))
+    else:
+        print(f"Unknown command: {cmd}")
+
+
+if __name__ == "__main__":
+    main()
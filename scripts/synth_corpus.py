@@ -0,0 +1,565 @@
+#!/usr/bin/env python3
+"""
+DumpsterMap - Synthetic Corpus Generator
+
+Learns field distributions from the real OutScraper pull (data/raw/*.json)
+and writes raw state files of any size with the same shape, plus a
+ground-truth map of which records are the same business. Used to measure
+dedup recall/precision and pipeline speed at 100k-1M records.
+
+What is learned from the real files:
+- records per state file, and where within a state they cluster (h3
+  parent cells when the h3 package is installed, a lat/lng grid otherwise)
+- business names (head and tail word runs are recombined)
+- phone formats and area codes per state
+- category/subtypes/type mix, and rating/reviews/verified/status profiles
+- website presence, URL prefixes, TLDs, social-page share
+- duplicate structure: the same place_id repeated across state files,
+  the same business listed twice (shared phone, new place_id), and
+  chains (different businesses sharing a website domain)
+
+Output layout:
+  <out>/raw/<state>.json       same format as data/raw
+  <out>/ground_truth.json      {"place_entity": {place_id: entity_id}, ...}
+
+Usage:
+  python synth_corpus.py generate 100000 /tmp/synth          # 100k records
+  python synth_corpus.py generate 1000000 /tmp/synth --slim  # Pipeline fields only
+  python synth_corpus.py generate 100000 /tmp/synth --seed 7
+  python synth_corpus.py bench /tmp/synth                    # clean_data + dedup recall
+"""
+
+import random
+import re
+import string
+import sys
+import time
+import zlib
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import jsonio
+
+try:
+    import h3
+except ImportError:
+    h3 = None
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+RAW_DIR = DATA_DIR / "raw"
+
+H3_PARENT_RES = 5         # ~250 km² cells
+GRID_DEGREES = 0.25       # fallback cell size without h3
+H3_RES = 9                # resolution OutScraper reports
+RESERVOIR_SIZE = 50_000   # earlier records kept as duplicate sources
+STREET_ATTEMPTS = 20      # random draws before suffixing a unit number
+SOCIAL_DOMAINS = ("facebook.com", "yelp.com", "google.com", "instagram.com", "business.site")
+
+# Fields the cleaning pipeline and merge scripts read; --slim keeps only these
+IDENTITY_FIELDS = (
+    "name", "phone", "website", "address", "street", "city", "postal_code", "county",
+    "state", "state_code", "country_code", "time_zone", "latitude", "longitude", "h3",
+    "place_id", "cid", "google_id", "category", "subtypes", "type", "rating", "reviews",
+    "verified", "business_status", "query",
+)
+
+STREET_SWAPS = [("Street", "St"), ("Road", "Rd"), ("Avenue", "Ave"),
+                ("Boulevard", "Blvd"), ("Drive", "Dr")]
+
+
+def digits(phone: str) -> str:
+    d = re.sub(r"\D", "", phone or "")
+    return d[1:] if len(d) == 11 and d.startswith("1") else d
+
+
+def domain_of(url: str) -> str:
+    d = re.sub(r"^https?://(www\.)?", "", (url or "").lower())
+    return d.split("/")[0]
+
+
+def h3_parent(cell: str, res: int) -> str:
+    fn = getattr(h3, "cell_to_parent", None) or getattr(h3, "h3_to_parent")
+    return fn(cell, res)
+
+
+def h3_cell(lat: float, lng: float, res: int) -> str:
+    fn = getattr(h3, "latlng_to_cell", None) or getattr(h3, "geo_to_h3")
+    return fn(lat, lng, res)
+
+
+def cell_key(record: dict) -> str:
+    if h3 and record.get("h3"):
+        return h3_parent(record["h3"], H3_PARENT_RES)
+    return f"{round(record['latitude'] / GRID_DEGREES)}:{round(record['longitude'] / GRID_DEGREES)}"
+
+
+# =============================================================================
+# Learning
+# =============================================================================
+
+class CorpusProfile:
+    """Empirical distributions from a directory of raw state files."""
+
+    def __init__(self):
+        self.state_counts = {}
+        self.cells = {}            # state -> (cells, cum_weights)
+        self.area_codes = defaultdict(list)
+        self.phone_formats = Counter()
+        self.name_heads = []
+        self.name_tails = []
+        self.street_numbers = []
+        self.street_names = []
+        self.categories = []       # (category, subtypes, type)
+        self.reputations = []      # (rating, reviews, verified, business_status)
+        self.url_prefixes = Counter()
+        self.tlds = Counter()
+        self.donors = []
+        self.rates = {}
+
+    @classmethod
+    def learn(cls, raw_dir: Path = RAW_DIR):
+        profile = cls()
+        all_records = []
+        by_state = {}
+        for path in sorted(Path(raw_dir).glob("*.json")):
+            if path.name == "pull_summary.json":
+                continue
+            records = jsonio.load(path)
+            by_state[path.stem] = records
+            all_records.extend((path.stem, r) for r in records)
+        if not all_records:
+            raise SystemExit(f"No raw state files in {raw_dir}")
+
+        for state, records in by_state.items():
+            profile.state_counts[state] = len(records)
+            profile._learn_cells(state, records)
+
+        first_file = {}
+        repeats = 0
+        for state, r in all_records:
+            pid = r.get("place_id")
+            if pid in first_file:
+                repeats += 1
+                continue
+            first_file[pid] = state
+            profile._learn_record(state, r)
+
+        distinct = [r for _, r in all_records if r.get("place_id") in first_file]
+        distinct = list({r["place_id"]: r for r in distinct}.values())
+        profile._learn_rates(len(all_records), repeats, distinct)
+        return profile
+
+    def _learn_cells(self, state, records):
+        cells = defaultdict(list)
+        for r in records:
+            if r.get("latitude") is not None and r.get("longitude") is not None:
+                cells[cell_key(r)].append({k: r.get(k) for k in (
+                    "latitude", "longitude", "h3", "city", "postal_code", "county",
+                    "state", "state_code", "time_zone")})
+        groups = []
+        total = 0
+        cum = []
+        for anchors in cells.values():
+            lats = [a["latitude"] for a in anchors]
+            lngs = [a["longitude"] for a in anchors]
+            spread = max(max(lats) - min(lats), max(lngs) - min(lngs)) / 4
+            groups.append((anchors, min(max(spread, 0.005), 0.1)))
+            total += len(anchors)
+            cum.append(total)
+        self.cells[state] = (groups, cum)
+
+    def _learn_record(self, state, r):
+        self.donors.append(r)
+
+        words = (r.get("name") or "").split()
+        if words:
+            k = 1 if len(words) <= 2 else 2
+            self.name_heads.append(" ".join(words[:k]))
+            if words[k:]:
+                self.name_tails.append(" ".join(words[k:]))
+
+        phone = r.get("phone") or ""
+        d = digits(phone)
+        if len(d) == 10:
+            self.phone_formats[re.sub(r"\d", "X", phone)] += 1
+            self.area_codes[state].append(d[:3])
+
+        m = re.match(r"(\d+)\s+(.+)", r.get("street") or "")
+        if m:
+            self.street_numbers.append(m.group(1))
+            self.street_names.append(m.group(2))
+
+        self.categories.append((r.get("category"), r.get("subtypes"), r.get("type")))
+        self.reputations.append((r.get("rating"), r.get("reviews"), r.get("verified"),
+                                 r.get("business_status")))
+
+        website = r.get("website") or ""
+        domain = domain_of(website)
+        if domain and not domain.endswith(SOCIAL_DOMAINS):
+            prefix = re.match(r"^(https?://(?:www\.)?)", website.lower())
+            self.url_prefixes[prefix.group(1) if prefix else "https://"] += 1
+            self.tlds[domain.rsplit(".", 1)[-1]] += 1
+
+    def _learn_rates(self, total, repeats, distinct):
+        n = len(distinct)
+        phones = Counter(digits(r.get("phone")) for r in distinct if len(digits(r.get("phone"))) == 10)
+        domains = Counter(domain_of(r.get("website")) for r in distinct if r.get("website"))
+        social = sum(c for d, c in domains.items() if d.endswith(SOCIAL_DOMAINS))
+        chains = {d: c for d, c in domains.items() if c > 1 and not d.endswith(SOCIAL_DOMAINS)}
+        with_site = sum(domains.values())
+        self.rates = {
+            # Same place_id pulled again by another state's query
+            "exact": repeats / total,
+            # Same business listed again under a new place_id (shares its phone)
+            "relisted": sum(c - 1 for c in phones.values() if c > 1) / total,
+            "missing_phone": sum(1 for r in distinct if not r.get("phone")) / n,
+            "missing_website": sum(1 for r in distinct if not r.get("website")) / n,
+            "social_website": social / with_site if with_site else 0.0,
+            # Share of businesses that belong to a multi-location brand
+            "chain": sum(chains.values()) / n,
+            "chain_size": sum(chains.values()) / len(chains) if chains else 1.0,
+        }
+
+    def summary(self) -> dict:
+        return {
+            "states": len(self.state_counts),
+            "records": sum(self.state_counts.values()),
+            "cells": sum(len(groups) for groups, _ in self.cells.values()),
+            "cell_source": "h3" if h3 else "grid",
+            "rates": {k: round(v, 4) for k, v in self.rates.items()},
+        }
+
+
+# =============================================================================
+# Generation
+# =============================================================================
+
+class CorpusGenerator:
+    """Draws synthetic raw records from a CorpusProfile."""
+
+    def __init__(self, profile: CorpusProfile, seed: int = 0, slim: bool = False):
+        self.p = profile
+        self.rnd = random.Random(seed)
+        self.slim = slim
+        self.used_phones = set()
+        self.used_domains = set()
+        self.used_addresses = set()
+        self.used_place_ids = set()
+        self.chains = []
+        self.reservoir = []
+        self.seen = 0
+        self.next_entity = 0
+        self.place_entity = {}
+        self.counts = Counter()
+        self._formats = list(profile.phone_formats)
+        self._format_weights = list(profile.phone_formats.values())
+        self._prefixes = list(profile.url_prefixes)
+        self._prefix_weights = list(profile.url_prefixes.values())
+        self._tlds = list(profile.tlds)
+        self._tld_weights = list(profile.tlds.values())
+
+    # -- field generators -----------------------------------------------------
+
+    def place_id(self) -> str:
+        alphabet = string.ascii_letters + string.digits + "-_"
+        while True:
+            pid = "ChIJ" + "".join(self.rnd.choices(alphabet, k=23))
+            if pid not in self.used_place_ids:
+                self.used_place_ids.add(pid)
+                return pid
+
+    def format_phone(self, d: str) -> str:
+        fmt = self.rnd.choices(self._formats, self._format_weights)[0] if self._formats else "+X XXX-XXX-XXXX"
+        fill = iter(("1" + d) if fmt.count("X") == 11 else d)
+        return re.sub("X", lambda _: next(fill), fmt)
+
+    def phone(self, state: str) -> str:
+        codes = self.p.area_codes.get(state) or [c for cs in self.p.area_codes.values() for c in cs] or ["555"]
+        while True:
+            d = (self.rnd.choice(codes) + str(self.rnd.randint(2, 9))
+                 + "".join(self.rnd.choices(string.digits, k=6)))
+            if d not in self.used_phones:
+                self.used_phones.add(d)
+                return self.format_phone(d)
+
+    def name(self) -> str:
+        head = self.rnd.choice(self.p.name_heads) if self.p.name_heads else "Acme"
+        tail = self.rnd.choice(self.p.name_tails) if self.p.name_tails else "Dumpster Rental"
+        return f"{head} {tail}"
+
+    def new_domain(self, name: str, city: str) -> str:
+        slug = re.sub(r"[^a-z0-9]", "", "".join(name.lower().split()[:3])) or "dumpsters"
+        tld = self.rnd.choices(self._tlds, self._tld_weights)[0] if self._tlds else "com"
+        candidates = [slug, slug + re.sub(r"[^a-z0-9]", "", (city or "").lower())]
+        for base in candidates:
+            if f"{base}.{tld}" not in self.used_domains:
+                break
+        else:
+            n = 2
+            while f"{base}{n}.{tld}" in self.used_domains:
+                n += 1
+            base = f"{base}{n}"
+        domain = f"{base}.{tld}"
+        self.used_domains.add(domain)
+        return domain
+
+    def url(self, domain: str) -> str:
+        prefix = self.rnd.choices(self._prefixes, self._prefix_weights)[0] if self._prefixes else "https://"
+        return f"{prefix}{domain}/"
+
+    def location(self, state: str) -> dict:
+        groups, cum = self.p.cells[state]
+        anchors, spread = self.rnd.choices(groups, cum_weights=cum)[0]
+        loc = dict(self.rnd.choice(anchors))
+        loc["latitude"] = loc["latitude"] + self.rnd.gauss(0, spread)
+        loc["longitude"] = loc["longitude"] + self.rnd.gauss(0, spread)
+        if h3:
+            loc["h3"] = h3_cell(loc["latitude"], loc["longitude"], H3_RES)
+        return loc
+
+    def street(self, loc: dict) -> tuple[str, str]:
+        names = self.p.street_names or ["Main St"]
+        for attempt in range(STREET_ATTEMPTS):
+            # Learned house numbers first; once those are used up in a small
+            # town, fall back to any 1-5 digit number
+            if attempt < STREET_ATTEMPTS // 2 and self.p.street_numbers:
+                number = self.rnd.choice(self.p.street_numbers)
+            else:
+                number = str(self.rnd.randint(1, 99999))
+            street = f"{number} {self.rnd.choice(names)}"
+            address = f"{street}, {loc['city']}, {loc['state_code']} {loc['postal_code']}"
+            if address.lower() not in self.used_addresses:
+                self.used_addresses.add(address.lower())
+                return street, address
+        # Still colliding: suffix a unit number, which is always fresh
+        street = f"{street} Unit {len(self.used_addresses)}"
+        address = f"{street}, {loc['city']}, {loc['state_code']} {loc['postal_code']}"
+        self.used_addresses.add(address.lower())
+        return street, address
+
+    # -- records ----------------------------------------------------------------
+
+    def new_business(self, state: str) -> dict:
+        rates = self.p.rates
+        loc = self.location(state)
+        street, address = self.street(loc)
+        category, subtypes, type_ = self.rnd.choice(self.p.categories)
+        rating, reviews, verified, status = self.rnd.choice(self.p.reputations)
+
+        chain = None
+        if self.rnd.random() < rates["chain"]:
+            if self.chains and self.rnd.random() > 1 / max(rates["chain_size"], 1.0):
+                chain = self.rnd.choice(self.chains)
+            else:
+                brand = self.name()
+                chain = (brand, self.url(self.new_domain(brand, "")))
+                self.chains.append(chain)
+
+        name = f"{chain[0]} {loc['city']}" if chain else self.name()
+        if chain:
+            website = chain[1]
+        elif self.rnd.random() < rates["missing_website"]:
+            website = None
+        elif self.rnd.random() < rates["social_website"]:
+            slug = re.sub(r"[^A-Za-z0-9]", "", name)
+            website = f"https://www.facebook.com/{slug}{self.rnd.randint(100, 99999)}"
+        else:
+            website = self.url(self.new_domain(name, loc["city"]))
+
+        record = {
+            **loc,
+            "name": name,
+            "phone": None if self.rnd.random() < rates["missing_phone"] else self.phone(state),
+            "website": website,
+            "street": street,
+            "address": address,
+            "country_code": "US",
+            "place_id": self.place_id(),
+            "cid": str(self.rnd.getrandbits(63)),
+            "google_id": f"0x{self.rnd.getrandbits(64):x}:0x{self.rnd.getrandbits(64):x}",
+            "category": category,
+            "subtypes": subtypes,
+            "type": type_,
+            "rating": rating,
+            "reviews": reviews,
+            "verified": verified,
+            "business_status": status,
+            "_chain": chain is not None,
+        }
+        self.place_entity[record["place_id"]] = self.next_entity
+        self.next_entity += 1
+        return record
+
+    def relisting(self, source: dict) -> dict:
+        """Same business under a new place_id: shared phone, spelled a little differently."""
+        record = dict(source)
+        record["place_id"] = self.place_id()
+        record["cid"] = str(self.rnd.getrandbits(63))
+        if record.get("phone"):
+            record["phone"] = self.format_phone(digits(record["phone"]))
+        long_form, short = self.rnd.choice(STREET_SWAPS)
+        street = record["street"]
+        swapped = street.replace(f" {short}", f" {long_form}") if street.endswith(f" {short}") \
+            else street.replace(f" {long_form}", f" {short}")
+        record["address"] = record["address"].replace(street, swapped, 1)
+        record["street"] = swapped
+        if self.rnd.random() < 0.3:
+            record["name"] = record["name"] + self.rnd.choice([" LLC", " Inc", ", LLC"])
+        record["latitude"] += self.rnd.gauss(0, 0.0005)
+        record["longitude"] += self.rnd.gauss(0, 0.0005)
+        self.place_entity[record["place_id"]] = self.place_entity[source["place_id"]]
+        return record
+
+    def remember(self, state: str, record: dict):
+        """Reservoir-sample earlier records so 1M-record runs stay bounded in memory."""
+        self.seen += 1
+        if len(self.reservoir) < RESERVOIR_SIZE:
+            self.reservoir.append((state, record))
+        else:
+            i = self.rnd.randrange(self.seen)
+            if i < RESERVOIR_SIZE:
+                self.reservoir[i] = (state, record)
+
+    def next_record(self, state: str) -> tuple[dict, str]:
+        rates = self.p.rates
+        roll = self.rnd.random()
+        if self.reservoir and roll < rates["exact"] + rates["relisted"]:
+            source_state, source = self.rnd.choice(self.reservoir)
+            if roll < rates["exact"] and source_state != state:
+                return dict(source), "exact"
+            if roll >= rates["exact"] and source.get("phone"):
+                return self.relisting(source), "relisted"
+        record = self.new_business(state)
+        return record, "chain" if record.pop("_chain") else "new"
+
+    def state_records(self, state: str, count: int) -> list:
+        query = f"dumpster rental {state.replace('_', ' ').title()}"
+        out = []
+        for _ in range(count):
+            record, kind = self.next_record(state)
+            record["query"] = query
+            self.counts[kind] += 1
+            if kind != "exact":
+                self.remember(state, record)
+            out.append(record)
+        return out
+
+    def full_record(self, record: dict) -> dict:
+        """Slim identity fields on top of a real donor record's remaining fields."""
+        if self.slim:
+            return {k: record.get(k) for k in IDENTITY_FIELDS}
+        # Keyed by place_id so repeated copies of a place stay byte-identical
+        donor = self.p.donors[zlib.crc32(record["place_id"].encode()) % len(self.p.donors)]
+        return {**donor, **record}
+
+    def state_sizes(self, total: int) -> dict:
+        real = sum(self.p.state_counts.values())
+        sizes = {s: int(total * c / real) for s, c in self.p.state_counts.items()}
+        # Hand the rounding remainder to the largest states
+        for s in sorted(sizes, key=lambda s: -self.p.state_counts[s])[: total - sum(sizes.values())]:
+            sizes[s] += 1
+        return sizes
+
+
+def generate(total: int, out_dir: Path, seed: int = 0, slim: bool = False,
+             profile: CorpusProfile = None) -> dict:
+    """Write <out_dir>/raw/*.json and <out_dir>/ground_truth.json."""
+    profile = profile or CorpusProfile.learn()
+    gen = CorpusGenerator(profile, seed, slim)
+    out_dir = Path(out_dir)
+    raw_dir = out_dir / "raw"
+    raw_dir.mkdir(parents=True, exist_ok=True)
+
+    start = time.time()
+    for state, count in gen.state_sizes(total).items():
+        records = [gen.full_record(r) for r in gen.state_records(state, count)]
+        jsonio.dump(records, raw_dir / f"{state}.json")
+
+    truth = {
+        "seed": seed,
+        "records": total,
+        "entities": gen.next_entity,
+        "kinds": dict(gen.counts),
+        "profile": profile.summary(),
+        "place_entity": gen.place_entity,
+    }
+    jsonio.dump(truth, out_dir / "ground_truth.json", pretty=False)
+    print(f"🧪 Generated {total:,} records ({gen.next_entity:,} businesses) in {time.time() - start:.1f}s")
+    print(f"   {dict(gen.counts)}")
+    print(f"   {raw_dir}")
+    return truth
+
+
+# =============================================================================
+# Scoring
+# =============================================================================
+
+def score_dedup(kept: list, unique: list, place_entity: dict) -> dict:
+    """
+    Compare a dedup result with the ground truth.
+
+    kept is the input to deduplicate (records that survived filtering),
+    unique its output. A removal is correct when another record of the
+    same business is still in the output; removing the last record of a
+    business is a false merge.
+    """
+    def entities(records):
+        return Counter(place_entity.get(r.get("place_id")) for r in records)
+
+    before, after = entities(kept), entities(unique)
+    true_dupes = len(kept) - len(before)
+    removed = len(kept) - len(unique)
+    false_merges = len(before) - len(after)
+    correct = removed - false_merges
+    return {
+        "true_duplicates": true_dupes,
+        "removed": removed,
+        "correct": correct,
+        "missed": len(unique) - len(after),
+        "false_merges": false_merges,
+        "recall": correct / true_dupes if true_dupes else 1.0,
+        "precision": correct / removed if removed else 1.0,
+    }
+
+
+def bench(out_dir: Path) -> dict:
+    """Run clean_data over a generated corpus and score its dedup."""
+    import clean_data
+
+    out_dir = Path(out_dir)
+    truth = jsonio.load(out_dir / "ground_truth.json")
+
+    clean_data.RAW_DIR = out_dir / "raw"
+    clean_data.CLEAN_DIR = out_dir / "cleaned"
+    stats = clean_data.clean_all()
+
+    kept = []
+    for path in sorted(clean_data.RAW_DIR.glob("*.json")):
+        kept.extend(r for r in jsonio.load(path) if not clean_data.should_remove(r)[0])
+    output = max(clean_data.CLEAN_DIR.glob("all_providers_*.json"), key=lambda p: p.stat().st_mtime)
+    unique = jsonio.load(output)
+
+    score = score_dedup(kept, unique, truth["place_entity"])
+    print(f"\n🎯 Dedup vs ground truth:")
+    print(f"   True duplicates: {score['true_duplicates']:,}  removed: {score['removed']:,}")
+    print(f"   Recall: {score['recall']:.1%}  precision: {score['precision']:.1%}")
+    print(f"   Missed: {score['missed']:,}  false merges: {score['false_merges']:,}")
+    return {"stages": stats.get("stages", {}), "dedup": score}
+
+
+def main():
+    args = sys.argv[1:]
+    seed = int(args[args.index("--seed") + 1]) if "--seed" in args else 0
+    slim = "--slim" in args
+
+    if len(args) >= 3 and args[0] == "generate":
+        generate(int(args[1]), Path(args[2]), seed=seed, slim=slim)
+    elif len(args) >= 2 and args[0] == "bench":
+        bench(Path(args[1]))
+    else:
+        print(__doc__.split("Usage:")[1])
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
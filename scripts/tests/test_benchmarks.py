@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test suite for benchmarks.py - hot-path benchmark suite
+Tests cover: size parsing, running benchmarks, baseline comparison
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import benchmarks
+from benchmarks import compare, parse_size, size_label, run
+from synth_corpus import CorpusProfile
+
+
+def results(**seconds):
+    return {"machine": {"python": "3"}, "results": {
+        key: {"benchmark": key.split("@")[0], "records": 1000, "seconds": s} for key, s in seconds.items()}}
+
+
+@pytest.fixture(scope="module")
+def profile():
+    return CorpusProfile.learn(benchmarks.ROOT / "data" / "raw")
+
+
+class TestSizes:
+    """Test size labels."""
+
+    def test_parse(self):
+        assert parse_size("10k") == 10_000
+        assert parse_size("1M") == 1_000_000
+        assert parse_size("2500") == 2500
+
+    def test_label_round_trips(self):
+        for n in (10_000, 100_000, 1_000_000, 1234):
+            assert parse_size(size_label(n)) == n
+
+
+class TestCompare:
+    """Test the regression gate."""
+
+    def test_no_regression_within_threshold(self):
+        assert compare(results(**{"dedup@1k": 1.0}), results(**{"dedup@1k": 1.1}), 0.15) == []
+
+    def test_regression_flagged(self):
+        assert compare(results(**{"dedup@1k": 1.0}), results(**{"dedup@1k": 1.3}), 0.15) == ["dedup@1k"]
+
+    def test_speedup_is_not_a_regression(self):
+        assert compare(results(**{"dedup@1k": 1.0}), results(**{"dedup@1k": 0.2})) == []
+
+    def test_missing_benchmark_ignored(self):
+        assert compare(results(**{"dedup@1k": 1.0, "x@1k": 1.0}), results(**{"dedup@1k": 1.0})) == []
+
+
+class TestRun:
+    """Test a small end-to-end run."""
+
+    def test_run_records_every_size(self, profile):
+        doc = run(sizes=[200, 400], only=["normalize_phone", "deduplicate", "clean_all"],
+                  repeat=1, profile=profile)
+        assert set(doc["results"]) == {
+            f"{name}@{n}" for name in ("normalize_phone", "deduplicate", "clean_all") for n in (200, 400)}
+        r = doc["results"]["deduplicate@400"]
+        assert r["records"] == 400 and len(r["runs"]) == 1 and r["seconds"] > 0
+
+    def test_prerender_leaves_real_pages_alone(self, profile):
+        before = {p: p.stat().st_mtime_ns for p in benchmarks.CITY_DIR.glob("*.html")}
+        run(sizes=[300], only=["prerender_page"], repeat=1, profile=profile)
+        assert before == {p: p.stat().st_mtime_ns for p in benchmarks.CITY_DIR.glob("*.html")}
+
+    def test_unknown_benchmark(self, profile):
+        with pytest.raises(SystemExit):
+            run(sizes=[10], only=["nope"], profile=profile)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test suite for categoricals.py - dictionary-encoded categorical fields
+Tests cover: vocabulary codes, interning of dicts and slim records,
+counts by value and by code column, vocabulary persistence
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from categoricals import Categoricals, Vocabulary, count_codes
+from record_model import Record
+
+
+def make(state, city, **extra):
+    # Build the strings at runtime so equal values are distinct objects
+    return {"name": "x", "state": "".join(state), "city": "".join(city), **extra}
+
+
+RECORDS = [
+    make("Texas", "Austin"),
+    make("Ohio", "Akron"),
+    make("Texas", "Dallas"),
+    make("Texas", "Austin"),
+    {"name": "no location", "state": None},
+]
+
+
+class TestVocabulary:
+    """Test value <-> code tables."""
+
+    def test_first_seen_codes(self):
+        v = Vocabulary(["b", "a", "b"])
+        assert v.code("b") == 1
+        assert v.code("a") == 2
+        assert len(v) == 3
+
+    def test_missing_is_zero(self):
+        v = Vocabulary()
+        assert v.code(None) == 0
+        assert v.value(0) is None
+
+    def test_canonical_is_shared(self):
+        v = Vocabulary()
+        a, b = "".join(["Tex", "as"]), "".join(["Te", "xas"])
+        assert a is not b
+        assert v.canonical(a) is v.canonical(b)
+
+
+class TestIntern:
+    """Test that interning shares strings without changing values."""
+
+    def test_dicts(self):
+        cats = Categoricals()
+        records = [dict(r) for r in RECORDS]
+        for r in records:
+            cats.intern(r)
+        assert records == RECORDS
+        assert records[0]["state"] is records[2]["state"]
+        assert records[0]["city"] is records[3]["city"]
+
+    def test_non_strings_untouched(self):
+        cats = Categoricals()
+        r = cats.intern({"state": None, "subtypes": ["a"]})
+        assert r == {"state": None, "subtypes": ["a"]}
+
+    def test_slim_records(self):
+        cats = Categoricals()
+        a, b = Record.from_dict(RECORDS[0]), Record.from_dict(RECORDS[3])
+        before = a.dumps()
+        cats.intern(a)
+        cats.intern(b)
+        assert a.get("state") is b.get("state")
+        assert a.dumps() == before
+
+
+class TestCounts:
+    """Test codes and per-value counts."""
+
+    def test_codes(self):
+        cats = Categoricals()
+        assert list(cats.codes(RECORDS, "state")) == [1, 2, 1, 1, 0]
+
+    def test_count_by(self):
+        cats = Categoricals()
+        assert cats.count_by(RECORDS, "state") == {"Texas": 3, "Ohio": 1, None: 1}
+        assert cats.count_by(RECORDS, "city")["Austin"] == 2
+
+    def test_count_codes_matches_count_by(self):
+        cats = Categoricals()
+        codes = cats.codes(RECORDS, "city")
+        assert count_codes(codes, cats.vocab["city"].values) == cats.count_by(RECORDS, "city")
+
+    def test_summary(self):
+        cats = Categoricals()
+        cats.codes(RECORDS, "state")
+        assert cats.summary()["state"] == 2
+
+
+class TestPersistence:
+    """Test that vocabularies round-trip with their codes."""
+
+    def test_round_trip(self):
+        cats = Categoricals(["state", "city"])
+        codes = list(cats.codes(RECORDS, "city"))
+        restored = Categoricals.from_dict(cats.to_dict())
+        assert restored.fields == ("state", "city")
+        assert list(restored.codes(RECORDS, "city")) == codes
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
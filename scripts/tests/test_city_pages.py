@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test suite for city_pages.py - data-driven city and state pages
+Tests cover: state normalization, JS-compatible rating format, grouped
+aggregates (JSON and columnar input), nearby-city grid, compiled template,
+page selection, write-only-on-change builds
+"""
+
+import json
+import pytest
+import sys
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import city_pages
+import columnar
+import jsonio
+
+
+def provider(city, state, lat=None, lng=None, rating=None, reviews=None, **extra):
+    return {"name": f"{city} Dumpsters", "city": city, "state": state, "latitude": lat, "longitude": lng,
+            "rating": rating, "reviews": reviews, **extra}
+
+
+CORPUS = (
+    [provider("Austin", "Texas", 30.27, -97.74, 4.0, 10) for _ in range(3)]
+    + [provider("Round Rock", "Texas", 30.51, -97.68, 5.0, 2)]
+    + [provider("Houston", "TX", 29.76, -95.37, 4.5, 0), provider("Houston", "Texas", 29.76, -95.37)]
+    + [provider("Paradise", "Nevada", 36.10, -115.15, 4.8, 5)]
+    + [provider("Nowhere", None), provider(None, "Texas")]
+)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    path = tmp_path / "all_providers_20260101.json"
+    jsonio.dump(CORPUS, path)
+    return path
+
+
+@pytest.fixture
+def template():
+    return city_pages.Template.load()
+
+
+class TestHelpers:
+    """Test slugs, state names and number formatting."""
+
+    def test_normalize_state(self):
+        assert city_pages.normalize_state("Texas") == "TX"
+        assert city_pages.normalize_state("tx") == "TX"
+        assert city_pages.normalize_state("District of Columbia") == "DC"
+        assert city_pages.normalize_state("Ontario") is None
+        assert city_pages.normalize_state(None) is None
+
+    def test_slugs(self):
+        assert city_pages.city_slug("St. Louis", "MO") == "st-louis-mo"
+        assert city_pages.state_slug("NH") == "new-hampshire"
+
+    def test_to_fixed_matches_javascript(self):
+        # (4.45).toFixed(1) === "4.5" and (1.05).toFixed(1) === "1.1" in JS:
+        # half-up on the exact binary value, not Python's round-half-even
+        assert city_pages.to_fixed(4.45) == "4.5"
+        assert city_pages.to_fixed(1.05) == "1.1"
+        assert city_pages.to_fixed(0.25) == "0.3"
+        assert city_pages.to_fixed(4.0) == "4.0"
+
+    def test_miles(self):
+        assert city_pages.miles(30.27, -97.74, 29.76, -95.37) == pytest.approx(146, abs=2)
+
+
+class TestAggregate:
+    """Test the grouped pass."""
+
+    def test_city_and_state_stats(self, corpus):
+        cities, states = city_pages.aggregate(city_pages.load_columns(corpus))
+        austin = cities[("Austin", "TX")]
+        assert austin.count == 3
+        assert austin.reviews == 30
+        assert austin.avg_rating == "4.0"
+        assert austin.center == pytest.approx((30.27, -97.74))
+        # "TX" and "Texas" records group together
+        houston = cities[("Houston", "TX")]
+        assert houston.count == 2
+        assert houston.avg_rating is None  # rated, but without reviews
+        assert states["TX"].count == 6
+        assert states["TX"].avg_rating == "4.3"  # (4.0 * 3 + 5.0) / 4
+        assert ("Nowhere", None) not in cities
+
+    def test_columnar_input_matches_json(self, corpus, tmp_path):
+        cols = tmp_path / "all_providers_20260101.cols"
+        columnar.write(cols, CORPUS)
+        from_json = city_pages.aggregate(city_pages.load_columns(corpus))
+        from_cols = city_pages.aggregate(city_pages.load_columns(cols))
+        for a, b in zip(from_json, from_cols):
+            assert {k: (v.count, v.avg_rating, v.reviews, v.center) for k, v in a.items()} == \
+                   {k: (v.count, v.avg_rating, v.reviews, v.center) for k, v in b.items()}
+
+    def test_latest_snapshot_prefers_cols(self, corpus, tmp_path):
+        assert city_pages.latest_snapshot(tmp_path) == corpus
+        columnar.write(corpus.with_suffix(".cols"), CORPUS)
+        assert city_pages.latest_snapshot(tmp_path) == corpus.with_suffix(".cols")
+        assert city_pages.latest_snapshot(tmp_path / "missing") is None
+
+    def test_latest_snapshot_ignores_validate_output(self, corpus, tmp_path):
+        (tmp_path / f"{corpus.stem}_2359.json").write_text("[")
+        assert city_pages.latest_snapshot(tmp_path) == corpus
+
+
+class TestNearby:
+    """Test nearby-city links."""
+
+    def test_same_state_first_then_distance(self, corpus):
+        cities, _ = city_pages.aggregate(city_pages.load_columns(corpus))
+        links = city_pages.nearby_cities(cities, [("Austin", "TX")])
+        assert links[("Austin", "TX")] == [("Round Rock", "TX"), ("Houston", "TX")]
+
+    def test_out_of_state_within_range(self):
+        cities = {key: city_pages.Aggregate() for key in
+                  [("Texarkana", "TX"), ("Texarkana", "AR"), ("Little Rock", "AR"), ("Seattle", "WA")]}
+        for key, (lat, lng) in zip(cities, [(33.43, -94.05), (33.44, -94.04), (34.75, -92.29), (47.6, -122.3)]):
+            cities[key].add(lat, lng, 0, 0)
+        links = city_pages.nearby_cities(cities, list(cities))
+        assert links[("Texarkana", "TX")] == [("Texarkana", "AR")]
+        assert links[("Texarkana", "AR")] == [("Little Rock", "AR"), ("Texarkana", "TX")]
+        assert links[("Seattle", "WA")] == []
+
+
+class TestTemplate:
+    """Test the compiled city.html template."""
+
+    def test_slots_and_fixed_paths(self, template):
+        assert set(template.slots) >= {"title", "description", "canonical", "schema", "config", "links"}
+        html = template.render({})
+        assert 'href="../index.html"' in html
+        assert 'href="index.html"' not in html
+
+    def test_city_page(self, corpus, template):
+        cities, _ = city_pages.aggregate(city_pages.load_columns(corpus))
+        html = city_pages.city_page(template, "Austin", "TX", cities[("Austin", "TX")], [("Round Rock", "TX")])
+        assert "<title>Dumpster Rental Austin, TX - Compare 3 Local Providers | DumpsterMap</title>" in html
+        config = html.split("window.CITY_CONFIG = ")[1].split(";</script>")[0]
+        assert json.loads(config)["providerCount"] == 3
+        assert html.index("window.CITY_CONFIG") < html.index('<script src="https://unpkg.com/leaflet')
+        assert '<a href="round-rock-tx.html" class="city-link">Round Rock, TX</a>' in html
+        schema = html.split('id="schema-json">')[1].split("</script>")[0]
+        assert json.loads(schema)["@graph"][0]["url"].endswith("/dumpster-rental/austin-tx.html")
+
+    def test_state_page(self, corpus, template):
+        _, states = city_pages.aggregate(city_pages.load_columns(corpus))
+        html = city_pages.state_page(template, "TX", states["TX"], [("Austin", 3)])
+        assert "<h3>Popular Cities in Texas</h3>" in html
+        assert '<a href="austin-tx.html">Austin (3)</a>' in html
+
+
+class TestBuild:
+    """Test page selection and writing."""
+
+    def test_selection(self, corpus):
+        cities, _ = city_pages.aggregate(city_pages.load_columns(corpus))
+        assert city_pages.select_pages(cities, set()) == [("Austin", "TX"), ("Paradise", "NV")]
+        assert ("Houston", "TX") in city_pages.select_pages(cities, {"houston-tx.html"})
+
+    def test_build_writes_then_is_a_noop(self, corpus, tmp_path):
+        out = tmp_path / "pages"
+        out.mkdir()
+        (out / "old-town-zz.html").write_text("keep")
+        r = city_pages.build(corpus, out)
+        assert sorted(r["written"]) == ["austin-tx.html", "paradise-nv.html", "texas.html"]
+        assert r["new"] == r["written"]
+        assert r["stale"] == ["old-town-zz.html"]
+        assert (out / "old-town-zz.html").read_text() == "keep"
+        # Pages come out prerendered
+        assert "Dumpster Rentals in Austin, Texas" in (out / "austin-tx.html").read_text()
+
+        before = {p.name: p.stat().st_mtime_ns for p in out.iterdir()}
+        r = city_pages.build(corpus, out)
+        assert r["written"] == []
+        assert {p.name: p.stat().st_mtime_ns for p in out.iterdir()} == before
+
+    def test_dry_run(self, corpus, tmp_path):
+        r = city_pages.build(corpus, tmp_path / "pages", dry_run=True)
+        assert len(r["written"]) == 3
+        assert not (tmp_path / "pages").exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
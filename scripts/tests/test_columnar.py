@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test suite for columnar.py - memory-mapped columnar snapshot
+Tests cover: numeric/string/categorical round trips, missing values,
+zero-copy views, per-column spilling, clean_all snapshot
+"""
+
+import contextlib
+import io
+import json
+import math
+import pytest
+import sys
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import clean_data
+import columnar
+from record_model import Record
+
+RECORDS = [
+    {"name": "Acme Dumpsters", "latitude": 30.27, "longitude": -97.74, "rating": 4.8, "reviews": 120,
+     "_quality_score": 0.9, "state": "Texas", "city": "Austin", "phone": "+1 512-555-0100",
+     "website": "https://acme.example/", "address": "1 Main St", "postal_code": "78701", "place_id": "a"},
+    {"name": "Café – Roll Off", "latitude": 41.5, "longitude": -81.7, "rating": None, "reviews": None,
+     "_quality_score": 0.4, "state": "Ohio", "city": None, "phone": None, "website": "",
+     "address": None, "postal_code": "44101", "place_id": "b"},
+    {"name": "Bins", "state": "Texas", "city": "Austin"},
+]
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = tmp_path / "all.cols"
+    columnar.write(path, RECORDS)
+    with columnar.Snapshot(path) as snap:
+        yield snap
+
+
+class TestNumeric:
+    """Test fixed-width numeric columns."""
+
+    def test_floats(self, snapshot):
+        assert list(snapshot.column("latitude")[:2]) == [30.27, 41.5]
+        assert math.isnan(snapshot.column("rating")[1])
+        assert math.isnan(snapshot.column("latitude")[2])
+
+    def test_ints(self, snapshot):
+        assert list(snapshot.column("reviews")) == [120, -1, -1]
+
+    def test_zero_copy(self, snapshot):
+        col = snapshot.column("longitude")
+        assert len(col) == snapshot.rows == 3
+        if columnar.numpy is None:
+            assert isinstance(col, memoryview) and col.format == "d"
+        else:
+            assert not col.flags.owndata
+
+
+class TestStrings:
+    """Test string heap and categorical columns."""
+
+    def test_strings(self, snapshot):
+        assert list(snapshot.column("name")) == ["Acme Dumpsters", "Café – Roll Off", "Bins"]
+
+    def test_none_vs_empty(self, snapshot):
+        assert snapshot.column("website")[1] == ""
+        assert snapshot.column("address")[1] is None
+        assert snapshot.column("address")[-1] is None
+
+    def test_index_error(self, snapshot):
+        with pytest.raises(IndexError):
+            snapshot.column("name")[3]
+
+    def test_categorical(self, snapshot):
+        city = snapshot.column("city")
+        assert list(city) == ["Austin", None, "Austin"]
+        assert list(city.codes) == [1, 0, 1]
+        assert snapshot.header["vocab"]["state"] == ["Texas", "Ohio"]
+
+    def test_record(self, snapshot):
+        row = snapshot.record(1)
+        assert row["rating"] is None and row["reviews"] is None
+        assert row["name"] == "Café – Roll Off"
+        assert row["state"] == "Ohio"
+
+    def test_record_reuses_column_views(self, snapshot):
+        snapshot.record(0)
+        views = len(snapshot._views)
+        for i in range(snapshot.rows):
+            snapshot.record(i)
+        assert len(snapshot._views) == views
+        assert snapshot.column("rating") is snapshot.column("rating")
+
+
+class TestFile:
+    """Test file-level behaviour."""
+
+    def test_not_a_snapshot(self, tmp_path):
+        path = tmp_path / "x.cols"
+        path.write_bytes(b"[]" * 8)
+        with pytest.raises(ValueError):
+            columnar.Snapshot(path)
+
+    def test_empty(self, tmp_path):
+        columnar.write(tmp_path / "e.cols", [])
+        with columnar.Snapshot(tmp_path / "e.cols") as snap:
+            assert snap.rows == 0
+            assert list(snap.column("name")) == []
+
+    def test_spilled_batches_match(self, tmp_path, monkeypatch):
+        records = RECORDS * 7
+        columnar.write(tmp_path / "one.cols", records)
+        monkeypatch.setattr(columnar, "SPILL_ROWS", 3)
+        header = columnar.write(tmp_path / "many.cols", iter(records))
+        assert header["rows"] == len(records)
+        assert (tmp_path / "many.cols").read_bytes() == (tmp_path / "one.cols").read_bytes()
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["many.cols", "one.cols"]
+
+    def test_slim_records(self, tmp_path):
+        columnar.write(tmp_path / "d.cols", RECORDS)
+        columnar.write(tmp_path / "s.cols", [Record.from_dict(r) for r in RECORDS])
+        assert (tmp_path / "d.cols").read_bytes() == (tmp_path / "s.cols").read_bytes()
+
+    def test_clean_all_writes_snapshot(self, tmp_path, monkeypatch):
+        raw = tmp_path / "raw"
+        raw.mkdir()
+        rows = [{"name": f"Dumpster Co {i}", "phone": f"+1 512-555-{i:04d}", "address": f"{i} Oak Rd",
+                 "website": f"https://p{i}.example/", "rating": 4.5, "reviews": i, "latitude": 30.0 + i,
+                 "longitude": -97.0, "city": "Austin", "state": "Texas", "category": "Dumpster rental service"}
+                for i in range(5)]
+        (raw / "texas.json").write_text(json.dumps(rows))
+        monkeypatch.setattr(clean_data, "RAW_DIR", raw)
+        monkeypatch.setattr(clean_data, "CLEAN_DIR", tmp_path / "clean")
+        with contextlib.redirect_stdout(io.StringIO()):
+            clean_data.clean_all()
+        (cols,) = (tmp_path / "clean").glob("*.cols")
+        (js,) = (tmp_path / "clean").glob("all_providers_*.json")
+        cleaned = json.loads(js.read_text())
+        with columnar.Snapshot(cols) as snap:
+            assert list(snap.column("name")) == [r["name"] for r in cleaned]
+            assert list(snap.column("latitude")) == [r["latitude"] for r in cleaned]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test suite for equivalence.py - reference vs. optimized cleaning
+Tests cover: live clean_data against the frozen reference on the real
+corpus and on generated records, divergence reporting
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cleaning_reference
+from equivalence import FUNCTIONS, check_corpus, check_generated, first_divergence, load_raw_records, report
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    records = load_raw_records()
+    if not records:
+        pytest.skip("data/raw is empty")
+    return records
+
+
+class TestCorpus:
+    """Live implementations must match the reference on every raw record."""
+
+    @pytest.mark.parametrize("name", FUNCTIONS)
+    def test_identical_on_corpus(self, corpus, name):
+        divergence = first_divergence(name, corpus)
+        assert divergence is None, report(divergence)
+
+
+class TestDivergenceReport:
+    """A deliberately different candidate is caught at the right record."""
+
+    RECORDS = [
+        {"name": "Acme Dumpsters", "phone": "+1 512-555-0100", "address": "1 Main Street", "place_id": "a"},
+        {"name": "Bob's Roll Off", "phone": "(512) 555-0101", "address": "2 Oak Road", "place_id": "b"},
+        {"name": "Acme Dumpsters", "phone": "+1 512-555-0100", "address": "9 Elm Ave", "place_id": "c"},
+    ]
+
+    def test_per_record_divergence(self):
+        def candidate(phone):
+            digits = cleaning_reference.normalize_phone(phone)
+            return digits[:9] if phone.startswith("(") else digits
+
+        d = first_divergence("normalize_phone", self.RECORDS, candidate)
+        assert d["index"] == 1
+        assert d["record"]["place_id"] == "b"
+        assert d["reference"] == "5125550101"
+        assert d["candidate"] == "512555010"
+
+    def test_exception_is_a_divergence(self):
+        def candidate(record):
+            raise KeyError("name")
+
+        d = first_divergence("should_remove", self.RECORDS, candidate)
+        assert d["index"] == 0
+        assert "raised KeyError" in d["candidate"]
+
+    def test_dedup_kept_set_divergence(self):
+        def keep_all(records):
+            return list(records), 0
+
+        d = first_divergence("deduplicate", self.RECORDS, keep_all)
+        assert d["index"] == 2
+        assert (d["reference"], d["candidate"]) == ("dropped", "kept")
+
+    def test_dedup_order_divergence(self):
+        def reversed_dedup(records):
+            unique, dupes = cleaning_reference.deduplicate(records)
+            return unique[::-1], dupes
+
+        d = first_divergence("deduplicate", self.RECORDS, reversed_dedup)
+        assert d["index"] == 0
+        assert "position 0" in d["reference"]
+
+    def test_check_corpus_covers_all_functions(self):
+        results = check_corpus(self.RECORDS)
+        assert set(results) == set(FUNCTIONS)
+        assert all(d is None for d in results.values())
+
+
+class TestGenerated:
+    """Property-based checks (only with hypothesis installed)."""
+
+    @pytest.mark.parametrize("name", FUNCTIONS)
+    def test_identical_on_generated(self, name):
+        pytest.importorskip("hypothesis")
+        divergence = check_generated(name, examples=100)
+        assert divergence is None, report(divergence)
+
+    def test_finds_planted_bug(self):
+        pytest.importorskip("hypothesis")
+
+        def candidate(address):
+            return cleaning_reference.normalize_address(address).replace("road", "rd")
+
+        d = check_generated("normalize_address", candidate, examples=200, shrink=False)
+        assert d is not None
+        assert "road" in d["reference"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
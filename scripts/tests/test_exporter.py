@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test suite for exporter.py - streaming multi-format export
+Tests cover: JSON/NDJSON/CSV/columnar output from one pass, RFC 4180
+quoting, gzip/zstd compression with and without threads, custom columns
+"""
+
+import csv
+import gzip
+import io
+import json
+import pytest
+import sys
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import columnar
+import exporter
+import jsonio
+from record_model import Record
+
+RECORDS = [
+    {"name": 'Acme, "The Best" Dumpsters', "phone": "+1 512-555-0100", "website": "https://acme.example/",
+     "city": "Austin", "state": "Texas", "rating": 4.8, "reviews": 120, "_quality_score": 0.9},
+    {"name": "Line\nBreak Bins", "phone": None, "website": None, "city": "Akron", "state": "Ohio",
+     "rating": None, "_quality_score": 0.4},
+]
+
+
+def read_csv(data: bytes) -> list:
+    return list(csv.reader(io.StringIO(data.decode(), newline="")))
+
+
+class TestFormats:
+    """Test each format from a single export."""
+
+    def test_all_formats(self, tmp_path):
+        paths = exporter.export(iter(RECORDS), tmp_path / "out")
+        assert sorted(paths) == sorted(exporter.FORMATS)
+        assert paths["json"].read_bytes() == jsonio.dumps(RECORDS, pretty=True)
+        assert [json.loads(l) for l in paths["ndjson"].read_text().splitlines()] == RECORDS
+        with columnar.Snapshot(paths["cols"]) as snap:
+            assert list(snap.column("name")) == [r["name"] for r in RECORDS]
+
+    def test_empty(self, tmp_path):
+        paths = exporter.export([], tmp_path / "out", ("json", "csv"))
+        assert paths["json"].read_bytes() == b"[]"
+        assert read_csv(paths["csv"].read_bytes()) == [[h for h, _ in exporter.CSV_COLUMNS]]
+
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            exporter.export(RECORDS, tmp_path / "out", ("xml",))
+
+    def test_slim_records(self, tmp_path):
+        slim = [Record.from_dict(r) for r in RECORDS]
+        a = exporter.export(RECORDS, tmp_path / "dict", ("json", "ndjson", "csv"))
+        b = exporter.export(slim, tmp_path / "slim", ("json", "ndjson", "csv"))
+        for fmt in a:
+            assert a[fmt].read_bytes() == b[fmt].read_bytes()
+
+
+class TestCsv:
+    """Test RFC 4180 CSV."""
+
+    def test_round_trip(self, tmp_path):
+        path = exporter.export(RECORDS, tmp_path / "out", ("csv",))["csv"]
+        rows = read_csv(path.read_bytes())
+        assert rows[1][0] == 'Acme, "The Best" Dumpsters'
+        assert rows[2][0] == "Line\nBreak Bins"
+        assert rows[2][1] == ""
+        assert len(rows) == 3
+
+    def test_quoting(self, tmp_path):
+        data = exporter.export(RECORDS[:1], tmp_path / "out", ("csv",))["csv"].read_bytes()
+        assert data.endswith(b'"Austin","Texas",4.8,120,0.9\r\n')
+        assert b'"Acme, ""The Best"" Dumpsters"' in data
+
+    def test_custom_columns(self, tmp_path):
+        columns = [("name", "name"), ("upper_state", lambda r: r["state"].upper())]
+        path = exporter.export(RECORDS, tmp_path / "out", ("csv",), columns)["csv"]
+        assert [row[1] for row in read_csv(path.read_bytes())] == ["upper_state", "TEXAS", "OHIO"]
+
+
+class TestCompression:
+    """Test compressed outputs."""
+
+    @pytest.mark.parametrize("threads", [True, False])
+    def test_gzip(self, tmp_path, threads, monkeypatch):
+        monkeypatch.setattr(exporter, "CHUNK", 64)  # several chunks per file
+        records = RECORDS * 50
+        paths = exporter.export(records, tmp_path / "out", ("json", "csv", "cols"), compress="gz", threads=threads)
+        assert paths["json"].name == "out.json.gz"
+        assert paths["cols"].name == "out.cols"
+        assert gzip.decompress(paths["json"].read_bytes()) == jsonio.dumps(records, pretty=True)
+        assert jsonio.load(paths["json"]) == records
+        assert len(read_csv(gzip.decompress(paths["csv"].read_bytes()))) == 101
+
+    def test_gzip_reproducible(self, tmp_path):
+        a = exporter.export(RECORDS, tmp_path / "a", ("json",), compress="gz")["json"]
+        b = exporter.export(RECORDS, tmp_path / "b", ("json",), compress="gz")["json"]
+        assert a.read_bytes() == b.read_bytes()
+
+    def test_zstd(self, tmp_path):
+        pytest.importorskip("zstandard")
+        path = exporter.export(RECORDS, tmp_path / "out", ("json",), compress="zst")["json"]
+        assert jsonio.load(path) == RECORDS
+
+    def test_zstd_missing(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(exporter, "zstandard", None)
+        with pytest.raises(RuntimeError):
+            exporter.export(RECORDS, tmp_path / "out", ("json",), compress="zst")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
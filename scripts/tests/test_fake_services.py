@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Test suite for fake_services.py - local OutScraper/Yelp/website stand-ins
+Tests cover: query results, Yelp conversion, site behaviour mix, latency
+percentiles, live server endpoints (with aiohttp), website validation e2e
+"""
+
+import json
+import pytest
+import sys
+import urllib.error
+import urllib.request
+from collections import Counter
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fake_services import FakeServices, latency_summary, percentile, yelp_business
+
+
+def record(n, state="Texas", code="TX", city="Austin"):
+    return {"place_id": f"p{n}", "name": f"Dumpster Co {n}", "state": state, "state_code": code,
+            "city": city, "phone": "+1 512-555-0100", "subtypes": "Dumpster rental service, Waste service",
+            "street": f"{n} Main St", "postal_code": "78701", "latitude": 30.2, "longitude": -97.7,
+            "business_status": "OPERATIONAL", "rating": 4.5, "reviews": 10}
+
+
+RECORDS = [record(n) for n in range(30)] + [record(n, "Ohio", "OH", "Columbus") for n in range(30, 40)]
+
+
+class TestQueryResults:
+    """Test which records a search query returns."""
+
+    def test_matches_trailing_state_name(self):
+        services = FakeServices(RECORDS)
+        results = services.query_results("dumpster rental Texas", 400)
+        assert len(results) == 30
+        assert {r["state"] for r in results} == {"Texas"}
+
+    def test_multi_word_state_and_code(self):
+        services = FakeServices([record(1, "New York", "NY", "Buffalo")])
+        assert len(services.query_results("roll off container rental New York", 10)) == 1
+        assert len(services.query_results("dumpster NY", 10)) == 1
+
+    def test_limit_and_overlap(self):
+        services = FakeServices(RECORDS)
+        a = services.query_results("dumpster rental Texas", 20)
+        b = services.query_results("construction dumpster Texas", 20)
+        assert len(a) == len(b) == 20
+        assert a != b
+
+
+class TestYelpBusiness:
+    """Test conversion of raw records to Yelp search results."""
+
+    def test_shape(self):
+        biz = yelp_business(record(7))
+        assert biz["id"] == "fake-p7"
+        assert biz["location"]["state"] == "TX"
+        assert biz["location"]["zip_code"] == "78701"
+        assert biz["phone"] == "+15125550100"
+        assert biz["display_phone"] == "+1 512-555-0100"
+        assert [c["title"] for c in biz["categories"]] == ["Dumpster rental service", "Waste service"]
+        assert biz["is_closed"] is False
+
+
+class TestSiteKinds:
+    """Test the website farm's behaviour mix."""
+
+    def test_stable_per_site(self):
+        a, b = FakeServices([]), FakeServices([])
+        assert [a.site_kind(str(n)) for n in range(100)] == [b.site_kind(str(n)) for n in range(100)]
+
+    def test_mix_roughly_matches_config(self):
+        services = FakeServices([], {"site_mix": {"error": 0.2, "head_405": 0.1}})
+        kinds = Counter(services.site_kind(str(n)) for n in range(5000))
+        assert 0.17 < kinds["error"] / 5000 < 0.23
+        assert 0.08 < kinds["head_405"] / 5000 < 0.12
+        assert set(kinds) == {"ok", "error", "head_405"}
+
+
+class TestLatencySummary:
+    """Test percentile reporting."""
+
+    def test_percentiles(self):
+        values = [i / 1000 for i in range(1, 101)]
+        assert percentile(values, 0.5) == pytest.approx(0.051)
+        s = latency_summary(values)
+        assert s["count"] == 100
+        assert s["p99_ms"] == 99.0
+        assert s["max_ms"] == 100.0
+
+    def test_empty(self):
+        assert latency_summary([])["p50_ms"] == 0
+
+
+# =============================================================================
+# Live server (needs aiohttp)
+# =============================================================================
+
+@pytest.fixture
+def services():
+    pytest.importorskip("aiohttp")
+    config = {"latency_ms": 0, "yelp_429_rate": 0, "pending_polls": 1, "hang_seconds": 30,
+              "site_mix": {"head_405": 0.25, "redirect": 0.25, "error": 0.25}}
+    with FakeServices(RECORDS, config) as s:
+        yield s
+
+
+def fetch(url, method="GET", body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            return resp.status, resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def site_of_kind(services, kind):
+    return next(str(n) for n in range(1000) if services.site_kind(str(n)) == kind)
+
+
+class TestServer:
+    """Test the endpoints over HTTP."""
+
+    def test_outscraper_submit_then_poll(self, services):
+        status, body = fetch(f"{services.url}/maps/search-v3", "POST",
+                             {"query": ["dumpster rental Ohio"], "limit": 400})
+        task = json.loads(body)
+        assert status == 200 and task["status"] == "Pending"
+
+        first = json.loads(fetch(f"{services.url}/requests/{task['id']}")[1])
+        second = json.loads(fetch(f"{services.url}/requests/{task['id']}")[1])
+        assert first["status"] == "Pending"
+        assert second["status"] == "Success"
+        assert {r["place_id"] for r in second["data"]} == {f"p{n}" for n in range(30, 40)}
+
+    def test_yelp_paging_and_detail(self, services):
+        url = f"{services.url}/v3/businesses/search?term=dumpster&location=Austin,%20TX&limit=20&offset=20"
+        status, body = fetch(url)
+        page = json.loads(body)
+        assert status == 200
+        assert page["total"] == 30
+        assert len(page["businesses"]) == 10
+
+        status, body = fetch(f"{services.url}/v3/businesses/fake-p3")
+        assert status == 200
+        assert json.loads(body)["hours"][0]["open"]
+        assert fetch(f"{services.url}/v3/businesses/missing")[0] == 404
+
+    def test_yelp_rate_limit(self, services):
+        services.config["yelp_429_rate"] = 1.0
+        assert fetch(f"{services.url}/v3/businesses/search?location=Austin,%20TX")[0] == 429
+
+    def test_head_quirk(self, services):
+        site = site_of_kind(services, "head_405")
+        assert fetch(f"{services.url}/site/{site}", "HEAD")[0] == 405
+        assert fetch(f"{services.url}/site/{site}")[0] == 200
+
+    def test_redirect_and_error(self, services):
+        status, body = fetch(f"{services.url}/site/{site_of_kind(services, 'redirect')}")
+        assert status == 200 and b"Provider" in body
+        assert fetch(f"{services.url}/site/{site_of_kind(services, 'error')}")[0] >= 500
+
+    def test_metrics_per_endpoint(self, services):
+        fetch(f"{services.url}/v3/businesses/fake-p1")
+        fetch(f"{services.url}/v3/businesses/missing")
+        summary = services.summary()
+        assert summary["yelp_detail"]["count"] == 2
+        assert summary["yelp_detail"]["statuses"] == {200: 1, 404: 1}
+
+
+class TestWebsiteValidationE2E:
+    """Drive validate_and_clean.validate_websites against the farm."""
+
+    def test_outcomes_follow_site_kinds(self, services):
+        from e2e_benchmark import run_websites
+        result = run_websites(services, None, sites=40, concurrency=8)
+        assert result["latency"]["count"] == 40
+        kinds = Counter(services.site_kind(str(n)) for n in range(40))
+        assert result["false_unreachable"] == kinds["head_405"]
+        assert result["outcomes"].get("redirect:up", 0) == kinds["redirect"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
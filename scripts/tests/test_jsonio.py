@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test suite for jsonio.py - shared JSON I/O
+Tests cover: dumps/loads on every available backend, compressed paths,
+decode errors, to_dict objects
+"""
+
+import gzip
+import json
+import pytest
+import sys
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import jsonio
+
+DOC = {
+    "name": "Café Dumpsters – 24/7",
+    "rating": 4.5,
+    "reviews": 120,
+    "verified": True,
+    "phone": None,
+    "tags": ["roll off", "10 yard"],
+    "about": {"Service options": {"Onsite services": True}, "empty": {}},
+    "none": [],
+}
+
+
+@pytest.fixture(params=["fast", "stdlib"])
+def backend(request, monkeypatch):
+    """Run a test on the installed fast backend and on the stdlib fallback."""
+    if request.param == "stdlib":
+        monkeypatch.setattr(jsonio, "orjson", None)
+        monkeypatch.setattr(jsonio, "msgspec", None)
+    return request.param
+
+
+class TestDumps:
+    """Test serialization."""
+
+    def test_compact(self, backend):
+        assert jsonio.dumps(DOC) == json.dumps(DOC, separators=(",", ":"), ensure_ascii=False).encode()
+
+    def test_pretty_matches_indent_2(self, backend):
+        assert jsonio.dumps(DOC, pretty=True) == json.dumps(DOC, indent=2, ensure_ascii=False).encode()
+
+    def test_sort_keys(self, backend):
+        assert jsonio.dumps({"b": 1, "a": 2}, sort_keys=True) == b'{"a":2,"b":1}'
+
+    def test_non_str_keys(self, backend):
+        assert jsonio.loads(jsonio.dumps({1: "a"})) == {"1": "a"}
+
+    def test_big_int(self, backend):
+        assert jsonio.loads(jsonio.dumps({"n": 2 ** 70})) == {"n": 2 ** 70}
+
+    def test_to_dict_objects(self, backend):
+        class Thing:
+            def to_dict(self):
+                return {"x": 1}
+
+        assert jsonio.dumps([Thing()]) == b'[{"x":1}]'
+
+    def test_unserializable(self, backend):
+        with pytest.raises(TypeError):
+            jsonio.dumps({"x": object()})
+
+
+class TestLoads:
+    """Test parsing."""
+
+    def test_round_trip(self, backend):
+        assert jsonio.loads(jsonio.dumps(DOC)) == DOC
+        assert jsonio.loads(json.dumps(DOC)) == DOC
+
+    def test_decode_error(self, backend):
+        with pytest.raises(jsonio.JSONDecodeError):
+            jsonio.loads('{"torn": ')
+        with pytest.raises(ValueError):
+            jsonio.loads(b"not json")
+
+
+class TestFiles:
+    """Test load/dump with compression by extension."""
+
+    def test_plain(self, tmp_path):
+        path = tmp_path / "doc.json"
+        jsonio.dump(DOC, path)
+        assert path.read_bytes() == jsonio.dumps(DOC, pretty=True)
+        assert jsonio.load(path) == DOC
+
+    def test_compact_file(self, tmp_path):
+        path = tmp_path / "doc.json"
+        jsonio.dump(DOC, path, pretty=False)
+        assert b"\n" not in path.read_bytes()
+
+    def test_gzip_round_trip(self, tmp_path):
+        path = tmp_path / "doc.json.gz"
+        jsonio.dump(DOC, path)
+        assert gzip.decompress(path.read_bytes()) == jsonio.dumps(DOC, pretty=True)
+        assert jsonio.load(path) == DOC
+
+    def test_gzip_reproducible(self, tmp_path):
+        jsonio.dump(DOC, tmp_path / "a.json.gz")
+        jsonio.dump(DOC, tmp_path / "b.json.gz")
+        assert (tmp_path / "a.json.gz").read_bytes() == (tmp_path / "b.json.gz").read_bytes()
+
+    def test_zstd_round_trip(self, tmp_path):
+        pytest.importorskip("zstandard")
+        path = tmp_path / "doc.json.zst"
+        jsonio.dump(DOC, path)
+        assert jsonio.load(path) == DOC
+
+    def test_zstd_missing(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(jsonio, "zstandard", None)
+        with pytest.raises(RuntimeError):
+            jsonio.dump(DOC, tmp_path / "doc.json.zst")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
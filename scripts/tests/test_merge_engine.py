@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Test suite for merge_engine.py - indexed provider merging
+Tests cover: normalize_name, normalize_phone, website_domain, match_keys, MergeEngine
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from merge_engine import (
+    normalize_name, normalize_phone, website_domain, geo_cell,
+    match_keys, MergeEngine, enrich
+)
+
+
+# =============================================================================
+# Normalization Tests
+# =============================================================================
+
+class TestNormalizeName:
+    """Test legal-suffix-aware name normalization."""
+
+    def test_strips_trailing_llc(self):
+        assert normalize_name("ABC Dumpsters LLC") == "abc dumpsters"
+
+    def test_strips_dotted_suffix(self):
+        assert normalize_name("ABC Dumpsters, L.L.C.") == "abc dumpsters"
+
+    def test_strips_multiple_suffixes(self):
+        assert normalize_name("Smith Hauling Co. Inc") == "smith hauling"
+
+    def test_keeps_inc_inside_words(self):
+        assert normalize_name("Incredible Hauling Inc.") == "incredible hauling"
+
+    def test_keeps_suffix_only_name(self):
+        assert normalize_name("Company") == "company"
+
+    def test_ampersand_becomes_and(self):
+        assert normalize_name("Joe & Sons") == normalize_name("Joe and Sons")
+
+    def test_none(self):
+        assert normalize_name(None) == ""
+
+
+class TestNormalizePhone:
+    """Test phone normalization used for matching."""
+
+    def test_formats_collapse(self):
+        assert normalize_phone("(555) 123-4567") == normalize_phone("+1 555.123.4567")
+
+    def test_rejects_short_numbers(self):
+        assert normalize_phone("123-4567") == ""
+
+    def test_none(self):
+        assert normalize_phone(None) == ""
+
+
+class TestWebsiteDomain:
+    """Test website domain extraction."""
+
+    def test_strips_scheme_www_and_path(self):
+        assert website_domain("https://www.abcdumpsters.com/quote?x=1") == "abcdumpsters.com"
+
+    def test_ignores_shared_domains(self):
+        assert website_domain("https://www.yelp.com/biz/abc") == ""
+        assert website_domain("https://m.facebook.com/abc") == ""
+
+    def test_empty(self):
+        assert website_domain("") == ""
+
+
+class TestMatchKeys:
+    """Test index key construction."""
+
+    def test_name_zip_uses_postal_code(self):
+        keys = match_keys({"name": "ABC LLC", "postal_code": "34102-1234"})
+        assert keys["name_zip"] == "abc|34102"
+
+    def test_name_city_state(self):
+        keys = match_keys({"name": "ABC", "city": "Naples", "state": "FL"})
+        assert keys["name_city"] == "abc|naples|fl"
+
+    def test_geo_cell_from_latitude_longitude(self):
+        keys = match_keys({"name": "ABC", "latitude": 26.142, "longitude": -81.795})
+        assert keys["name_geo"] == ("abc", geo_cell(26.142, -81.795))
+
+    def test_no_keys_for_empty_record(self):
+        assert match_keys({}) == {}
+
+
+# =============================================================================
+# MergeEngine Tests
+# =============================================================================
+
+class TestMergeEngine:
+    """Test matching and enrichment across sources."""
+
+    def test_same_name_different_states_not_merged(self):
+        engine = MergeEngine()
+        engine.load([{"name": "Dumpster Depot", "city": "Columbus", "state": "OH"}])
+        stats = engine.merge([{"name": "Dumpster Depot", "city": "Austin", "state": "TX"}], "yelp")
+        assert stats["added"] == 1
+        assert len(engine.providers) == 2
+
+    def test_matches_by_phone(self):
+        engine = MergeEngine()
+        engine.load([{"name": "ABC Dumpsters", "phone": "(555) 123-4567"}])
+        stats = engine.merge([{"name": "ABC Roll-Off", "phone": "555-123-4567"}], "yelp")
+        assert stats["matched_by"]["phone"] == 1
+        assert len(engine.providers) == 1
+
+    def test_matches_by_name_zip_with_suffix(self):
+        engine = MergeEngine()
+        engine.load([{"name": "ABC Dumpsters LLC", "zip": "34102"}])
+        stats = engine.merge([{"name": "ABC Dumpsters", "zip": "34102"}], "yelp")
+        assert stats["matched_by"]["name_zip"] == 1
+
+    def test_matches_by_domain(self):
+        engine = MergeEngine()
+        engine.load([{"name": "ABC", "website": "https://abc.com"}])
+        stats = engine.merge([{"name": "Other", "website": "http://www.abc.com/contact"}], "yelp")
+        assert stats["matched_by"]["domain"] == 1
+
+    def test_shared_domain_does_not_match(self):
+        engine = MergeEngine()
+        engine.load([{"name": "ABC", "website": "https://yelp.com/biz/abc"}])
+        stats = engine.merge([{"name": "XYZ", "website": "https://yelp.com/biz/xyz"}], "yelp")
+        assert stats["added"] == 1
+
+    def test_matches_by_geo_cell_across_boundary(self):
+        engine = MergeEngine()
+        engine.load([{"name": "ABC", "lat": 26.1419999, "lng": -81.795}])
+        stats = engine.merge([{"name": "ABC", "lat": 26.1420001, "lng": -81.795}], "yelp")
+        assert stats["matched_by"]["name_geo"] == 1
+
+    def test_same_name_different_zip_and_phone_not_merged(self):
+        engine = MergeEngine()
+        engine.load([{"name": "ABC Dumpsters", "zip": "77001", "phone": "713-555-0100",
+                      "city": "Houston", "state": "TX"}])
+        stats = engine.merge([{"name": "ABC Dumpsters LLC", "zip": "77090", "phone": "281-555-0199",
+                               "city": "Houston", "state": "TX"}], "yelp")
+        assert stats["added"] == 1
+
+    def test_name_city_used_when_zip_missing(self):
+        engine = MergeEngine()
+        engine.load([{"name": "ABC Dumpsters", "zip": "77001", "city": "Houston", "state": "TX"}])
+        stats = engine.merge([{"name": "ABC Dumpsters", "city": "Houston", "state": "TX"}], "yelp")
+        assert stats["matched_by"]["name_city"] == 1
+
+    def test_conflicting_phone_blocks_name_zip(self):
+        engine = MergeEngine()
+        engine.load([{"name": "ABC", "zip": "34102", "phone": "5551234567"}])
+        stats = engine.merge([{"name": "ABC", "zip": "34102", "phone": "5559876543"}], "yelp")
+        assert stats["added"] == 1
+
+    def test_chain_locations_sharing_domain_not_merged(self):
+        engine = MergeEngine()
+        engine.load([{"name": "Bin There Austin", "zip": "78701", "website": "https://binthere.com/austin"}])
+        stats = engine.merge([{"name": "Bin There Dallas", "zip": "75201",
+                               "website": "https://binthere.com/dallas"}], "yelp")
+        assert stats["added"] == 1
+
+    def test_dedups_within_incoming_source(self):
+        engine = MergeEngine()
+        stats = engine.merge([
+            {"name": "ABC", "phone": "5551234567"},
+            {"name": "ABC", "phone": "5551234567"},
+        ], "yelp")
+        assert stats["added"] == 1
+
+    def test_enrich_fills_empty_fields_only(self):
+        engine = MergeEngine()
+        engine.load([{"name": "ABC", "phone": "5551234567", "rating": 4.0, "yelp_url": None}])
+        engine.merge([{"name": "ABC", "phone": "5551234567", "rating": 3.0,
+                       "yelp_url": "https://yelp.com/biz/abc"}], "yelp")
+        assert engine.providers[0]["rating"] == 4.0
+        assert engine.providers[0]["yelp_url"] == "https://yelp.com/biz/abc"
+
+    def test_fill_limits_enriched_fields(self):
+        engine = MergeEngine()
+        engine.load([{"name": "ABC", "phone": "5551234567", "notes": None, "yelp_url": None}])
+        engine.merge([{"name": "ABC", "phone": "5551234567", "notes": "from yelp",
+                       "yelp_url": "https://yelp.com/biz/abc"}], "yelp", fill=("yelp_url",))
+        assert engine.providers[0]["notes"] is None
+        assert engine.providers[0]["yelp_url"] == "https://yelp.com/biz/abc"
+
+    def test_overwrite_fields(self):
+        engine = MergeEngine()
+        engine.load([{"name": "ABC", "phone": "5551234567", "yelp_rating": 3.0}])
+        engine.merge([{"name": "ABC", "phone": "5551234567", "yelp_rating": 4.5}],
+                     "yelp", overwrite=("yelp_rating",))
+        assert engine.providers[0]["yelp_rating"] == 4.5
+
+    def test_convert_applied_before_matching(self):
+        engine = MergeEngine()
+        engine.load([{"name": "ABC", "zip": "34102"}])
+        stats = engine.merge([{"title": "ABC", "postal": "34102"}], "other",
+                             convert=lambda r: {"name": r["title"], "zip": r["postal"]})
+        assert stats["matched_by"]["name_zip"] == 1
+
+    def test_track_sources(self):
+        engine = MergeEngine(track_sources=True)
+        engine.load([{"name": "ABC", "phone": "5551234567"}], source="google")
+        engine.merge([{"name": "ABC", "phone": "5551234567"}], "yelp")
+        assert engine.providers[0]["sources"] == ["google", "yelp"]
+
+    def test_sources_not_added_by_default(self):
+        engine = MergeEngine()
+        engine.load([{"name": "ABC"}])
+        assert "sources" not in engine.providers[0]
+
+    def test_report_counts(self):
+        engine = MergeEngine()
+        engine.load([{"name": "ABC", "phone": "5551234567"}])
+        engine.merge([{"name": "ABC", "phone": "5551234567"}, {"name": "XYZ"}], "yelp")
+        report = engine.report()
+        assert report["total"] == 2
+        assert report["sources"]["yelp"]["incoming"] == 2
+        assert report["sources"]["yelp"]["added"] == 1
+
+
+class TestEnrich:
+    """Test field-level enrichment."""
+
+    def test_returns_false_when_nothing_changes(self):
+        assert enrich({"a": 1}, {"a": 2}) is False
+
+    def test_ignores_empty_incoming(self):
+        existing = {"a": None}
+        assert enrich(existing, {"a": ""}) is False
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test suite for pipeline.py - dependency-aware pipeline runner
+Tests cover: stage selection, fingerprint skipping, dependency invalidation, failures,
+stage input globs
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pipeline
+from pipeline import Stage
+
+
+def touch_stage(name, inputs, output, deps=(), manual=False, fail=False):
+    """Stage that appends its name to runs.log and writes its output file."""
+    code = (
+        "import sys, pathlib; "
+        f"pathlib.Path('runs.log').open('a').write('{name}\\n'); "
+        f"pathlib.Path('{output}').write_text('{name}'); "
+        f"sys.exit({1 if fail else 0})"
+    )
+    return Stage(name, [sys.executable, "-c", code], inputs=inputs, outputs=[output],
+                 deps=deps, manual=manual)
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "ROOT", tmp_path)
+    monkeypatch.setattr(pipeline, "STATE_FILE", tmp_path / "state.json")
+    (tmp_path / "raw.json").write_text("[1]")
+    stages = [
+        touch_stage("pull", [], "raw.json", manual=True),
+        touch_stage("clean", ["raw.json"], "clean.json", deps=["pull"]),
+        touch_stage("export", ["clean.json"], "export.json", deps=["clean"]),
+        touch_stage("render", ["pages/*.html"], "render.done"),
+    ]
+    monkeypatch.setattr(pipeline, "STAGES", stages)
+    return tmp_path
+
+
+def runs(tree):
+    log = tree / "runs.log"
+    return log.read_text().split() if log.exists() else []
+
+
+class TestSelectStages:
+    """Test which stages a target list expands to."""
+
+    def test_default_excludes_manual(self, tree):
+        assert [s.name for s in pipeline.select_stages([])] == ["clean", "export", "render"]
+
+    def test_target_pulls_in_dependencies(self, tree):
+        assert [s.name for s in pipeline.select_stages(["export"])] == ["clean", "export"]
+
+    def test_manual_stage_included_when_named(self, tree):
+        assert "pull" in [s.name for s in pipeline.select_stages(["pull", "clean"])]
+
+    def test_unknown_stage(self, tree):
+        with pytest.raises(SystemExit):
+            pipeline.select_stages(["nope"])
+
+
+class TestRun:
+    """Test fingerprint-based skipping."""
+
+    def test_first_run_runs_everything(self, tree):
+        assert pipeline.run([])
+        assert sorted(runs(tree)) == ["clean", "export", "render"]
+
+    def test_noop_rerun_skips_everything(self, tree):
+        pipeline.run([])
+        pipeline.run([])
+        assert len(runs(tree)) == 3
+
+    def test_changed_input_reruns_stage_and_dependents(self, tree):
+        pipeline.run([])
+        (tree / "raw.json").write_text("[1, 2]")
+        pipeline.run([])
+        assert runs(tree)[3:] == ["clean", "export"]
+
+    def test_missing_output_reruns(self, tree):
+        pipeline.run([])
+        (tree / "export.json").unlink()
+        pipeline.run([])
+        assert runs(tree)[3:] == ["export"]
+
+    def test_force(self, tree):
+        pipeline.run([])
+        pipeline.run(["render"], force=True)
+        assert runs(tree)[3:] == ["render"]
+
+    def test_shared_file_rewritten_downstream_settles(self, tree, monkeypatch):
+        # Both stages read and rewrite the same file, each with different content
+        (tree / "providers.json").write_text("{}")
+        monkeypatch.setattr(pipeline, "STAGES", [
+            touch_stage("merge", ["providers.json"], "providers.json"),
+            touch_stage("clean", ["providers.json"], "providers.json", deps=["merge"]),
+        ])
+        for _ in range(3):
+            pipeline.run([])
+        assert runs(tree) == ["merge", "clean"]
+
+    def test_failure_skips_dependents(self, tree, monkeypatch):
+        stages = list(pipeline.STAGES)
+        stages[1] = touch_stage("clean", ["raw.json"], "clean.json", deps=["pull"], fail=True)
+        monkeypatch.setattr(pipeline, "STAGES", stages)
+        assert not pipeline.run(["export"])
+        assert runs(tree) == ["clean"]
+
+
+
+class TestStageInputs:
+    """Test the real stage definitions."""
+
+    def test_snapshot_readers_ignore_validate_output(self, tmp_path):
+        cleaned = tmp_path / "data" / "cleaned"
+        cleaned.mkdir(parents=True)
+        for name in ("all_providers_20260101.json", "all_providers_20260101.cols",
+                     "all_providers_20260101_1200.json"):
+            (cleaned / name).write_text("[]")
+        stages = {s.name: s for s in pipeline.STAGES}
+        for name in ("city-pages", "zip-index"):
+            matched = {p.name for pattern in stages[name].inputs for p in tmp_path.glob(pattern)}
+            assert "all_providers_20260101.json" in matched
+            assert "all_providers_20260101_1200.json" not in matched
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
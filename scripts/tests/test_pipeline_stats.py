@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test suite for pipeline_stats.py - per-stage instrumentation
+Tests cover: StageTimer, load_filter_score, prometheus_text, export_prometheus
+"""
+
+import json
+import pytest
+import sys
+import tracemalloc
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from collections import defaultdict
+
+from pipeline_stats import StageTimer, load_filter_score, prometheus_text, export_prometheus
+from profiling import NullProfiler, Profiler
+
+
+class TestStageTimer:
+    """Test stage metric collection."""
+
+    def test_records_metrics(self):
+        stats = {"by_state": {}}
+        timer = StageTimer(stats, track_memory=True)
+        with timer.stage("score", records=1000):
+            sum(range(10000))
+        timer.close()
+        s = stats["stages"]["score"]
+        assert s["records"] == 1000
+        assert s["wall_seconds"] >= 0
+        assert s["cpu_seconds"] >= 0
+        assert s["peak_memory_bytes"] > 0
+        assert "by_state" in stats
+
+    def test_records_set_inside_stage(self):
+        stats = {}
+        timer = StageTimer(stats, track_memory=False)
+        with timer.stage("load") as m:
+            m["records"] = 42
+        assert stats["stages"]["load"]["records"] == 42
+        assert "peak_memory_bytes" not in stats["stages"]["load"]
+
+    def test_peak_is_per_stage(self):
+        stats = {}
+        timer = StageTimer(stats, track_memory=True)
+        with timer.stage("big"):
+            blob = bytearray(5_000_000)
+            del blob
+        with timer.stage("small"):
+            pass
+        timer.close()
+        assert stats["stages"]["big"]["peak_memory_bytes"] > stats["stages"]["small"]["peak_memory_bytes"]
+
+    def test_close_stops_tracing_it_started(self):
+        timer = StageTimer({}, track_memory=True)
+        with timer.stage("x"):
+            pass
+        timer.close()
+        assert not tracemalloc.is_tracing()
+
+    def test_memory_tracking_off_by_default(self):
+        stats = {}
+        timer = StageTimer(stats)
+        with timer.stage("x"):
+            assert not tracemalloc.is_tracing()
+        timer.close()
+        assert "peak_memory_bytes" not in stats["stages"]["x"]
+
+    def test_memory_tracking_off_while_profiling(self, tmp_path):
+        assert not StageTimer({}, track_memory=True, profiler=Profiler("t", tmp_path)).track_memory
+        assert StageTimer({}, track_memory=True, profiler=NullProfiler()).track_memory
+
+    def test_repeated_stage_accumulates(self):
+        stats = {}
+        timer = StageTimer(stats, track_memory=False)
+        for n in (10, 20, 30):
+            with timer.stage("load", records=n):
+                sum(range(1000))
+        timer.close()
+        s = stats["stages"]["load"]
+        assert s["records"] == 60
+        assert set(s) == {"wall_seconds", "cpu_seconds", "records", "records_per_second"}
+
+    def test_profiler_files_written_outside_stage(self, tmp_path):
+        profiler = Profiler("t", tmp_path)
+        timer = StageTimer({}, profiler=profiler)
+        with timer.stage("x"):
+            sum(range(1000))
+        assert not profiler.output_dir.exists()
+        profiler.finish()
+        assert (profiler.output_dir / "x.pstats").exists()
+
+    def test_stage_recorded_on_exception(self):
+        stats = {}
+        timer = StageTimer(stats, track_memory=False)
+        with pytest.raises(ValueError):
+            with timer.stage("boom"):
+                raise ValueError()
+        assert "boom" in stats["stages"]
+
+
+class TestLoadFilterScore:
+    """Test the shared per-file load/filter/score pass."""
+
+    def test_per_file_pass(self, tmp_path):
+        (tmp_path / "ohio.json").write_text(json.dumps([{"name": "a"}, {"name": ""}]))
+        (tmp_path / "new_york.json").write_text(json.dumps([{"name": "b"}]))
+        (tmp_path / "pull_summary.json").write_text("{}")
+        stats = {"total_raw": 0, "removed": defaultdict(int), "by_state": {}}
+        timer = StageTimer(stats, track_memory=False)
+
+        kept = load_filter_score(tmp_path, stats, timer,
+                                 lambda r: (not r["name"], "missing_name"), lambda r: 0.5)
+        timer.close()
+        assert [(r["name"], r["_source_state"]) for r in kept] == [("b", "New York"), ("a", "Ohio")]
+        assert stats["total_raw"] == 3
+        assert stats["total_after_filter"] == 2
+        assert stats["removed"] == {"missing_name": 1}
+        assert stats["by_state"]["Ohio"] == {"raw": 2, "kept": 1, "removed": {"missing_name": 1}}
+        assert stats["stages"]["load"]["records"] == 3
+        assert stats["stages"]["score"]["records"] == 2
+
+
+class TestPrometheus:
+    """Test textfile export."""
+
+    STATS = {
+        "total_raw": 10,
+        "total_clean": 8,
+        "stages": {"dedup": {"wall_seconds": 0.5, "cpu_seconds": 0.4, "records": 10,
+                             "records_per_second": 20.0, "peak_memory_bytes": 1024}},
+    }
+
+    def test_text_format(self):
+        text = prometheus_text(self.STATS, "clean_data")
+        assert '# TYPE dumpstermap_stage_wall_seconds gauge' in text
+        assert 'dumpstermap_stage_wall_seconds{script="clean_data",stage="dedup"} 0.5' in text
+        assert 'dumpstermap_total_clean{script="clean_data"} 8' in text
+
+    def test_export_disabled_without_path(self):
+        assert export_prometheus(self.STATS, "clean_data", None) is None
+
+    def test_export_writes_file(self, tmp_path):
+        path = export_prometheus(self.STATS, "clean_data", str(tmp_path / "dumpstermap.prom"))
+        assert path.read_text() == prometheus_text(self.STATS, "clean_data")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
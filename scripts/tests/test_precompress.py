@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test suite for precompress.py - pre-compressed static assets
+Tests cover: gzip/brotli siblings, skipping unchanged files, touched
+files, small and incompressible files, orphaned siblings
+"""
+
+import gzip
+import os
+import pytest
+import sys
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import precompress
+
+PAGE = ("<html><body>" + "<p>Dumpster rental in Austin, TX</p>\n" * 200 + "</body></html>").encode()
+
+
+@pytest.fixture
+def site(tmp_path):
+    (tmp_path / "dumpster-rental").mkdir()
+    for name in ("austin-tx.html", "naples-fl.html"):
+        (tmp_path / "dumpster-rental" / name).write_bytes(PAGE)
+    (tmp_path / "index.html").write_bytes(PAGE)
+    (tmp_path / "tiny.html").write_bytes(b"<p>hi</p>")
+    return tmp_path
+
+
+def run(root: Path, state: dict, **kwargs) -> list:
+    files = precompress.sources(root, ["*.html", "dumpster-rental/*.html"])
+    return [r["name"] for r in precompress.precompress_all(files, state, root=root, jobs=2, **kwargs)]
+
+
+class TestPrecompress:
+    """Test sibling generation and change detection."""
+
+    def test_writes_siblings(self, site):
+        state = {"files": {}}
+        assert len(run(site, state)) == 4
+        gz = site / "dumpster-rental" / "austin-tx.html.gz"
+        assert gzip.decompress(gz.read_bytes()) == PAGE
+        assert gz.read_bytes() == gzip.compress(PAGE, 9, mtime=0)
+        assert not (site / "tiny.html.gz").exists()
+        if precompress.brotli:
+            assert precompress.brotli.decompress((site / "index.html.br").read_bytes()) == PAGE
+
+    def test_skips_unchanged(self, site):
+        state = {"files": {}}
+        run(site, state)
+        assert run(site, state) == []
+        (site / "index.html").write_bytes(PAGE + b"\n")
+        assert run(site, state) == ["index.html"]
+        assert gzip.decompress((site / "index.html.gz").read_bytes()) == PAGE + b"\n"
+
+    def test_touched_file_is_not_recompressed(self, site):
+        state = {"files": {}}
+        run(site, state)
+        path = site / "index.html"
+        os.utime(path, ns=(1, 1))
+        assert run(site, state) == []
+        assert state["files"]["index.html"]["mtime_ns"] == 1
+
+    def test_missing_sibling_is_rewritten(self, site):
+        state = {"files": {}}
+        run(site, state)
+        (site / "dumpster-rental" / "naples-fl.html.gz").unlink()
+        assert run(site, state) == ["dumpster-rental/naples-fl.html"]
+        assert (site / "dumpster-rental" / "naples-fl.html.gz").exists()
+
+    def test_force(self, site):
+        state = {"files": {}}
+        run(site, state)
+        assert len(run(site, state, force=True)) == 4
+
+    def test_incompressible_file_gets_no_sibling(self, site):
+        (site / "noise.html").write_bytes(os.urandom(4096))
+        run(site, {"files": {}})
+        assert not (site / "noise.html.gz").exists()
+
+    def test_removed_sources(self, site):
+        state = {"files": {}}
+        run(site, state)
+        (site / "index.html").unlink()
+        run(site, state)
+        assert "index.html" not in state["files"]
+        assert precompress.remove_orphans(site, ["*.html"]) == [site / "index.html.gz"]
+        assert not (site / "index.html.gz").exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test suite for prerender-city-seo.py - change-aware page prerendering
+Tests cover: single-pass slot rewriting, rendering, write-only-on-change,
+skipping unchanged pages, config and template invalidation, process pool
+"""
+
+import importlib.util
+import os
+import pytest
+import shutil
+import sys
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+SCRIPT = Path(__file__).parent.parent / "prerender-city-seo.py"
+spec = importlib.util.spec_from_file_location("prerender_city_seo", SCRIPT)
+prerender = importlib.util.module_from_spec(spec)
+sys.modules["prerender_city_seo"] = prerender  # worker processes unpickle render_file by module name
+spec.loader.exec_module(prerender)
+
+PAGES = ["naples-fl.html", "austin-tx.html", "al.html"]
+
+
+@pytest.fixture
+def pages(tmp_path):
+    for name in PAGES:
+        shutil.copy(prerender.CITY_DIR / name, tmp_path / name)
+    return tmp_path
+
+
+def run(pages: Path, state: dict, **kwargs) -> dict:
+    results = prerender.prerender_all(sorted(pages.glob("*.html")), state, jobs=1, **kwargs)
+    return {r["name"]: r["status"] for r in results}
+
+
+class TestRewriteSlots:
+    """Test the single-pass slot rewriter."""
+
+    VALUES = {slot: f"[{slot}]" for slot in prerender.SLOT_PATTERNS}
+
+    def test_all_slots(self):
+        html = ('<head><title>Old</title><meta name="description" content="x">'
+                '<link rel="canonical" href="y"><meta property="og:url" content="y">'
+                '<meta property="og:title" content="t"><meta property="og:description" content="d">'
+                '<script type="application/ld+json" id="schema-json">\n{"a": 1}\n</script></head>'
+                '<body><h1 class="big" id="city-title">Old</h1><h1>Other</h1></body>')
+        out, missing = prerender.rewrite_slots(html, self.VALUES)
+        assert missing == []
+        assert out == ("<head>[title][description][canonical][og_url][og_title][og_description][schema]</head>"
+                       "<body>[h1]<h1>Other</h1></body>")
+
+    def test_reports_missing(self):
+        out, missing = prerender.rewrite_slots("<html><title>x</title><h1>y</h1></html>", self.VALUES)
+        assert out == "<html>[title]<h1>y</h1></html>"
+        assert "title" not in missing and "h1" in missing and len(missing) == 7
+
+    def test_values_are_literal(self):
+        out, _ = prerender.rewrite_slots("<title>x</title>", {**self.VALUES, "title": r"\u00f1 \1"})
+        assert out == r"\u00f1 \1"
+
+    def test_matches_sequential_substitution(self, pages):
+        import re
+        html = (pages / "naples-fl.html").read_text()
+        expected = html
+        for slot, pattern in prerender.SLOT_PATTERNS.items():
+            expected = re.sub("<" + pattern, self.VALUES[slot], expected)
+        assert prerender.rewrite_slots(html, self.VALUES)[0] == expected
+
+
+class TestRender:
+    """Test the page rewrite itself."""
+
+    def test_render(self, pages):
+        html, reason, missing = prerender.render((pages / "naples-fl.html").read_text(), "naples-fl")
+        assert reason is None and missing == []
+        assert '<h1 id="city-title">Dumpster Rentals in Naples, Florida</h1>' in html
+        assert 'href="https://dumpstermap.io/dumpster-rental/naples-fl.html"' in html
+
+    def test_no_config(self, pages):
+        assert prerender.render((pages / "al.html").read_text(), "al") == (None, "No CITY_CONFIG found", [])
+
+    def test_idempotent(self, pages):
+        html, _, _ = prerender.render((pages / "naples-fl.html").read_text(), "naples-fl")
+        assert prerender.render(html, "naples-fl")[0] == html
+
+
+class TestChangeAware:
+    """Test that only changed pages are rendered and written."""
+
+    def test_first_run_then_skip(self, pages):
+        state = {"pages": {}}
+        assert run(pages, state) == {"al.html": "failed", "austin-tx.html": "written", "naples-fl.html": "written"}
+        assert run(pages, state) == {}
+
+    def test_unchanged_output_not_rewritten(self, pages):
+        run(pages, {"pages": {}})
+        mtimes = {p.name: p.stat().st_mtime_ns for p in pages.iterdir()}
+        assert set(run(pages, {"pages": {}}).values()) == {"unchanged", "failed"}
+        assert mtimes == {p.name: p.stat().st_mtime_ns for p in pages.iterdir()}
+
+    def test_touched_page_skipped(self, pages):
+        state = {"pages": {}}
+        run(pages, state)
+        os.utime(pages / "naples-fl.html", ns=(1, 1))
+        assert run(pages, state) == {}
+        assert state["pages"]["naples-fl.html"]["mtime_ns"] == 1
+
+    def test_config_change_rerenders(self, pages):
+        state = {"pages": {}}
+        run(pages, state)
+        page = pages / "austin-tx.html"
+        page.write_text(page.read_text().replace('"city":"Austin"', '"city":"Austyn"', 1))
+        assert run(pages, state) == {"austin-tx.html": "written"}
+        assert "Dumpster Rentals in Austyn" in page.read_text()
+
+    def test_template_change_rerenders(self, pages, monkeypatch):
+        state = {"pages": {}}
+        run(pages, state)
+        for page in pages.iterdir():
+            os.utime(page, ns=(1, 1))
+        monkeypatch.setattr(prerender, "TEMPLATE_VERSION", "next")
+        assert set(run(pages, state)) == set(PAGES)
+
+    def test_force(self, pages):
+        state = {"pages": {}}
+        run(pages, state)
+        assert len(run(pages, state, force=True)) == 3
+
+    def test_removed_pages_dropped(self, pages):
+        state = {"pages": {}}
+        run(pages, state)
+        (pages / "al.html").unlink()
+        run(pages, state)
+        assert sorted(state["pages"]) == ["austin-tx.html", "naples-fl.html"]
+
+    def test_process_pool_matches_serial(self, pages, tmp_path_factory):
+        serial = tmp_path_factory.mktemp("serial")
+        for p in pages.iterdir():
+            shutil.copy(p, serial / p.name)
+        run(serial, {"pages": {}})
+        prerender.prerender_all(sorted(pages.glob("*.html")), {"pages": {}}, jobs=2)
+        for p in pages.iterdir():
+            assert p.read_bytes() == (serial / p.name).read_bytes()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
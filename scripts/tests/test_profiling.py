@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test suite for profiling.py - opt-in per-stage profiling
+Tests cover: Profiler.from_argv, sync stage output, async task sampling, speedscope format
+"""
+
+import asyncio
+import json
+import pytest
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from profiling import Profiler, NullProfiler, StackSampler, write_collapsed, write_speedscope
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(100))
+
+
+class TestFromArgv:
+    """Test the --profile flag."""
+
+    def test_without_flag_is_noop(self, tmp_path):
+        profiler = Profiler.from_argv("x", tmp_path, ["script.py", "all"])
+        assert isinstance(profiler, NullProfiler)
+        with profiler.stage("s"):
+            pass
+        assert profiler.finish() is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_flag_is_consumed(self, tmp_path):
+        argv = ["script.py", "--profile", "all"]
+        assert isinstance(Profiler.from_argv("x", tmp_path, argv), Profiler)
+        assert argv == ["script.py", "all"]
+
+
+class TestProfiler:
+    """Test the files each stage produces."""
+
+    def test_sync_stage_outputs(self, tmp_path):
+        profiler = Profiler("test", tmp_path)
+        with profiler.stage("crunch"):
+            busy(0.1)
+        hotspots = profiler.finish()
+
+        out = profiler.output_dir
+        for suffix in (".pstats", ".collapsed", ".speedscope.json"):
+            assert (out / f"crunch{suffix}").exists()
+        assert "busy" in hotspots.read_text()
+        assert "busy" in (out / "crunch.collapsed").read_text()
+
+    def test_async_stage_samples_suspended_tasks(self, tmp_path):
+        profiler = Profiler("test", tmp_path)
+
+        async def fetch():
+            await asyncio.sleep(0.2)
+
+        async def run():
+            profiler.attach_loop()
+            await asyncio.gather(*(fetch() for _ in range(3)))
+
+        with profiler.stage("validate", mode="async"):
+            asyncio.run(run())
+        profiler.finish()
+
+        collapsed = (profiler.output_dir / "validate.collapsed").read_text()
+        assert any(line.startswith("await;") and "fetch" in line for line in collapsed.splitlines())
+        assert not (profiler.output_dir / "validate.pstats").exists()
+
+    def test_nested_stage_folds_into_outer(self, tmp_path):
+        profiler = Profiler("test", tmp_path)
+        with profiler.stage("outer"):
+            with profiler.stage("inner"):
+                busy(0.02)
+        profiler.finish()
+        assert not (profiler.output_dir / "inner.collapsed").exists()
+
+
+class TestWriters:
+    """Test output formats."""
+
+    STACKS = Counter({("main", "a", "b"): 3, ("main", "a"): 1})
+
+    def test_collapsed(self, tmp_path):
+        write_collapsed(self.STACKS, tmp_path / "x.collapsed")
+        assert (tmp_path / "x.collapsed").read_text().splitlines() == ["main;a 1", "main;a;b 3"]
+
+    def test_speedscope_weights_sum_to_duration(self, tmp_path):
+        write_speedscope(self.STACKS, tmp_path / "x.json", "x", 2.0)
+        doc = json.loads((tmp_path / "x.json").read_text())
+        profile = doc["profiles"][0]
+        assert profile["type"] == "sampled"
+        assert sum(profile["weights"]) == pytest.approx(2.0)
+        assert [f["name"] for f in doc["shared"]["frames"]] == ["main", "a", "b"]
+
+    def test_sampler_collects_stacks(self):
+        sampler = StackSampler(interval=0.001)
+        sampler.start()
+        busy(0.05)
+        sampler.stop()
+        assert sum(sampler.stacks.values()) > 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Test suite for provider_patch.py - patch-based providers.json updates
+Tests cover: compute_patch, apply_patch, invert_patch, commit_providers, rollback
+"""
+
+import json
+import pytest
+import random
+import sys
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import provider_patch
+from provider_patch import (
+    compute_patch, apply_patch, invert_patch, is_empty,
+    record_keys, atomic_write_json, commit_providers, rollback
+)
+
+
+def doc(*providers, **meta):
+    return {**meta, "providers": [dict(p) for p in providers]}
+
+
+A = {"id": "a", "name": "ABC", "rating": 4.0}
+B = {"id": "b", "name": "BCD", "rating": 3.5}
+C = {"id": "c", "name": "CDE", "rating": 5.0}
+
+
+# =============================================================================
+# Patch computation Tests
+# =============================================================================
+
+class TestComputePatch:
+    """Test record-level diffs."""
+
+    def test_identical_documents_give_empty_patch(self):
+        assert is_empty(compute_patch(doc(A, B), doc(A, B)))
+
+    def test_add(self):
+        patch = compute_patch(doc(A), doc(A, B))
+        assert [a["key"] for a in patch["add"]] == ["b"]
+        assert "order" not in patch
+
+    def test_remove(self):
+        patch = compute_patch(doc(A, B), doc(A))
+        assert [r["key"] for r in patch["remove"]] == ["b"]
+        assert patch["remove"][0]["record"] == B
+
+    def test_update_only_changed_fields(self):
+        patch = compute_patch(doc(A), doc({**A, "rating": 4.5}))
+        assert patch["update"] == [{"key": "a", "set": {"rating": 4.5}, "unset": [], "before": {"rating": 4.0}}]
+
+    def test_unset_field(self):
+        patch = compute_patch(doc(A), doc({"id": "a", "name": "ABC"}))
+        assert patch["update"][0]["unset"] == ["rating"]
+
+    def test_reorder_recorded(self):
+        patch = compute_patch(doc(A, B), doc(B, A))
+        assert patch["order"] == ["b", "a"]
+        assert patch["order_before"] == ["a", "b"]
+
+    def test_meta_change(self):
+        patch = compute_patch(doc(A, total=1), doc(A, total=1, cleaned_at="now"))
+        assert patch["meta"]["set"] == {"cleaned_at": "now"}
+
+    def test_duplicate_ids_keyed_by_occurrence(self):
+        assert record_keys([{"id": "x"}, {"id": "x"}, {"name": "n"}]) == ["x", "x#2", "n"]
+
+
+# =============================================================================
+# Apply / invert Tests
+# =============================================================================
+
+class TestApplyAndInvert:
+    """Test that patches round-trip."""
+
+    CASES = [
+        (doc(A, B), doc(A, B, C)),
+        (doc(A, B, C), doc(C, A)),
+        (doc(A, B, total=2), doc({**B, "rating": 1.0}, {**A, "phone": "555"}, total=2, cleaned_at="x")),
+        (doc(A, {"id": "a", "name": "dup"}), doc({"id": "a", "name": "dup"})),
+        (doc(), doc(A)),
+        (doc(A, B), doc(B, C)),
+        (doc(A, B, C), doc(A, C)),
+    ]
+
+    @pytest.mark.parametrize("before,after", CASES)
+    def test_apply_reproduces_after(self, before, after):
+        assert apply_patch(before, compute_patch(before, after)) == after
+
+    @pytest.mark.parametrize("before,after", CASES)
+    def test_invert_reproduces_before(self, before, after):
+        patch = compute_patch(before, after)
+        assert apply_patch(after, invert_patch(patch)) == before
+
+    def test_random_round_trips(self):
+        rnd = random.Random(0)
+        pool = [{"id": f"p{i}", "rating": i} for i in range(8)]
+        for _ in range(500):
+            before = doc(*rnd.sample(pool, rnd.randint(0, 8)))
+            after = doc(*[{**p, "rating": rnd.choice([p["rating"], -1])}
+                          for p in rnd.sample(pool, rnd.randint(0, 8))])
+            patch = compute_patch(before, after)
+            inverse = invert_patch(patch)
+            assert apply_patch(before, patch) == after
+            assert apply_patch(after, inverse) == before
+            assert apply_patch(before, invert_patch(inverse)) == after
+
+    def test_apply_does_not_mutate_input(self):
+        before = doc(A)
+        apply_patch(before, compute_patch(before, doc({**A, "rating": 1.0})))
+        assert before == doc(A)
+
+
+# =============================================================================
+# Commit / rollback Tests
+# =============================================================================
+
+@pytest.fixture
+def patch_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(provider_patch, "PATCH_DIR", tmp_path / "patches")
+    monkeypatch.setattr(provider_patch, "ROLLED_BACK_DIR", tmp_path / "patches" / "rolled_back")
+    return tmp_path
+
+
+class TestCommitAndRollback:
+    """Test history files and reverse replay."""
+
+    def test_atomic_write_leaves_no_temp_files(self, tmp_path):
+        path = tmp_path / "providers.json"
+        atomic_write_json(path, doc(A))
+        assert json.loads(path.read_text()) == doc(A)
+        assert [p.name for p in tmp_path.iterdir()] == ["providers.json"]
+
+    def test_commit_writes_patch_not_backup(self, patch_dirs):
+        path = patch_dirs / "providers.json"
+        atomic_write_json(path, doc(A))
+        commit_providers(doc(A), doc(A, B), "test", path)
+        assert json.loads(path.read_text()) == doc(A, B)
+        assert len(list((patch_dirs / "patches").glob("*.json"))) == 1
+        assert not list(patch_dirs.glob("providers-backup-*"))
+
+    def test_noop_commit_writes_nothing(self, patch_dirs):
+        path = patch_dirs / "providers.json"
+        assert commit_providers(doc(A), doc(A), "test", path) is None
+        assert not path.exists()
+
+    def test_rollback_replays_in_reverse(self, patch_dirs):
+        path = patch_dirs / "providers.json"
+        v1, v2, v3 = doc(A), doc(A, B), doc(C, {**A, "rating": 2.0}, cleaned_at="x")
+        atomic_write_json(path, v1)
+        commit_providers(v1, v2, "one", path)
+        commit_providers(v2, v3, "two", path)
+
+        rollback(1, path)
+        assert json.loads(path.read_text()) == v2
+        rollback(1, path)
+        assert json.loads(path.read_text()) == v1
+        assert len(list((patch_dirs / "patches" / "rolled_back").glob("*.json"))) == 2
+
+    def test_rollback_refuses_changed_file(self, patch_dirs):
+        path = patch_dirs / "providers.json"
+        v1, v2 = doc(A), doc(A, B)
+        atomic_write_json(path, v1)
+        commit_providers(v1, v2, "one", path)
+        atomic_write_json(path, doc(B))  # hand edit after the patch
+
+        assert rollback(1, path) is False
+        assert json.loads(path.read_text()) == doc(B)
+        assert len(list((patch_dirs / "patches").glob("*.json"))) == 1
+
+    def test_rollback_ignores_formatting(self, patch_dirs):
+        path = patch_dirs / "providers.json"
+        v1, v2 = doc(A), doc(A, B)
+        atomic_write_json(path, v1)
+        commit_providers(v1, v2, "one", path)
+        atomic_write_json(path, v2, indent=None)
+
+        assert rollback(1, path) is True
+        assert json.loads(path.read_text()) == v1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
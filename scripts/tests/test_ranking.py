@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test suite for ranking.py - top-K per group and external sort
+Tests cover: top_k_by against a full sort, ties, listings, ranked()
+in memory and spilled to disk, temp file cleanup
+"""
+
+import pytest
+import random
+import sys
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ranking import city_state, drain, listing, quality, ranked, top_k_by
+from record_model import Record
+
+
+def make_records(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [{"name": f"p{i}", "state": rng.choice(["Texas", "Ohio", "Utah"]),
+             "city": rng.choice(["Austin", "Akron", None]),
+             # Coarse scores so there are plenty of ties
+             "_quality_score": rng.randint(0, 10) / 10} for i in range(n)]
+
+
+def full_sort(records: list) -> list:
+    return sorted(records, key=quality, reverse=True)
+
+
+class TestTopK:
+    """Test heap-based top-K per group."""
+
+    def test_matches_full_sort(self):
+        records = make_records(500)
+        top = top_k_by(records, "state", 7)
+        for state, best in top.items():
+            assert best == full_sort([r for r in records if r["state"] == state])[:7]
+
+    def test_fewer_than_k(self):
+        top = top_k_by(make_records(5), "state", 50)
+        assert sum(len(v) for v in top.values()) == 5
+
+    def test_function_group_skips_none(self):
+        records = make_records(200)
+        top = top_k_by(records, city_state, 3)
+        assert None not in top
+        assert all(key.split(", ")[0] in ("Austin", "Akron") for key in top)
+
+    def test_listing_fields(self):
+        top = listing(top_k_by(make_records(20), "state", 2), fields=("name",))
+        assert all(list(entry) == ["name"] for rows in top.values() for entry in rows)
+
+
+class TestRanked:
+    """Test the in-memory and external sort paths."""
+
+    def test_in_memory(self):
+        records = make_records(100)
+        assert list(ranked(records, run_size=1000)) == full_sort(records)
+
+    @pytest.mark.parametrize("run_size", [1, 7, 99, 100])
+    def test_spilled_matches_stable_sort(self, run_size):
+        records = make_records(100)
+        assert list(ranked(iter(records), run_size=run_size)) == full_sort(records)
+
+    def test_empty(self):
+        assert list(ranked([], run_size=3)) == []
+
+    def test_slim_records_spill_as_dicts(self):
+        records = make_records(10)
+        out = list(ranked([Record.from_dict(r) for r in records], run_size=3))
+        assert out == full_sort(records)
+
+    def test_temp_dir_removed(self, tmp_path):
+        list(ranked(make_records(50), run_size=10, tmp_dir=tmp_path))
+        assert list(tmp_path.iterdir()) == []
+
+    def test_runs_spilled_before_iteration(self, tmp_path):
+        it = ranked(make_records(50), run_size=10, tmp_dir=tmp_path)
+        (sort_dir,) = tmp_path.iterdir()
+        assert len(list(sort_dir.glob("run-*.ndjson"))) == 5
+        next(it)
+        it.close()
+        assert list(tmp_path.iterdir()) == []
+
+    def test_drain_empties_list_as_runs_spill(self, tmp_path):
+        records = make_records(50)
+        expected = full_sort(records)
+        held = list(records)
+        it = ranked(drain(held), run_size=10, tmp_dir=tmp_path)
+        assert held == []
+        assert list(it) == expected
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test suite for record_model.py - slim provider records
+Tests cover: dict interface, raw byte round trip,
+load_records, clean_all with slim records
+"""
+
+import contextlib
+import io
+import json
+import pytest
+import sys
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import clean_data
+from record_model import Record, load_records, pack, unpack
+
+RAW = {
+    "about": {"Service options": {"Onsite services": True}},
+    "address": "1 Main St, Austin, TX 78701",
+    "name": "Acme Dumpsters",
+    "phone": None,
+    "popular_times": [{"day": 1, "popular_times": [{"hour": 6, "percentage": 0}]}],
+    "rating": 4.8,
+    "reviews": 120,
+    "website": "https://acme.example/",
+    "place_id": "abc",
+    "note": "café – 24/7",
+}
+
+
+class TestDictInterface:
+    """Test that a Record answers like the dict it came from."""
+
+    def test_pipeline_fields(self):
+        r = Record.from_dict(RAW)
+        assert r.get("name") == "Acme Dumpsters"
+        assert r["rating"] == 4.8
+        assert r.get("reviews", 0) == 120
+
+    def test_null_vs_missing(self):
+        r = Record.from_dict(RAW)
+        assert r.get("phone", "") is None
+        assert r.get("verified", "default") == "default"
+        assert "phone" in r
+        assert "verified" not in r
+        with pytest.raises(KeyError):
+            r["verified"]
+
+    def test_other_fields_decoded_on_demand(self):
+        r = Record.from_dict(RAW)
+        assert r.get("about") == RAW["about"]
+        assert r["note"] == RAW["note"]
+        assert r.get("absent") is None
+
+    def test_assignment(self):
+        r = Record.from_dict(RAW)
+        r["_quality_score"] = 0.91
+        r["name"] = "Acme Roll Off"
+        assert r.get("_quality_score") == 0.91
+        assert r["name"] == "Acme Roll Off"
+
+    def test_slots(self):
+        with pytest.raises(AttributeError):
+            Record.from_dict(RAW).anything = 1
+
+
+class TestRawBytes:
+    """Test that the original record comes back untouched."""
+
+    def test_pack_round_trip(self):
+        data = json.dumps(RAW).encode()
+        assert unpack(pack(data)) == data
+        assert len(pack(data)) < len(data)
+
+    def test_to_dict_keeps_key_order(self):
+        r = Record.from_dict(RAW)
+        r["_quality_score"] = 0.5
+        r["_source_state"] = "Texas"
+        assert list(r.to_dict()) == list(RAW) + ["_quality_score", "_source_state"]
+        assert r.to_dict() == {**RAW, "_quality_score": 0.5, "_source_state": "Texas"}
+
+    def test_dumps_reuses_raw_bytes(self):
+        raw = json.dumps(RAW, separators=(",", ":")).encode()
+        r = Record.from_bytes(raw)
+        assert r.dumps() == raw
+        r["_quality_score"] = 0.5
+        assert r.dumps() == raw[:-1] + b',"_quality_score":0.5}'
+
+    def test_dumps_with_overwritten_key(self):
+        r = Record.from_dict(RAW)
+        r["name"] = "New"
+        assert json.loads(r.dumps()) == {**RAW, "name": "New"}
+
+    def test_empty_record(self):
+        r = Record.from_dict({})
+        r["x"] = 1
+        assert json.loads(r.dumps()) == {"x": 1}
+
+
+class TestCleanAllSlim:
+    """clean_all output must not depend on the record representation."""
+
+    def test_load_records(self, tmp_path):
+        path = tmp_path / "texas.json"
+        path.write_text(json.dumps([RAW, {"name": "b"}], indent=2))
+        records = load_records(path)
+        assert [r.get("name") for r in records] == ["Acme Dumpsters", "b"]
+
+    def test_identical_output(self, tmp_path, monkeypatch):
+        raw = tmp_path / "raw"
+        raw.mkdir()
+        base = {k: v for k, v in RAW.items() if k != "phone"}
+        rows = [dict(base, place_id=f"p{i}", phone=f"+1 512-555-{i:04d}", address=f"{i} Oak Rd, Austin, TX",
+                     website=f"https://p{i}.example/", reviews=i) for i in range(20)]
+        rows.append(dict(rows[3], place_id="dupe"))
+        (raw / "texas.json").write_text(json.dumps(rows, indent=2))
+
+        outputs = {}
+        for slim in (False, True):
+            out = tmp_path / f"clean-{slim}"
+            monkeypatch.setattr(clean_data, "RAW_DIR", raw)
+            monkeypatch.setattr(clean_data, "CLEAN_DIR", out)
+            monkeypatch.setattr(clean_data, "SLIM_RECORDS", slim)
+            with contextlib.redirect_stdout(io.StringIO()):
+                clean_data.clean_all()
+            outputs[slim] = {p.suffix: p.read_bytes() for p in out.glob("all_providers_*")}
+        assert outputs[True] == outputs[False]
+        assert len(json.loads(outputs[True][".json"])) == 20
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test suite for sitemap.py - incremental sitemap generation
+Tests cover: URL selection and priorities, content-hash lastmod, seeding
+from the published sitemap, sitemap-index sharding, gzip siblings
+"""
+
+import gzip
+import pytest
+import sys
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import sitemap
+
+
+@pytest.fixture
+def site(tmp_path):
+    for name in ("index.html", "results.html", "faq.html"):
+        (tmp_path / name).write_text(name)
+    pages = tmp_path / "dumpster-rental"
+    pages.mkdir()
+    for name in ("austin-tx", "naples-fl", "texas", "tx"):
+        (pages / f"{name}.html").write_text(name)
+    return tmp_path
+
+
+def locs(root: Path, name: str = "sitemap.xml") -> dict:
+    return dict(sitemap.URL_RE.findall((root / name).read_text()))
+
+
+class TestPages:
+    """Test which URLs are listed."""
+
+    def test_order_and_priorities(self, site):
+        urls = [(loc.rsplit("/", 1)[-1], priority) for loc, _, _, priority in sitemap.pages(site)]
+        assert urls[0] == ("dumpstermap.io", "1.0")
+        tail = urls[len(sitemap.STATIC_PAGES):]
+        # State pages first, abbreviation pages left out, top metros ranked higher
+        assert tail == [("texas.html", "0.85"), ("austin-tx.html", "0.9"), ("naples-fl.html", "0.8")]
+
+
+class TestUpdate:
+    """Test content-hash lastmod and file output."""
+
+    def test_lastmod_moves_only_on_change(self, site):
+        state = {"urls": {}}
+        r = sitemap.update(state, root=site, today="2026-01-01")
+        assert r["urls"] == 6
+        assert r["written"] == ["sitemap.xml"]
+        assert set(locs(site).values()) == {"2026-01-01"}
+
+        r = sitemap.update(state, root=site, today="2026-01-02")
+        assert r["changed"] == [] and r["written"] == []
+
+        (site / "dumpster-rental" / "naples-fl.html").write_text("new content")
+        r = sitemap.update(state, root=site, today="2026-01-03")
+        assert r["changed"] == [f"{sitemap.BASE_URL}/dumpster-rental/naples-fl.html"]
+        lastmods = locs(site)
+        assert lastmods[f"{sitemap.BASE_URL}/dumpster-rental/naples-fl.html"] == "2026-01-03"
+        assert lastmods[f"{sitemap.BASE_URL}/dumpster-rental/austin-tx.html"] == "2026-01-01"
+
+    def test_known_hashes_are_trusted(self, site):
+        state = {"urls": {}}
+        sitemap.update(state, {"austin-tx.html": "abc"}, root=site, today="2026-01-01")
+        assert state["urls"][f"{sitemap.BASE_URL}/dumpster-rental/austin-tx.html"]["sha256"] == "abc"
+
+    def test_removed_pages(self, site):
+        state = {"urls": {}}
+        sitemap.update(state, root=site, today="2026-01-01")
+        (site / "dumpster-rental" / "naples-fl.html").unlink()
+        r = sitemap.update(state, root=site, today="2026-01-02")
+        assert r["removed"] == [f"{sitemap.BASE_URL}/dumpster-rental/naples-fl.html"]
+        assert f"{sitemap.BASE_URL}/dumpster-rental/naples-fl.html" not in locs(site)
+
+    def test_first_run_keeps_published_lastmod(self, site):
+        loc = f"{sitemap.BASE_URL}/dumpster-rental/austin-tx.html"
+        (site / "sitemap.xml").write_bytes(sitemap.urlset([(loc, "2025-05-05", "weekly", "0.9")]))
+        state = {"urls": {}}
+        r = sitemap.update(state, root=site, today="2026-01-01")
+        assert loc not in r["changed"]
+        assert locs(site)[loc] == "2025-05-05"
+
+    def test_first_run_rewritten_page_is_dated_today(self, site):
+        loc = f"{sitemap.BASE_URL}/dumpster-rental/austin-tx.html"
+        (site / "sitemap.xml").write_bytes(sitemap.urlset([(loc, "2025-05-05", "weekly", "0.9")]))
+        r = sitemap.update({"urls": {}}, written={"austin-tx.html"}, root=site, today="2026-01-01")
+        assert loc in r["changed"]
+        assert locs(site)[loc] == "2026-01-01"
+
+    def test_gzip_sibling(self, site):
+        sitemap.update({"urls": {}}, root=site, today="2026-01-01")
+        assert gzip.decompress((site / "sitemap.xml.gz").read_bytes()) == (site / "sitemap.xml").read_bytes()
+
+
+class TestSharding:
+    """Test the sitemap index."""
+
+    def test_shards_and_back(self, site):
+        state = {"urls": {}}
+        sitemap.update(state, root=site, today="2026-01-01", max_urls=4)
+        index = (site / "sitemap.xml").read_text()
+        assert "<sitemapindex" in index
+        assert len(locs(site, "sitemap-1.xml")) == 4
+        assert len(locs(site, "sitemap-2.xml")) == 2
+        assert (site / "sitemap-2.xml.gz").exists()
+        assert locs(site)[f"{sitemap.BASE_URL}/sitemap-1.xml"] == "2026-01-01"
+
+        # A brotli sibling of a live shard survives a rerun
+        (site / "sitemap-1.xml.br").write_bytes(b"br")
+        sitemap.update(state, root=site, today="2026-01-02", max_urls=4)
+        assert (site / "sitemap-1.xml.br").exists()
+
+        sitemap.update(state, root=site, today="2026-01-01")
+        assert "<urlset" in (site / "sitemap.xml").read_text()
+        assert not list(site.glob("sitemap-*"))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
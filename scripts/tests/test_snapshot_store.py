@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test suite for snapshot_store.py - content-addressed snapshots
+Tests cover: SnapshotStore create, restore, diff, deduplicated storage
+"""
+
+import json
+import pytest
+import sys
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from snapshot_store import SnapshotStore
+
+
+def write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2))
+
+
+@pytest.fixture
+def raw_dir(tmp_path):
+    raw = tmp_path / "raw"
+    write(raw / "florida.json", [
+        {"place_id": "p1", "name": "ABC Dumpsters", "rating": 4.5},
+        {"place_id": "p2", "name": "XYZ Roll-Off", "rating": 4.0},
+    ])
+    write(raw / "ohio.json", [{"place_id": "p3", "name": "Buckeye Bins"}])
+    write(raw / "pull_summary.json", {"states": {"Florida": {"count": 2}}})
+    return raw
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(tmp_path / "snapshots")
+
+
+class TestSnapshotStore:
+    """Test snapshot creation, restore and diff."""
+
+    def test_restore_round_trips(self, store, raw_dir, tmp_path):
+        store.create(raw_dir, "s1")
+        store.restore("s1", tmp_path / "out")
+        for path in raw_dir.glob("*.json"):
+            assert json.loads((tmp_path / "out" / path.name).read_text()) == json.loads(path.read_text())
+
+    def test_unchanged_snapshot_stores_no_new_objects(self, store, raw_dir):
+        store.create(raw_dir, "s1")
+        objects = len(store.index)
+        store.create(raw_dir, "s2")
+        assert len(store.index) == objects
+        assert len(list(store.packs.iterdir())) == 1
+
+    def test_changed_record_stores_one_object(self, store, raw_dir):
+        store.create(raw_dir, "s1")
+        objects = len(store.index)
+        data = json.loads((raw_dir / "florida.json").read_text())
+        data[0]["rating"] = 5.0
+        write(raw_dir / "florida.json", data)
+        store.create(raw_dir, "s2")
+        assert len(store.index) == objects + 1
+
+    def test_index_survives_reopen(self, store, raw_dir, tmp_path):
+        store.create(raw_dir, "s1")
+        reopened = SnapshotStore(tmp_path / "snapshots")
+        assert reopened.materialize(reopened.load_manifest("s1")["files"]["ohio.json"]) == \
+            [{"place_id": "p3", "name": "Buckeye Bins"}]
+
+    def test_diff(self, store, raw_dir):
+        store.create(raw_dir, "s1")
+        data = json.loads((raw_dir / "florida.json").read_text())
+        data[0]["rating"] = 5.0
+        data.append({"place_id": "p4", "name": "New Co"})
+        write(raw_dir / "florida.json", data)
+        (raw_dir / "ohio.json").unlink()
+        store.create(raw_dir, "s2")
+
+        diff = store.diff("s1", "s2")
+        assert diff["florida.json"] == {"added": 1, "removed": 0, "changed": 1, "file": "modified"}
+        assert diff["ohio.json"]["file"] == "removed"
+        assert "pull_summary.json" not in diff
+
+    def test_providers_document(self, store, tmp_path):
+        path = tmp_path / "providers.json"
+        doc = {"total": 1, "providers": [{"id": "a", "name": "ABC"}]}
+        write(path, doc)
+        manifest = store.create(path, "p1")
+        assert manifest["files"]["providers.json"]["list_key"] == "providers"
+        assert store.materialize(manifest["files"]["providers.json"]) == doc
+
+    def test_list(self, store, raw_dir):
+        store.create(raw_dir, "s1")
+        store.create(raw_dir, "s2")
+        assert [m["name"] for m in store.list()] == ["s1", "s2"]
+
+    def test_default_names_do_not_collide(self, store, raw_dir):
+        first = store.create(raw_dir)
+        data = json.loads((raw_dir / "florida.json").read_text())
+        data[0]["rating"] = 5.0
+        write(raw_dir / "florida.json", data)
+        second = store.create(raw_dir)
+        assert first["name"] != second["name"]
+        assert store.load_manifest(first["name"]) == first
+
+    def test_explicit_name_is_not_overwritten(self, store, raw_dir):
+        store.create(raw_dir, "s1")
+        with pytest.raises(FileExistsError):
+            store.create(raw_dir, "s1")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test suite for synth_corpus.py - synthetic raw corpus generator
+Tests cover: profile learning, generation, ground truth, dedup scoring
+"""
+
+import json
+import pytest
+import sys
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from synth_corpus import CorpusProfile, generate, score_dedup, IDENTITY_FIELDS
+
+
+def raw_record(i, state_code, lat, lng, city, phone=None, website=None, place_id=None):
+    return {
+        "name": f"Roll Off Dumpsters {i}",
+        "phone": phone or f"+1 555-{200 + i:03d}-{1000 + i:04d}",
+        "website": website if website is not None else f"https://www.dumpsters{i}.com/",
+        "street": f"{100 + i} Main St",
+        "address": f"{100 + i} Main St, {city}, {state_code} 0{1000 + i}",
+        "city": city,
+        "postal_code": f"0{1000 + i}",
+        "county": "County",
+        "state": state_code,
+        "state_code": state_code,
+        "time_zone": "America/New_York",
+        "latitude": lat,
+        "longitude": lng,
+        "h3": "892a1072e77ffff",
+        "place_id": place_id or f"ChIJ{i:023d}",
+        "category": "Dumpster rental service",
+        "subtypes": "Dumpster rental service",
+        "type": "Dumpster rental service",
+        "rating": 4.5,
+        "reviews": 10 + i,
+        "verified": True,
+        "business_status": "OPERATIONAL",
+        "working_hours": {"Monday": ["7AM-5PM"]},
+    }
+
+
+@pytest.fixture
+def raw_dir(tmp_path):
+    raw = tmp_path / "real"
+    raw.mkdir()
+    ohio = [raw_record(i, "OH", 40.0 + i * 0.01, -83.0, "Columbus") for i in range(20)]
+    ohio.append(raw_record(20, "OH", 40.2, -83.0, "Columbus", phone=ohio[0]["phone"]))
+    texas = [raw_record(100 + i, "TX", 30.0, -97.0 - i * 0.01, "Austin") for i in range(10)]
+    texas.append(dict(ohio[1]))  # same place pulled by the Texas query
+    (raw / "ohio.json").write_text(json.dumps(ohio))
+    (raw / "texas.json").write_text(json.dumps(texas))
+    (raw / "pull_summary.json").write_text("{}")
+    return raw
+
+
+@pytest.fixture
+def profile(raw_dir):
+    return CorpusProfile.learn(raw_dir)
+
+
+def load_corpus(out):
+    records = []
+    for path in sorted((out / "raw").glob("*.json")):
+        records.extend(json.loads(path.read_text()))
+    truth = json.loads((out / "ground_truth.json").read_text())
+    return records, truth
+
+
+class TestProfile:
+    """Test what is learned from real files."""
+
+    def test_state_counts(self, profile):
+        assert profile.state_counts == {"ohio": 21, "texas": 11}
+
+    def test_duplicate_rates(self, profile):
+        assert profile.rates["exact"] == pytest.approx(1 / 32)
+        assert profile.rates["relisted"] == pytest.approx(1 / 32)
+
+    def test_phone_formats_and_area_codes(self, profile):
+        assert list(profile.phone_formats) == ["+X XXX-XXX-XXXX"]
+        assert set(profile.area_codes["ohio"]) == {"555"}
+
+    def test_empty_dir(self, tmp_path):
+        with pytest.raises(SystemExit):
+            CorpusProfile.learn(tmp_path)
+
+
+class TestGenerate:
+    """Test generated corpora."""
+
+    def test_sizes_and_ground_truth(self, profile, tmp_path):
+        generate(500, tmp_path / "synth", seed=1, profile=profile)
+        records, truth = load_corpus(tmp_path / "synth")
+        assert len(records) == 500
+        assert {p.stem for p in (tmp_path / "synth" / "raw").glob("*.json")} == {"ohio", "texas"}
+        assert all(r["place_id"] in truth["place_entity"] for r in records)
+        assert truth["entities"] == len(set(truth["place_entity"].values()))
+
+    def test_same_seed_same_corpus(self, profile, tmp_path):
+        generate(200, tmp_path / "a", seed=3, profile=profile)
+        generate(200, tmp_path / "b", seed=3, profile=profile)
+        assert load_corpus(tmp_path / "a")[0] == load_corpus(tmp_path / "b")[0]
+
+    def test_exact_copies_are_identical_apart_from_query(self, profile, tmp_path):
+        profile.rates["exact"] = 0.3
+        generate(300, tmp_path / "synth", seed=2, profile=profile)
+        records, _ = load_corpus(tmp_path / "synth")
+        by_place = {}
+        repeats = 0
+        for r in records:
+            if r["place_id"] in by_place:
+                repeats += 1
+                first = {k: v for k, v in by_place[r["place_id"]].items() if k != "query"}
+                assert first == {k: v for k, v in r.items() if k != "query"}
+            by_place.setdefault(r["place_id"], r)
+        assert repeats > 0
+
+    def test_donor_fields_kept_unless_slim(self, profile, tmp_path):
+        generate(50, tmp_path / "full", profile=profile)
+        generate(50, tmp_path / "slim", slim=True, profile=profile)
+        assert "working_hours" in load_corpus(tmp_path / "full")[0][0]
+        assert set(load_corpus(tmp_path / "slim")[0][0]) == set(IDENTITY_FIELDS)
+
+
+class TestScoreDedup:
+    """Test recall/precision against the ground truth."""
+
+    TRUTH = {"a1": 1, "a2": 1, "b1": 2, "c1": 3, "c2": 3}
+
+    def recs(self, *ids):
+        return [{"place_id": i} for i in ids]
+
+    def test_perfect(self):
+        score = score_dedup(self.recs("a1", "a2", "b1", "c1", "c2"), self.recs("a1", "b1", "c1"), self.TRUTH)
+        assert score["recall"] == 1.0 and score["precision"] == 1.0
+
+    def test_missed_duplicate(self):
+        score = score_dedup(self.recs("a1", "a2", "b1", "c1", "c2"), self.recs("a1", "b1", "c1", "c2"), self.TRUTH)
+        assert score["recall"] == 0.5
+        assert score["missed"] == 1
+
+    def test_false_merge(self):
+        score = score_dedup(self.recs("a1", "a2", "b1", "c1", "c2"), self.recs("a1", "c1"), self.TRUTH)
+        assert score["false_merges"] == 1
+        assert score["precision"] == pytest.approx(2 / 3)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Test suite for scrapers/yelp-scraper.py - Yelp Fusion scraper
+Tests cover: search paging, NDJSON log resume, torn-line recovery, compaction, detail cache
+"""
+
+import importlib.util
+import json
+import pytest
+import sys
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("requests")
+
+# Hyphenated filename, so load it by path
+_spec = importlib.util.spec_from_file_location(
+    "yelp_scraper", Path(__file__).parent.parent / "scrapers" / "yelp-scraper.py")
+yelp_scraper = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(yelp_scraper)
+
+
+def provider(yelp_id):
+    return {"id": f"yelp-{yelp_id}", "yelp_id": yelp_id, "name": yelp_id.upper()}
+
+
+@pytest.fixture
+def scraper():
+    s = yelp_scraper.YelpScraper("test-key")
+    s.fetch_details = False
+    return s
+
+
+def compacted_ids(scraper, log, tmp_path):
+    out = tmp_path / "yelp-providers.json"
+    scraper.compact(log, out)
+    return [p["yelp_id"] for p in json.loads(out.read_text())["providers"]]
+
+
+# =============================================================================
+# Search paging
+# =============================================================================
+
+def biz(yelp_id):
+    return {"id": yelp_id, "name": yelp_id, "location": {}, "coordinates": {}}
+
+
+class TestSearchTerm:
+    """Test paging through one term's results."""
+
+    @pytest.fixture
+    def pages(self, scraper, monkeypatch):
+        calls = []
+
+        def search(term, location, limit, offset):
+            calls.append(offset)
+            scraper.api_calls += 1
+            if self.failures.get(offset):
+                self.failures[offset] -= 1
+                return None
+            return [biz(f"b{i}") for i in range(offset, min(offset + limit, self.total))]
+
+        self.failures = {}
+
+        monkeypatch.setattr(scraper, "search_businesses", search)
+        monkeypatch.setattr(yelp_scraper.time, "sleep", lambda s: None)
+        return calls
+
+    def test_short_page_stops(self, scraper, pages):
+        self.total = 30
+        assert len(scraper.search_term("dumpster rental", "Austin, TX")) == 30
+        assert pages == [0]
+
+    def test_pages_up_to_yelp_cap(self, scraper, pages):
+        self.total = 1000
+        found = scraper.search_term("dumpster rental", "Austin, TX")
+        assert len(found) == yelp_scraper.YELP_MAX_RESULTS
+        assert pages == [0, 50, 100, 150, 200]
+
+    def test_page_of_seen_ids_stops(self, scraper, pages):
+        self.total = 1000
+        scraper.seen_ids.update(f"b{i}" for i in range(50, 100))
+        scraper.search_term("dumpster rental", "Austin, TX")
+        assert pages == [0, 50]
+
+    def test_failed_page_is_retried_at_same_offset(self, scraper, pages):
+        self.total = 120
+        self.failures = {50: 2}
+        assert len(scraper.search_term("dumpster rental", "Austin, TX")) == 120
+        assert pages == [0, 50, 50, 50, 100]
+        assert scraper.failed_pages == 0
+
+    def test_persistent_failure_is_reported_not_exhausted(self, scraper, pages):
+        self.total = 1000
+        self.failures = {50: 99}
+        assert len(scraper.search_term("dumpster rental", "Austin, TX")) == 50
+        assert pages == [0] + [50] * (yelp_scraper.YELP_PAGE_RETRIES + 1)
+        assert scraper.failed_pages == 1
+
+
+# =============================================================================
+# Log and resume
+# =============================================================================
+
+class TestResume:
+    """Test restarting from an existing log."""
+
+    def test_load_log_restores_progress(self, scraper, tmp_path):
+        log = tmp_path / "yelp-providers.ndjson"
+        log.write_text(
+            json.dumps(provider("a")) + "\n"
+            + json.dumps({"_city_done": "Austin, TX"}) + "\n"
+            + json.dumps(provider("b")) + "\n"
+        )
+        scraper.load_log(log)
+        assert scraper.seen_ids == {"a", "b"}
+        assert scraper.completed_cities == {"Austin, TX"}
+        assert [p["yelp_id"] for p in scraper.providers] == ["a", "b"]
+
+    def test_torn_line_is_dropped_before_appending(self, scraper, tmp_path):
+        log = tmp_path / "yelp-providers.ndjson"
+        log.write_text(json.dumps(provider("a")) + "\n" + json.dumps(provider("b"))[:15])
+
+        scraper.load_log(log)
+        scraper.open_log(log, resume=True)
+        scraper.append(provider("c"))
+        scraper.append(provider("d"))
+        scraper.close_log()
+
+        assert compacted_ids(scraper, log, tmp_path) == ["a", "c", "d"]
+        # b was never logged in full, so a resumed run can still find it
+        assert "b" not in scraper.seen_ids
+
+    def test_fresh_run_truncates(self, scraper, tmp_path):
+        log = tmp_path / "yelp-providers.ndjson"
+        log.write_text(json.dumps(provider("old")) + "\n")
+        scraper.open_log(log)
+        scraper.append(provider("new"))
+        scraper.close_log()
+        assert compacted_ids(scraper, log, tmp_path) == ["new"]
+
+
+class TestCompact:
+    """Test writing the log out as yelp-providers.json."""
+
+    def test_skips_markers_and_duplicates(self, scraper, tmp_path):
+        log = tmp_path / "yelp-providers.ndjson"
+        log.write_text("\n".join(json.dumps(e) for e in [
+            provider("a"), {"_city_done": "Austin, TX"}, provider("b"), provider("a"),
+        ]) + "\n")
+        out = tmp_path / "yelp-providers.json"
+        scraper.compact(log, out)
+        data = json.loads(out.read_text())
+        assert data["source"] == "yelp"
+        assert data["total"] == 2
+        assert [p["yelp_id"] for p in data["providers"]] == ["a", "b"]
+
+    def test_read_log_skips_unreadable_lines(self, tmp_path):
+        log = tmp_path / "log.ndjson"
+        log.write_text(json.dumps(provider("a")) + "\n{not json\n")
+        assert [e["yelp_id"] for e in yelp_scraper.read_log(log)] == ["a"]
+
+
+class TestDetailCache:
+    """Test the on-disk business-detail cache."""
+
+    def test_round_trip(self, tmp_path):
+        cache = yelp_scraper.DetailCache(tmp_path)
+        cache.put("abc", {"hours": []})
+        assert cache.get("abc")["details"] == {"hours": []}
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_expired_entry_is_a_miss(self, tmp_path):
+        cache = yelp_scraper.DetailCache(tmp_path, ttl_days=30)
+        cache.path("abc").write_text(json.dumps(
+            {"fetched_at": "2000-01-01T00:00:00", "details": {}}))
+        assert cache.get("abc") is None
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        cache = yelp_scraper.DetailCache(tmp_path)
+        cache.path("abc").write_text("{")
+        assert cache.get("abc") is None
+
+    def test_enrich_uses_cache_and_counts_calls(self, scraper, tmp_path, monkeypatch):
+        scraper.detail_cache = yelp_scraper.DetailCache(tmp_path)
+        scraper.detail_cache.put("a", {"hours": [{"open": [1], "is_open_now": True}]})
+        fetched = []
+
+        def details(yelp_id):
+            scraper.count_call()
+            fetched.append(yelp_id)
+            return {"hours": [], "is_claimed": True}
+
+        monkeypatch.setattr(scraper, "get_business_details", details)
+        monkeypatch.setattr(scraper.limiter, "interval", 0)
+        providers = [provider(i) for i in ["a"] + [f"n{i}" for i in range(20)]]
+        assert scraper.enrich_details(providers) == 21
+        assert sorted(fetched) == sorted(f"n{i}" for i in range(20))
+        assert scraper.api_calls == 20
+        assert providers[0]["is_open_now"] is True
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test suite for zip_index.py - offline ZIP -> nearest providers index
+Tests cover: KD-tree against brute force, ties, centroid sources,
+artifact round trip and O(1) lookups, incremental rebuilds matching
+full rebuilds
+"""
+
+import copy
+import math
+import pytest
+import random
+import sys
+from pathlib import Path
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import zip_index
+
+STATES = {"Texas": (31.0, -99.0), "Oklahoma": (35.5, -97.5), "Louisiana": (31.0, -92.0)}
+
+
+def corpus(seed: int = 7, per_state: int = 60) -> list:
+    rng = random.Random(seed)
+    records = []
+    for state, (lat, lng) in STATES.items():
+        for i in range(per_state):
+            records.append({"name": f"{state} Provider {i}", "state": state, "city": f"Town {i % 7}",
+                            "place_id": f"{state[:2]}-{i}", "postal_code": f"{7 + len(state) % 3}{i % 9:04d}",
+                            "latitude": lat + rng.uniform(-2, 2), "longitude": lng + rng.uniform(-2, 2),
+                            "rating": 4.5, "reviews": i})
+    return records
+
+
+def haversine(lat1, lng1, lat2, lng2) -> float:
+    dlat, dlng = math.radians(lat2 - lat1), math.radians(lng2 - lng1)
+    a = (math.sin(dlat / 2) ** 2
+         + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng / 2) ** 2)
+    return 2 * zip_index.EARTH_MILES * math.asin(math.sqrt(a))
+
+
+class TestKDTree:
+    """Test exact k-nearest queries."""
+
+    def test_matches_brute_force(self):
+        rng = random.Random(1)
+        coords = [(rng.uniform(25, 49), rng.uniform(-124, -67)) for _ in range(500)]
+        tree = zip_index.KDTree([zip_index.to_xyz(*c) for c in coords])
+        for _ in range(50):
+            q = (rng.uniform(25, 49), rng.uniform(-124, -67))
+            found = [i for _, i in tree.query(zip_index.to_xyz(*q), 5)]
+            brute = sorted(range(len(coords)), key=lambda i: haversine(*q, *coords[i]))[:5]
+            assert found == brute
+
+    def test_ties_go_to_lower_index(self):
+        points = [zip_index.to_xyz(30, -97)] * 4 + [zip_index.to_xyz(31, -97)]
+        tree = zip_index.KDTree(points)
+        assert [i for _, i in tree.query(zip_index.to_xyz(30, -97), 2)] == [0, 1]
+
+    def test_any_within(self):
+        tree = zip_index.KDTree([zip_index.to_xyz(30, -97)])
+        d2 = zip_index._d2(zip_index.to_xyz(30, -97), zip_index.to_xyz(30.5, -97))
+        assert tree.any_within(zip_index.to_xyz(30.5, -97), d2)
+        assert not tree.any_within(zip_index.to_xyz(30.5, -97), d2 * 0.99)
+        assert not zip_index.KDTree([]).any_within((1, 0, 0), 1.0)
+
+    def test_chord_miles(self):
+        d2 = zip_index._d2(zip_index.to_xyz(30.27, -97.74), zip_index.to_xyz(29.76, -95.37))
+        assert zip_index.chord_miles(d2) == pytest.approx(haversine(30.27, -97.74, 29.76, -95.37))
+
+
+class TestCentroids:
+    """Test ZIP centroid sources."""
+
+    def test_gazetteer(self, tmp_path):
+        path = tmp_path / "zcta.txt"
+        path.write_text("GEOID\tALAND\tINTPTLAT\tINTPTLONG            \n"
+                        "78701\t1\t30.270\t-97.742\n00601\t1\t18.18\t-66.75\n")
+        assert zip_index.load_centroids(path) == {"78701": (30.27, -97.742), "00601": (18.18, -66.75)}
+
+    def test_csv(self, tmp_path):
+        path = tmp_path / "zips.csv"
+        path.write_text("zip,lat,lng\n78701,30.27,-97.74\nbad,1,1\n")
+        assert zip_index.load_centroids(path) == {"78701": (30.27, -97.74)}
+
+    def test_corpus_centroids(self):
+        providers = zip_index.load_providers([
+            {"place_id": "a", "postal_code": "78701-1234", "latitude": 30.0, "longitude": -97.0},
+            {"place_id": "b", "postal_code": "78701", "latitude": 31.0, "longitude": -98.0},
+            {"place_id": "c", "postal_code": None, "latitude": 31.0, "longitude": -98.0},
+            {"place_id": "d", "postal_code": "78702", "latitude": None, "longitude": None},
+        ])
+        assert zip_index.corpus_centroids(providers) == {"78701": (30.5, -97.5)}
+
+
+class TestIndex:
+    """Test the artifact and incremental rebuilds."""
+
+    def test_lookup(self, tmp_path):
+        providers = zip_index.load_providers(corpus())
+        centroids = {"75001": (32.95, -96.83), "70112": (29.95, -90.07)}
+        path = tmp_path / "index.bin"
+        r = zip_index.build(providers, centroids, path, k=3)
+        assert r == dict(r, zips=2, providers=180, queried=2, incremental=False)
+        with zip_index.ZipIndex(path) as index:
+            found = index.nearest("75001")
+            assert len(found) == 3
+            brute = sorted(providers, key=lambda p: haversine(32.95, -96.83, p["latitude"], p["longitude"]))
+            assert [p["key"] for p in found] == [p["key"] for p in brute[:3]]
+            assert found[0]["miles"] == round(haversine(32.95, -96.83, brute[0]["latitude"],
+                                                        brute[0]["longitude"]), 1)
+            assert index.nearest("12345") == []
+            assert index.nearest("not a zip") == []
+
+    def test_fewer_providers_than_k(self, tmp_path):
+        providers = zip_index.load_providers(corpus(per_state=1))
+        path = tmp_path / "index.bin"
+        zip_index.build(providers, {"75001": (32.95, -96.83)}, path, k=5)
+        with zip_index.ZipIndex(path) as index:
+            assert len(index.nearest("75001")) == 3
+
+    def test_incremental_matches_full(self, tmp_path):
+        records = corpus()
+        providers = zip_index.load_providers(records)
+        centroids = zip_index.corpus_centroids(providers)
+        path = tmp_path / "index.bin"
+        zip_index.build(providers, centroids, path, k=4)
+        assert zip_index.build(providers, centroids, path, k=4)["queried"] == 0
+
+        changed = copy.deepcopy(records)
+        ok = [r for r in changed if r["state"] == "Oklahoma"]
+        ok[0]["latitude"] -= 1.5
+        changed.remove(ok[1])
+        changed.append(dict(ok[2], place_id="ok-new", longitude=ok[2]["longitude"] + 0.01))
+        providers = zip_index.load_providers(changed)
+        centroids = zip_index.corpus_centroids(providers)
+        r = zip_index.build(providers, centroids, path, k=4)
+        assert r["incremental"]
+        assert 0 < r["queried"] < r["zips"]
+        full = tmp_path / "full.bin"
+        zip_index.build(providers, centroids, full, k=4, full=True)
+        assert path.read_bytes() == full.read_bytes()
+
+    def test_k_change_forces_full_rebuild(self, tmp_path):
+        providers = zip_index.load_providers(corpus())
+        path = tmp_path / "index.bin"
+        zip_index.build(providers, {"75001": (32.95, -96.83)}, path, k=3)
+        assert not zip_index.build(providers, {"75001": (32.95, -96.83)}, path, k=4)["incremental"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
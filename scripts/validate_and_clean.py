@@ -4,7 +4,6 @@ DumpsterMap - Data Cleaning & Validation Pipeline
 Cleans raw OutScraper data and validates websites are active.
 """
 
-import json
 import re
 import asyncio
 import aiohttp
@@ -14,6 +13,11 @@ from collections import defaultdict
 from urllib.parse import urlparse
 import sys
 
+import jsonio
+from exporter import CSV_COLUMNS, EXPORT_COMPRESS, EXPORT_FORMATS, export
+from pipeline_stats import StageTimer, export_prometheus, load_filter_score, print_stage_table
+from profiling import NullProfiler, Profiler
+
 RAW_DIR = Path.home() / "dumpstermap" / "data" / "raw"
 CLEAN_DIR = Path.home() / "dumpstermap" / "data" / "cleaned"
 VALIDATED_DIR = Path.home() / "dumpstermap" / "data" / "validated"
@@ -232,8 +236,9 @@ async def validate_websites(records: list, concurrency: int = 50) -> list:
         return validated
 
 
-def clean_all():
+def clean_all(run_stamp: str = None, profiler=None):
     """Run full cleaning pipeline."""
+    run_stamp = run_stamp or datetime.now().strftime('%Y%m%d_%H%M')
     CLEAN_DIR.mkdir(parents=True, exist_ok=True)
     
     stats = {
@@ -245,46 +250,15 @@ def clean_all():
         "by_state": {}
     }
     
-    all_records = []
+    timer = StageTimer(stats, profiler=profiler)
     
     print("=" * 60)
     print("PHASE 1: Loading and filtering raw data")
     print("=" * 60)
     
-    for state_file in sorted(RAW_DIR.glob("*.json")):
-        if state_file.name == "pull_summary.json":
-            continue
-        
-        state_name = state_file.stem.replace("_", " ").title()
-        
-        with open(state_file) as f:
-            records = json.load(f)
-        
-        stats["total_raw"] += len(records)
-        
-        kept = []
-        state_removed = defaultdict(int)
-        
-        for r in records:
-            should_rm, reason = should_remove(r)
-            if should_rm:
-                stats["removed"][reason] += 1
-                state_removed[reason] += 1
-            else:
-                r["_quality_score"] = calculate_quality_score(r)
-                r["_source_state"] = state_name
-                kept.append(r)
-        
-        all_records.extend(kept)
-        stats["by_state"][state_name] = {
-            "raw": len(records),
-            "kept": len(kept),
-            "removed": dict(state_removed)
-        }
-        
-        print(f"  ✅ {state_name}: {len(records)} → {len(kept)}")
-    
-    stats["total_after_filter"] = len(all_records)
+    # Load, filter and score one state file at a time
+    all_records = load_filter_score(RAW_DIR, stats, timer, should_remove, calculate_quality_score,
+                                    line="  ✅ {state}: {raw} → {kept}")
     
     print(f"\n📊 After filtering: {stats['total_after_filter']} records")
     
@@ -292,7 +266,8 @@ def clean_all():
     print("PHASE 2: Deduplicating across states")
     print("=" * 60)
     
-    unique_records, dupes = deduplicate(all_records)
+    with timer.stage("dedup", records=len(all_records)):
+        unique_records, dupes = deduplicate(all_records)
     stats["duplicates_removed"] = dupes
     stats["total_clean"] = len(unique_records)
     
@@ -300,24 +275,39 @@ def clean_all():
     print(f"  📊 After dedup: {len(unique_records)} records")
     
     # Sort by quality
-    unique_records.sort(key=lambda x: x.get("_quality_score", 0), reverse=True)
+    with timer.stage("sort", records=len(unique_records)):
+        unique_records.sort(key=lambda x: x.get("_quality_score", 0), reverse=True)
     
     # Save cleaned data
-    output_file = CLEAN_DIR / f"all_providers_{datetime.now().strftime('%Y%m%d_%H%M')}.json"
-    with open(output_file, "w") as f:
-        json.dump(unique_records, f, indent=2)
+    with timer.stage("write", records=len(unique_records)):
+        outputs = export(unique_records, CLEAN_DIR / f"all_providers_{run_stamp}",
+                         EXPORT_FORMATS or ("json",), compress=EXPORT_COMPRESS)
+    timer.close()
     
     # Save stats
-    stats_file = CLEAN_DIR / f"cleaning_stats_{datetime.now().strftime('%Y%m%d_%H%M')}.json"
     stats["removed"] = dict(stats["removed"])
-    with open(stats_file, "w") as f:
-        json.dump(stats, f, indent=2)
+    save_stats(stats, run_stamp)
     
-    print(f"\n💾 Saved to {output_file}")
+    print(f"\n💾 Saved to {', '.join(str(p) for p in outputs.values())}")
     
     return unique_records, stats
 
 
+def save_stats(stats: dict, run_stamp: str):
+    """Write stats (including per-stage metrics) to the run's stats file."""
+    stats_file = CLEAN_DIR / f"cleaning_stats_{run_stamp}.json"
+    jsonio.dump(stats, stats_file)
+    export_prometheus(stats, "validate_and_clean")
+
+
+def website_status(record: dict) -> str:
+    ws = record.get("_website_check", {})
+    return "reachable" if ws.get("reachable") else ws.get("status", "no_url")
+
+
+VALIDATED_CSV_COLUMNS = CSV_COLUMNS[:3] + [("website_status", website_status)] + CSV_COLUMNS[3:]
+
+
 async def validate_all(records: list):
     """Validate websites for all records."""
     VALIDATED_DIR.mkdir(parents=True, exist_ok=True)
@@ -347,45 +337,34 @@ async def validate_all(records: list):
     # Sort by quality
     all_validated.sort(key=lambda x: x.get("_quality_score", 0), reverse=True)
     
-    # Save validated data
-    output_file = VALIDATED_DIR / f"validated_providers_{datetime.now().strftime('%Y%m%d_%H%M')}.json"
-    with open(output_file, "w") as f:
-        json.dump(all_validated, f, indent=2)
-    
-    # Save CSV for easy viewing
-    csv_file = VALIDATED_DIR / f"validated_providers_{datetime.now().strftime('%Y%m%d_%H%M')}.csv"
-    with open(csv_file, "w") as f:
-        f.write("name,phone,website,website_status,city,state,rating,reviews,quality_score\n")
-        for r in all_validated:
-            name = (r.get("name") or "").replace(",", " ").replace('"', "'")
-            phone = r.get("phone", "")
-            website = r.get("website", "")
-            ws = r.get("_website_check", {})
-            website_status = "reachable" if ws.get("reachable") else ws.get("status", "no_url")
-            city = r.get("city", "")
-            state = r.get("state", "")
-            rating = r.get("rating", "")
-            reviews = r.get("reviews", "")
-            quality = r.get("_quality_score", "")
-            f.write(f'"{name}","{phone}","{website}","{website_status}","{city}","{state}",{rating},{reviews},{quality}\n')
+    # Save validated data, plus CSV for easy viewing
+    outputs = export(all_validated, VALIDATED_DIR / f"validated_providers_{datetime.now().strftime('%Y%m%d_%H%M')}",
+                     EXPORT_FORMATS or ("json", "csv"), VALIDATED_CSV_COLUMNS, compress=EXPORT_COMPRESS)
     
     print(f"\n💾 Saved to:")
-    print(f"  {output_file}")
-    print(f"  {csv_file}")
+    for path in outputs.values():
+        print(f"  {path}")
     
     return all_validated
 
 
-async def main():
+async def main(profiler=None):
+    profiler = profiler or NullProfiler()
     print("\n" + "=" * 60)
     print("🗺️  DUMPSTERMAP DATA CLEANING & VALIDATION")
     print("=" * 60 + "\n")
     
     # Phase 1 & 2: Clean
-    cleaned, stats = clean_all()
+    run_stamp = datetime.now().strftime('%Y%m%d_%H%M')
+    cleaned, stats = clean_all(run_stamp, profiler)
     
     # Phase 3: Validate
-    validated = await validate_all(cleaned)
+    timer = StageTimer(stats, profiler=profiler)
+    with timer.stage("validate", records=len(cleaned), mode="async"):
+        profiler.attach_loop()
+        validated = await validate_all(cleaned)
+    timer.close()
+    save_stats(stats, run_stamp)
     
     # Final summary
     print("\n" + "=" * 60)
@@ -398,8 +377,11 @@ async def main():
     
     ws_reachable = sum(1 for r in validated if r.get("_website_check", {}).get("reachable"))
     print(f"  Websites OK:      {ws_reachable:,}")
-    print("=" * 60 + "\n")
+    print("=" * 60)
+    print_stage_table(stats)
+    profiler.finish()
+    print()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(Profiler.from_argv("validate_and_clean", VALIDATED_DIR)))
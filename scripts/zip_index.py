@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+DumpsterMap - Offline ZIP -> nearest providers index
+
+Precomputes, for every ZIP centroid, the k nearest providers by
+great-circle distance, so a by-ZIP lookup is two array reads instead of
+a scan of every provider.
+
+- Providers and centroids are placed on the unit sphere as (x, y, z);
+  straight-line (chord) distance there orders points exactly as
+  great-circle distance does, so a plain 3-d KD-tree answers k-nearest
+  queries. Ties go to the provider that sorts first.
+- ZIP centroids come from a ZCTA gazetteer or zip,lat,lng CSV when one
+  is given (--zips, default data/zip_centroids.csv if present), else
+  from the mean location of the corpus's providers in each ZIP.
+- The artifact (data/zip_nearest.bin) holds a 100,000-entry slot table
+  indexed by the ZIP's number, k (provider, miles) pairs per ZIP, and
+  the providers as compact JSON behind an offset array. Everything is
+  little-endian; see write() for the layout.
+- Rebuilds are incremental. The header keeps a fingerprint per state. A
+  ZIP is only re-queried when its centroid moved, or a provider in a
+  changed state was one of its neighbours or now comes within its k-th
+  distance. The output matches a full rebuild.
+
+Usage:
+  python zip_index.py                        # Latest data/cleaned snapshot
+  python zip_index.py <all_providers.json> [--zips FILE] [--k 10] [--full]
+  python zip_index.py lookup 78701           # Query the built index
+"""
+
+import csv
+import hashlib
+import heapq
+import math
+import mmap
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+
+import jsonio
+from columnar import latest_clean_json
+from ranking import LISTING_FIELDS
+
+ROOT = Path(__file__).parent.parent
+CLEAN_DIR = ROOT / "data" / "cleaned"
+INDEX_FILE = ROOT / "data" / "zip_nearest.bin"
+CENTROIDS_FILE = ROOT / "data" / "zip_centroids.csv"
+
+MAGIC = b"DMZIPNN1"
+VERSION = 1
+ALIGN = 8
+K = 10
+ZIP_SLOTS = 100_000
+EMPTY = 0xFFFFFFFF
+EARTH_MILES = 3959
+LEAF_SIZE = 8
+
+FIELDS = ("key",) + LISTING_FIELDS + ("postal_code", "latitude", "longitude")
+
+
+def to_xyz(lat: float, lng: float) -> tuple:
+    phi, lam = math.radians(lat), math.radians(lng)
+    return (math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi))
+
+
+def chord_miles(d2: float) -> float:
+    """Great-circle miles for a squared chord length on the unit sphere."""
+    return 2 * EARTH_MILES * math.asin(min(1.0, math.sqrt(d2) / 2))
+
+
+def _d2(a: tuple, b: tuple) -> float:
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+# =============================================================================
+# KD-tree
+# =============================================================================
+
+class KDTree:
+    """Exact k-nearest neighbours over 3-d points; index ties break low."""
+
+    def __init__(self, points: list):
+        self.points = points
+        self.root = self._build(list(range(len(points))), 0) if points else None
+
+    def _build(self, idx: list, depth: int):
+        if len(idx) <= LEAF_SIZE:
+            return idx
+        axis = depth % 3
+        idx.sort(key=lambda i: self.points[i][axis])
+        mid = len(idx) // 2
+        return (axis, self.points[idx[mid]][axis], self._build(idx[:mid], depth + 1),
+                self._build(idx[mid:], depth + 1))
+
+    def query(self, q: tuple, k: int) -> list:
+        """[(squared chord, index)] for the k nearest points, nearest first."""
+        heap = []  # (-d2, -i): the root is the worst kept neighbour
+        qx, qy, qz = q
+        points = self.points
+
+        def visit(node):
+            if isinstance(node, list):
+                for i in node:
+                    x, y, z = points[i]
+                    item = (-((x - qx) ** 2 + (y - qy) ** 2 + (z - qz) ** 2), -i)
+                    if len(heap) < k:
+                        heapq.heappush(heap, item)
+                    elif item > heap[0]:
+                        heapq.heapreplace(heap, item)
+                return
+            axis, split, left, right = node
+            diff = q[axis] - split
+            near, far = (left, right) if diff < 0 else (right, left)
+            visit(near)
+            # Left holds coordinates <= split and right >= split, so diff**2
+            # bounds either side; <= keeps equally distant points in play
+            if len(heap) < k or diff * diff <= -heap[0][0]:
+                visit(far)
+
+        if self.root is not None and k > 0:
+            visit(self.root)
+        return sorted((-d2, -i) for d2, i in heap)
+
+    def any_within(self, q: tuple, r2: float) -> bool:
+        """Whether some point lies within squared chord r2 of q (inclusive)."""
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                if any(_d2(q, self.points[i]) <= r2 for i in node):
+                    return True
+                continue
+            axis, split, left, right = node
+            diff = q[axis] - split
+            stack.append(left if diff < 0 else right)
+            if diff * diff <= r2:
+                stack.append(right if diff < 0 else left)
+        return False
+
+
+# =============================================================================
+# Inputs
+# =============================================================================
+
+def provider_key(r: dict) -> str:
+    return r.get("place_id") or f"{r.get('name')}|{r.get('latitude')}|{r.get('longitude')}"
+
+
+def load_providers(records: list) -> list:
+    """Located providers as compact dicts, in (state, key) order."""
+    out = []
+    for r in records:
+        lat, lng = r.get("latitude"), r.get("longitude")
+        if isinstance(lat, (int, float)) and isinstance(lng, (int, float)) and (lat or lng):
+            p = {f: r.get(f) for f in FIELDS[1:]}
+            p["key"] = provider_key(r)
+            out.append({f: p[f] for f in FIELDS})
+    out.sort(key=lambda p: (p["state"] or "", p["key"]))
+    return out
+
+
+def state_fingerprints(providers: list) -> dict:
+    digests = {}
+    for p in providers:
+        digests.setdefault(p["state"] or "", hashlib.sha256()).update(jsonio.dumps(p) + b"\n")
+    return {state: h.hexdigest() for state, h in digests.items()}
+
+
+def zip5(value) -> str | None:
+    digits = str(value or "").strip()[:5]
+    return digits if len(digits) == 5 and digits.isdigit() else None
+
+
+def load_centroids(path: Path) -> dict:
+    """{zip: (lat, lng)} from a Census ZCTA gazetteer (tab separated) or a zip,lat,lng CSV."""
+    with open(path, newline="") as f:
+        sample = f.readline()
+        f.seek(0)
+        reader = csv.DictReader(f, delimiter="\t" if "\t" in sample else ",")
+        reader.fieldnames = [h.strip().lower() for h in reader.fieldnames]
+        zip_col = next(c for c in reader.fieldnames if c in ("geoid", "zip", "zcta", "zipcode", "postal_code"))
+        lat_col = next(c for c in reader.fieldnames if c in ("intptlat", "lat", "latitude"))
+        lng_col = next(c for c in reader.fieldnames if c in ("intptlong", "lng", "lon", "longitude"))
+        centroids = {}
+        for row in reader:
+            z = zip5(row[zip_col])
+            if z:
+                centroids[z] = (float(row[lat_col]), float(row[lng_col]))
+    return centroids
+
+
+def corpus_centroids(providers: list) -> dict:
+    """{zip: mean provider location} for ZIPs that appear in the corpus."""
+    sums = {}
+    for p in providers:
+        z = zip5(p.get("postal_code"))
+        if z:
+            s = sums.setdefault(z, [0.0, 0.0, 0])
+            s[0] += p["latitude"]
+            s[1] += p["longitude"]
+            s[2] += 1
+    return {z: (lat / n, lng / n) for z, (lat, lng, n) in sorted(sums.items())}
+
+
+# =============================================================================
+# Artifact
+# =============================================================================
+
+def write(path, header: dict, centroids: dict, neighbours: dict, providers: list):
+    """
+    MAGIC, uint32 header length, JSON header, padding to 8, then sections
+    (byte ranges in header["sections"]):
+      slots      uint32[100000]  row + 1 for each ZIP number, 0 if absent
+      zips       uint32[rows]    ZIP of each row
+      centroids  float64[rows*2] lat, lng of each row
+      providers  uint32[rows*k]  provider index, 0xFFFFFFFF past the end
+      miles      float32[rows*k]
+      offsets    uint64[n + 1]   into heap: provider i's compact JSON
+      heap
+    """
+    k = header["k"]
+    slots = array("I", bytes(4 * ZIP_SLOTS))
+    zip_col, centroid_col, nbr, miles = array("I"), array("d"), array("I"), array("f")
+    for row, z in enumerate(sorted(centroids)):
+        slots[int(z)] = row + 1
+        zip_col.append(int(z))
+        centroid_col.extend(centroids[z])
+        found = neighbours[z]
+        nbr.extend([i for i, _ in found] + [EMPTY] * (k - len(found)))
+        miles.extend([d for _, d in found] + [0.0] * (k - len(found)))
+    offsets, heap = array("Q", [0]), bytearray()
+    for p in providers:
+        heap += jsonio.dumps(p)
+        offsets.append(len(heap))
+
+    blobs, size = [], 0
+    sections = {}
+    for name, data in (("slots", slots), ("zips", zip_col), ("centroids", centroid_col), ("providers", nbr),
+                       ("miles", miles), ("offsets", offsets), ("heap", heap)):
+        if isinstance(data, array):
+            if sys.byteorder == "big":
+                data.byteswap()
+            data = data.tobytes()
+        sections[name] = [size, len(data)]
+        pad = -len(data) % ALIGN
+        blobs.append(bytes(data) + b"\0" * pad)
+        size += len(data) + pad
+
+    header = dict(header, version=VERSION, rows=len(centroids), count=len(providers), sections=sections)
+    meta = jsonio.dumps(header)
+    prefix = MAGIC + struct.pack("<I", len(meta)) + meta
+    prefix += b"\0" * (-len(prefix) % ALIGN)
+    tmp = Path(path).with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(prefix)
+        for blob in blobs:
+            f.write(blob)
+    tmp.replace(path)
+
+
+class ZipIndex:
+    """Memory-mapped index. nearest() is O(1): one slot read, one row read."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a ZIP index")
+        (size,) = struct.unpack_from("<I", self._map, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.header = jsonio.loads(self._map[start:start + size])
+        self.k = self.header["k"]
+        self._data = start + size + (-(start + size) % ALIGN)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def _at(self, section: str, fmt: str, i: int):
+        """Record i of a section made of fmt-sized records."""
+        return struct.unpack_from(fmt, self._map, self._data + self.header["sections"][section][0]
+                                  + i * struct.calcsize(fmt))
+
+    def provider(self, i: int) -> dict:
+        start, end = struct.unpack_from("<2Q", self._map, self._data + self.header["sections"]["offsets"][0] + 8 * i)
+        heap = self._data + self.header["sections"]["heap"][0]
+        return jsonio.loads(self._map[heap + start:heap + end])
+
+    def row(self, zip_code: str) -> list:
+        """[(provider index, miles)] for a ZIP, nearest first ([] if unknown)."""
+        z = zip5(zip_code)
+        if z is None:
+            return []
+        (slot,) = self._at("slots", "<I", int(z))
+        if not slot:
+            return []
+        idx = self._at("providers", f"<{self.k}I", slot - 1)
+        miles = self._at("miles", f"<{self.k}f", slot - 1)
+        return [(i, d) for i, d in zip(idx, miles) if i != EMPTY]
+
+    def nearest(self, zip_code: str) -> list:
+        """Provider dicts with a "miles" field, nearest first."""
+        return [dict(self.provider(i), miles=round(d, 1)) for i, d in self.row(zip_code)]
+
+    def rows(self) -> dict:
+        """{zip: ((lat, lng), [provider key])} for every row (used by incremental rebuilds)."""
+        n = self.header["rows"]
+        zips = self._at("zips", f"<{n}I", 0) if n else ()
+        keys = [self.provider(i)["key"] for i in range(self.header["count"])]
+        return {f"{z:05d}": (self._at("centroids", "<2d", row), [keys[i] for i, _ in self.row(f"{z:05d}")])
+                for row, z in enumerate(zips)}
+
+
+# =============================================================================
+# Build
+# =============================================================================
+
+def _previous(path: Path, k: int):
+    """(header, {zip: (centroid, [provider key])}, {key: provider}) of a compatible index, else None."""
+    if not path.exists():
+        return None
+    try:
+        with ZipIndex(path) as old:
+            if old.header.get("version") != VERSION or old.k != k:
+                return None
+            providers = {p["key"]: p for p in map(old.provider, range(old.header["count"]))}
+            return old.header, old.rows(), providers
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def build(providers: list, centroids: dict, path: Path = INDEX_FILE, k: int = K, full: bool = False) -> dict:
+    """Write the index for providers and centroids. Returns build stats."""
+    start = time.perf_counter()
+    states = state_fingerprints(providers)
+    points = [to_xyz(p["latitude"], p["longitude"]) for p in providers]
+    index_of = {p["key"]: i for i, p in enumerate(providers)}
+    tree = KDTree(points)
+    # Stored rounded, so an unchanged centroid compares equal on the next run
+    centroids = {z: (round(lat, 6), round(lng, 6)) for z, (lat, lng) in sorted(centroids.items())}
+    zips = list(centroids)
+    zip_xyz = {z: to_xyz(*centroids[z]) for z in zips}
+
+    prev = None if full else _previous(Path(path), k)
+    todo = set(zips)
+    kept = {}
+    if prev:
+        header, old_rows, old_providers = prev
+        old_states = header["states"]
+        changed = {s for s in set(states) | set(old_states) if states.get(s) != old_states.get(s)}
+        gone = {key for key, p in old_providers.items() if (p["state"] or "") in changed}
+        added = [i for i, p in enumerate(providers) if (p["state"] or "") in changed]
+        added_tree = KDTree([points[i] for i in added])
+        todo = set()
+        for z in zips:
+            centroid, row = old_rows.get(z, (None, None))
+            if row is None or centroid != centroids[z] or any(key in gone for key in row):
+                todo.add(z)
+                continue
+            indices = [index_of[key] for key in row]
+            kth = _d2(zip_xyz[z], points[indices[-1]]) if indices else 0.0
+            if added and (len(row) < k or added_tree.any_within(zip_xyz[z], kth)):
+                todo.add(z)
+                continue
+            kept[z] = indices
+
+    neighbours = {}
+    for z in zips:
+        if z in todo:
+            found = tree.query(zip_xyz[z], k)
+            neighbours[z] = [(i, chord_miles(d2)) for d2, i in found]
+        else:
+            neighbours[z] = [(i, chord_miles(_d2(zip_xyz[z], points[i]))) for i in kept[z]]
+
+    write(path, {"k": k, "states": states}, centroids, neighbours, providers)
+    return {"zips": len(zips), "providers": len(providers), "queried": len(todo),
+            "incremental": prev is not None, "seconds": time.perf_counter() - start}
+
+
+def main():
+    args = sys.argv[1:]
+    if args and args[0] == "lookup":
+        with ZipIndex(INDEX_FILE) as index:
+            for p in index.nearest(args[1]):
+                print(f"   {p['miles']:6.1f} mi  {p['name']} ({p['city']}, {p['state']})")
+        return
+    k = int(args[args.index("--k") + 1]) if "--k" in args else K
+    zips_path = Path(args[args.index("--zips") + 1]) if "--zips" in args else CENTROIDS_FILE
+    paths = [a for a in args if a.endswith(".json")]
+    source = Path(paths[0]) if paths else latest_clean_json(CLEAN_DIR)
+    if not source:
+        print(f"❌ No all_providers_YYYYMMDD.json in {CLEAN_DIR} (run clean_data.py first)")
+        sys.exit(1)
+
+    providers = load_providers(jsonio.load(source))
+    if zips_path.exists():
+        centroids = load_centroids(zips_path)
+        origin = zips_path.name
+    else:
+        centroids = corpus_centroids(providers)
+        origin = "provider locations (no ZIP centroid file)"
+    print(f"📮 {len(providers):,} providers from {source.name}, {len(centroids):,} ZIPs from {origin}")
+    r = build(providers, centroids, k=k, full="--full" in args)
+    mode = "incremental" if r["incremental"] else "full"
+    print(f"   ✅ {INDEX_FILE.name}: {r['queried']:,} of {r['zips']:,} ZIPs queried ({mode}), "
+          f"{INDEX_FILE.stat().st_size / 1e6:.1f} MB in {r['seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()